@@ -0,0 +1,10 @@
+-- backend/sql/game_questions_correct_option_index.sql
+--
+-- Display position of the correct answer among a game question's options.
+-- Options are ordered deterministically from the game and question IDs
+-- (src/game/option_order.py), so storing this index at game start lets
+-- GameService check answers without reading questions or incorrect_answers.
+-- Rows created before this column existed keep NULL and are checked the old way.
+
+alter table game_questions
+    add column if not exists correct_option_index integer;
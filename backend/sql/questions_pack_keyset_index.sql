@@ -0,0 +1,10 @@
+-- backend/sql/questions_pack_keyset_index.sql
+--
+-- Index for QuestionRepository.iter_pages_by_pack_id.
+--
+-- Pack questions are read in keyset pages: pack_id = ? and id > last id,
+-- ordered by id. This index serves each page as a range scan starting at
+-- the previous page's last row, however far into the pack it is.
+
+create index concurrently if not exists questions_pack_id_id_idx
+    on questions (pack_id, id);
@@ -0,0 +1,57 @@
+-- backend/sql/record_game_answer.sql
+--
+-- Atomically record one participant's answer and score for a game question.
+-- Called by GameQuestionRepository.record_answer via supabase.rpc("record_game_answer", ...).
+--
+-- The participant's key is merged into participant_answers/participant_scores
+-- with jsonb concatenation inside a single UPDATE, so concurrent answers from
+-- different players never overwrite each other. The "not already answered" and
+-- "question still open" checks are part of the same statement, so a duplicate
+-- submission cannot be recorded twice. The participant's running total is
+-- incremented in the same transaction. The participant row is checked (and
+-- locked) before anything is written; a missing participant raises
+-- no_data_found (SQLSTATE P0002) rather than leaving an answer with no score.
+--
+-- Returns one row:
+--   recorded     false if the question was closed, missing or already answered
+--   total_score  the participant's score after this answer (NULL if not recorded)
+
+create or replace function record_game_answer(
+    p_game_question_id uuid,
+    p_participant_id uuid,
+    p_answer text,
+    p_score integer
+)
+returns table (recorded boolean, total_score integer)
+language plpgsql
+as $$
+declare
+    v_key text := p_participant_id::text;
+    v_updated integer;
+begin
+    perform 1 from game_participants where id = p_participant_id for update;
+    if not found then
+        raise exception 'Participant % not found', p_participant_id using errcode = 'no_data_found';
+    end if;
+
+    update game_questions
+       set participant_answers = coalesce(participant_answers, '{}'::jsonb) || jsonb_build_object(v_key, p_answer),
+           participant_scores  = coalesce(participant_scores,  '{}'::jsonb) || jsonb_build_object(v_key, p_score)
+     where id = p_game_question_id
+       and end_time is null
+       and not (coalesce(participant_answers, '{}'::jsonb) ? v_key);
+
+    get diagnostics v_updated = row_count;
+    if v_updated = 0 then
+        return query select false, null::integer;
+        return;
+    end if;
+
+    return query
+    update game_participants
+       set score = coalesce(score, 0) + p_score,
+           last_activity = now()
+     where id = p_participant_id
+    returning true, score;
+end;
+$$;
@@ -0,0 +1,72 @@
+-- backend/sql/record_game_answers.sql
+--
+-- Record a batch of answers (any number of questions and participants) in one call.
+-- Called by GameQuestionRepository.record_answers via supabase.rpc("record_game_answers", ...)
+-- when the answer write-behind buffer flushes.
+--
+-- p_answers is a JSON array of
+--   {"game_question_id": uuid, "participant_id": uuid, "answer": text, "score": integer}
+--
+-- The batch's game_questions rows are locked, each question gets one UPDATE
+-- merging all of its new answers/scores into the JSONB maps, and each
+-- participant's total is incremented once by the sum of their new scores.
+-- Answers a question already holds are skipped, so retrying a batch is safe.
+-- Unlike record_game_answer there is no end_time check: the answers were
+-- accepted while the question was open and may be flushed after it closed.
+--
+-- Returns one row per distinct (game_question_id, participant_id) in the batch:
+--   recorded  false if the question or participant is missing or the answer was already recorded
+
+create or replace function record_game_answers(p_answers jsonb)
+returns table (game_question_id uuid, participant_id uuid, recorded boolean)
+language plpgsql
+as $$
+begin
+    perform 1
+       from game_questions q
+      where q.id in (select (a->>'game_question_id')::uuid from jsonb_array_elements(p_answers) as a)
+      order by q.id
+        for update;
+
+    return query
+    with batch as (
+        select distinct on (a->>'game_question_id', a->>'participant_id')
+               (a->>'game_question_id')::uuid as gq_id,
+               (a->>'participant_id')::uuid as p_id,
+               a->>'answer' as answer,
+               coalesce((a->>'score')::integer, 0) as points
+          from jsonb_array_elements(p_answers) as a
+    ),
+    fresh as (
+        select b.*
+          from batch b
+          join game_questions q on q.id = b.gq_id
+          join game_participants gp on gp.id = b.p_id
+         where not (coalesce(q.participant_answers, '{}'::jsonb) ? b.p_id::text)
+    ),
+    merged as (
+        update game_questions q
+           set participant_answers = coalesce(q.participant_answers, '{}'::jsonb) || f.answers,
+               participant_scores  = coalesce(q.participant_scores,  '{}'::jsonb) || f.scores
+          from (
+                select gq_id,
+                       jsonb_object_agg(p_id::text, answer) as answers,
+                       jsonb_object_agg(p_id::text, points) as scores
+                  from fresh
+                 group by gq_id
+               ) f
+         where q.id = f.gq_id
+        returning q.id
+    ),
+    scored as (
+        update game_participants gp
+           set score = coalesce(gp.score, 0) + t.points,
+               last_activity = now()
+          from (select p_id, sum(points)::integer as points from fresh group by p_id) t
+         where gp.id = t.p_id
+        returning gp.id
+    )
+    select b.gq_id, b.p_id, exists (select 1 from fresh f where f.gq_id = b.gq_id and f.p_id = b.p_id)
+      from batch b;
+end;
+$$;
@@ -0,0 +1,128 @@
+-- backend/sql/user_pack_seen_questions.sql
+--
+-- Per-(user, pack) seen-question bitmaps used by GameService._select_questions_for_game
+-- instead of querying user_question_history for every pack question at game start.
+--
+-- 1. questions.pack_ordinal: a stable ordinal for each question within its pack.
+--    Existing questions are numbered by (created_at, id). New questions get the
+--    next free ordinal from a trigger. Ordinals are never reused, so deleting a
+--    question only leaves an unused bit.
+-- 2. user_pack_history.seen_questions: base64 bitmap over pack_ordinal (bit n
+--    = least significant bit first within each byte). It is backfilled from
+--    user_question_history.
+-- 3. mark_questions_seen(pack, users, ordinals): sets bits for several users in
+--    one statement. It is called by UserPackHistoryRepository.mark_questions_seen
+--    when a question ends.
+
+-- 1. Question ordinals -------------------------------------------------------
+
+alter table questions add column if not exists pack_ordinal integer;
+
+update questions q
+   set pack_ordinal = r.ordinal
+  from (
+        select id, (row_number() over (partition by pack_id order by created_at, id) - 1)::integer as ordinal
+          from questions
+       ) r
+ where q.id = r.id
+   and q.pack_ordinal is null;
+
+create unique index if not exists questions_pack_ordinal_idx on questions (pack_id, pack_ordinal);
+
+create or replace function assign_question_pack_ordinal()
+returns trigger
+language plpgsql
+as $$
+begin
+    if new.pack_ordinal is null then
+        -- Serialize ordinal assignment per pack; rows inserted earlier in the same statement are visible here
+        perform pg_advisory_xact_lock(hashtext('questions.pack_ordinal:' || new.pack_id::text));
+        select coalesce(max(pack_ordinal) + 1, 0) into new.pack_ordinal from questions where pack_id = new.pack_id;
+    end if;
+    return new;
+end;
+$$;
+
+drop trigger if exists questions_assign_pack_ordinal on questions;
+create trigger questions_assign_pack_ordinal
+    before insert on questions
+    for each row execute function assign_question_pack_ordinal();
+
+-- 2. Seen bitmaps --------------------------------------------------------------
+
+alter table user_pack_history add column if not exists seen_questions text;
+
+-- Set the given ordinals in a base64 bitmap, growing it as needed
+create or replace function seen_bitmap_set(p_bitmap text, p_ordinals integer[])
+returns text
+language plpgsql
+immutable
+as $$
+declare
+    v_bits bytea := coalesce(decode(nullif(p_bitmap, ''), 'base64'), ''::bytea);
+    v_needed integer;
+    v_ordinal integer;
+begin
+    select max(o) / 8 + 1 into v_needed from unnest(p_ordinals) as o where o >= 0;
+    if v_needed is null then
+        return coalesce(p_bitmap, '');
+    end if;
+    if length(v_bits) < v_needed then
+        v_bits := v_bits || decode(repeat('00', v_needed - length(v_bits)), 'hex');
+    end if;
+    foreach v_ordinal in array p_ordinals loop
+        if v_ordinal >= 0 then
+            v_bits := set_bit(v_bits, v_ordinal, 1);
+        end if;
+    end loop;
+    -- encode() wraps base64 output every 76 characters
+    return translate(encode(v_bits, 'base64'), E'\n', '');
+end;
+$$;
+
+-- Players with history but no pack history row get one (play_count 0) so their bitmap has a home
+insert into user_pack_history (user_id, pack_id, play_count, last_played_at)
+select h.user_id, q.pack_id, 0, max(h.created_at)
+  from user_question_history h
+  join questions q on q.id = h.question_id
+ where not exists (select 1 from user_pack_history p where p.user_id = h.user_id and p.pack_id = q.pack_id)
+ group by h.user_id, q.pack_id;
+
+update user_pack_history uph
+   set seen_questions = seen_bitmap_set('', s.ordinals)
+  from (
+        select h.user_id, q.pack_id, array_agg(distinct q.pack_ordinal) as ordinals
+          from user_question_history h
+          join questions q on q.id = h.question_id
+         group by h.user_id, q.pack_id
+       ) s
+ where uph.user_id = s.user_id
+   and uph.pack_id = s.pack_id;
+
+update user_pack_history set seen_questions = '' where seen_questions is null;
+alter table user_pack_history alter column seen_questions set default '';
+
+-- 3. Incremental maintenance ---------------------------------------------------
+
+create or replace function mark_questions_seen(p_pack_id uuid, p_user_ids uuid[], p_ordinals integer[])
+returns integer
+language plpgsql
+as $$
+declare
+    v_updated integer;
+begin
+    update user_pack_history
+       set seen_questions = seen_bitmap_set(seen_questions, p_ordinals)
+     where pack_id = p_pack_id
+       and user_id = any(p_user_ids);
+    get diagnostics v_updated = row_count;
+
+    -- First play of the pack whose pack history row is missing
+    insert into user_pack_history (user_id, pack_id, play_count, last_played_at, seen_questions)
+    select u, p_pack_id, 0, now(), seen_bitmap_set('', p_ordinals)
+      from unnest(p_user_ids) as u
+     where not exists (select 1 from user_pack_history p where p.user_id = u and p.pack_id = p_pack_id);
+
+    return v_updated;
+end;
+$$;
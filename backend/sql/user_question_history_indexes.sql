@@ -0,0 +1,11 @@
+-- backend/sql/user_question_history_indexes.sql
+--
+-- Index for UserQuestionHistoryRepository.get_seen_question_ids_for_users.
+--
+-- Game start asks which of a pack's questions any of the players has seen:
+-- user_id in (...) and question_id in (...), read in keyset pages ordered by
+-- id. This index answers the filter from its leading columns and carries id
+-- for the page boundary, so the lookup never scans a user's whole history.
+
+create index concurrently if not exists user_question_history_user_question_idx
+    on user_question_history (user_id, question_id, id);
@@ -1,10 +1,14 @@
 # backend/src/api/dependencies.py
 from fastapi import Depends, Request, WebSocket # <<< Import WebSocket
+from typing import Any, Optional
 from supabase import AsyncClient
 
 # --- WebSocket Manager Import ---
 from ..websocket_manager import ConnectionManager # <<< ADDED
 # --- End WebSocket Manager Import ---
+from ..game.game_room import GameRoomRegistry
+from ..game.timer_wheel import TimerWheel
+from ..game.answer_buffer import AnswerBuffer
 
 
 # Ensure repositories are imported FIRST
@@ -27,6 +31,7 @@ from ..services.difficulty_service import DifficultyService
 from ..services.question_service import QuestionService
 from ..services.seed_question_service import SeedQuestionService
 from ..services.incorrect_answer_service import IncorrectAnswerService
+from ..services.pack_build_service import PackBuildService
 from ..services.game_service import GameService
 from ..services.user_service import UserService
 
@@ -67,6 +72,35 @@ async def get_connection_manager(
     return app_state.connection_manager
 # --- END MODIFIED ---
 
+def _app_state_attr(websocket: Optional[WebSocket], request: Optional[Request], name: str, label: str) -> Any:
+    """Get a shared object set on app state at startup, via WebSocket or Request."""
+    connection = websocket or request
+    value = getattr(connection.app.state, name, None) if connection else None
+    if value is None:
+        raise RuntimeError(f"{label} not initialized or found in app state.")
+    return value
+
+async def get_game_room_registry(
+    websocket: WebSocket = None,
+    request: Request = None
+) -> GameRoomRegistry:
+    """Get the shared GameRoomRegistry (in-memory state of active games) from app state."""
+    return _app_state_attr(websocket, request, "game_rooms", "GameRoomRegistry")
+
+async def get_question_timers(
+    websocket: WebSocket = None,
+    request: Request = None
+) -> TimerWheel:
+    """Get the shared question deadline TimerWheel from app state."""
+    return _app_state_attr(websocket, request, "question_timers", "Question TimerWheel")
+
+async def get_answer_buffer(
+    websocket: WebSocket = None,
+    request: Request = None
+) -> AnswerBuffer:
+    """Get the shared answer write-behind buffer from app state."""
+    return _app_state_attr(websocket, request, "answer_buffer", "AnswerBuffer")
+
 # --- Repository dependencies (Unchanged in definition, but rely on modified get_supabase_client) ---
 async def get_pack_repository(
     supabase: AsyncClient = Depends(get_supabase_client)
@@ -174,6 +208,15 @@ async def get_incorrect_answer_service(
         incorrect_answers_repository=incorrect_answers_repository
     )
 
+async def get_pack_build_service(
+    question_service: QuestionService = Depends(get_question_service),
+    incorrect_answer_service: IncorrectAnswerService = Depends(get_incorrect_answer_service)
+) -> PackBuildService:
+    return PackBuildService(
+        question_service=question_service,
+        incorrect_answer_service=incorrect_answer_service
+    )
+
 # --- MODIFIED get_user_service ---
 # No change in signature, but Depends(get_connection_manager) works now
 async def get_user_service(
@@ -201,7 +244,10 @@ async def get_game_service(
     user_repository: UserRepository = Depends(get_user_repository),
     user_question_history_repository: UserQuestionHistoryRepository = Depends(get_user_question_history_repository),
     user_pack_history_repository: UserPackHistoryRepository = Depends(get_user_pack_history_repository),
-    connection_manager: ConnectionManager = Depends(get_connection_manager) # <<< Works now
+    connection_manager: ConnectionManager = Depends(get_connection_manager), # <<< Works now
+    game_room_registry: GameRoomRegistry = Depends(get_game_room_registry),
+    question_timers: TimerWheel = Depends(get_question_timers),
+    answer_buffer: AnswerBuffer = Depends(get_answer_buffer)
 ) -> GameService:
     """Get GameService instance."""
     return GameService(
@@ -213,6 +259,30 @@ async def get_game_service(
         user_repository=user_repository,
         user_question_history_repository=user_question_history_repository,
         user_pack_history_repository=user_pack_history_repository,
-        connection_manager=connection_manager # <<< Injected correctly
+        connection_manager=connection_manager, # <<< Injected correctly
+        game_room_registry=game_room_registry,
+        question_timers=question_timers,
+        answer_buffer=answer_buffer
+    )
+# --- END MODIFIED get_game_service ---
+
+def create_game_service(app_state) -> GameService:
+    """
+    Build a GameService from app state outside of a request (e.g. from a timer
+    callback or an answer buffer flush).
+    """
+    supabase = app_state.supabase
+    return GameService(
+        game_session_repository=GameSessionRepository(supabase),
+        game_participant_repository=GameParticipantRepository(supabase),
+        game_question_repository=GameQuestionRepository(supabase),
+        question_repository=QuestionRepository(supabase),
+        incorrect_answers_repository=IncorrectAnswersRepository(supabase),
+        user_repository=UserRepository(supabase),
+        user_question_history_repository=UserQuestionHistoryRepository(supabase),
+        user_pack_history_repository=UserPackHistoryRepository(supabase),
+        connection_manager=app_state.connection_manager,
+        game_room_registry=app_state.game_rooms,
+        question_timers=app_state.question_timers,
+        answer_buffer=app_state.answer_buffer
     )
-# --- END MODIFIED get_game_service ---
\ No newline at end of file
@@ -1,13 +1,12 @@
 # backend/src/api/routes/game.py
-from fastapi import APIRouter, Depends, HTTPException, Path, Query, Body
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Body, Response
 from typing import Dict, List, Any, Optional
 import logging
-import random # Import random
 import asyncio # Ensure asyncio is imported
 
 from ..dependencies import get_game_service, get_pack_service
 from ..schemas.game import (
-    GameSessionCreateRequest, GameSessionJoinRequest, GameSessionSubmitAnswerRequest,
+    GameSessionCreateRequest, GameSessionJoinRequest, GameSessionSubmitAnswerRequest, GameSessionNextQuestionRequest,
     GameSessionResponse, GameSessionListResponse, QuestionResultResponse, GameResultsResponse,
     GameStartResponse, # <<< Import the new schema
     # --- ADDED IMPORT ---
@@ -127,14 +126,10 @@ async def start_game_endpoint(
     try:
         game_id = ensure_uuid(game_id); user_id = ensure_uuid(user_id)
         game_session = await game_service.start_game(game_session_id=game_id, host_user_id=user_id)
-        game_question = await game_service.game_question_repo.get_by_game_session_and_index(game_id, 0)
-        if not game_question: raise HTTPException(status_code=500, detail="Failed to retrieve first question")
-        original_question = await game_service.question_repo.get_by_id(game_question.question_id)
-        if not original_question: raise HTTPException(status_code=500, detail="Failed to retrieve original question data")
-        incorrect_answers = await game_service.incorrect_answers_repo.get_by_question_id(game_question.question_id)
-        incorrect_options = incorrect_answers.incorrect_answers if incorrect_answers else []
-        all_options = [original_question.answer] + incorrect_options; random.shuffle(all_options)
-        response_data = {"status": game_session.status, "current_question": {"index": 0, "question_text": original_question.question, "options": all_options, "time_limit": game_session.time_limit_seconds}}
+        # Same options, in the same order, as broadcast in game_started
+        first_question = await game_service.get_play_question(game_id, 0)
+        if not first_question: raise HTTPException(status_code=500, detail="Failed to retrieve first question")
+        response_data = {"status": game_session.status, "current_question": {"index": 0, "question_text": first_question.question_text, "options": first_question.options, "time_limit": game_session.time_limit_seconds}}
         return response_data
     except ValueError as e:
         logger.warning(f"Validation error starting game {game_id}: {str(e)}")
@@ -152,6 +147,10 @@ async def get_gameplay_questions(
     """Get the list of questions (with shuffled options) for an active game."""
     try:
         game_id_str = ensure_uuid(game_id)
+        snapshot = game_service.get_play_snapshot(game_id_str)
+        if snapshot is not None:
+            # Serialized once at game start
+            return Response(content=snapshot.list_json, media_type="application/json")
         play_questions = await game_service.get_questions_for_play(game_id_str)
         return GamePlayQuestionListResponse(
             game_id=game_id_str,
@@ -200,12 +199,21 @@ async def submit_answer(
 async def next_question(
     game_id: str = Path(..., description="ID of the game session"),
     user_id: str = Query(..., description="ID of the host user"),
+    next_data: Optional[GameSessionNextQuestionRequest] = Body(None),
     game_service: GameService = Depends(get_game_service)
 ):
-    """Advance to the next question or end the game."""
+    """
+    Advance to the next question or end the game.
+
+    The body's question_index names the question the host is closing; if the
+    timer or the all-answered close got there first, the game is left as it is.
+    """
     try:
         game_id = ensure_uuid(game_id); user_id = ensure_uuid(user_id)
-        result = await game_service.end_current_question(game_session_id=game_id, host_user_id=user_id)
+        result = await game_service.end_current_question(
+            game_session_id=game_id, host_user_id=user_id,
+            expected_index=next_data.question_index if next_data is not None else None
+        )
         return result
     except ValueError as e:
         logger.warning(f"Error advancing question for game {game_id}: {str(e)}")
@@ -9,22 +9,26 @@ from ..dependencies import (
     get_seed_question_service,
     get_difficulty_service,
     get_pack_service,
-    get_incorrect_answer_service
+    get_incorrect_answer_service,
+    get_pack_build_service
 )
 from ..schemas import (
     QuestionGenerateRequest, SeedQuestionRequest, SeedQuestionTextRequest,
     QuestionResponse, QuestionsResponse, SeedQuestionsResponse,
     CustomInstructionsGenerateRequest, CustomInstructionsResponse, # Removed CustomInstructionsInputRequest
     # --- Use the updated schemas ---
-    BatchQuestionGenerateRequest, BatchQuestionGenerateResponse
+    BatchQuestionGenerateRequest, BatchQuestionGenerateResponse,
+    PackBuildRequest, PackBuildResponse
 )
 from ...services.question_service import QuestionService
 from ...services.seed_question_service import SeedQuestionService
 from ...services.difficulty_service import DifficultyService
 from ...services.pack_service import PackService
-from ...services.incorrect_answer_service import IncorrectAnswerService, IncorrectAnswerGenerationError
+from ...services.incorrect_answer_service import IncorrectAnswerService, IncorrectAnswerBatcher, IncorrectAnswerGenerationError
+from ...services.pack_build_service import PackBuildService
 from ...models.question import DifficultyLevel, Question
 from ...utils import ensure_uuid
+from ...utils.llm.llm_scheduler import LLMPriority
 
 # Configure logger
 logger = logging.getLogger(__name__)
@@ -51,29 +55,33 @@ async def generate_questions(
     if not pack:
         raise HTTPException(status_code=404, detail=f"Pack with ID {pack_id} not found")
 
+    # Incorrect answers start per batch of 5 while later questions are still streaming.
+    incorrect_answer_batcher = IncorrectAnswerBatcher(
+        incorrect_answer_service,
+        num_incorrect_answers=3, # Default or get from config
+        batch_size=5, # Default or get from config
+        debug_mode=question_request.debug_mode
+    )
+
     try:
         # 2. Generate Questions for the single topic/difficulty
-        # Custom instructions are handled internally by the service now
+        # Custom instructions are handled internally by the service now.
         created_questions: List[Question] = await question_service.generate_and_store_questions(
             pack_id=pack_id_uuid,
             pack_name=pack.name, # Pass pack name
             pack_topic=question_request.pack_topic,
             difficulty=question_request.difficulty,
             num_questions=question_request.num_questions,
-            debug_mode=question_request.debug_mode
+            debug_mode=question_request.debug_mode,
+            on_question_created=incorrect_answer_batcher.add
             # custom_instructions=question_request.custom_instructions # Removed - Service fetches this
         )
 
-        # 3. Generate Incorrect Answers for the newly created questions
+        # 3. Finish Incorrect Answers for the newly created questions
         if created_questions:
-            logger.info(f"Generated {len(created_questions)} questions for topic '{question_request.pack_topic}'. Now generating incorrect answers...")
+            logger.info(f"Generated {len(created_questions)} questions for topic '{question_request.pack_topic}'. Waiting for incorrect answers...")
             try:
-                await incorrect_answer_service.generate_and_store_incorrect_answers(
-                     questions=created_questions,
-                     num_incorrect_answers=3, # Default or get from config
-                     batch_size=5, # Default or get from config
-                     debug_mode=question_request.debug_mode
-                 )
+                await incorrect_answer_batcher.finish()
                 logger.info(f"Incorrect answer generation complete for topic '{question_request.pack_topic}'.")
             except IncorrectAnswerGenerationError as ia_error:
                  logger.error(f"Failed to generate some incorrect answers for topic '{question_request.pack_topic}': {ia_error.message}")
@@ -89,6 +97,9 @@ async def generate_questions(
     except Exception as e:
         logger.error(f"Error generating single topic questions: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error generating questions: {str(e)}")
+    finally:
+        # No-op once finish() has run; on the error path, stop batches nobody will await
+        await incorrect_answer_batcher.cancel()
 
 
 # --- Batch Question Generation Endpoint ---
@@ -116,6 +127,10 @@ async def batch_generate_questions(
     batch_results: Dict[str, Any] = {}
     final_status = "completed" # Default status
     error_list: List[str] = []
+    # Incorrect answers start per batch of 5 while later questions are still streaming
+    incorrect_answer_batcher = IncorrectAnswerBatcher(
+        incorrect_answer_service, num_incorrect_answers=3, batch_size=5, debug_mode=request.debug_mode
+    )
 
     try:
         # 2. Call the batch question generation service method
@@ -124,12 +139,17 @@ async def batch_generate_questions(
             pack_id=pack_id_uuid,
             pack_name=pack.name, # Pass pack name
             topic_configs=request.topic_configs, # Pass the structure including overrides
-            debug_mode=request.debug_mode
+            debug_mode=request.debug_mode,
+            on_question_created=incorrect_answer_batcher.add
         )
         error_list.extend(batch_results.get("failed_topics", []))
 
     except Exception as e_qg:
         logger.error(f"Core batch question generation failed for pack {pack_id}: {str(e_qg)}", exc_info=True)
+        try:
+            await incorrect_answer_batcher.finish() # Don't leave batches for stored questions running unobserved
+        except Exception as e_ia:
+            logger.error(f"Incorrect answer generation failed after batch question failure for pack {pack_id}: {e_ia}", exc_info=True)
         final_status = "failed"
         error_list = list(set([tc.topic for tc in request.topic_configs]))
         return BatchQuestionGenerateResponse(
@@ -140,11 +160,9 @@ async def batch_generate_questions(
     # 3. Trigger Incorrect Answer Generation
     newly_generated_questions: List[Question] = batch_results.get("generated_questions", [])
     if newly_generated_questions:
-         logger.info(f"Batch question step complete. Triggering incorrect answers for {len(newly_generated_questions)} new questions...")
+         logger.info(f"Batch question step complete. Waiting for incorrect answers for {len(newly_generated_questions)} new questions...")
          try:
-             await incorrect_answer_service.generate_and_store_incorrect_answers(
-                 questions=newly_generated_questions, num_incorrect_answers=3, batch_size=5, debug_mode=request.debug_mode
-             )
+             await incorrect_answer_batcher.finish()
              logger.info("Incorrect answer generation for batch completed.")
          except IncorrectAnswerGenerationError as ia_error:
              logger.error(f"Partial failure during incorrect answer generation for batch in pack {pack_id}: {ia_error.message}")
@@ -417,6 +435,41 @@ async def get_topic_custom_instructions(
         logger.error(f"Error retrieving custom instructions for topic '{topic_name}': {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error: {e}")
 
+# --- Pipelined Pack Build Endpoint ---
+@router.post("/build", response_model=PackBuildResponse)
+async def build_pack_questions(
+    pack_id: str = Path(..., description="ID of the pack"),
+    request: PackBuildRequest = Body(...),
+    pack_service: PackService = Depends(get_pack_service),
+    pack_build_service: PackBuildService = Depends(get_pack_build_service)
+):
+    """
+    Generate questions and their incorrect answers in a single overlapping pipeline.
+    Replaces calling /batch-generate followed by /incorrect-answers/batch, and
+    reports per-stage throughput.
+    """
+    pack_id_uuid = ensure_uuid(pack_id)
+    pack = await pack_service.pack_repository.get_by_id(pack_id_uuid)
+    if not pack:
+        raise HTTPException(status_code=404, detail=f"Pack with ID {pack_id} not found")
+
+    try:
+        summary = await pack_build_service.build_pack(
+            pack_id=pack_id_uuid,
+            pack_name=pack.name,
+            topic_configs=request.topic_configs,
+            regenerate_instructions=request.regenerate_instructions,
+            num_incorrect_answers=request.num_incorrect_answers,
+            batch_size=request.incorrect_answer_batch_size,
+            max_retries=request.incorrect_answer_max_retries,
+            debug_mode=request.debug_mode
+        )
+        return PackBuildResponse(**summary)
+    except Exception as e:
+        logger.error(f"Pack build failed for pack {pack_id}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error building pack: {str(e)}")
+
+
 # --- Incorrect Answers Endpoints (remain unchanged) ---
 @router.post("/{question_id}/incorrect-answers")
 async def generate_single_question_incorrect_answers(
@@ -434,7 +487,8 @@ async def generate_single_question_incorrect_answers(
     if str(question.pack_id) != str(pack_id_uuid): raise HTTPException(status_code=400, detail=f"Question {question_id} not in pack {pack_id}")
     try:
         result_map = await incorrect_answer_service.generate_and_store_incorrect_answers(
-            questions=[question], num_incorrect_answers=num_answers, debug_mode=debug_mode
+            questions=[question], num_incorrect_answers=num_answers, debug_mode=debug_mode,
+            priority=LLMPriority.INTERACTIVE # The caller is waiting on this one question
         )
         # Key should be string representation of UUID
         result_key = str(question_id_uuid)
@@ -16,7 +16,9 @@ from .question import (
     DifficultyConfig,
     TopicQuestionConfig,
     BatchQuestionGenerateRequest,
-    BatchQuestionGenerateResponse
+    BatchQuestionGenerateResponse,
+    PackBuildRequest,
+    PackBuildResponse
 )
 from .game import (
     GameSessionCreateRequest, GameSessionJoinRequest, GameSessionSubmitAnswerRequest,
@@ -27,6 +29,7 @@ from .game import (
     GamePlayQuestionResponse,
     GamePlayQuestionListResponse
 )
+from .websocket import WsCommand, WsSubmitAnswerPayload, WsResyncPayload, WsAck
 from .user import (
     UserCreateRequest, UserResponse, UserUpdateRequest,
     UserLoginRequest, UserAuthRequest, UserConvertRequest
@@ -65,6 +68,8 @@ __all__ = [
     "TopicQuestionConfig",
     "BatchQuestionGenerateRequest",
     "BatchQuestionGenerateResponse",
+    "PackBuildRequest",
+    "PackBuildResponse",
 
     # Game schemas
     "GameSessionCreateRequest",
@@ -81,6 +86,12 @@ __all__ = [
     "GamePlayQuestionResponse",
     "GamePlayQuestionListResponse",
 
+    # WebSocket command schemas
+    "WsCommand",
+    "WsSubmitAnswerPayload",
+    "WsResyncPayload",
+    "WsAck",
+
     # User schemas
     "UserCreateRequest",
     "UserResponse",
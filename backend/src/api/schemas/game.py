@@ -24,6 +24,10 @@ class GameSessionSubmitAnswerRequest(BaseModel):
     question_index: int = Field(..., description="Index of the question being answered", ge=0)
     answer: str = Field(..., description="Answer submitted by the participant")
 
+class GameSessionNextQuestionRequest(BaseModel):
+    """Request schema for ending the current question and advancing."""
+    question_index: Optional[int] = Field(None, description="Index of the question the host is closing; if the game has moved past it, nothing changes", ge=0)
+
 class ParticipantResponse(BaseModel):
     """Response schema for a game participant."""
     id: str
@@ -39,6 +39,25 @@ class BatchQuestionGenerateResponse(BaseModel):
     status: str # e.g., "completed", "partial_failure", "failed"
     errors: Optional[List[str]] = None # List of topic names where at least one difficulty failed
 
+# --- Pipelined Pack Build ---
+class PackBuildRequest(BatchQuestionGenerateRequest):
+    """Request schema for building questions and incorrect answers in one pipeline."""
+    num_incorrect_answers: int = Field(3, description="Incorrect answers per question", ge=1, le=10)
+    incorrect_answer_batch_size: int = Field(5, description="Questions per incorrect-answer LLM call", ge=1, le=20)
+    incorrect_answer_max_retries: int = Field(1, description="Retries for questions whose incorrect answers failed to generate", ge=0, le=5)
+
+class PackBuildResponse(BaseModel):
+    """Response schema for a pipelined pack build."""
+    pack_id: str
+    status: str # "completed", "partial_failure", "failed"
+    topics_processed: List[str]
+    total_questions_generated: int
+    total_incorrect_answers_stored: int
+    failed_topics: List[str] = []
+    failed_question_ids: List[str] = []
+    elapsed_seconds: float
+    stages: Dict[str, Dict[str, Any]] # Per-stage counts, elapsed/busy seconds and items_per_second
+
 # --- Other Schemas (remain largely the same) ---
 
 class QuestionGenerateRequest(BaseModel):
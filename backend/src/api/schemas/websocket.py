@@ -0,0 +1,35 @@
+# backend/src/api/schemas/websocket.py
+from typing import Dict, Optional, Any, Literal
+from pydantic import BaseModel, Field
+
+# Commands a client may send on /ws/{game_id}/{user_id}
+WsCommandType = Literal["submit_answer", "next_question", "ping", "resync"]
+
+class WsCommand(BaseModel):
+    """A command sent by a client over the game WebSocket."""
+    type: WsCommandType = Field(..., description="Command name")
+    id: Optional[str] = Field(None, description="Client correlation ID, echoed in the ack", max_length=64)
+    payload: Dict[str, Any] = Field(default_factory=dict, description="Command arguments")
+
+class WsSubmitAnswerPayload(BaseModel):
+    """Arguments of the submit_answer command (the participant is the socket's user)."""
+    question_index: int = Field(..., description="Index of the question being answered", ge=0)
+    answer: str = Field(..., description="Answer ID submitted by the participant")
+
+class WsNextQuestionPayload(BaseModel):
+    """Arguments of the next_question command; without question_index the current question is closed."""
+    question_index: Optional[int] = Field(None, description="Index of the question the host is closing; if the game has moved past it, nothing changes", ge=0)
+
+class WsResyncPayload(BaseModel):
+    """Arguments of the resync command; without last_seq a full snapshot is returned."""
+    last_seq: Optional[int] = Field(None, description="seq of the last broadcast the client received", ge=0)
+    epoch: Optional[str] = Field(None, description="epoch of the last broadcast the client received")
+
+class WsAck(BaseModel):
+    """Reply to a command, sent only to the client that issued it."""
+    type: Literal["ack"] = "ack"
+    id: Optional[str] = Field(None, description="Correlation ID of the command")
+    command: Optional[str] = Field(None, description="Command being acknowledged")
+    ok: bool
+    payload: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
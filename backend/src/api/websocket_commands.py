@@ -0,0 +1,135 @@
+# backend/src/api/websocket_commands.py
+"""
+Command protocol for the game WebSocket.
+
+Clients send JSON commands ({"type", "id", "payload"}) on /ws/{game_id}/{user_id}
+and get an "ack" carrying the same id, with either a result payload or an
+error. Commands run on the connection's GameService, so answering and host
+controls reuse the open socket instead of a new HTTPS request each time.
+"""
+
+import time
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional, Union
+
+from fastapi import WebSocket
+from pydantic import ValidationError
+
+from ..services.game_service import GameService
+from .schemas.websocket import WsCommand, WsSubmitAnswerPayload, WsNextQuestionPayload, WsResyncPayload, WsAck
+from .schemas.game import QuestionResultResponse
+from ..websocket_encoding import decode
+
+logger = logging.getLogger(__name__)
+
+
+class GameSocketCommands:
+    """Dispatches the commands received on one game WebSocket to GameService."""
+
+    def __init__(self, game_service: GameService, game_id: str, user_id: str, websocket: Optional[WebSocket] = None):
+        self.game_service = game_service
+        self.game_id = game_id
+        self.user_id = user_id
+        self.websocket = websocket # Replies go to this socket, not to a newer one of the same user
+        self.connection_manager = game_service.connection_manager
+        self._participant_id: Optional[str] = None # Resolved on first answer
+        self._handlers: Dict[str, Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]] = {
+            "submit_answer": self._submit_answer,
+            "next_question": self._next_question,
+            "ping": self._ping,
+            "resync": self._resync,
+        }
+
+    async def handle(self, raw: Union[str, bytes]) -> Dict[str, Any]:
+        """
+        Run one raw command and build its ack.
+
+        Args:
+            raw: Frame received from the client (JSON text or MessagePack binary).
+
+        Returns:
+            The ack message to send back to this client.
+        """
+        try:
+            command = WsCommand.model_validate_json(raw) if isinstance(raw, str) else WsCommand.model_validate(decode(raw))
+        except ValidationError as e:
+            return self._ack(None, None, error=f"Invalid command: {e.errors()[0].get('msg', 'malformed message')}")
+        except ValueError as e: # Undecodable binary frame
+            return self._ack(None, None, error=f"Invalid command: {str(e) or 'undecodable frame'}")
+
+        try:
+            payload = await self._handlers[command.type](command.payload)
+            return self._ack(command.id, command.type, payload=payload)
+        except ValidationError as e:
+            first_error = e.errors()[0]
+            field = ".".join(str(part) for part in first_error.get("loc", ()))
+            return self._ack(command.id, command.type, error=f"Invalid {command.type} payload: {field} {first_error.get('msg', '')}".strip())
+        except ValueError as e:
+            logger.warning(f"WebSocket command {command.type} from user {self.user_id} in game {self.game_id} rejected: {e}")
+            return self._ack(command.id, command.type, error=str(e))
+        except Exception as e:
+            logger.error(f"WebSocket command {command.type} from user {self.user_id} in game {self.game_id} failed: {e}", exc_info=True)
+            return self._ack(command.id, command.type, error=f"Failed to process {command.type}")
+
+    @staticmethod
+    def _ack(command_id: Optional[str], command_type: Optional[str], payload: Optional[Dict[str, Any]] = None, error: Optional[str] = None) -> Dict[str, Any]:
+        return WsAck(id=command_id, command=command_type, ok=error is None, payload=payload, error=error).model_dump(exclude_none=True)
+
+    # --- Commands ---
+
+    async def _submit_answer(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        answer_data = WsSubmitAnswerPayload.model_validate(payload)
+        if self._participant_id is None:
+            self._participant_id = await self.game_service.get_participant_id_for_user(self.game_id, self.user_id)
+            if self._participant_id is None: raise ValueError("Participant not found in game")
+        result = await self.game_service.submit_answer(
+            game_session_id=self.game_id, participant_id=self._participant_id,
+            question_index=answer_data.question_index, answer=answer_data.answer
+        )
+        if not result.get("success", True): raise ValueError(result.get("error", "Failed to submit answer."))
+        return QuestionResultResponse(
+            is_correct=result.get("is_correct", False), correct_answer=result.get("correct_answer", ""),
+            score=result.get("score", 0), total_score=result.get("total_score", 0)
+        ).model_dump()
+
+    async def _next_question(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        next_data = WsNextQuestionPayload.model_validate(payload)
+        return await self.game_service.end_current_question(
+            game_session_id=self.game_id, host_user_id=self.user_id, expected_index=next_data.question_index
+        )
+
+    async def _ping(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        return {"server_time": time.time()}
+
+    async def _resync(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Catch up from payload's last_seq/epoch by replaying missed broadcasts,
+        or (without them, or when they are no longer buffered) by a snapshot.
+        """
+        resync_data = WsResyncPayload.model_validate(payload)
+        if resync_data.last_seq is not None:
+            replayed = self.connection_manager.replay_missed(
+                self.game_id, self.user_id, resync_data.last_seq, resync_data.epoch, websocket=self.websocket
+            )
+            if replayed is not None:
+                return {"replayed": replayed, **self.connection_manager.room_position(self.game_id)}
+        return await self._snapshot()
+
+    async def _snapshot(self) -> Dict[str, Any]:
+        # Position is taken before the state read, so replaying from it can only repeat events, never skip one
+        position = self.connection_manager.room_position(self.game_id)
+        state = await self.game_service.get_game_state(self.game_id)
+        return {**position, "state": state}
+
+    def reply(self, message: Dict[str, Any]) -> bool:
+        """Queue a message (an ack or snapshot) for the connection the commands came from."""
+        return self.connection_manager.send_to_user(message, self.game_id, self.user_id, websocket=self.websocket)
+
+    async def send_snapshot(self) -> None:
+        """Send this client a resync snapshot (current game state and the room's seq/epoch)."""
+        try:
+            snapshot = await self._snapshot()
+        except Exception as e:
+            logger.error(f"Failed to build resync snapshot for user {self.user_id} in game {self.game_id}: {e}", exc_info=True)
+            return
+        self.reply({"type": "resync", "payload": snapshot})
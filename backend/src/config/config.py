@@ -1,16 +1,51 @@
 import os
+import httpx
+import anthropic
+import openai
 from dotenv import load_dotenv
-from anthropic import Anthropic
-from openai import OpenAI
+from anthropic import Anthropic, AsyncAnthropic
+from openai import OpenAI, AsyncOpenAI
 import google.generativeai as genai
 
+
+class LLMPoolConfig:
+    """
+    Connection pool settings shared by the HTTP clients of each LLM provider.
+    """
+
+    def __init__(self, max_connections=None, max_keepalive_connections=None,
+                 keepalive_expiry=None, timeout_seconds=None):
+        load_dotenv()
+        self.max_connections = int(max_connections if max_connections is not None else os.getenv("LLM_POOL_MAX_CONNECTIONS", "50"))
+        self.max_keepalive_connections = int(
+            max_keepalive_connections if max_keepalive_connections is not None else os.getenv("LLM_POOL_MAX_KEEPALIVE", "20")
+        )
+        self.keepalive_expiry = float(keepalive_expiry if keepalive_expiry is not None else os.getenv("LLM_POOL_KEEPALIVE_EXPIRY", "60"))
+        self.timeout_seconds = float(timeout_seconds if timeout_seconds is not None else os.getenv("LLM_REQUEST_TIMEOUT", "120"))
+
+    def get_limits(self):
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry
+        )
+
+    def get_timeout(self):
+        return httpx.Timeout(self.timeout_seconds)
+
+
 class LLMConfig:
     """
-    Configuration for LLM clients (OpenAI, Anthropic, Gemini).
+    Configuration for LLM clients (OpenAI, Anthropic, Gemini, and the offline
+    "replay" provider used for benchmarks and tests).
+
+    When a pool_config is given, the sync and async clients share keep-alive
+    connection pools sized from it instead of the SDK defaults.
     """
 
-    def __init__(self, provider=None, model=None):
+    def __init__(self, provider=None, model=None, pool_config=None):
         load_dotenv()
+        self.pool_config = pool_config
         self.provider = (provider or os.getenv("LLM_PROVIDER", "openai")).lower()
         self.openai_api_key = os.getenv("OPENAI_API_KEY")
         self.anthropic_api_key = os.getenv("ANTHROPIC_API_KEY")
@@ -21,25 +56,48 @@ class LLMConfig:
         if self.provider == "openai":
             if not self.openai_api_key:
                 raise ValueError("OPENAI_API_KEY not found.")
-            self.client = OpenAI(api_key=self.openai_api_key)
+            self.client = OpenAI(api_key=self.openai_api_key, **self._http_client_kwargs(openai.DefaultHttpxClient))
+            self.async_client = AsyncOpenAI(api_key=self.openai_api_key, **self._http_client_kwargs(openai.DefaultAsyncHttpxClient))
             self.model = model or "gpt-4o"
         elif self.provider == "anthropic":
             if not self.anthropic_api_key:
                 raise ValueError("ANTHROPIC_API_KEY not found.")
-            self.client = Anthropic(api_key=self.anthropic_api_key)
+            self.client = Anthropic(api_key=self.anthropic_api_key, **self._http_client_kwargs(anthropic.DefaultHttpxClient))
+            self.async_client = AsyncAnthropic(api_key=self.anthropic_api_key, **self._http_client_kwargs(anthropic.DefaultAsyncHttpxClient))
             self.model = model or "claude-3-7-sonnet-20250219"
         elif self.provider == "gemini":
             if not self.gemini_api_key:
                 raise ValueError("GEMINI_API_KEY not found.")
             genai.configure(api_key=self.gemini_api_key)
             self.client = genai
+            self.async_client = genai # GenerativeModel exposes generate_content_async
             self.model = model or "gemini-1.5-pro-latest"
+        elif self.provider in ("replay", "fake"):
+            from ..utils.llm.replay_client import ReplayLLMClient # Local import: utils.llm imports this module
+            self.provider = "replay"
+            self.client = ReplayLLMClient.from_env()
+            self.async_client = self.client
+            self.model = model or "replay"
         else:
             raise ValueError(f"Invalid LLM provider: {self.provider}")
 
+    def _http_client_kwargs(self, http_client_cls):
+        """Build the http_client kwarg for an SDK client when pooling is configured."""
+        if not self.pool_config:
+            return {}
+        return {
+            "http_client": http_client_cls(
+                limits=self.pool_config.get_limits(),
+                timeout=self.pool_config.get_timeout()
+            )
+        }
+
     def get_client(self):
         return self.client
 
+    def get_async_client(self):
+        return getattr(self, "async_client", None)
+
     def get_model(self):
         return self.model
 
@@ -56,9 +114,20 @@ class LLMConfig:
         else:
             return None
 
+    def close(self):
+        close = getattr(self.client, "close", None)
+        if callable(close):
+            close()
+
+    async def aclose(self):
+        self.close()
+        aclose = getattr(self.async_client, "close", None) if self.async_client is not self.client else None
+        if callable(aclose):
+            await aclose()
+
     @staticmethod
-    def create(provider=None, model=None):
-        return LLMConfig(provider, model)
+    def create(provider=None, model=None, pool_config=None):
+        return LLMConfig(provider, model, pool_config)
 
 
 class SupabaseConfig:
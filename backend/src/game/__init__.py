@@ -0,0 +1,32 @@
+"""
+In-memory game engine for active games.
+"""
+
+from .game_room import GameRoom, GameRoomRegistry, RoomQuestion
+from .play_snapshot import PlaySnapshot, PlayQuestionEntry
+from .option_order import option_order, arrange_options, answer_id, parse_answer_index
+from .timer_wheel import TimerWheel
+from .answer_buffer import AnswerBuffer, BufferedAnswer
+from .seen_set import decode_bitmap, encode_bitmap, bitmap_from_ordinals
+from .question_selector import PackQuestionArrays, select_questions, select_pack_questions
+
+__all__ = [
+    "GameRoom",
+    "GameRoomRegistry",
+    "RoomQuestion",
+    "PlaySnapshot",
+    "PlayQuestionEntry",
+    "option_order",
+    "arrange_options",
+    "answer_id",
+    "parse_answer_index",
+    "TimerWheel",
+    "AnswerBuffer",
+    "BufferedAnswer",
+    "decode_bitmap",
+    "encode_bitmap",
+    "bitmap_from_ordinals",
+    "PackQuestionArrays",
+    "select_questions",
+    "select_pack_questions",
+]
@@ -0,0 +1,244 @@
+# backend/src/game/answer_buffer.py
+"""
+Write-behind buffer for answers accepted by GameRooms.
+
+An answer is scored against the room's in-memory state and the player gets
+the result right away; the database writes are buffered here. One background
+task flushes every game's pending answers as a single batch every
+flush_interval seconds (or sooner once max_batch answers are waiting), and a
+game's answers are flushed on demand when its question closes. The batch
+handler writes the whole batch at once (game_questions answers and scores,
+participant totals and user_question_history rows) instead of several
+requests per answer.
+
+A batch whose handler fails is put back and retried on the next flush, up to
+max_attempts times. aclose() flushes everything that is still pending, so a
+graceful shutdown loses no accepted answers.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Recent answer latencies (accepted -> persisted) kept for the metrics percentiles
+LATENCY_SAMPLE_SIZE = 1024
+
+
+class BufferedAnswer:
+    """An answer accepted by a GameRoom and waiting to be written."""
+
+    __slots__ = (
+        "game_id", "game_question_id", "question_id", "participant_id", "user_id",
+        "answer", "score", "is_correct", "accepted_at", "attempts"
+    )
+
+    def __init__(
+        self,
+        game_id: str,
+        game_question_id: str,
+        question_id: str,
+        participant_id: str,
+        user_id: str,
+        answer: str,
+        score: int,
+        is_correct: bool
+    ):
+        self.game_id = game_id
+        self.game_question_id = game_question_id
+        self.question_id = question_id
+        self.participant_id = participant_id
+        self.user_id = user_id
+        self.answer = answer
+        self.score = score
+        self.is_correct = is_correct
+        self.accepted_at = time.monotonic()
+        self.attempts = 0
+
+
+class AnswerBuffer:
+    """
+    Process-wide write-behind buffer of accepted answers.
+
+    handler(batch) writes a list of BufferedAnswers and raises if the batch
+    should be retried. Flushes never overlap, so a game's answers are written
+    in the order they were accepted.
+    """
+
+    def __init__(
+        self,
+        handler: Optional[Callable[[List[BufferedAnswer]], Awaitable[Any]]] = None,
+        flush_interval: Optional[float] = None,
+        max_batch: Optional[int] = None,
+        max_attempts: int = 5
+    ):
+        """
+        Initialize the buffer.
+
+        Args:
+            handler: Coroutine function that persists a batch. May be set later via the handler attribute.
+            flush_interval: Seconds between background flushes (ANSWER_FLUSH_INTERVAL_MS, default 250ms).
+            max_batch: Pending answers that trigger an early flush (ANSWER_FLUSH_MAX_BATCH, default 500).
+            max_attempts: Times a batch is tried before its answers are dropped.
+        """
+        self.handler = handler
+        self.flush_interval = flush_interval if flush_interval is not None else float(os.getenv("ANSWER_FLUSH_INTERVAL_MS", "250")) / 1000
+        self.max_batch = max(1, int(max_batch or os.getenv("ANSWER_FLUSH_MAX_BATCH", "500")))
+        self.max_attempts = max(1, max_attempts)
+
+        self._pending: Dict[str, List[BufferedAnswer]] = {} # game_id -> answers in accepted order
+        self._pending_count = 0
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._late_writes: Set[asyncio.Task] = set()
+        self._closed = False
+
+        self._latencies_ms: Deque[float] = deque(maxlen=LATENCY_SAMPLE_SIZE)
+        self._counters: Dict[str, Any] = {
+            "accepted": 0,
+            "persisted": 0,
+            "dropped": 0,
+            "batches": 0,
+            "batch_failures": 0,
+            "largest_batch": 0,
+            "last_flush_ms": 0.0,
+            "max_flush_ms": 0.0,
+        }
+
+    # --- Public API ---
+
+    def add(self, answer: BufferedAnswer) -> None:
+        """Buffer an accepted answer. Never blocks."""
+        if self._closed:
+            # Shutdown already flushed the buffer; write it on its own rather than lose it
+            logger.warning(f"Answer buffer closed; writing answer of participant {answer.participant_id} immediately")
+            task = asyncio.create_task(self._write([answer]))
+            self._late_writes.add(task)
+            task.add_done_callback(self._late_writes.discard)
+            return
+        self._pending.setdefault(answer.game_id, []).append(answer)
+        self._pending_count += 1
+        self._counters["accepted"] += 1
+        self._ensure_running()
+        if self._pending_count >= self.max_batch:
+            self._wakeup.set()
+
+    async def flush(self, game_id: Optional[str] = None) -> None:
+        """
+        Write pending answers now: one game's (e.g. when its question closes) or all of them.
+
+        Answers whose batch fails stay buffered for the next flush.
+        """
+        async with self._flush_lock:
+            if game_id is None:
+                batch = [answer for answers in self._pending.values() for answer in answers]
+                self._pending.clear()
+            else:
+                batch = self._pending.pop(str(game_id), [])
+            self._pending_count -= len(batch)
+            if batch:
+                await self._write(batch)
+
+    @property
+    def pending(self) -> int:
+        return self._pending_count
+
+    async def aclose(self) -> None:
+        """Stop the background flusher and write everything still buffered. Called on application shutdown."""
+        self._closed = True
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Retry failed batches until they are written or run out of attempts
+        while self._pending_count:
+            await self.flush()
+            if self._pending_count:
+                await asyncio.sleep(min(self.flush_interval, 0.5))
+        if self._late_writes:
+            await asyncio.gather(*self._late_writes, return_exceptions=True)
+        logger.info(f"Answer buffer closed: {self._counters['persisted']} answers persisted, {self._counters['dropped']} dropped")
+
+    def get_metrics(self) -> Dict[str, Any]:
+        latencies = sorted(self._latencies_ms)
+        return {
+            **self._counters,
+            "pending": self._pending_count,
+            "pending_games": len(self._pending),
+            "flush_interval_ms": round(self.flush_interval * 1000, 1),
+            "latency_p50_ms": latencies[len(latencies) // 2] if latencies else 0.0,
+            "latency_p95_ms": latencies[int(len(latencies) * 0.95)] if latencies else 0.0,
+            "latency_max_ms": latencies[-1] if latencies else 0.0,
+        }
+
+    # --- Flushing ---
+
+    def _ensure_running(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if self._pending_count:
+                try:
+                    await self.flush()
+                except Exception as e:
+                    logger.error(f"Answer buffer flush failed: {e}", exc_info=True)
+
+    async def _write(self, batch: List[BufferedAnswer]) -> None:
+        if self.handler is None:
+            logger.warning(f"Answer buffer has no handler; keeping {len(batch)} answers buffered")
+            self._requeue(batch, count_attempt=False)
+            return
+        started = time.perf_counter()
+        try:
+            await self.handler(batch)
+        except Exception as e:
+            self._counters["batch_failures"] += 1
+            logger.error(f"Failed to persist batch of {len(batch)} answers: {e}", exc_info=True)
+            self._requeue(batch)
+            return
+        flush_ms = round((time.perf_counter() - started) * 1000, 1)
+        persisted_at = time.monotonic()
+        self._latencies_ms.extend(round((persisted_at - answer.accepted_at) * 1000, 1) for answer in batch)
+        self._counters["persisted"] += len(batch)
+        self._counters["batches"] += 1
+        self._counters["largest_batch"] = max(self._counters["largest_batch"], len(batch))
+        self._counters["last_flush_ms"] = flush_ms
+        self._counters["max_flush_ms"] = max(self._counters["max_flush_ms"], flush_ms)
+        logger.debug(f"Persisted {len(batch)} buffered answers in {flush_ms}ms")
+
+    def _requeue(self, batch: List[BufferedAnswer], count_attempt: bool = True) -> None:
+        """Put a failed batch back ahead of anything buffered since, dropping answers out of attempts."""
+        retained: Dict[str, List[BufferedAnswer]] = {}
+        for answer in batch:
+            if count_attempt:
+                answer.attempts += 1
+            if answer.attempts >= self.max_attempts:
+                self._counters["dropped"] += 1
+                logger.error(
+                    f"Dropping answer of participant {answer.participant_id} to game question {answer.game_question_id} "
+                    f"after {answer.attempts} failed attempts"
+                )
+                continue
+            retained.setdefault(answer.game_id, []).append(answer)
+        if self.handler is None and self._closed:
+            self._counters["dropped"] += sum(len(answers) for answers in retained.values())
+            logger.error("Answer buffer closed with no handler; buffered answers were not persisted")
+            return
+        for game_id, answers in retained.items():
+            self._pending[game_id] = answers + self._pending.get(game_id, [])
+            self._pending_count += len(answers)
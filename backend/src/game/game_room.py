@@ -0,0 +1,378 @@
+# backend/src/game/game_room.py
+"""
+In-memory authoritative state for active games.
+
+A GameRoom is created when a game starts and holds everything needed to play
+it: the session, participants, the play snapshot of its questions, answers and
+scores. Game actions (answer submission, ending and advancing questions) read
+and update this state directly. Database writes are queued on the room and applied in
+order by a background writer (write-behind), so players never wait on them.
+
+Rooms live in a process-wide GameRoomRegistry (app.state.game_rooms). With a
+distributed backplane the worker holding a room owns the game: commands for it
+received by other workers are forwarded there (see websocket_backplane).
+"""
+
+import time
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Any, Callable, Awaitable, Tuple, Iterable
+
+from ..models.game_session import GameSession, GameStatus
+from ..models.game_participant import GameParticipant
+from ..api.schemas.game import GamePlayQuestionResponse
+from .play_snapshot import PlaySnapshot, PlayQuestionEntry
+from .option_order import parse_answer_index
+
+logger = logging.getLogger(__name__)
+
+# Completed/cancelled rooms are kept this long so late result requests are served from memory
+DEFAULT_ROOM_RETENTION_SECONDS = 300.0
+
+
+class RoomQuestion:
+    """A question prepared for play, with its answers and scores for this game."""
+
+    __slots__ = (
+        "game_question_id", "question_id", "index", "question_text", "correct_answer",
+        "correct_option_index", "play", "pack_ordinal", "start_time", "end_time", "answers", "scores"
+    )
+
+    def __init__(
+        self,
+        game_question_id: str,
+        question_id: str,
+        index: int,
+        question_text: str,
+        correct_answer: str,
+        correct_option_index: int,
+        play: PlayQuestionEntry,
+        pack_ordinal: Optional[int] = None
+    ):
+        self.game_question_id = game_question_id
+        self.question_id = question_id
+        self.index = index
+        self.question_text = question_text
+        self.correct_answer = correct_answer
+        self.correct_option_index = correct_option_index
+        self.play = play # Snapshot entry: what players are shown
+        self.pack_ordinal = pack_ordinal # Bit in the players' seen-question bitmaps
+        self.start_time: Optional[datetime] = None
+        self.end_time: Optional[datetime] = None
+        self.answers: Dict[str, str] = {}  # participant_id -> answer
+        self.scores: Dict[str, int] = {}   # participant_id -> score
+
+    @property
+    def correct_answer_id(self) -> str:
+        return self.play.correct_answer_id
+
+    def is_correct(self, answer: str) -> bool:
+        return parse_answer_index(answer, self.question_id) == self.correct_option_index
+
+    def result(self) -> Dict[str, Any]:
+        """Per-question summary in the shape used by game results."""
+        correct_count = sum(1 for score in self.scores.values() if score > 0)
+        total_answered = len(self.answers)
+        correct_percentage = (correct_count / total_answered * 100) if total_answered > 0 else 0
+        return {
+            "index": self.index,
+            "question_text": self.question_text,
+            "correct_answer": self.correct_answer,
+            "correct_count": correct_count,
+            "total_answered": total_answered,
+            "correct_percentage": round(correct_percentage, 1)
+        }
+
+
+class GameRoom:
+    """
+    Authoritative in-memory state of one active game.
+
+    All mutating methods are synchronous and never await, so each one is atomic
+    with respect to other coroutines on the event loop.
+    """
+
+    def __init__(
+        self,
+        session: GameSession,
+        participants: List[GameParticipant],
+        questions: List[RoomQuestion],
+        snapshot: PlaySnapshot
+    ):
+        self.game_id = str(session.id)
+        self.session = session
+        self.participants: Dict[str, GameParticipant] = {str(p.id): p for p in participants}
+        self.participant_ids_by_user: Dict[str, str] = {str(p.user_id): str(p.id) for p in participants}
+        self.questions: List[RoomQuestion] = sorted(questions, key=lambda q: q.index)
+        self.snapshot = snapshot
+        self.current_index = session.current_question_index
+        self.status = session.status
+        self.updated_at = datetime.now(timezone.utc)
+
+        # Serializes multi-step transitions (end + advance) across awaits
+        self.transition_lock = asyncio.Lock()
+
+        self._writes: "asyncio.Queue[Tuple[str, Callable[[], Awaitable[Any]]]]" = asyncio.Queue()
+        self._writer_task: Optional[asyncio.Task] = None
+        self.writes_completed = 0
+        self.writes_failed = 0
+
+    # --- Lookups ---
+
+    @property
+    def host_user_id(self) -> str:
+        return str(self.session.host_user_id)
+
+    @property
+    def is_active(self) -> bool:
+        return self.status == GameStatus.ACTIVE
+
+    @property
+    def total_questions(self) -> int:
+        return len(self.questions)
+
+    def get_question(self, index: int) -> Optional[RoomQuestion]:
+        if 0 <= index < len(self.questions):
+            return self.questions[index]
+        return None
+
+    @property
+    def current_question(self) -> Optional[RoomQuestion]:
+        return self.get_question(self.current_index)
+
+    def get_participant(self, participant_id: str) -> Optional[GameParticipant]:
+        return self.participants.get(str(participant_id))
+
+    def get_participant_by_user(self, user_id: str) -> Optional[GameParticipant]:
+        participant_id = self.participant_ids_by_user.get(str(user_id))
+        return self.participants.get(participant_id) if participant_id else None
+
+    def play_questions(self) -> List[GamePlayQuestionResponse]:
+        return self.snapshot.questions()
+
+    def all_connected_answered(self, question: RoomQuestion, connected_user_ids: Iterable[str]) -> bool:
+        """
+        Whether every connected participant has answered question.
+
+        False when no participant is connected, so an empty room never
+        closes questions early.
+        """
+        connected = [self.participant_ids_by_user.get(str(user_id)) for user_id in connected_user_ids]
+        connected = [participant_id for participant_id in connected if participant_id is not None]
+        return bool(connected) and all(participant_id in question.answers for participant_id in connected)
+
+    def participant_payloads(self) -> List[Dict[str, Any]]:
+        return [
+            {"id": p.id, "user_id": p.user_id, "display_name": p.display_name, "score": p.score, "is_host": p.is_host}
+            for p in self.participants.values()
+        ]
+
+    # --- State transitions ---
+
+    def record_answer(self, participant_id: str, question_index: int, answer: str) -> Tuple[RoomQuestion, bool, int, int]:
+        """
+        Validate and record an answer.
+
+        Returns:
+            Tuple of (question, is_correct, score, participant's new total score).
+
+        Raises:
+            ValueError: If the game, question or participant is not valid for answering.
+        """
+        if not self.is_active:
+            raise ValueError("Game not active")
+        participant = self.participants.get(str(participant_id))
+        if not participant:
+            raise ValueError("Participant not found in game")
+        question = self.get_question(question_index)
+        if not question:
+            raise ValueError(f"Question index {question_index} not found for this game")
+        if question.end_time:
+            raise ValueError(f"Question {question_index} has already ended")
+        if participant.id in question.answers:
+            raise ValueError("Answer already submitted for this question")
+
+        is_correct = question.is_correct(str(answer))
+        score = 1 if is_correct else 0
+        question.answers[participant.id] = str(answer)
+        question.scores[participant.id] = score
+        participant.score = (participant.score or 0) + score
+        participant.last_activity = datetime.now(timezone.utc)
+        return question, is_correct, score, participant.score
+
+    def end_current_question(self) -> Optional[RoomQuestion]:
+        """Close the current question. Returns it if it was open, else None."""
+        question = self.current_question
+        if question is None or question.end_time is not None:
+            return None
+        question.end_time = datetime.now(timezone.utc)
+        return question
+
+    def advance(self) -> Optional[RoomQuestion]:
+        """Move to the next question and start it. Returns None (and completes the game) after the last one."""
+        next_index = self.current_index + 1
+        now = datetime.now(timezone.utc)
+        self.updated_at = now
+        if next_index >= len(self.questions):
+            self.status = GameStatus.COMPLETED
+            return None
+        self.current_index = next_index
+        question = self.questions[next_index]
+        question.start_time = now
+        return question
+
+    def cancel(self) -> None:
+        self.status = GameStatus.CANCELLED
+        self.updated_at = datetime.now(timezone.utc)
+
+    def results(self) -> Dict[str, Any]:
+        """Game results in the shape returned by GameService.get_game_results."""
+        participants = sorted(self.participants.values(), key=lambda p: p.score, reverse=True)
+        completed = self.status in (GameStatus.COMPLETED, GameStatus.CANCELLED)
+        return {
+            "game_id": self.game_id,
+            "game_code": self.session.code,
+            "status": self.status.value,
+            "participants": [
+                {"id": p.id, "user_id": p.user_id, "display_name": p.display_name, "score": p.score, "is_host": p.is_host}
+                for p in participants
+            ],
+            "questions": [q.result() for q in self.questions],
+            "total_questions": len(self.questions),
+            "completed_at": (self.updated_at if completed else datetime.now(timezone.utc)).isoformat()
+        }
+
+    # --- Write-behind persistence ---
+
+    def persist(self, description: str, write: Callable[[], Awaitable[Any]]) -> None:
+        """
+        Queue a database write. Writes for a room are applied one at a time in
+        the order they were queued. Failures are logged and counted, not raised.
+
+        Args:
+            description: Label used in logs.
+            write: Zero-argument coroutine function performing the write.
+        """
+        self._writes.put_nowait((description, write))
+        if self._writer_task is None or self._writer_task.done():
+            self._writer_task = asyncio.create_task(self._run_writer())
+
+    async def _run_writer(self) -> None:
+        while True:
+            description, write = await self._writes.get()
+            started = time.perf_counter()
+            try:
+                await write()
+                self.writes_completed += 1
+                logger.debug(f"Game {self.game_id}: persisted {description} in {(time.perf_counter() - started) * 1000:.1f}ms")
+            except Exception as e:
+                self.writes_failed += 1
+                logger.error(f"Game {self.game_id}: failed to persist {description}: {e}", exc_info=True)
+            finally:
+                self._writes.task_done()
+
+    @property
+    def pending_writes(self) -> int:
+        return self._writes.qsize()
+
+    async def flush(self) -> None:
+        """Wait until every queued write has been applied."""
+        if self._writer_task is not None and not self._writer_task.done():
+            await self._writes.join()
+
+    async def close(self) -> None:
+        """Flush queued writes and stop the writer."""
+        await self.flush()
+        if self._writer_task is not None:
+            self._writer_task.cancel()
+            try:
+                await self._writer_task
+            except asyncio.CancelledError:
+                pass
+            self._writer_task = None
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "status": self.status.value,
+            "current_index": self.current_index,
+            "total_questions": len(self.questions),
+            "participants": len(self.participants),
+            "pending_writes": self.pending_writes,
+            "writes_completed": self.writes_completed,
+            "writes_failed": self.writes_failed,
+        }
+
+
+class GameRoomRegistry:
+    """Process-wide index of active GameRooms by game ID."""
+
+    def __init__(self, retention_seconds: float = DEFAULT_ROOM_RETENTION_SECONDS):
+        self.retention_seconds = retention_seconds
+        self._rooms: Dict[str, GameRoom] = {}
+        self._retirements: Dict[str, asyncio.Task] = {}
+        # Called with the game ID once a room has been dropped (releases its backplane ownership)
+        self.on_removed: Optional[Callable[[str], None]] = None
+
+    def get(self, game_id: str) -> Optional[GameRoom]:
+        return self._rooms.get(str(game_id))
+
+    def add(self, room: GameRoom) -> GameRoom:
+        existing = self._rooms.get(room.game_id)
+        if existing is not None and existing is not room:
+            logger.warning(f"Replacing existing game room {room.game_id}")
+        self._rooms[room.game_id] = room
+        return room
+
+    def __len__(self) -> int:
+        return len(self._rooms)
+
+    def retire(self, game_id: str, delay: Optional[float] = None) -> None:
+        """Flush and drop a finished room after the retention period."""
+        game_id = str(game_id)
+        if game_id not in self._rooms or game_id in self._retirements:
+            return
+        delay = self.retention_seconds if delay is None else delay
+        self._retirements[game_id] = asyncio.create_task(self._retire_after(game_id, delay))
+
+    async def _retire_after(self, game_id: str, delay: float) -> None:
+        try:
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await self.remove(game_id)
+        finally:
+            self._retirements.pop(game_id, None)
+
+    async def remove(self, game_id: str) -> None:
+        """Flush a room's pending writes and drop it."""
+        room = self._rooms.get(str(game_id))
+        if room is None:
+            return
+        await room.close()
+        # The room may have been replaced while flushing
+        if self._rooms.get(room.game_id) is room:
+            del self._rooms[room.game_id]
+            if self.on_removed is not None:
+                self.on_removed(room.game_id)
+        logger.info(f"Game room {room.game_id} removed")
+
+    async def aclose(self) -> None:
+        """Flush every room's pending writes. Called on application shutdown."""
+        for task in list(self._retirements.values()):
+            task.cancel()
+        self._retirements.clear()
+        for game_id in list(self._rooms):
+            try:
+                await self.remove(game_id)
+            except Exception as e:
+                logger.error(f"Error closing game room {game_id}: {e}", exc_info=True)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        rooms = list(self._rooms.values())
+        return {
+            "rooms": len(rooms),
+            "active_rooms": sum(1 for room in rooms if room.is_active),
+            "participants": sum(len(room.participants) for room in rooms),
+            "pending_writes": sum(room.pending_writes for room in rooms),
+            "writes_failed": sum(room.writes_failed for room in rooms),
+        }
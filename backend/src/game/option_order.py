@@ -0,0 +1,54 @@
+# backend/src/game/option_order.py
+"""
+Deterministic answer-option order for game questions.
+
+The order of a question's options is derived from the game ID and question
+ID, so every process (and every later request) arrives at the same order
+without storing it. The correct option's position is stored on game_questions
+at game start, which makes answer checking an integer comparison.
+"""
+
+import random
+import hashlib
+from typing import List, Optional, Sequence, Tuple
+
+
+def option_order(game_id: str, question_id: str, option_count: int) -> List[int]:
+    """
+    Permutation of option positions for one question in one game.
+
+    Element i of the result is the original position (0 = correct answer,
+    1.. = incorrect answers in stored order) shown at display position i.
+    """
+    digest = hashlib.sha256(f"{game_id}:{question_id}".encode("utf-8")).digest()
+    order = list(range(option_count))
+    random.Random(int.from_bytes(digest[:8], "big")).shuffle(order)
+    return order
+
+
+def arrange_options(
+    game_id: str,
+    question_id: str,
+    correct_answer: str,
+    incorrect_answers: Sequence[str]
+) -> Tuple[List[str], int]:
+    """
+    Options in display order and the display index of the correct answer.
+    """
+    options = [correct_answer] + list(incorrect_answers)
+    order = option_order(game_id, question_id, len(options))
+    return [options[i] for i in order], order.index(0)
+
+
+def answer_id(question_id: str, option_index: int) -> str:
+    """Client-facing answer ID, e.g. "<question_id>-2"."""
+    return f"{question_id}-{option_index}"
+
+
+def parse_answer_index(answer: str, question_id: str) -> Optional[int]:
+    """Option index from an answer ID for this question, or None if it is not one."""
+    prefix = f"{question_id}-"
+    if not answer.startswith(prefix):
+        return None
+    suffix = answer[len(prefix):]
+    return int(suffix) if suffix.isascii() and suffix.isdigit() else None
@@ -0,0 +1,88 @@
+# backend/src/game/play_snapshot.py
+"""
+Immutable, pre-serialized gameplay questions for one game.
+
+Built once when a game starts. Option order and correct answer IDs are fixed
+at that point, and each question's payload is serialized once, so starting,
+advancing and serving /play-questions are lookups instead of database reads
+and re-serialization.
+"""
+
+import copy
+import json
+from typing import Dict, List, Optional, Tuple, Any, Iterable
+
+from ..api.schemas.game import GamePlayQuestionResponse
+
+
+class PlayQuestionEntry:
+    """One question as served to players, in model, dict and JSON form."""
+
+    __slots__ = ("_question", "_payload", "_json")
+
+    def __init__(self, question: GamePlayQuestionResponse):
+        self._question = question
+        self._payload: Dict[str, Any] = question.model_dump(mode='json')
+        self._json: bytes = json.dumps(self._payload, separators=(",", ":")).encode("utf-8")
+
+    @property
+    def index(self) -> int:
+        return self._question.index
+
+    @property
+    def question(self) -> GamePlayQuestionResponse:
+        return self._question.model_copy(deep=True) # Callers get a copy; the snapshot stays unchanged
+
+    @property
+    def payload(self) -> Dict[str, Any]:
+        return copy.deepcopy(self._payload)
+
+    @property
+    def json(self) -> bytes:
+        return self._json
+
+    @property
+    def correct_answer_id(self) -> str:
+        return self._question.correct_answer_id
+
+
+class PlaySnapshot:
+    """Ordered, read-only collection of a game's PlayQuestionEntry objects."""
+
+    __slots__ = ("_game_id", "_entries", "_by_index", "_list_json")
+
+    def __init__(self, game_id: str, questions: Iterable[GamePlayQuestionResponse]):
+        self._game_id = str(game_id)
+        self._entries: Tuple[PlayQuestionEntry, ...] = tuple(
+            PlayQuestionEntry(q) for q in sorted(questions, key=lambda q: q.index)
+        )
+        self._by_index: Dict[int, PlayQuestionEntry] = {entry.index: entry for entry in self._entries}
+        # Body of GamePlayQuestionListResponse, serialized once
+        questions_json = b",".join(entry.json for entry in self._entries)
+        self._list_json: bytes = (
+            b'{"game_id":' + json.dumps(self._game_id).encode("utf-8")
+            + b',"questions":[' + questions_json
+            + b'],"total_questions":' + str(len(self._entries)).encode("utf-8") + b'}'
+        )
+
+    @property
+    def game_id(self) -> str:
+        return self._game_id
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, index: int) -> Optional[PlayQuestionEntry]:
+        return self._by_index.get(index)
+
+    @property
+    def entries(self) -> Tuple[PlayQuestionEntry, ...]:
+        return self._entries
+
+    def questions(self) -> List[GamePlayQuestionResponse]:
+        return [entry.question for entry in self._entries]
+
+    @property
+    def list_json(self) -> bytes:
+        """JSON body for GET /game/{id}/play-questions."""
+        return self._list_json
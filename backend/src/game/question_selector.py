@@ -0,0 +1,121 @@
+# backend/src/game/question_selector.py
+"""
+Question selection for a new game.
+
+A pack's questions are turned into parallel arrays once (topic id,
+difficulty, correct-answer rate, seen flag) and a game's questions are
+chosen from them in one vectorized pass:
+
+1. Unseen first: questions nobody in the game has answered always outrank
+   ones somebody has.
+2. Topic balance: within each tier, topics are taken round-robin (every
+   topic's first pick, then every topic's second, ...) in random order, so
+   no topic dominates a game unless it is all that is left.
+3. Difficulty curve: the chosen questions are played easy -> hard.
+
+Sorting dominates, so selection is O(n log n) in the pack size and stays
+fast for packs with tens of thousands of questions.
+"""
+
+from typing import Iterable, List, Optional, Sequence, Set
+
+import numpy as np
+
+from ..models.question import DifficultyLevel, Question
+
+# Difficulty ordinals for the curve; unrated and "mixed" questions sit in the middle
+DIFFICULTY_ORDINALS = {
+    DifficultyLevel.EASY: 0.0,
+    DifficultyLevel.MEDIUM: 1.0,
+    DifficultyLevel.HARD: 2.0,
+    DifficultyLevel.EXPERT: 3.0,
+}
+UNRATED_DIFFICULTY = 1.5
+
+
+class PackQuestionArrays:
+    """A pack's questions as parallel arrays for vectorized selection."""
+
+    __slots__ = ("question_ids", "topic", "difficulty", "rate")
+
+    def __init__(self, question_ids: Sequence[str], topic: np.ndarray, difficulty: np.ndarray, rate: np.ndarray):
+        self.question_ids = list(question_ids)
+        self.topic = topic               # int32 topic id (index into the pack's distinct topics)
+        self.difficulty = difficulty     # float32 difficulty ordinal (see DIFFICULTY_ORDINALS)
+        self.rate = rate                 # float32 correct-answer rate, 0.0 when unknown
+
+    @classmethod
+    def from_questions(cls, questions: Sequence[Question]) -> "PackQuestionArrays":
+        count = len(questions)
+        topic_names = np.array([q.pack_topics_item or "" for q in questions], dtype=object)
+        _, topic = np.unique(topic_names, return_inverse=True) if count else (None, np.empty(0, dtype=np.int64))
+        difficulty = np.fromiter(
+            (DIFFICULTY_ORDINALS.get(q.difficulty_current or q.difficulty_initial, UNRATED_DIFFICULTY) for q in questions),
+            dtype=np.float32, count=count
+        )
+        rate = np.fromiter((q.correct_answer_rate or 0.0 for q in questions), dtype=np.float32, count=count)
+        return cls([str(q.id) for q in questions], topic.astype(np.int32), difficulty, rate)
+
+    def __len__(self) -> int:
+        return len(self.question_ids)
+
+    def seen_flags(self, seen_question_ids: Set[str]) -> np.ndarray:
+        """Boolean array: question i has been answered by someone in the game."""
+        return np.fromiter((qid in seen_question_ids for qid in self.question_ids), dtype=bool, count=len(self.question_ids))
+
+
+def select_questions(
+    arrays: PackQuestionArrays,
+    seen: np.ndarray,
+    count: int,
+    rng: Optional[np.random.Generator] = None
+) -> np.ndarray:
+    """
+    Choose count questions and return their indexes in play order (easy -> hard).
+
+    Args:
+        arrays: The pack's question arrays.
+        seen: Boolean seen flag per question (PackQuestionArrays.seen_flags).
+        count: Number of questions wanted; capped at the pack size.
+        rng: Random generator (for reproducible selection).
+
+    Returns:
+        int64 array of indexes into the pack's questions.
+    """
+    size = len(arrays)
+    count = min(count, size)
+    if count <= 0:
+        return np.empty(0, dtype=np.int64)
+    rng = rng if rng is not None else np.random.default_rng()
+    noise = rng.random(size)
+
+    # Rank of each question within its (tier, topic) group, in random order
+    tier = seen.astype(np.int8)
+    grouped = np.lexsort((noise, arrays.topic, tier))
+    group_key = tier[grouped].astype(np.int64) * (int(arrays.topic.max()) + 1) + arrays.topic[grouped]
+    starts = np.flatnonzero(np.r_[True, group_key[1:] != group_key[:-1]])
+    group_sizes = np.diff(np.r_[starts, size])
+    rank = np.empty(size, dtype=np.int64)
+    rank[grouped] = np.arange(size) - np.repeat(starts, group_sizes)
+
+    # Round-robin across topics; the order of topics within a round is random too
+    topic_order = rng.permutation(int(arrays.topic.max()) + 1)
+    chosen = np.lexsort((topic_order[arrays.topic], rank, tier))[:count]
+
+    # Difficulty curve: by difficulty ordinal, then by higher correct-answer rate first
+    # (unknown rates sort between the two halves), then randomly
+    rate = np.where(arrays.rate[chosen] > 0, arrays.rate[chosen], 0.5)
+    curve = np.lexsort((noise[chosen], -rate, arrays.difficulty[chosen]))
+    return chosen[curve]
+
+
+def select_pack_questions(
+    questions: Sequence[Question],
+    seen_question_ids: Iterable[str],
+    count: int,
+    rng: Optional[np.random.Generator] = None
+) -> List[Question]:
+    """select_questions for a list of Question models and a set of seen question IDs."""
+    arrays = PackQuestionArrays.from_questions(questions)
+    seen = arrays.seen_flags(set(seen_question_ids))
+    return [questions[i] for i in select_questions(arrays, seen, count, rng)]
@@ -0,0 +1,47 @@
+# backend/src/game/seen_set.py
+"""
+Compact per-(user, pack) seen-question sets.
+
+Every question has a stable ordinal within its pack (questions.pack_ordinal),
+and user_pack_history.seen_questions stores the questions a user has answered
+as a bitmap over those ordinals: bit n (least significant bit first within
+each byte) is set once the user has answered the pack's question n. The
+bitmap is stored base64-encoded, so a 10,000-question pack costs at most
+1,250 bytes per user however much history the user has.
+
+In memory a bitmap is a Python int, so combining players is a single OR and
+the unseen questions are the pack's bits AND NOT the union.
+"""
+
+import base64
+import binascii
+from typing import Iterable, Optional
+
+
+def decode_bitmap(encoded: Optional[str]) -> int:
+    """Bitmap from its stored (base64) form. Empty or missing means nothing seen."""
+    if not encoded:
+        return 0
+    try:
+        return int.from_bytes(base64.b64decode(encoded), "little")
+    except (binascii.Error, ValueError):
+        raise ValueError("Malformed seen-question bitmap")
+
+
+def encode_bitmap(bitmap: int) -> str:
+    """Stored (base64) form of a bitmap."""
+    if bitmap <= 0:
+        return ""
+    return base64.b64encode(bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little")).decode("ascii")
+
+
+def bitmap_from_ordinals(ordinals: Iterable[int]) -> int:
+    bitmap = 0
+    for ordinal in ordinals:
+        if ordinal is not None and ordinal >= 0:
+            bitmap |= 1 << ordinal
+    return bitmap
+
+
+def is_set(bitmap: int, ordinal: int) -> bool:
+    return (bitmap >> ordinal) & 1 == 1
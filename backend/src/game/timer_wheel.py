@@ -0,0 +1,172 @@
+# backend/src/game/timer_wheel.py
+"""
+Hashed timer wheel for question deadlines.
+
+One asyncio task advances the wheel every tick and fires the timers in the
+current slot, so thousands of rooms with running questions cost one sleeping
+task instead of one per room. Scheduling and cancelling are O(1). Timers are
+keyed (one per room), and re-scheduling a key replaces its previous timer.
+"""
+
+import math
+import time
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class _Timer:
+    __slots__ = ("key", "deadline", "rounds", "slot", "args")
+
+    def __init__(self, key: Hashable, deadline: float, rounds: int, slot: int, args: Tuple[Any, ...]):
+        self.key = key
+        self.deadline = deadline
+        self.rounds = rounds
+        self.slot = slot
+        self.args = args
+
+
+class TimerWheel:
+    """
+    Single-task timer wheel.
+
+    Expired timers call handler(*args) in their own task; handler errors are
+    logged and do not stop the wheel.
+    """
+
+    def __init__(
+        self,
+        handler: Optional[Callable[..., Awaitable[Any]]] = None,
+        tick_seconds: float = 0.1,
+        wheel_size: int = 512
+    ):
+        """
+        Initialize the wheel.
+
+        Args:
+            handler: Coroutine function called with a timer's args when it expires.
+                     May be set later via the handler attribute.
+            tick_seconds: Timer resolution.
+            wheel_size: Number of slots. Timers further out than one revolution
+                        wait additional rounds in their slot.
+        """
+        self.handler = handler
+        self.tick_seconds = tick_seconds
+        self.wheel_size = max(1, wheel_size)
+        self._slots: List[Dict[Hashable, _Timer]] = [{} for _ in range(self.wheel_size)]
+        self._timers: Dict[Hashable, _Timer] = {}
+        self._cursor = 0
+        self._next_tick_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._callbacks: Set[asyncio.Task] = set()
+        self._closed = False
+
+        self._counters: Dict[str, Any] = {
+            "scheduled": 0,
+            "fired": 0,
+            "cancelled": 0,
+            "handler_errors": 0,
+            "max_lag_ms": 0.0,
+        }
+
+    def schedule(self, key: Hashable, delay_seconds: float, *args: Any) -> None:
+        """Fire handler(*args) after delay_seconds, replacing any timer already under key."""
+        if self._closed:
+            return
+        self._ensure_running()
+        self._remove(key)
+        loop_now = asyncio.get_running_loop().time()
+        deadline = loop_now + max(0.0, delay_seconds)
+        ticks = max(0, math.ceil((deadline - self._next_tick_at) / self.tick_seconds))
+        slot = (self._cursor + ticks) % self.wheel_size
+        timer = _Timer(key, deadline, ticks // self.wheel_size, slot, args)
+        self._slots[slot][key] = timer
+        self._timers[key] = timer
+        self._counters["scheduled"] += 1
+
+    def cancel(self, key: Hashable) -> bool:
+        """Cancel the timer under key. Returns whether one was pending."""
+        if self._remove(key):
+            self._counters["cancelled"] += 1
+            return True
+        return False
+
+    def deadline_of(self, key: Hashable) -> Optional[float]:
+        """Wall-clock (time.time()) deadline of a pending timer, if any."""
+        timer = self._timers.get(key)
+        if timer is None:
+            return None
+        return time.time() + (timer.deadline - asyncio.get_running_loop().time())
+
+    def __len__(self) -> int:
+        return len(self._timers)
+
+    def _remove(self, key: Hashable) -> bool:
+        timer = self._timers.pop(key, None)
+        if timer is None:
+            return False
+        self._slots[timer.slot].pop(key, None)
+        return True
+
+    def _ensure_running(self) -> None:
+        if self._task is None or self._task.done():
+            self._next_tick_at = asyncio.get_running_loop().time() + self.tick_seconds
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(max(0.0, self._next_tick_at - loop.time()))
+            now = loop.time()
+            # Catch up on every tick that has passed (e.g. after a long event-loop stall)
+            while self._next_tick_at <= now:
+                self._process_slot(now)
+                self._cursor = (self._cursor + 1) % self.wheel_size
+                self._next_tick_at += self.tick_seconds
+
+    def _process_slot(self, now: float) -> None:
+        slot = self._slots[self._cursor]
+        if not slot:
+            return
+        for key, timer in list(slot.items()):
+            if timer.rounds > 0:
+                timer.rounds -= 1
+                continue
+            del slot[key]
+            del self._timers[key]
+            self._counters["fired"] += 1
+            self._counters["max_lag_ms"] = max(self._counters["max_lag_ms"], round((now - timer.deadline) * 1000, 1))
+            task = asyncio.create_task(self._fire(timer))
+            self._callbacks.add(task)
+            task.add_done_callback(self._callbacks.discard)
+
+    async def _fire(self, timer: _Timer) -> None:
+        if self.handler is None:
+            logger.warning(f"Timer {timer.key} expired with no handler set")
+            return
+        try:
+            await self.handler(*timer.args)
+        except Exception as e:
+            self._counters["handler_errors"] += 1
+            logger.error(f"Timer handler for {timer.key} failed: {e}", exc_info=True)
+
+    async def aclose(self) -> None:
+        """Stop the wheel, drop pending timers and wait for running handlers."""
+        self._closed = True
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._timers.clear()
+        for slot in self._slots:
+            slot.clear()
+        if self._callbacks:
+            await asyncio.gather(*self._callbacks, return_exceptions=True)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {**self._counters, "pending": len(self._timers), "running_handlers": len(self._callbacks)}
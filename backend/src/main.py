@@ -4,13 +4,22 @@ from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Depends, HTTPExcept
 from fastapi.middleware.cors import CORSMiddleware # Ensure this is imported
 import logging
 from contextlib import asynccontextmanager
-from typing import Dict
+from typing import Dict, Optional
 
 from .api.routes import router as api_router
 from .config.supabase_client import init_supabase_client, close_supabase_client
 from .websocket_manager import ConnectionManager
+from .websocket_backplane import create_backplane
+from .websocket_encoding import negotiate_encoding
+from .game.game_room import GameRoomRegistry
+from .game.timer_wheel import TimerWheel
+from .game.answer_buffer import AnswerBuffer
+from .utils.llm.llm_client_registry import llm_client_registry
+from .utils.llm.llm_scheduler import get_llm_scheduler_metrics
+from .utils.llm.llm_response_cache import get_llm_response_cache_metrics
 from .utils import ensure_uuid
-from .api.dependencies import get_game_service
+from .api.dependencies import get_game_service, create_game_service
+from .api.websocket_commands import GameSocketCommands
 from .services.game_service import GameService
 
 # Configure logging
@@ -20,7 +29,11 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-connection_manager = ConnectionManager()
+# Broadcasts reach other workers through the backplane (WS_BACKPLANE_URL; in-process when unset)
+connection_manager = ConnectionManager(backplane=create_backplane())
+game_room_registry = GameRoomRegistry()
+question_timers = TimerWheel()
+answer_buffer = AnswerBuffer()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -35,13 +48,40 @@ async def lifespan(app: FastAPI):
 
     # Make the manager instance available via app state
     app.state.connection_manager = connection_manager
+    # In-memory state of active games, owned by this worker; other workers forward their commands here
+    app.state.game_rooms = game_room_registry
+    game_room_registry.on_removed = connection_manager.backplane.release_room
+    connection_manager.backplane.set_command_handler(
+        lambda method, params: create_game_service(app.state).run_forwarded_command(method, params)
+    )
+    # Server-side question deadlines and early closes: the question is closed and the game advanced
+    app.state.question_timers = question_timers
+    question_timers.handler = lambda *timer_args: create_game_service(app.state).handle_question_deadline(*timer_args)
+    # Answers accepted by rooms are written in batches (ANSWER_FLUSH_INTERVAL_MS)
+    app.state.answer_buffer = answer_buffer
+    answer_buffer.handler = lambda batch: create_game_service(app.state).persist_answer_batch(batch)
 
     logger.info("Application startup complete")
     yield
 
+    # Stop question deadlines, then flush write-behind game state before the database client goes away
+    logger.info("Stopping question timers...")
+    await question_timers.aclose()
+    logger.info("Flushing active game rooms...")
+    await game_room_registry.aclose()
+    logger.info("Flushing buffered answers...")
+    await answer_buffer.aclose()
+
+    # Stop WebSocket writer tasks
+    await connection_manager.aclose()
+
     # Close the Supabase client on shutdown
     logger.info("Closing Supabase client...")
     await close_supabase_client(app.state.supabase)
+
+    # Close pooled LLM provider connections
+    logger.info("Closing LLM client pools...")
+    await llm_client_registry.aclose()
     logger.info("Application shutdown complete")
 
 # Create FastAPI application
@@ -80,9 +120,20 @@ async def websocket_endpoint(
     websocket: WebSocket,
     game_id: str,
     user_id: str,
+    last_seq: Optional[int] = None,
+    epoch: Optional[str] = None,
+    encoding: Optional[str] = None,
     game_service: GameService = Depends(get_game_service)
 ):
-    """WebSocket endpoint for real-time game communication."""
+    """
+    WebSocket endpoint for real-time game communication.
+
+    A reconnecting client passes last_seq/epoch from the last broadcast it
+    received and is sent only what it missed, or a resync snapshot.
+
+    Messages are JSON text frames unless the client negotiates MessagePack
+    (subprotocol "trivia.msgpack" or ?encoding=msgpack), then binary frames.
+    """
     try:
         # Basic validation (more robust validation might be needed depending on auth)
         game_id_uuid = ensure_uuid(game_id)
@@ -94,38 +145,62 @@ async def websocket_endpoint(
 
     # Use the global connection manager instance from app state
     manager = app.state.connection_manager
-    await manager.connect(websocket, game_id_uuid, user_id_uuid)
+    wire_encoding, subprotocol = negotiate_encoding(websocket.scope.get("subprotocols", []), encoding)
+    resumed = await manager.connect(
+        websocket, game_id_uuid, user_id_uuid, last_seq=last_seq, epoch=epoch,
+        encoding=wire_encoding, subprotocol=subprotocol
+    )
+    # Commands (submit_answer, next_question, ping, resync) run on this connection's GameService
+    commands = GameSocketCommands(game_service, game_id_uuid, user_id_uuid, websocket)
 
     try:
+        if not resumed:
+            await commands.send_snapshot()
         while True:
-            # Keep connection open, listen for messages (optional)
-            # If client sends messages, handle them here
-            data = await websocket.receive_text()
+            frame = await websocket.receive()
+            if frame["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(frame.get("code", 1000))
+            if not manager.is_current(websocket, game_id_uuid, user_id_uuid):
+                # Replaced by a newer socket of this user (it is being closed); its commands are not run
+                raise WebSocketDisconnect(1000)
+            data = frame.get("text") if frame.get("text") is not None else frame.get("bytes")
             logger.debug(f"Received WebSocket message from {user_id_uuid} in {game_id_uuid}: {data}")
-            # Example: Echo message back or handle specific commands
-            # await manager.send_personal_message(f"You wrote: {data}", websocket)
+            ack = await commands.handle(data)
+            commands.reply(ack)
     except WebSocketDisconnect:
-        manager.disconnect(websocket, game_id_uuid, user_id_uuid)
-        # Call the service to handle disconnect logic (like broadcasting user_left)
-        try:
-            await game_service.handle_disconnect(game_id_uuid, user_id_uuid)
-        except Exception as service_error:
-            logger.error(f"Error during GameService disconnect handling for User {user_id_uuid} in Game {game_id_uuid}: {service_error}", exc_info=True)
+        # A replaced socket closing is not the user leaving: they are still connected on the new one
+        if manager.disconnect(websocket, game_id_uuid, user_id_uuid):
+            # Call the service to handle disconnect logic (like broadcasting user_left)
+            try:
+                await game_service.handle_disconnect(game_id_uuid, user_id_uuid)
+            except Exception as service_error:
+                logger.error(f"Error during GameService disconnect handling for User {user_id_uuid} in Game {game_id_uuid}: {service_error}", exc_info=True)
         logger.info(f"WebSocket disconnected cleanly for User {user_id_uuid} in Game {game_id_uuid}.")
     except Exception as e:
         # Log unexpected errors during WebSocket communication
         logger.error(f"WebSocket error for User {user_id_uuid} in Game {game_id_uuid}: {e}", exc_info=True)
         # Attempt to disconnect cleanly if possible
-        manager.disconnect(websocket, game_id_uuid, user_id_uuid)
-        # Consider calling handle_disconnect here too
-        try:
-            await game_service.handle_disconnect(game_id_uuid, user_id_uuid)
-        except Exception as service_error:
-            logger.error(f"Error during GameService disconnect handling (on WebSocket error) for User {user_id_uuid} in Game {game_id_uuid}: {service_error}", exc_info=True)
+        if manager.disconnect(websocket, game_id_uuid, user_id_uuid):
+            try:
+                await game_service.handle_disconnect(game_id_uuid, user_id_uuid)
+            except Exception as service_error:
+                logger.error(f"Error during GameService disconnect handling (on WebSocket error) for User {user_id_uuid} in Game {game_id_uuid}: {service_error}", exc_info=True)
 
 @app.get("/")
 async def root():
     """Root endpoint for health check."""
     return {"status": "ok", "message": "Trivia API is running"}
 
+@app.get("/metrics")
+async def metrics():
+    """Runtime metrics for capacity monitoring."""
+    return {
+        "llm_schedulers": get_llm_scheduler_metrics(),
+        "llm_response_cache": get_llm_response_cache_metrics(),
+        "game_rooms": game_room_registry.get_metrics(),
+        "question_timers": question_timers.get_metrics(),
+        "answer_buffer": answer_buffer.get_metrics(),
+        "websockets": connection_manager.get_metrics(),
+    }
+
 # Removed uvicorn runner - use run_api_server.py instead
\ No newline at end of file
@@ -19,6 +19,7 @@ class GameQuestion(BaseModel):
         end_time: When this question was completed
         participant_answers: Dictionary mapping participant IDs to their answer choices
         participant_scores: Dictionary mapping participant IDs to their scores for this question
+        correct_option_index: Display position of the correct answer among the shuffled options
     """
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     game_session_id: str
@@ -28,6 +29,7 @@ class GameQuestion(BaseModel):
     end_time: Optional[datetime] = None
     participant_answers: Dict[str, str] = Field(default_factory=dict)
     participant_scores: Dict[str, int] = Field(default_factory=dict)
+    correct_option_index: Optional[int] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
     
     class Config:
@@ -38,6 +40,7 @@ class GameQuestionCreate(BaseCreateSchema):
     game_session_id: str
     question_id: str
     question_index: int
+    correct_option_index: Optional[int] = None
 
 class GameQuestionUpdate(BaseUpdateSchema):
     """Schema for updating an existing game question."""
@@ -31,6 +31,7 @@ class Question(BaseModel):
         difficulty_current: The current difficulty rating (optional)
         correct_answer_rate: Percentage of correct answers given by users
         created_at: When this question was created
+        pack_ordinal: Stable position of the question within its pack, assigned by the database
     """
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     question: str
@@ -41,6 +42,7 @@ class Question(BaseModel):
     difficulty_current: Optional[DifficultyLevel] = None
     correct_answer_rate: float = 0.0
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    pack_ordinal: Optional[int] = None
     
     # Updated from root_validator to model_validator for Pydantic v2
     @model_validator(mode='before')
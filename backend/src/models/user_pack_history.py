@@ -17,12 +17,14 @@ class UserPackHistory(BaseModel):
         pack_id: Reference to the pack
         play_count: Number of times the user has played this pack
         last_played_at: When the user last played this pack
+        seen_questions: Base64 bitmap over the pack's question ordinals the user has answered
     """
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     user_id: str
     pack_id: str
     play_count: int
     last_played_at: datetime = Field(default_factory=datetime.utcnow)
+    seen_questions: Optional[str] = None
     
     class Config:
         from_attributes = True  # Updated from orm_mode = True
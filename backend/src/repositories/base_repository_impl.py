@@ -1,12 +1,14 @@
 # backend/src/repositories/base_repository_impl.py
 
 import uuid
+import inspect
 import logging
 import traceback
-from typing import List, Optional, Type, Dict, Any, Union, TypeVar
+from typing import List, Optional, Type, Dict, Any, Union, TypeVar, Tuple
 from pydantic import BaseModel
 from supabase import AsyncClient
 from postgrest import APIResponse
+from postgrest.exceptions import APIError
 # --- Import datetime and timezone ---
 from datetime import datetime, timezone
 
@@ -16,6 +18,13 @@ from ..utils import ensure_uuid
 # Configure logger
 logger = logging.getLogger(__name__)
 
+# SQLSTATE classes for errors caused by a row's values (22: data exception,
+# 23: integrity constraint violation); only these are retried row by row
+_DATA_ERROR_SQLSTATE_CLASSES = ("22", "23")
+
+# Whether the installed postgrest-py accepts insert(default_to_null=...); checked once
+_insert_default_to_null_supported: Optional[bool] = None
+
 class BaseRepositoryImpl(BaseRepository[ModelType, CreateSchemaType, UpdateSchemaType, IdentifierType]):
     """
     Generic implementation of the BaseRepository using Supabase.
@@ -132,49 +141,197 @@ class BaseRepositoryImpl(BaseRepository[ModelType, CreateSchemaType, UpdateSchem
             logger.error(f"Error getting all records from table {self.table_name}: {str(e)}")
             raise
 
-    async def create(self, *, obj_in: CreateSchemaType) -> ModelType:
-        """Create a new record from a creation schema."""
+    def _parse_written_row(self, rows: Optional[List[Dict[str, Any]]]) -> Optional[ModelType]:
+        """Parse the first row returned by an insert/update/delete (return=representation)."""
+        if not rows:
+            return None
+        return self.model.model_validate(rows[0])
+
+    async def _update_row(self, id_str: str, update_data: Dict[str, Any], *, refetch: bool = False) -> Optional[ModelType]:
+        """
+        Update a single row by ID and return it.
+
+        PostgREST returns the updated row in the same request, so no follow-up
+        read is needed. Pass refetch=True to read the row back with a separate
+        query instead (e.g. when a trigger changes it after the update).
+
+        Args:
+            id_str: ID of the row, already normalized.
+            update_data: Serialized column values to write.
+            refetch: Read the row back with get_by_id after the update.
+
+        Returns:
+            The updated record, or None if no row matched.
+        """
+        query = self.db.table(self.table_name).update(update_data).eq("id", id_str)
+        response = await self._execute_query(query)
+        if refetch:
+            return await self.get_by_id(id_str)
+        return self._parse_written_row(response.data)
+
+    async def create(self, *, obj_in: CreateSchemaType, refetch: bool = False) -> ModelType:
+        """
+        Create a new record from a creation schema.
+
+        The inserted row, including database defaults, is returned by the insert
+        itself. Pass refetch=True to read it back with a separate query.
+        """
         try:
-            # Convert model to dict using Pydantic v2's model_dump
-            insert_data = obj_in.model_dump(exclude_unset=False, by_alias=False)
+            # Convert model to a serialized row (datetimes as ISO strings)
+            insert_data = self._prepare_insert_data(obj_in)
             logger.debug(f"Creating new record in table {self.table_name}")
 
-            # ---> FIX: Serialize data (including datetimes) before sending <---
-            insert_data = self._serialize_data_for_db(insert_data)
-
-            # Step 1: Insert the data
             query = self.db.table(self.table_name).insert(insert_data) # Pass serialized data
             response = await self._execute_query(query)
 
-            # Step 2: If successful and we have an id, fetch the newly created record
-            if response.data and 'id' in response.data[0]:
-                new_id = response.data[0]['id']
-                logger.debug(f"Record created with ID: {new_id}, fetching complete record")
-                # Use get_by_id which handles parsing correctly
-                new_record = await self.get_by_id(new_id)
+            if not response.data:
+                logger.error("Failed to create record, no data returned from insert.")
+                raise ValueError("Failed to create record, no data returned.")
+
+            if refetch and 'id' in response.data[0]:
+                new_record = await self.get_by_id(response.data[0]['id'])
                 if new_record:
                     return new_record
 
-            # Fallback: If fetching failed or no ID returned, try parsing insert response
-            if response.data:
-                try:
-                    logger.warning("Could not fetch created record by ID, parsing insert response.")
-                    # Use model_validate for Pydantic V2
-                    return self.model.model_validate(response.data[0])
-                except Exception as e:
-                    logger.error(f"Could not parse insert response data: {e}")
-                    raise ValueError("Failed to create record and parse response.")
-
-            logger.error("Failed to create record, no data returned from insert.")
-            raise ValueError("Failed to create record, no data returned.")
+            try:
+                return self._parse_written_row(response.data)
+            except Exception as e:
+                logger.error(f"Could not parse insert response data: {e}")
+                raise ValueError("Failed to create record and parse response.")
 
         except Exception as e:
             logger.error(f"Error creating record in table {self.table_name}: {str(e)}")
             logger.error(traceback.format_exc())
             raise
 
-    async def update(self, *, id: IdentifierType, obj_in: UpdateSchemaType) -> Optional[ModelType]:
-        """Update a record with proper handling of optional fields."""
+    def _prepare_insert_data(self, obj_in: CreateSchemaType) -> Dict[str, Any]:
+        """Convert a creation schema into a row for insertion. Override for custom serialization."""
+        insert_data = obj_in.model_dump(exclude_unset=False, by_alias=False)
+        return self._serialize_data_for_db(insert_data)
+
+    @staticmethod
+    def _is_data_error(error: Exception) -> bool:
+        """Whether a failed insert was rejected because of the rows' values."""
+        return isinstance(error, APIError) and str(error.code or "")[:2] in _DATA_ERROR_SQLSTATE_CLASSES
+
+    def _bulk_insert_query(self, rows: List[Dict[str, Any]], **kwargs):
+        """
+        Multi-row insert where keys missing from a row use the column default.
+
+        Raises:
+            RuntimeError: If the installed postgrest-py predates insert(default_to_null=...).
+        """
+        global _insert_default_to_null_supported
+        builder = self.db.table(self.table_name)
+        if _insert_default_to_null_supported is None:
+            _insert_default_to_null_supported = "default_to_null" in inspect.signature(builder.insert).parameters
+        if not _insert_default_to_null_supported:
+            raise RuntimeError(
+                "Bulk inserts need postgrest-py with insert(default_to_null=...); "
+                "upgrade supabase/postgrest to the versions in requirements.txt"
+            )
+        return builder.insert(rows, default_to_null=False, **kwargs)
+
+    async def create_many(
+        self,
+        *,
+        objs_in: List[CreateSchemaType],
+        chunk_size: int = 500
+    ) -> Tuple[List[ModelType], List[Dict[str, Any]]]:
+        """
+        Create several records with one multi-row insert per chunk.
+
+        The inserted rows are returned by the same request (return=representation),
+        so no follow-up fetch is needed. Rows without an id are given one here, and
+        returned rows are matched back to their inputs by id. If a chunk is rejected
+        for its data (a constraint or value error), its rows are retried individually
+        so that one bad row does not fail the rest; any other error is raised.
+
+        Args:
+            objs_in: Creation schemas to insert.
+            chunk_size: Maximum rows per insert request.
+
+        Returns:
+            Tuple of (created records in input order, errors). Each error is a dict
+            with the input "index" and an "error" message.
+        """
+        created: List[Tuple[int, ModelType]] = []
+        errors: List[Dict[str, Any]] = []
+        assign_ids = "id" in self.model.model_fields
+
+        rows: List[Tuple[int, Dict[str, Any]]] = []
+        for index, obj_in in enumerate(objs_in):
+            try:
+                data = self._prepare_insert_data(obj_in)
+                if assign_ids:
+                    data.setdefault("id", str(uuid.uuid4()))
+                rows.append((index, data))
+            except Exception as e:
+                errors.append({"index": index, "error": f"Invalid row: {e}"})
+
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            try:
+                response = await self._execute_query(self._bulk_insert_query([data for _, data in chunk]))
+                self._collect_inserted_rows(chunk, response.data or [], created, errors)
+            except Exception as e:
+                if not self._is_data_error(e):
+                    raise
+                if len(chunk) == 1:
+                    errors.append({"index": chunk[0][0], "error": str(e)})
+                    continue
+                logger.warning(f"Bulk insert of {len(chunk)} rows into {self.table_name} failed ({e}); retrying rows individually")
+                for index, data in chunk:
+                    try:
+                        response = await self._execute_query(self.db.table(self.table_name).insert(data))
+                        self._collect_inserted_rows([(index, data)], response.data or [], created, errors)
+                    except Exception as row_error:
+                        if not self._is_data_error(row_error):
+                            raise
+                        errors.append({"index": index, "error": str(row_error)})
+
+        if errors:
+            logger.warning(f"create_many on {self.table_name}: {len(created)} created, {len(errors)} failed")
+        created.sort(key=lambda pair: pair[0])
+        return [record for _, record in created], sorted(errors, key=lambda err: err["index"])
+
+    def _collect_inserted_rows(
+        self,
+        chunk: List[Tuple[int, Dict[str, Any]]],
+        returned_rows: List[Dict[str, Any]],
+        created: List[Tuple[int, ModelType]],
+        errors: List[Dict[str, Any]]
+    ) -> None:
+        """
+        Match returned rows to input indexes and parse them.
+
+        Rows are matched on their id. Inputs without an id (tables whose model has
+        no id field) fall back to position, which relies on PostgREST returning
+        rows in insert order.
+        """
+        if len(returned_rows) != len(chunk):
+            logger.error(f"Insert into {self.table_name} returned {len(returned_rows)} rows for {len(chunk)} inputs")
+        rows_by_id = {str(row["id"]): row for row in returned_rows if row.get("id") is not None}
+        for position, (index, data) in enumerate(chunk):
+            if data.get("id") is not None:
+                row = rows_by_id.get(str(data["id"]))
+            else:
+                row = returned_rows[position] if position < len(returned_rows) else None
+            if row is None:
+                errors.append({"index": index, "error": "No row returned from insert"})
+                continue
+            try:
+                created.append((index, self.model.model_validate(row)))
+            except Exception as e:
+                errors.append({"index": index, "error": f"Could not parse inserted row: {e}"})
+
+    async def update(self, *, id: IdentifierType, obj_in: UpdateSchemaType, refetch: bool = False) -> Optional[ModelType]:
+        """
+        Update a record with proper handling of optional fields.
+
+        The updated row is returned by the update itself. Pass refetch=True to
+        read it back with a separate query.
+        """
         try:
             id_str = ensure_uuid(id)
             logger.debug(f"Updating record with ID: {id_str} in table {self.table_name}")
@@ -189,13 +346,7 @@ class BaseRepositoryImpl(BaseRepository[ModelType, CreateSchemaType, UpdateSchem
             # ---> FIX: Serialize data (including datetimes) before sending <---
             update_data = self._serialize_data_for_db(update_data)
 
-            # Step 1: Update the record
-            query = self.db.table(self.table_name).update(update_data).eq("id", id_str) # Pass serialized data
-            await self._execute_query(query)
-
-            # Step 2: Fetch the updated record
-            logger.debug(f"Record updated, fetching updated record with ID: {id_str}")
-            return await self.get_by_id(id_str)
+            return await self._update_row(id_str, update_data, refetch=refetch)
         except Exception as e:
             logger.error(f"Error updating record with ID {id_str} in table {self.table_name}: {str(e)}") # Use id_str
             logger.error(traceback.format_exc())
@@ -207,21 +358,18 @@ class BaseRepositoryImpl(BaseRepository[ModelType, CreateSchemaType, UpdateSchem
             id_str = ensure_uuid(id)
             logger.debug(f"Deleting record with ID: {id_str} from table {self.table_name}")
 
-            # Step 1: Get the object before deletion
-            obj = await self.get_by_id(id_str)
+            # The delete returns the removed row (return=representation)
+            query = self.db.table(self.table_name).delete().eq("id", id_str)
+            response = await self._execute_query(query)
 
+            obj = self._parse_written_row(response.data)
             if not obj:
                 logger.warning(f"Record with ID {id_str} not found for deletion")
                 return None  # Object doesn't exist
 
-            # Step 2: Delete the object
-            query = self.db.table(self.table_name).delete().eq("id", id_str)
-            await self._execute_query(query)
-
-            # Step 3: Return the object that was deleted
             logger.debug(f"Successfully deleted record with ID: {id_str}")
             return obj
         except Exception as e:
             logger.error(f"Error deleting record with ID {id_str} in table {self.table_name}: {str(e)}") # Use id_str
             logger.error(traceback.format_exc())
-            raise
\ No newline at end of file
+            raise
@@ -107,11 +107,8 @@ class GameParticipantRepository(BaseRepositoryImpl[GameParticipant, GameParticip
         }
         # --- END CORRECTED FIX ---
 
-        query = self.db.table(self.table_name).update(update_data).eq("id", participant_id_str)
-        await self._execute_query(query) # This should now work
-
-        # Fetch and return the updated object using the correct ID
-        return await self.get_by_id(participant_id_str) # Ensure correct ID type
+        # The update returns the written row; no follow-up fetch
+        return await self._update_row(participant_id_str, update_data)
 
     async def get_user_active_games(self, user_id: str) -> List[GameParticipant]:
         """Retrieve all game participations for a user."""
@@ -1,20 +1,53 @@
 # backend/src/repositories/game_question_repository.py
 import uuid
-from typing import List, Optional, Dict
+import logging
+from typing import List, Optional, Dict, Any
 from datetime import datetime
 from supabase import AsyncClient
+from postgrest.exceptions import APIError
 
 from ..models.game_question import GameQuestion, GameQuestionCreate, GameQuestionUpdate
 from .base_repository_impl import BaseRepositoryImpl
 from ..utils import ensure_uuid
 
+logger = logging.getLogger(__name__)
+
+# PostgREST error codes: function / column not found in the schema cache
+_RPC_NOT_FOUND = "PGRST202"
+_COLUMN_NOT_FOUND = "PGRST204"
+# Postgres undefined_column (the schema cache still lists a column the table no longer has)
+_UNDEFINED_COLUMN = "42703"
+# Postgres no_data_found, raised by record_game_answer for an unknown participant
+_NO_DATA_FOUND = "P0002"
+
 class GameQuestionRepository(BaseRepositoryImpl[GameQuestion, GameQuestionCreate, GameQuestionUpdate, str]):
     """
     Repository for managing GameQuestion data in Supabase.
     """
+    # Set to False the first time the correct_option_index column is found missing
+    _correct_option_column_available: bool = True
+
     def __init__(self, db: AsyncClient):
         super().__init__(model=GameQuestion, db=db, table_name="game_questions") # Table name: "game_questions"
 
+    def _prepare_insert_data(self, obj_in: GameQuestionCreate) -> Dict[str, Any]:
+        insert_data = super()._prepare_insert_data(obj_in)
+        if insert_data.get("correct_option_index") is None or not GameQuestionRepository._correct_option_column_available:
+            insert_data.pop("correct_option_index", None)
+        return insert_data
+
+    async def create(self, *, obj_in: GameQuestionCreate, refetch: bool = False) -> GameQuestion:
+        """Create a game question, dropping correct_option_index if the column has not been added yet."""
+        try:
+            return await super().create(obj_in=obj_in, refetch=refetch)
+        except APIError as e:
+            if e.code not in (_COLUMN_NOT_FOUND, _UNDEFINED_COLUMN) or "correct_option_index" not in f"{e.message} {e.details}":
+                raise
+            if GameQuestionRepository._correct_option_column_available:
+                logger.warning("game_questions.correct_option_index column not found; storing game questions without it. Apply backend/sql/game_questions_correct_option_index.sql.")
+                GameQuestionRepository._correct_option_column_available = False
+            return await super().create(obj_in=obj_in, refetch=refetch)
+
     # --- Custom GameQuestion-specific methods ---
 
     async def get_by_game_session_id(self, game_session_id: str) -> List[GameQuestion]:
@@ -56,11 +89,8 @@ class GameQuestionRepository(BaseRepositoryImpl[GameQuestion, GameQuestionCreate
         now = datetime.utcnow()
         update_data = {"start_time": now.isoformat()}
         
-        query = self.db.table(self.table_name).update(update_data).eq("id", question_id_str)
-        await self._execute_query(query)
-        
-        # Fetch and return the updated object
-        return await self.get_by_id(question_id)
+        # The update returns the written row; no follow-up fetch
+        return await self._update_row(question_id_str, update_data)
 
     async def end_question(self, question_id: str) -> Optional[GameQuestion]:
         """Mark a question as ended (set end_time)."""
@@ -70,11 +100,8 @@ class GameQuestionRepository(BaseRepositoryImpl[GameQuestion, GameQuestionCreate
         now = datetime.utcnow()
         update_data = {"end_time": now.isoformat()}
         
-        query = self.db.table(self.table_name).update(update_data).eq("id", question_id_str)
-        await self._execute_query(query)
-        
-        # Fetch and return the updated object
-        return await self.get_by_id(question_id)
+        # The update returns the written row; no follow-up fetch
+        return await self._update_row(question_id_str, update_data)
 
     async def record_participant_answer(
         self, 
@@ -97,11 +124,8 @@ class GameQuestionRepository(BaseRepositoryImpl[GameQuestion, GameQuestionCreate
         
         # Update in database
         update_data = {"participant_answers": participant_answers}
-        query = self.db.table(self.table_name).update(update_data).eq("id", question_id_str)
-        await self._execute_query(query)
-        
-        # Fetch and return the updated object
-        return await self.get_by_id(question_id)
+        # The update returns the written row; no follow-up fetch
+        return await self._update_row(question_id_str, update_data)
 
     async def record_participant_score(
         self, 
@@ -124,8 +148,98 @@ class GameQuestionRepository(BaseRepositoryImpl[GameQuestion, GameQuestionCreate
         
         # Update in database
         update_data = {"participant_scores": participant_scores}
-        query = self.db.table(self.table_name).update(update_data).eq("id", question_id_str)
-        await self._execute_query(query)
-        
-        # Fetch and return the updated object
-        return await self.get_by_id(question_id)
\ No newline at end of file
+        # The update returns the written row; no follow-up fetch
+        return await self._update_row(question_id_str, update_data)
+
+    async def _call_answer_function(self, function_name: str, params: Dict[str, Any]):
+        """
+        Call one of the answer-recording database functions.
+
+        Raises:
+            RuntimeError: If the function is not installed. There is no non-atomic
+                          fallback; apply backend/sql/<function_name>.sql.
+        """
+        try:
+            return await self._execute_query(self.db.rpc(function_name, params))
+        except APIError as e:
+            if e.code != _RPC_NOT_FOUND:
+                raise
+            raise RuntimeError(
+                f"Database function {function_name} is not installed; apply backend/sql/{function_name}.sql"
+            ) from e
+
+    async def record_answer(
+        self,
+        question_id: str,
+        participant_id: str,
+        answer: str,
+        score: int
+    ) -> Dict[str, Any]:
+        """
+        Record a participant's answer and score for a question in one call.
+
+        Uses the record_game_answer database function (backend/sql/record_game_answer.sql),
+        which merges the participant's key into the JSONB maps and increments the
+        participant's total score atomically, so concurrent answers are never lost
+        and a duplicate answer is rejected.
+
+        Args:
+            question_id: ID of the game question.
+            participant_id: ID of the answering participant.
+            answer: The submitted answer.
+            score: Points awarded for this answer.
+
+        Returns:
+            Dict with "recorded" (False if the question is closed or was already
+            answered by this participant) and "total_score" (the participant's new
+            total, or None if the answer was not recorded).
+
+        Raises:
+            ValueError: If the participant does not exist (nothing is written).
+            RuntimeError: If record_game_answer is not installed.
+        """
+        try:
+            response = await self._call_answer_function("record_game_answer", {
+                "p_game_question_id": ensure_uuid(question_id),
+                "p_participant_id": ensure_uuid(participant_id),
+                "p_answer": answer,
+                "p_score": score,
+            })
+        except APIError as e:
+            if e.code != _NO_DATA_FOUND:
+                raise
+            raise ValueError(f"Participant {participant_id} not found") from e
+        row = response.data[0] if response.data else {}
+        return {"recorded": bool(row.get("recorded")), "total_score": row.get("total_score")}
+
+    async def record_answers(self, answers: List[Dict[str, Any]]) -> int:
+        """
+        Record a batch of answers and scores, across questions and participants, in one call.
+
+        Uses the record_game_answers database function (backend/sql/record_game_answers.sql),
+        which merges each question's new answers in one UPDATE and increments each
+        participant's total once. Answers a question already holds are skipped, so a
+        batch can be retried.
+
+        Args:
+            answers: Dicts with "game_question_id", "participant_id", "answer" and "score".
+
+        Returns:
+            Number of answers written.
+
+        Raises:
+            RuntimeError: If record_game_answers is not installed.
+        """
+        if not answers:
+            return 0
+        rows = [
+            {
+                "game_question_id": ensure_uuid(answer["game_question_id"]),
+                "participant_id": ensure_uuid(answer["participant_id"]),
+                "answer": answer["answer"],
+                "score": answer["score"],
+            }
+            for answer in answers
+        ]
+        response = await self._call_answer_function("record_game_answers", {"p_answers": rows})
+        return sum(1 for row in response.data or [] if row.get("recorded"))
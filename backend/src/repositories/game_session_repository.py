@@ -66,8 +66,5 @@ class GameSessionRepository(BaseRepositoryImpl[GameSession, GameSessionCreate, G
         }
         # --- END CORRECTED FIX ---
 
-        query = self.db.table(self.table_name).update(update_data).eq("id", game_id_str)
-        await self._execute_query(query) # This should now work
-
-        # Fetch and return the updated object
-        return await self.get_by_id(game_id_str) # Use string ID
\ No newline at end of file
+        # The update returns the written row; no follow-up fetch
+        return await self._update_row(game_id_str, update_data)
\ No newline at end of file
@@ -74,12 +74,10 @@ class PackRepository(BaseRepositoryImpl[Pack, PackCreate, PackUpdate, str]):
         """Updates the correct answer rate for a given pack."""
         pack_id_str = ensure_uuid(pack_id)
         update_data = {"correct_answer_rate": rate}
-        query = self.db.table(self.table_name).update(update_data).eq("id", pack_id_str)
-        await self._execute_query(query)
-        return await self.get_by_id(pack_id_str) # Fetch updated record
+        return await self._update_row(pack_id_str, update_data) # Update returns the written row
 
     # Override base methods to handle enum serialization and new fields if needed
-    async def create(self, *, obj_in: PackCreate) -> Pack:
+    async def create(self, *, obj_in: PackCreate, refetch: bool = False) -> Pack:
         """Create a new pack with proper enum handling and new fields."""
         # Use exclude_none=True to avoid inserting None for optional fields
         # Ensure defaults from the model are used if not provided in obj_in
@@ -97,22 +95,15 @@ class PackRepository(BaseRepositoryImpl[Pack, PackCreate, PackUpdate, str]):
         query_result = await self.db.table(self.table_name).insert(insert_data).execute()
         # --- END MODIFIED LINE ---
 
-        # Fetch the newly created record to get all fields including defaults
-        # --- MODIFIED LINE: Use query_result instead of query ---
+        # The insert returns the complete row, including DB defaults
         if query_result.data:
-             # --- MODIFIED LINE: Use query_result instead of query ---
              new_id = query_result.data[0].get('id')
-             if new_id:
-                 # Fetch the complete record
+             if refetch and new_id:
                  logger.debug(f"Fetching newly created pack with ID: {new_id}")
                  new_pack = await self.get_by_id(new_id)
                  if new_pack:
                       return new_pack
-                 else:
-                      logger.warning(f"Failed to fetch pack {new_id} after creation, attempting to parse insert response.")
-             # Fallback: parse insert response (might miss DB defaults)
              try:
-                  # --- MODIFIED LINE: Use query_result instead of query ---
                   return self.model.model_validate(query_result.data[0])
              except Exception as e:
                   logger.error(f"Failed to parse insert response: {e}")
@@ -124,7 +115,7 @@ class PackRepository(BaseRepositoryImpl[Pack, PackCreate, PackUpdate, str]):
             raise ValueError(f"Failed to create pack, no data returned. Error: {getattr(query_result, 'error', 'Unknown error')}")
 
 
-    async def update(self, *, id: str, obj_in: PackUpdate) -> Optional[Pack]:
+    async def update(self, *, id: str, obj_in: PackUpdate, refetch: bool = False) -> Optional[Pack]:
         """Update an existing pack with proper enum handling and new fields."""
         id_str = ensure_uuid(id)
         # Use exclude_unset=True for partial updates
@@ -136,7 +127,4 @@ class PackRepository(BaseRepositoryImpl[Pack, PackCreate, PackUpdate, str]):
         update_data = self._serialize_enum_values(update_data) # Handle enums
         update_data = self._serialize_data_for_db(update_data) # Handle potential nested JSON
 
-        query = self.db.table(self.table_name).update(update_data).eq("id", id_str)
-        await self._execute_query(query) # Base implementation handles await correctly
-
-        return await self.get_by_id(id_str) # Fetch and return updated record
\ No newline at end of file
+        return await self._update_row(id_str, update_data, refetch=refetch) # Update returns the written row
\ No newline at end of file
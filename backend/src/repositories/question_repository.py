@@ -1,12 +1,15 @@
 # backend/src/repositories/question_repository.py
 import uuid
-from typing import List, Optional, Dict, Any
+from typing import AsyncIterator, List, Optional, Dict, Any
 from supabase import AsyncClient
 
 from ..models.question import Question, QuestionCreate, QuestionUpdate, DifficultyLevel
 from .base_repository_impl import BaseRepositoryImpl
 from ..utils import ensure_uuid
 
+# Rows per keyset page when streaming a pack's questions (kept under PostgREST's max rows)
+PACK_PAGE_SIZE = 500
+
 
 class QuestionRepository(BaseRepositoryImpl[Question, QuestionCreate, QuestionUpdate, str]):
     """
@@ -27,8 +30,16 @@ class QuestionRepository(BaseRepositoryImpl[Question, QuestionCreate, QuestionUp
 
     # --- Custom Question-specific methods ---
 
-    async def get_by_pack_id(self, pack_id: str, *, skip: int = 0, limit: int = 100) -> List[Question]:
-        """Retrieve questions belonging to a specific pack."""
+    async def get_by_pack_id(self, pack_id: str, *, skip: int = 0, limit: Optional[int] = None) -> List[Question]:
+        """
+        Retrieve questions belonging to a specific pack.
+
+        Without a limit every question in the pack is returned (read in keyset
+        pages). skip/limit select one window, ordered by id.
+        """
+        if limit is None and skip == 0:
+            return [question async for question in self.iter_by_pack_id(pack_id)]
+
         # Ensure pack_id is a valid UUID string
         pack_id_str = ensure_uuid(pack_id)
         
@@ -36,12 +47,59 @@ class QuestionRepository(BaseRepositoryImpl[Question, QuestionCreate, QuestionUp
             self.db.table(self.table_name)
             .select("*")
             .eq("pack_id", pack_id_str)
+            .order("id")
             .offset(skip)
-            .limit(limit)
+            .limit(limit if limit is not None else PACK_PAGE_SIZE)
         )
         response = await self._execute_query(query)
         return [self.model.parse_obj(item) for item in response.data]
 
+    async def iter_pages_by_pack_id(
+        self,
+        pack_id: str,
+        *,
+        topic: Optional[str] = None,
+        page_size: int = PACK_PAGE_SIZE
+    ) -> AsyncIterator[List[Question]]:
+        """
+        Stream a pack's questions in pages, using keyset pagination on id.
+
+        Each page asks for rows with id greater than the last one seen, so
+        every page is an index range scan on (pack_id, id) instead of an
+        OFFSET scan, and only one page is held in memory at a time. Pages
+        end when a short page comes back.
+
+        Args:
+            pack_id: The pack.
+            topic: Only questions with this topic (case-insensitive).
+            page_size: Rows per request (at most the server's max rows).
+
+        Yields:
+            Lists of up to page_size questions, ordered by id.
+        """
+        pack_id_str = ensure_uuid(pack_id)
+        last_id: Optional[str] = None
+        while True:
+            query = self.db.table(self.table_name).select("*").eq("pack_id", pack_id_str)
+            if topic is not None:
+                # ilike without wildcards: case-insensitive equality
+                query = query.ilike("pack_topics_item", topic.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_"))
+            if last_id is not None:
+                query = query.gt("id", last_id)
+            response = await self._execute_query(query.order("id").limit(page_size))
+            rows = response.data or []
+            if rows:
+                yield [self.model.parse_obj(item) for item in rows]
+            if len(rows) < page_size:
+                return
+            last_id = rows[-1]["id"]
+
+    async def iter_by_pack_id(self, pack_id: str, *, topic: Optional[str] = None, page_size: int = PACK_PAGE_SIZE) -> AsyncIterator[Question]:
+        """Stream a pack's questions one at a time (see iter_pages_by_pack_id)."""
+        async for page in self.iter_pages_by_pack_id(pack_id, topic=topic, page_size=page_size):
+            for question in page:
+                yield question
+
     async def get_by_difficulty(self, difficulty: DifficultyLevel, *, skip: int = 0, limit: int = 100) -> List[Question]:
         """Retrieve questions by their current difficulty level."""
         # Convert enum to string value for the query
@@ -64,14 +122,16 @@ class QuestionRepository(BaseRepositoryImpl[Question, QuestionCreate, QuestionUp
         if new_difficulty:
             update_data["difficulty_current"] = new_difficulty.value
 
-        query = self.db.table(self.table_name).update(update_data).eq("id", question_id_str)
-        await self._execute_query(query)
-        
-        # Fetch and return the updated object
-        return await self.get_by_id(question_id)
+        # The update returns the written row; no follow-up fetch
+        return await self._update_row(question_id_str, update_data)
 
     # Override base methods to handle enum serialization
-    async def create(self, *, obj_in: QuestionCreate) -> Question:
+    def _prepare_insert_data(self, obj_in: QuestionCreate) -> Dict[str, Any]:
+        """Row for insertion (used by create_many), matching create()'s serialization."""
+        insert_data = obj_in.model_dump(exclude_unset=False, exclude_none=True, by_alias=False)
+        return self._serialize_enum_values(insert_data)
+
+    async def create(self, *, obj_in: QuestionCreate, refetch: bool = False) -> Question:
         """Create a new question with proper enum handling."""
         insert_data = obj_in.dict(exclude_unset=False, exclude_none=True, by_alias=False)
         insert_data = self._serialize_enum_values(insert_data)
@@ -80,16 +140,15 @@ class QuestionRepository(BaseRepositoryImpl[Question, QuestionCreate, QuestionUp
         response = await self._execute_query(query)
 
         if response.data:
-            # Get the ID of the newly created record
             new_id = response.data[0].get('id')
-            if new_id:
-                # Fetch the complete record
+            if refetch and new_id:
                 return await self.get_by_id(new_id)
+            # The insert returns the complete row, including DB defaults
             return self.model.parse_obj(response.data[0])
         else:
             raise ValueError("Failed to create question, no data returned.")
 
-    async def update(self, *, id: str, obj_in: QuestionUpdate) -> Optional[Question]:
+    async def update(self, *, id: str, obj_in: QuestionUpdate, refetch: bool = False) -> Optional[Question]:
         """Update an existing question with proper enum handling."""
         # Ensure id is a valid UUID string
         id_str = ensure_uuid(id)
@@ -101,8 +160,4 @@ class QuestionRepository(BaseRepositoryImpl[Question, QuestionCreate, QuestionUp
             
         update_data = self._serialize_enum_values(update_data)
         
-        query = self.db.table(self.table_name).update(update_data).eq("id", id_str)
-        await self._execute_query(query)
-
-        # Fetch and return the updated object
-        return await self.get_by_id(id)
\ No newline at end of file
+        return await self._update_row(id_str, update_data, refetch=refetch)
@@ -1,8 +1,9 @@
 # backend/src/repositories/user_pack_history_repository.py
 import uuid
 import logging # Import logging
-from typing import List, Optional
+from typing import Dict, List, Optional
 from supabase import AsyncClient
+from postgrest.exceptions import APIError
 from datetime import datetime, timezone # Import timezone
 
 from ..models.user_pack_history import UserPackHistory, UserPackHistoryCreate, UserPackHistoryUpdate
@@ -12,10 +13,17 @@ from ..utils import ensure_uuid
 # Configure logger
 logger = logging.getLogger(__name__)
 
+# PostgREST / Postgres error codes: function not found, column does not exist
+_RPC_NOT_FOUND = "PGRST202"
+_UNDEFINED_COLUMN = "42703"
+
 class UserPackHistoryRepository(BaseRepositoryImpl[UserPackHistory, UserPackHistoryCreate, UserPackHistoryUpdate, str]):
     """
     Repository for managing UserPackHistory data in Supabase.
     """
+    # Set to False the first time the seen_questions column or mark_questions_seen function is found missing
+    _seen_bitmaps_available: bool = True
+
     def __init__(self, db: AsyncClient):
         super().__init__(model=UserPackHistory, db=db, table_name="user_pack_history") # Table name: "user_pack_history"
 
@@ -112,4 +120,55 @@ class UserPackHistoryRepository(BaseRepositoryImpl[UserPackHistory, UserPackHist
         except Exception as e:
             logger.error(f"Error incrementing play count for user {user_id_str}, pack {pack_id_str}: {e}", exc_info=True)
             return None # Return None on error
-    # --- END MODIFIED: increment_play_count ---
\ No newline at end of file
+    # --- END MODIFIED: increment_play_count ---
+
+    async def get_seen_bitmaps(self, user_ids: List[str], pack_id: str) -> Optional[Dict[str, Optional[str]]]:
+        """
+        Retrieve the seen-question bitmaps (base64, see game/seen_set.py) of several users for a pack.
+
+        Args:
+            user_ids: Users to fetch bitmaps for.
+            pack_id: The pack.
+
+        Returns:
+            Dict of user ID -> stored bitmap. Users who have never played the pack
+            are absent; a None bitmap has not been backfilled yet. Returns None if
+            bitmaps are not available (backend/sql/user_pack_seen_questions.sql not applied).
+        """
+        if not UserPackHistoryRepository._seen_bitmaps_available:
+            return None
+        user_ids_str = sorted({ensure_uuid(uid) for uid in user_ids})
+        query = (
+            self.db.table(self.table_name)
+            .select("user_id,seen_questions")
+            .eq("pack_id", ensure_uuid(pack_id))
+            .in_("user_id", user_ids_str)
+        )
+        try:
+            response = await self._execute_query(query)
+        except APIError as e:
+            if e.code != _UNDEFINED_COLUMN:
+                raise
+            logger.warning("user_pack_history.seen_questions column not found; selecting questions from user_question_history. Apply backend/sql/user_pack_seen_questions.sql.")
+            UserPackHistoryRepository._seen_bitmaps_available = False
+            return None
+        return {str(item["user_id"]): item.get("seen_questions") for item in response.data or []}
+
+    async def mark_questions_seen(self, pack_id: str, user_ids: List[str], ordinals: List[int]) -> None:
+        """
+        Set the given question ordinals in several users' seen bitmaps for a pack, in one call
+        (mark_questions_seen database function).
+        """
+        if not UserPackHistoryRepository._seen_bitmaps_available or not user_ids or not ordinals:
+            return
+        try:
+            await self._execute_query(self.db.rpc("mark_questions_seen", {
+                "p_pack_id": ensure_uuid(pack_id),
+                "p_user_ids": sorted({ensure_uuid(uid) for uid in user_ids}),
+                "p_ordinals": sorted(set(ordinals)),
+            }))
+        except APIError as e:
+            if e.code != _RPC_NOT_FOUND:
+                raise
+            logger.warning("mark_questions_seen function not found; seen-question bitmaps are not maintained. Apply backend/sql/user_pack_seen_questions.sql.")
+            UserPackHistoryRepository._seen_bitmaps_available = False
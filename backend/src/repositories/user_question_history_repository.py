@@ -3,6 +3,7 @@ import uuid
 import logging # Import logging
 from typing import List, Optional, Set # Added Set
 from supabase import AsyncClient
+from postgrest.types import ReturnMethod
 
 from ..models.user_question_history import UserQuestionHistory, UserQuestionHistoryCreate, UserQuestionHistoryUpdate
 from .base_repository_impl import BaseRepositoryImpl
@@ -11,6 +12,10 @@ from ..utils import ensure_uuid
 # Configure logger
 logger = logging.getLogger(__name__)
 
+# Seen-question lookups: question IDs per request (URL length) and rows per keyset page
+SEEN_QUERY_QUESTION_CHUNK = 150
+SEEN_QUERY_PAGE_SIZE = 1000
+
 class UserQuestionHistoryRepository(BaseRepositoryImpl[UserQuestionHistory, UserQuestionHistoryCreate, UserQuestionHistoryUpdate, str]):
     """
     Repository for managing UserQuestionHistory data in Supabase.
@@ -68,17 +73,63 @@ class UserQuestionHistoryRepository(BaseRepositoryImpl[UserQuestionHistory, User
         response = await self._execute_query(query)
         return [self.model.model_validate(item) for item in response.data] # Use model_validate
 
-    # --- NEW METHOD for efficient checking ---
+    async def insert_many(self, objs_in: List[UserQuestionHistoryCreate], *, chunk_size: int = 1000) -> int:
+        """
+        Insert many history entries with one request per chunk, without returning the rows.
+
+        History rows are never read back by the writer, so the insert asks
+        PostgREST for no response body. A chunk rejected for its data is
+        retried through create_many, which isolates the failing rows; any
+        other error is raised.
+
+        Args:
+            objs_in: History entries to insert.
+            chunk_size: Maximum rows per insert request.
+
+        Returns:
+            Number of rows inserted.
+        """
+        inserted = 0
+        for start in range(0, len(objs_in), chunk_size):
+            chunk = objs_in[start:start + chunk_size]
+            try:
+                query = self._bulk_insert_query(
+                    [self._prepare_insert_data(obj_in) for obj_in in chunk],
+                    returning=ReturnMethod.minimal
+                )
+                await self._execute_query(query)
+                inserted += len(chunk)
+            except Exception as e:
+                if not self._is_data_error(e):
+                    raise
+                logger.warning(f"Bulk insert of {len(chunk)} history rows failed ({e}); retrying through create_many")
+                created, _ = await self.create_many(objs_in=chunk)
+                inserted += len(created)
+        return inserted
+
     async def get_seen_question_ids_for_users(
-        self, user_ids: List[str], question_ids: List[str]
+        self,
+        user_ids: List[str],
+        question_ids: List[str],
+        *,
+        question_chunk_size: int = SEEN_QUERY_QUESTION_CHUNK,
+        page_size: int = SEEN_QUERY_PAGE_SIZE
     ) -> Set[str]:
         """
         Retrieve the set of question IDs that have been seen by any of the specified users.
         Filters by the provided question_ids to limit the search scope.
 
+        question_ids are sent in chunks (keeping request URLs short for large
+        packs), and each chunk is read in keyset pages ordered by id, so the
+        result is complete however many history rows match; PostgREST's row
+        limit never truncates it. The (user_id, question_id) index from
+        backend/sql/user_question_history_indexes.sql serves the filter.
+
         Args:
             user_ids: List of user IDs to check history for.
             question_ids: List of question IDs to consider.
+            question_chunk_size: Question IDs per request.
+            page_size: Rows per page (at most the server's max rows).
 
         Returns:
             A set containing the string representations of question IDs seen by any user.
@@ -87,27 +138,32 @@ class UserQuestionHistoryRepository(BaseRepositoryImpl[UserQuestionHistory, User
             return set() # No need to query if either list is empty
 
         # Ensure UUIDs are strings
-        user_ids_str = [ensure_uuid(uid) for uid in user_ids]
-        question_ids_str = [ensure_uuid(qid) for qid in question_ids]
+        user_ids_str = sorted({ensure_uuid(uid) for uid in user_ids})
+        question_ids_str = sorted({ensure_uuid(qid) for qid in question_ids})
 
+        seen_ids: Set[str] = set()
         try:
-            # Query for distinct question_ids seen by any of the users within the question pool
-            query = (
-                self.db.table(self.table_name)
-                .select("question_id", count="exact") # Fetch only question_id, count for potential pagination (though not used here)
-                .in_("user_id", user_ids_str)
-                .in_("question_id", question_ids_str)
-                # Supabase Python client might not directly support DISTINCT in select easily.
-                # We fetch all matching question_ids and dedup in Python using a set.
-            )
-            response = await self._execute_query(query)
-
-            # Extract unique question IDs from the response data
-            seen_ids = {item["question_id"] for item in response.data if "question_id" in item}
+            for start in range(0, len(question_ids_str), question_chunk_size):
+                chunk = question_ids_str[start:start + question_chunk_size]
+                last_id: Optional[str] = None
+                while chunk:
+                    query = (
+                        self.db.table(self.table_name)
+                        .select("id,question_id")
+                        .in_("user_id", user_ids_str)
+                        .in_("question_id", chunk)
+                    )
+                    if last_id is not None:
+                        query = query.gt("id", last_id)
+                    response = await self._execute_query(query.order("id").limit(page_size))
+                    rows = response.data or []
+                    seen_ids.update(item["question_id"] for item in rows if "question_id" in item)
+                    if len(rows) < page_size:
+                        break
+                    last_id = rows[-1]["id"]
             return seen_ids
 
         except Exception as e:
             logger.error(f"Error fetching seen question IDs for users {user_ids_str}: {e}", exc_info=True)
             # Return empty set on error to avoid blocking game start, but log it.
             return set()
-    # --- END NEW METHOD ---
\ No newline at end of file
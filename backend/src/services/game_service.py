@@ -1,11 +1,16 @@
 # backend/src/services/game_service.py
 import random
 import string
+import inspect
 import logging
 import asyncio
-from typing import List, Optional, Tuple, Dict, Any, Set
+from contextvars import ContextVar
+from functools import partial, wraps
+from typing import List, Optional, Tuple, Dict, Any, Set, Type
 from datetime import datetime, timezone # Ensure timezone is imported
 
+from pydantic import BaseModel
+
 # Models
 from ..models.game_session import GameSession, GameSessionCreate, GameSessionUpdate, GameStatus
 from ..models.game_participant import GameParticipant, GameParticipantCreate, GameParticipantUpdate
@@ -32,10 +37,52 @@ from ..api.schemas.game import GamePlayQuestionResponse
 # --- WebSocket Integration ---
 from ..websocket_manager import ConnectionManager
 # --- End WebSocket Integration ---
+from ..game.game_room import GameRoom, GameRoomRegistry, RoomQuestion
+from ..game.play_snapshot import PlaySnapshot
+from ..game.option_order import arrange_options, answer_id, parse_answer_index
+from ..game.timer_wheel import TimerWheel
+from ..game.answer_buffer import AnswerBuffer, BufferedAnswer
+from ..game.seen_set import decode_bitmap, bitmap_from_ordinals, is_set
+from ..game.question_selector import select_pack_questions
 
 # Configure logger
 logger = logging.getLogger(__name__)
 
+# Time allowed past a question's time limit before the server closes it (client and network latency)
+QUESTION_DEADLINE_GRACE_SECONDS = 1.0
+
+# Game commands other workers may forward to the worker owning a game's room
+FORWARDED_COMMANDS: Set[str] = set()
+# Set while running a forwarded command, so it is never forwarded again
+_serving_forwarded_command: ContextVar[bool] = ContextVar("serving_forwarded_command", default=False)
+
+
+def forwarded_to_room_owner(model: Optional[Type[BaseModel]] = None):
+    """
+    Run a GameService method on the worker that owns the game's room when that
+    is another worker (the game's state lives only there). The game ID is the
+    method's first argument; model rebuilds results returned as a model or a
+    list of models.
+    """
+    def decorate(method):
+        signature = inspect.signature(method)
+        FORWARDED_COMMANDS.add(method.__name__)
+
+        @wraps(method)
+        async def wrapper(self: "GameService", *args, **kwargs):
+            params = signature.bind(self, *args, **kwargs).arguments
+            params.pop("self")
+            owner = await self._remote_room_owner(ensure_uuid(next(iter(params.values()))))
+            if owner is None:
+                return await method(self, *args, **kwargs)
+            result = await self.connection_manager.backplane.call(owner, method.__name__, params)
+            if model is None or result is None:
+                return result
+            return [model.model_validate(item) for item in result] if isinstance(result, list) else model.model_validate(result)
+        return wrapper
+    return decorate
+
+
 class GameService:
     """
     Service for game management operations.
@@ -54,10 +101,20 @@ class GameService:
         user_repository: UserRepository,
         user_question_history_repository: UserQuestionHistoryRepository,
         user_pack_history_repository: UserPackHistoryRepository,
-        connection_manager: ConnectionManager
+        connection_manager: ConnectionManager,
+        game_room_registry: Optional[GameRoomRegistry] = None,
+        question_timers: Optional[TimerWheel] = None,
+        answer_buffer: Optional[AnswerBuffer] = None
     ):
         """
         Initialize the service with required repositories and connection manager.
+
+        When a game_room_registry is given, started games are played from
+        in-memory GameRooms with write-behind persistence; otherwise every
+        action reads and writes the database directly. With question_timers,
+        timed questions in those rooms are closed and advanced by the server
+        when their time limit runs out. With answer_buffer, answers accepted
+        by a room are written in batches instead of one write per answer.
         """
         self.game_session_repo = game_session_repository
         self.game_participant_repo = game_participant_repository
@@ -68,6 +125,9 @@ class GameService:
         self.user_question_history_repo = user_question_history_repository
         self.user_pack_history_repo = user_pack_history_repository
         self.connection_manager = connection_manager
+        self.game_rooms = game_room_registry
+        self.question_timers = question_timers
+        self.answer_buffer = answer_buffer
 
     async def create_game_session(
         self,
@@ -195,6 +255,21 @@ class GameService:
         if str(game_session.host_user_id) != str(host_user_id): raise ValueError("Only the host can start the game") # Compare as strings
         if game_session.status != GameStatus.PENDING: raise ValueError(f"Game cannot be started (current status: {game_session.status})")
 
+        if self.game_rooms is None:
+            return await self._start_game(game_session, host_user_id)
+        # This worker will hold the game's room; other workers forward its commands here
+        backplane = self.connection_manager.backplane
+        if not await backplane.claim_room(game_session_id): raise ValueError("Game is already being started")
+        try:
+            return await self._start_game(game_session, host_user_id)
+        except BaseException:
+            backplane.release_room(game_session_id)
+            raise
+
+    async def _start_game(self, game_session: GameSession, host_user_id: str) -> GameSession:
+        """Prepare and start a validated pending game (steps 2-7 of start_game)."""
+        game_session_id = ensure_uuid(game_session.id)
+
         # --- REMOVE OR COMMENT OUT THIS BLOCK ---
         # # --- WebSocket Connection Check for Host ---
         # if not self.connection_manager.is_user_connected(game_id=game_session_id, user_id=host_user_id):
@@ -227,17 +302,19 @@ class GameService:
             if not updated_session: raise ValueError(f"Failed to update question count for game {game_session_id}")
             game_session = updated_session
 
-        # 4. Populate `game_questions` Table Concurrently
+        # 4. Fix each question's option order and populate `game_questions` Table Concurrently
+        incorrect_options_by_question = await self._fetch_incorrect_options(selected_questions_for_game)
         game_question_creation_tasks = [
             asyncio.create_task(self.game_question_repo.create(obj_in=GameQuestionCreate(
-                game_session_id=game_session_id, question_id=q.id, question_index=idx
+                game_session_id=game_session_id, question_id=q.id, question_index=idx,
+                correct_option_index=arrange_options(game_session_id, q.id, q.answer, incorrect_options_by_question[q.id])[1]
             ))) for idx, q in enumerate(selected_questions_for_game)
         ]
         game_question_results = await asyncio.gather(*game_question_creation_tasks, return_exceptions=True)
         failed_creations = [i for i, res in enumerate(game_question_results) if isinstance(res, Exception)]
         if failed_creations:
             logger.error(f"Failed to create {len(failed_creations)} game_question records for game {game_session_id}. Errors: {game_question_results}")
-            raise ValueError("Failed to prepare all game questions.")
+            raise ValueError(f"Failed to prepare all game questions: {game_question_results[failed_creations[0]]}")
         logger.info(f"Created {actual_question_count} game question records for game {game_session_id}")
 
         # 5. Update `user_pack_history` Concurrently
@@ -259,11 +336,18 @@ class GameService:
 
         # --- 7. Broadcast Game Started Event ---
         # Fetch the formatted first question for the broadcast
-        play_questions = await self.get_questions_for_play(updated_game.id) # Use updated game ID
-        first_question_payload_obj = play_questions[0] if play_questions else None
+        first_question_dict = None
+        if self.game_rooms is not None:
+            # Play continues from memory; questions are prepared and serialized once here
+            room = self._create_game_room(updated_game, participants, selected_questions_for_game, game_question_results, incorrect_options_by_question)
+            first_entry = room.snapshot.get(0)
+            first_question_dict = first_entry.payload if first_entry else None
+            first_question_payload_obj = None
+        else:
+            play_questions = await self.get_questions_for_play(updated_game.id) # Use updated game ID
+            first_question_payload_obj = play_questions[0] if play_questions else None
 
         # Convert the Pydantic model to a dictionary before including it
-        first_question_dict = None
         if first_question_payload_obj:
             try:
                 # Use model_dump(mode='json') for proper serialization including enums/datetimes if any
@@ -292,6 +376,92 @@ class GameService:
         logger.info(f"Game {game_session_id} started with {actual_question_count} questions by host {host_user_id}")
         return updated_game
 
+    async def _fetch_incorrect_options(self, questions: List[Question]) -> Dict[str, List[str]]:
+        """Incorrect answer texts for each question, keyed by question ID."""
+        incorrect_answer_records = await asyncio.gather(
+            *[self.incorrect_answers_repo.get_by_question_id(q.id) for q in questions],
+            return_exceptions=True
+        )
+        incorrect_options_by_question: Dict[str, List[str]] = {}
+        for question, incorrect_record in zip(questions, incorrect_answer_records):
+            incorrect_options: List[str] = []
+            if isinstance(incorrect_record, Exception): logger.error(f"Failed to fetch incorrect answers for {question.id}: {incorrect_record}")
+            elif incorrect_record: incorrect_options = incorrect_record.incorrect_answers
+            incorrect_options_by_question[question.id] = incorrect_options
+        return incorrect_options_by_question
+
+    def _create_game_room(
+        self,
+        game_session: GameSession,
+        participants: List[GameParticipant],
+        questions: List[Question],
+        game_questions: List[GameQuestion],
+        incorrect_options_by_question: Dict[str, List[str]]
+    ) -> GameRoom:
+        """Build and register the in-memory room for a game that has just started."""
+        play_questions = [
+            self._build_play_question(game_question, question, incorrect_options_by_question[question.id], game_session.time_limit_seconds)
+            for question, game_question in zip(questions, game_questions)
+        ]
+
+        # Option order and payloads are fixed here for the rest of the game
+        snapshot = PlaySnapshot(game_session.id, play_questions)
+        room_questions = [
+            RoomQuestion(
+                game_question_id=game_question.id,
+                question_id=game_question.question_id,
+                index=game_question.question_index,
+                question_text=question.question,
+                correct_answer=question.answer,
+                correct_option_index=parse_answer_index(play_question.correct_answer_id, play_question.question_id),
+                play=snapshot.get(game_question.question_index),
+                pack_ordinal=question.pack_ordinal
+            )
+            for question, game_question, play_question in zip(questions, game_questions, play_questions)
+        ]
+
+        room = GameRoom(session=game_session, participants=participants, questions=room_questions, snapshot=snapshot)
+        first_question = room.current_question
+        if first_question:
+            first_question.start_time = datetime.now(timezone.utc)
+            room.persist(f"start of question {first_question.index}", partial(self.game_question_repo.start_question, first_question.game_question_id))
+        self.game_rooms.add(room)
+        if first_question:
+            self._schedule_question_deadline(room, first_question)
+        logger.info(f"Created in-memory room for game {room.game_id} with {room.total_questions} questions and {len(room.participants)} participants")
+        return room
+
+    def _get_room(self, game_session_id: str) -> Optional[GameRoom]:
+        """The in-memory room for a started game, if this process holds one."""
+        if self.game_rooms is None:
+            return None
+        return self.game_rooms.get(game_session_id)
+
+    async def _remote_room_owner(self, game_session_id: str) -> Optional[str]:
+        """The other worker holding a game's room, when commands for the game must run there."""
+        if self.game_rooms is None or not self.connection_manager.backplane.distributed:
+            return None
+        if _serving_forwarded_command.get() or self.game_rooms.get(game_session_id) is not None:
+            return None
+        return await self.connection_manager.backplane.room_owner(game_session_id)
+
+    async def run_forwarded_command(self, method: str, params: Dict[str, Any]) -> Any:
+        """
+        Backplane command handler: run a game command forwarded by another
+        worker against this worker's rooms. Returns a JSON-serializable result.
+        """
+        if method not in FORWARDED_COMMANDS: raise ValueError(f"Unknown game command: {method}")
+        token = _serving_forwarded_command.set(True)
+        try:
+            result = await getattr(self, method)(**params)
+        finally:
+            _serving_forwarded_command.reset(token)
+        if isinstance(result, BaseModel):
+            return result.model_dump(mode='json')
+        if isinstance(result, list):
+            return [item.model_dump(mode='json') if isinstance(item, BaseModel) else item for item in result]
+        return result
+
     async def _select_questions_for_game(
         self,
         pack_id: str,
@@ -299,29 +469,93 @@ class GameService:
         participant_user_ids: List[str]
     ) -> List[Question]:
         pack_id_str = ensure_uuid(pack_id)
-        all_pack_questions = await self.question_repo.get_by_pack_id(pack_id_str)
+        all_pack_questions = [q async for q in self.question_repo.iter_by_pack_id(pack_id_str)]
         if not all_pack_questions: return []
         effective_count = min(target_count, len(all_pack_questions))
-        pack_question_ids = [str(q.id) for q in all_pack_questions] # Ensure string IDs
-        seen_question_ids = await self.user_question_history_repo.get_seen_question_ids_for_users(
-            user_ids=participant_user_ids, question_ids=pack_question_ids
+        seen_question_ids = await self._get_seen_question_ids(pack_id_str, all_pack_questions, participant_user_ids)
+        # Unseen first, topics balanced, played easy -> hard
+        return select_pack_questions(all_pack_questions, seen_question_ids, effective_count)
+
+    async def _get_seen_question_ids(self, pack_id: str, pack_questions: List[Question], user_ids: List[str]) -> Set[str]:
+        """
+        IDs of the pack questions any of the users has answered before.
+
+        Uses the players' per-pack seen bitmaps (one small read, then an
+        in-memory OR across players and AND NOT against the pack's questions).
+        Questions without an ordinal and players whose bitmap has not been
+        backfilled are looked up in user_question_history instead.
+        """
+        try:
+            bitmaps = await self.user_pack_history_repo.get_seen_bitmaps(user_ids, pack_id)
+        except Exception as e:
+            logger.error(f"Failed to fetch seen-question bitmaps for pack {pack_id}: {e}", exc_info=True)
+            bitmaps = None
+        if bitmaps is None:
+            return await self.user_question_history_repo.get_seen_question_ids_for_users(
+                user_ids=user_ids, question_ids=[str(q.id) for q in pack_questions]
+            )
+
+        seen_bitmap = 0
+        stale_user_ids: List[str] = []
+        for user_id in user_ids:
+            encoded = bitmaps.get(str(user_id), "") # No pack history row: never played the pack
+            try:
+                if encoded is None: raise ValueError("Seen-question bitmap not backfilled")
+                seen_bitmap |= decode_bitmap(encoded)
+            except ValueError:
+                stale_user_ids.append(user_id)
+        with_ordinal = [q for q in pack_questions if q.pack_ordinal is not None]
+        unseen_bitmap = bitmap_from_ordinals(q.pack_ordinal for q in with_ordinal) & ~seen_bitmap
+        seen_question_ids = {str(q.id) for q in with_ordinal if not is_set(unseen_bitmap, q.pack_ordinal)}
+
+        # Players without a usable bitmap, and questions added before ordinals existed, fall back to history
+        lookups = []
+        if stale_user_ids:
+            lookups.append((stale_user_ids, [str(q.id) for q in with_ordinal if str(q.id) not in seen_question_ids]))
+        without_ordinal = [str(q.id) for q in pack_questions if q.pack_ordinal is None]
+        if without_ordinal:
+            lookups.append((list(user_ids), without_ordinal))
+        for lookup_user_ids, question_ids in lookups:
+            seen_question_ids |= await self.user_question_history_repo.get_seen_question_ids_for_users(
+                user_ids=lookup_user_ids, question_ids=question_ids
+            )
+        return seen_question_ids
+
+    def get_play_snapshot(self, game_session_id: str) -> Optional[PlaySnapshot]:
+        """The pre-serialized play questions of a game held in memory, if any."""
+        room = self._get_room(ensure_uuid(game_session_id))
+        return room.snapshot if room is not None else None
+
+    @forwarded_to_room_owner(GamePlayQuestionResponse)
+    async def get_play_question(self, game_session_id: str, index: int) -> Optional[GamePlayQuestionResponse]:
+        """
+        One gameplay question by index: a snapshot lookup for games held in memory,
+        otherwise built from that question's records only.
+        """
+        game_session_id = ensure_uuid(game_session_id)
+        snapshot = self.get_play_snapshot(game_session_id)
+        if snapshot is not None:
+            entry = snapshot.get(index)
+            return entry.question if entry else None
+
+        game_session = await self.game_session_repo.get_by_id(game_session_id)
+        if not game_session: raise ValueError(f"Game session {game_session_id} not found.")
+        game_question = await self.game_question_repo.get_by_game_session_and_index(game_session_id, index)
+        if not game_question: return None
+        original_question, incorrect_answers_record = await asyncio.gather(
+            self.question_repo.get_by_id(game_question.question_id),
+            self.incorrect_answers_repo.get_by_question_id(game_question.question_id)
         )
-        unseen_questions: List[Question] = []
-        seen_questions: List[Question] = []
-        for q in all_pack_questions: (seen_questions if str(q.id) in seen_question_ids else unseen_questions).append(q) # Compare as strings
-        selected_questions_for_game: List[Question] = []
-        random.shuffle(unseen_questions); random.shuffle(seen_questions)
-        take_from_unseen = min(effective_count, len(unseen_questions))
-        selected_questions_for_game.extend(unseen_questions[:take_from_unseen])
-        num_needed = effective_count - take_from_unseen
-        if num_needed > 0:
-            take_from_seen = min(num_needed, len(seen_questions))
-            selected_questions_for_game.extend(seen_questions[:take_from_seen])
-        random.shuffle(selected_questions_for_game)
-        return selected_questions_for_game
+        if not original_question: logger.error(f"Failed to fetch original question {game_question.question_id}"); return None
+        incorrect_options = incorrect_answers_record.incorrect_answers if incorrect_answers_record else []
+        return self._build_play_question(game_question, original_question, incorrect_options, game_session.time_limit_seconds)
 
+    @forwarded_to_room_owner(GamePlayQuestionResponse)
     async def get_questions_for_play(self, game_session_id: str) -> List[GamePlayQuestionResponse]:
         game_session_id = ensure_uuid(game_session_id)
+        room = self._get_room(game_session_id)
+        if room is not None:
+            return room.play_questions()
         game_session = await self.game_session_repo.get_by_id(game_session_id)
         if not game_session: raise ValueError(f"Game session {game_session_id} not found.")
         game_questions = await self.game_question_repo.get_by_game_session_id(game_session_id)
@@ -339,41 +573,34 @@ class GameService:
             if isinstance(incorrect_answers_record, Exception): logger.error(f"Failed to fetch incorrect answers for {gq.question_id}: {incorrect_answers_record}")
             elif incorrect_answers_record: incorrect_options = incorrect_answers_record.incorrect_answers
 
-            # Use correctAnswer field from Question model
-            correct_answer_text = original_question.answer
-            all_options_texts = [correct_answer_text] + incorrect_options
-            random.shuffle(all_options_texts)
-
-            # Create answer IDs like "qID-optionIndex"
-            answer_options_with_ids = [
-                {"id": f"{gq.question_id}-{idx}", "text": text}
-                for idx, text in enumerate(all_options_texts)
-            ]
-
-            # Find the ID of the correct option after shuffling
-            correct_answer_id = None
-            for option in answer_options_with_ids:
-                if option["text"] == correct_answer_text:
-                    correct_answer_id = option["id"]
-                    break
-
-            if correct_answer_id is None:
-                logger.error(f"Could not determine correct_answer_id for question {gq.question_id}. Correct text: '{correct_answer_text}'. Options: {answer_options_with_ids}")
-                continue
-
-            play_question = GamePlayQuestionResponse(
-                index=gq.question_index,
-                question_id=gq.question_id,
-                question_text=original_question.question,
-                options=[opt["text"] for opt in answer_options_with_ids], # Pass only texts
-                correct_answer_id=correct_answer_id, # Pass the generated correct ID
-                time_limit=game_session.time_limit_seconds
-            )
-            play_questions.append(play_question)
+            play_questions.append(self._build_play_question(gq, original_question, incorrect_options, game_session.time_limit_seconds))
 
         play_questions.sort(key=lambda q: q.index)
         return play_questions
 
+    def _build_play_question(
+        self,
+        game_question: GameQuestion,
+        original_question: Question,
+        incorrect_options: List[str],
+        time_limit: int
+    ) -> GamePlayQuestionResponse:
+        """Build a question's gameplay payload with its options in this game's fixed order."""
+        options, correct_index = arrange_options(
+            game_question.game_session_id, game_question.question_id, original_question.answer, incorrect_options
+        )
+        if game_question.correct_option_index is not None and game_question.correct_option_index != correct_index:
+            # Incorrect answers changed after the game started; the stored index is what answers are checked against
+            logger.warning(f"Option order for question {game_question.question_id} in game {game_question.game_session_id} no longer matches the stored correct option")
+        return GamePlayQuestionResponse(
+            index=game_question.question_index,
+            question_id=game_question.question_id,
+            question_text=original_question.question,
+            options=options,
+            correct_answer_id=answer_id(game_question.question_id, correct_index), # Answer IDs are "qID-optionIndex"
+            time_limit=time_limit
+        )
+
     async def _advance_to_next_question(
         self,
         game_session_id: str,
@@ -403,6 +630,7 @@ class GameService:
             else: logger.error(f"Failed to mark game question {next_game_question.id} as started for game {game_session_id}"); return None
         else: logger.error(f"Game {game_session_id}: Failed to find game question at index {next_index}"); return None
 
+    @forwarded_to_room_owner()
     async def submit_answer(
         self,
         game_session_id: str,
@@ -414,6 +642,10 @@ class GameService:
         game_session_id = ensure_uuid(game_session_id)
         participant_id = ensure_uuid(participant_id)
 
+        room = self._get_room(game_session_id)
+        if room is not None:
+            return await self._submit_answer_in_room(room, participant_id, question_index, answer)
+
         # 1. Fetch game session and participant
         game_session = await self.game_session_repo.get_by_id(game_session_id)
         if not game_session: raise ValueError(f"Game {game_session_id} not found")
@@ -437,88 +669,320 @@ class GameService:
         if participant_id in game_question.participant_answers:
             raise ValueError("Answer already submitted for this question")
 
-        # 5. Record answer
-        await self.game_question_repo.record_participant_answer(game_question.id, participant_id, str(answer))
-
-        # 6. Check correctness and calculate score
-        original_question = await self.question_repo.get_by_id(game_question.question_id)
-        if not original_question:
-            logger.error(f"Original question {game_question.question_id} not found for game question {game_question.id}")
-            return {"success": False, "error": "Original question data missing"}
-
-        # --- Correctness check (requires reconstructing options/IDs) ---
-        incorrect_answers_record = await self.incorrect_answers_repo.get_by_question_id(original_question.id)
-        incorrect_options = incorrect_answers_record.incorrect_answers if incorrect_answers_record else []
-        all_options_texts = [original_question.answer] + incorrect_options
-        # We need a deterministic way to map submitted ID back to text or compare IDs.
-        # Let's reconstruct the potential IDs based on the order the backend knows.
-        answer_options_with_ids = [
-             {"id": f"{original_question.id}-{idx}", "text": text}
-             for idx, text in enumerate(all_options_texts)
-        ]
-        correct_answer_option = next((opt for opt in answer_options_with_ids if opt["text"] == original_question.answer), None)
-        correct_answer_id_generated = correct_answer_option["id"] if correct_answer_option else None
-
-        if not correct_answer_id_generated:
-             logger.error(f"Could not reconstruct correct answer ID for question {original_question.id}")
-             return {"success": False, "error": "Internal error checking answer"}
+        # 5. Check correctness: the submitted option index against the one stored at game start
+        correct_option_index = game_question.correct_option_index
+        original_question: Optional[Question] = None
+        if correct_option_index is None:
+            # Games started before correct_option_index was stored: derive it from the fixed option order
+            original_question, incorrect_answers_record = await asyncio.gather(
+                self.question_repo.get_by_id(game_question.question_id),
+                self.incorrect_answers_repo.get_by_question_id(game_question.question_id)
+            )
+            if not original_question:
+                logger.error(f"Original question {game_question.question_id} not found for game question {game_question.id}")
+                return {"success": False, "error": "Original question data missing"}
+            incorrect_options = incorrect_answers_record.incorrect_answers if incorrect_answers_record else []
+            correct_option_index = arrange_options(game_session_id, original_question.id, original_question.answer, incorrect_options)[1]
 
-        is_correct = str(answer) == str(correct_answer_id_generated)
-        logger.info(f"Correctness check for Q{question_index}: Submitted='{answer}', Correct ID='{correct_answer_id_generated}', Result={is_correct}")
-        # --- End Correctness Check ---
+        is_correct = parse_answer_index(str(answer), game_question.question_id) == correct_option_index
+        logger.info(f"Correctness check for Q{question_index}: Submitted='{answer}', Correct option={correct_option_index}, Result={is_correct}")
 
         # --- Simplified Score Calculation ---
         score = 1 if is_correct else 0
         # --- End Simplified Score Calculation ---
 
-        # 7. Record score for this question
-        await self.game_question_repo.record_participant_score(game_question.id, participant_id, score)
+        # 6. Record answer, question score and participant total in one atomic call
+        record_task = self.game_question_repo.record_answer(game_question.id, participant_id, str(answer), score)
+        if original_question is None:
+            # The correct answer text is only needed for the response; read it alongside the write
+            record_result, original_question = await asyncio.gather(record_task, self.question_repo.get_by_id(game_question.question_id))
+        else:
+            record_result = await record_task
+        if not record_result["recorded"]:
+            raise ValueError(f"Answer already submitted or question {question_index} has already ended")
 
-        # 8. Update participant's total score
-        current_total_score = participant.score if participant.score is not None else 0
-        new_total_score = current_total_score + score
-        updated_participant = await self.game_participant_repo.update_score(participant_id, new_total_score)
-        final_total_score = updated_participant.score if updated_participant else new_total_score
+        # 7. User history is written for the whole question when it ends (_record_question_history)
 
-        # 9. Record in user history
-        try:
-            history_data = UserQuestionHistoryCreate(
-                user_id=participant.user_id,
-                question_id=game_question.question_id,
-                correct=is_correct,
-            )
-            await self.user_question_history_repo.create(obj_in=history_data)
-        except Exception as hist_error:
-            logger.error(f"Failed to record question history for user {participant.user_id}, question {game_question.question_id}: {hist_error}", exc_info=True)
-
-        # 10. Return result
+        # 8. Return result
         return {
             "success": True,
             "is_correct": is_correct,
-            "correct_answer": original_question.answer, # Return correct text
+            "correct_answer": original_question.answer if original_question else "", # Return correct text
             "score": score, # Score for this question (now 1 or 0)
-            "total_score": final_total_score # Participant's new total score
+            "total_score": record_result["total_score"] # Participant's new total score
+        }
+
+    async def _submit_answer_in_room(
+        self,
+        room: GameRoom,
+        participant_id: str,
+        question_index: int,
+        answer: str
+    ) -> Dict[str, Any]:
+        """Score an answer against the room's in-memory state and queue its persistence."""
+        question, is_correct, score, total_score = room.record_answer(participant_id, question_index, str(answer))
+        participant = room.get_participant(participant_id)
+        logger.info(f"Correctness check for Q{question_index}: Submitted='{answer}', Correct ID='{question.correct_answer_id}', Result={is_correct}")
+        if self.answer_buffer is not None:
+            self.answer_buffer.add(BufferedAnswer(
+                room.game_id, question.game_question_id, question.question_id,
+                participant.id, participant.user_id, str(answer), score, is_correct
+            ))
+        else:
+            room.persist(
+                f"answer of participant {participant_id} to question {question_index}",
+                partial(
+                    self._persist_answer, question.game_question_id,
+                    participant.id, str(answer), score
+                )
+            )
+        await self._close_early_if_all_answered(room, question)
+        return {
+            "success": True,
+            "is_correct": is_correct,
+            "correct_answer": question.correct_answer,
+            "score": score,
+            "total_score": total_score
         }
 
+    async def _persist_answer(
+        self,
+        game_question_id: str,
+        participant_id: str,
+        answer: str,
+        score: int
+    ) -> None:
+        """Write-behind for an answer accepted by a GameRoom (history is written when the question ends)."""
+        await self.game_question_repo.record_answer(game_question_id, participant_id, answer, score)
+
+    async def persist_answer_batch(self, batch: List[BufferedAnswer]) -> None:
+        """
+        AnswerBuffer handler: write a batch of answers accepted by GameRooms.
+
+        All answers, scores and participant totals go in one call, then all
+        history rows in one multi-row insert. Raises if the answers could not be
+        recorded, so the buffer retries the batch; re-recording an answer is a no-op.
+        """
+        await self.game_question_repo.record_answers([
+            {"game_question_id": a.game_question_id, "participant_id": a.participant_id, "answer": a.answer, "score": a.score}
+            for a in batch
+        ])
+        history_rows = [UserQuestionHistoryCreate(user_id=a.user_id, question_id=a.question_id, correct=a.is_correct) for a in batch]
+        inserted = await self.user_question_history_repo.insert_many(history_rows)
+        if inserted < len(history_rows):
+            logger.error(f"Failed to record question history for {len(history_rows) - inserted} of {len(batch)} buffered answers")
+
+    async def _persist_question_end(self, game_session_id: str, game_question_id: str, history_rows: List[UserQuestionHistoryCreate]) -> None:
+        """
+        Write-behind for a closed question: its buffered answers land before its
+        end_time, then (without the answer buffer) its history rows in one insert.
+        """
+        if self.answer_buffer is not None:
+            await self.answer_buffer.flush(game_session_id)
+        await self.game_question_repo.end_question(game_question_id)
+        if history_rows:
+            await self._insert_question_history(game_question_id, history_rows)
+
+    @staticmethod
+    def _question_history_rows(
+        question_id: str,
+        scores: Dict[str, int],
+        user_ids_by_participant: Dict[str, str]
+    ) -> List[UserQuestionHistoryCreate]:
+        """History rows for everyone who answered a question, from its participant -> score map."""
+        return [
+            UserQuestionHistoryCreate(user_id=user_ids_by_participant[participant_id], question_id=question_id, correct=score > 0)
+            for participant_id, score in scores.items()
+            if participant_id in user_ids_by_participant
+        ]
+
+    async def _insert_question_history(self, game_question_id: str, history_rows: List[UserQuestionHistoryCreate]) -> None:
+        try:
+            inserted = await self.user_question_history_repo.insert_many(history_rows)
+            if inserted < len(history_rows):
+                logger.error(f"Recorded question history for {inserted} of {len(history_rows)} participants of game question {game_question_id}")
+        except Exception as hist_error:
+            logger.error(f"Failed to record question history for game question {game_question_id}: {hist_error}", exc_info=True)
+
+    async def _record_question_history(self, game_session_id: str, game_question: GameQuestion) -> None:
+        """
+        Aggregate a question that has just ended (database path) into one history
+        insert, and set its bit in the answering players' seen bitmaps.
+        """
+        if not game_question.participant_scores:
+            return
+        participants = await self.game_participant_repo.get_by_game_session_id(game_session_id)
+        user_ids_by_participant = {str(p.id): str(p.user_id) for p in participants}
+        history_rows = self._question_history_rows(game_question.question_id, game_question.participant_scores, user_ids_by_participant)
+        await self._insert_question_history(game_question.id, history_rows)
+        try:
+            question = await self.question_repo.get_by_id(game_question.question_id)
+            if question and question.pack_ordinal is not None:
+                await self.user_pack_history_repo.mark_questions_seen(question.pack_id, [row.user_id for row in history_rows], [question.pack_ordinal])
+        except Exception as e:
+            logger.error(f"Failed to update seen-question bitmaps for game question {game_question.id}: {e}", exc_info=True)
+
+    async def _end_current_question_in_room(self, room: GameRoom, host_user_id: str, expected_index: Optional[int] = None) -> Dict[str, Any]:
+        """End the current question and advance, entirely from in-memory state."""
+        if room.host_user_id != str(host_user_id): raise ValueError("Only host can end question/advance game")
+        return await self._close_and_advance(room, expected_index=expected_index)
+
+    async def handle_question_deadline(self, game_session_id: str, question_index: int, reason: str = "timeout") -> None:
+        """Question timer callback: close question_index if it is still open, then advance."""
+        room = self._get_room(game_session_id)
+        if room is None:
+            logger.debug(f"Deadline for question {question_index} of game {game_session_id} fired with no room; ignoring")
+            return
+        await self._close_and_advance(room, expected_index=question_index, reason=reason)
+
+    async def _close_early_if_all_answered(self, room: GameRoom, question: RoomQuestion) -> None:
+        """
+        Close question right away once every connected participant has answered it.
+
+        Connected means connected to any worker (the room's presence set), not
+        just to this one. The close runs from the question timer on its next
+        tick, off the caller's request path, and replaces the question's pending deadline.
+        """
+        if self.question_timers is None or question.end_time is not None or question.index != room.current_index:
+            return
+        try:
+            connected_user_ids = await self.connection_manager.connected_user_ids(room.game_id)
+        except Exception as e:
+            # The answer is already accepted; the question's deadline closes it instead
+            logger.warning(f"Game {room.game_id}: could not look up connected participants for an early close: {e}")
+            return
+        if question.end_time is not None or question.index != room.current_index:
+            return # Closed while presence was looked up
+        if not room.all_connected_answered(question, connected_user_ids):
+            return
+        logger.info(f"Game {room.game_id}: all connected participants answered question {question.index}; closing early")
+        self.question_timers.schedule(room.game_id, 0, room.game_id, question.index, "all_answered")
+
+    async def _close_and_advance(self, room: GameRoom, expected_index: Optional[int] = None, reason: str = "host") -> Dict[str, Any]:
+        """
+        Close the current question, broadcast its results and advance the room
+        to the next question (or complete the game).
+
+        Shared by the host's end-question action, the question deadline timer and
+        the all-answered early close.
+
+        Args:
+            room: Active game room.
+            expected_index: Question the caller means to close. If the room has already
+                            moved past it (the host and the timer raced), nothing changes.
+                            None closes whatever question is current.
+            reason: What closed the question ("host", "timeout" or "all_answered"), sent with the results.
+
+        Raises:
+            ValueError: If the game is not active and no expected_index was given.
+        """
+        async with room.transition_lock:
+            if expected_index is not None and (not room.is_active or room.current_index != expected_index):
+                logger.debug(f"Game {room.game_id}: question {expected_index} already closed (now at {room.current_index}, {room.status.value})")
+                current = room.current_question
+                if not room.is_active or current is None:
+                    return {"game_complete": room.status == GameStatus.COMPLETED}
+                return {"game_complete": False, "next_question": current.play.payload}
+            if not room.is_active: raise ValueError(f"Game not active")
+
+            ended_question = room.end_current_question()
+            if ended_question:
+                # Buffered answers carry their own history rows; otherwise the question's are written as one batch
+                history_rows = [] if self.answer_buffer is not None else self._question_history_rows(
+                    ended_question.question_id, ended_question.scores, {p.id: p.user_id for p in room.participants.values()}
+                )
+                room.persist(f"end of question {ended_question.index}", partial(self._persist_question_end, room.game_id, ended_question.game_question_id, history_rows))
+                if ended_question.pack_ordinal is not None and ended_question.answers:
+                    answered_user_ids = [room.participants[pid].user_id for pid in ended_question.answers if pid in room.participants]
+                    room.persist(
+                        f"seen bitmaps for question {ended_question.index}",
+                        partial(self.user_pack_history_repo.mark_questions_seen, room.session.pack_id, answered_user_ids, [ended_question.pack_ordinal])
+                    )
+                results_message = {
+                    "type": "question_results",
+                    "payload": {
+                        **ended_question.result(),
+                        "correct_answer_id": ended_question.correct_answer_id,
+                        "scores": dict(ended_question.scores),
+                        "reason": reason
+                    }
+                }
+                await self.connection_manager.broadcast(results_message, room.game_id)
+                logger.info(f"Game {room.game_id}: question {ended_question.index} closed ({reason})")
+
+            next_question = room.advance()
+            if next_question:
+                room.persist(f"advance to question {next_question.index}", partial(self._persist_advance, room.game_id, next_question.index, next_question.game_question_id))
+                self._schedule_question_deadline(room, next_question)
+                next_question_payload_dict = next_question.play.payload
+                next_q_message = {"type": "next_question", "payload": next_question_payload_dict}
+                await self.connection_manager.broadcast(next_q_message, room.game_id)
+                logger.info(f"Broadcasted next_question event (index {next_question.index}) for game {room.game_id}")
+                return {"game_complete": False, "next_question": next_question_payload_dict}
+
+            self._cancel_question_deadline(room.game_id)
+            room.persist("game completion", partial(self.game_session_repo.update_game_status, game_id=room.game_id, status=GameStatus.COMPLETED))
+            end_message = {"type": "game_over", "payload": room.results()}
+            await self.connection_manager.broadcast(end_message, room.game_id)
+            logger.info(f"Broadcasted game_over event for game {room.game_id}")
+        self.game_rooms.retire(room.game_id)
+        return {"game_complete": True}
+
+    def _schedule_question_deadline(self, room: GameRoom, question: RoomQuestion) -> None:
+        """Arm the server-side deadline for a question that has just started. No-op for untimed games."""
+        time_limit = room.session.time_limit_seconds
+        if self.question_timers is None or not time_limit or time_limit <= 0:
+            return
+        # One timer per room; scheduling the next question replaces the previous deadline
+        self.question_timers.schedule(room.game_id, time_limit + QUESTION_DEADLINE_GRACE_SECONDS, room.game_id, question.index)
+
+    def _cancel_question_deadline(self, game_session_id: str) -> None:
+        if self.question_timers is not None:
+            self.question_timers.cancel(str(game_session_id))
+
+    async def _persist_advance(self, game_session_id: str, next_index: int, game_question_id: str) -> None:
+        """Write-behind for a GameRoom moving to its next question."""
+        await self.game_session_repo.update(id=game_session_id, obj_in=GameSessionUpdate(current_question_index=next_index)) # type: ignore[call-arg]
+        await self.game_question_repo.start_question(game_question_id)
+
+    @forwarded_to_room_owner()
     async def end_current_question(
         self,
         game_session_id: str,
-        host_user_id: str
+        host_user_id: str,
+        expected_index: Optional[int] = None
     ) -> Dict[str, Any]:
-        """Ends the current question, calculates results/scores for it, advances the game, and broadcasts the next step."""
+        """
+        Ends the current question, calculates results/scores for it, advances the game, and broadcasts the next step.
+
+        expected_index is the question the host is closing. If the game has already
+        moved past it (the question timer or the all-answered close won the race),
+        nothing changes and the current question is returned. None closes whatever question is current.
+        """
         game_session_id = ensure_uuid(game_session_id); host_user_id = ensure_uuid(host_user_id)
+        room = self._get_room(game_session_id)
+        if room is not None:
+            return await self._end_current_question_in_room(room, host_user_id, expected_index)
         game_session = await self.game_session_repo.get_by_id(game_session_id)
         if not game_session: raise ValueError(f"Game {game_session_id} not found")
         if str(game_session.host_user_id) != str(host_user_id): raise ValueError("Only host can end question/advance game") # Compare as strings
+        current_index = game_session.current_question_index
+        if expected_index is not None and (game_session.status != GameStatus.ACTIVE or current_index != expected_index):
+            logger.debug(f"Game {game_session_id}: question {expected_index} already closed (now at {current_index}, {game_session.status.value})")
+            if game_session.status != GameStatus.ACTIVE:
+                return {"game_complete": game_session.status == GameStatus.COMPLETED}
+            current_play = await self.get_play_question(game_session_id, current_index)
+            return {"game_complete": False, "next_question": current_play.model_dump(mode='json') if current_play else None}
         if game_session.status != GameStatus.ACTIVE: raise ValueError(f"Game not active")
 
-        current_index = game_session.current_question_index
         current_game_question = await self.game_question_repo.get_by_game_session_and_index(game_session_id, current_index)
 
         # End the current question in DB if not already ended
         if current_game_question and current_game_question.start_time and not current_game_question.end_time:
              ended_question = await self.game_question_repo.end_question(current_game_question.id)
-             if ended_question: current_game_question = ended_question # Use updated record
+             if ended_question:
+                 current_game_question = ended_question # Use updated record
+                 await self._record_question_history(game_session_id, ended_question)
              else: logger.warning(f"Failed to mark question {current_index} as ended.")
         elif not current_game_question: logger.warning(f"Current game question (index {current_index}) not found when trying to end it.")
 
@@ -527,8 +991,7 @@ class GameService:
 
         if next_game_question:
             # Fetch formatted next question details
-            play_questions = await self.get_questions_for_play(game_session_id)
-            next_question_payload_obj = next((q for q in play_questions if q.index == next_game_question.question_index), None)
+            next_question_payload_obj = await self.get_play_question(game_session_id, next_game_question.question_index)
 
             # Convert the Pydantic model to a dictionary before including it
             next_question_payload_dict = None
@@ -574,14 +1037,67 @@ class GameService:
                  await self.connection_manager.broadcast(end_message, game_session_id)
                  return {"game_complete": True}
 
+    @forwarded_to_room_owner()
     async def get_game_participants(self, game_session_id: str) -> List[Dict[str, Any]]:
         game_session_id_str = ensure_uuid(game_session_id)
+        room = self._get_room(game_session_id_str)
+        if room is not None:
+            return room.participant_payloads()
         participants: List[GameParticipant] = await self.game_participant_repo.get_by_game_session_id(game_session_id_str)
         # Use model_dump for Pydantic V2 serialization if needed, or manual dict creation
         return [{"id": p.id, "user_id": p.user_id, "display_name": p.display_name, "score": p.score, "is_host": p.is_host} for p in participants]
 
+    @forwarded_to_room_owner()
+    async def get_participant_id_for_user(self, game_session_id: str, user_id: str) -> Optional[str]:
+        """The participant ID of a user in a game, or None if they have not joined it."""
+        game_session_id = ensure_uuid(game_session_id); user_id = ensure_uuid(user_id)
+        room = self._get_room(game_session_id)
+        participant = room.get_participant_by_user(user_id) if room is not None else None
+        if participant is None:
+            participant = await self.game_participant_repo.get_by_user_and_game(user_id, game_session_id)
+        return str(participant.id) if participant else None
+
+    @forwarded_to_room_owner()
+    async def get_game_state(self, game_session_id: str) -> Dict[str, Any]:
+        """
+        Current state of a game for a client catching up: status, current
+        question (as served to players) and participants with scores.
+        """
+        game_session_id = ensure_uuid(game_session_id)
+        room = self._get_room(game_session_id)
+        if room is not None:
+            current = room.current_question if room.is_active else None
+            return {
+                "game_id": room.game_id,
+                "status": room.status.value,
+                "current_question_index": room.current_index,
+                "total_questions": room.total_questions,
+                "time_limit": room.session.time_limit_seconds,
+                "current_question": current.play.payload if current else None,
+                "participants": room.participant_payloads()
+            }
+        game_session = await self.game_session_repo.get_by_id(game_session_id)
+        if not game_session: raise ValueError(f"Game {game_session_id} not found")
+        current_question, participants = await asyncio.gather(
+            self.get_play_question(game_session_id, game_session.current_question_index) if game_session.status == GameStatus.ACTIVE else asyncio.sleep(0, result=None),
+            self.get_game_participants(game_session_id)
+        )
+        return {
+            "game_id": game_session.id,
+            "status": game_session.status.value,
+            "current_question_index": game_session.current_question_index,
+            "total_questions": game_session.question_count,
+            "time_limit": game_session.time_limit_seconds,
+            "current_question": current_question.model_dump(mode='json') if current_question else None,
+            "participants": participants
+        }
+
+    @forwarded_to_room_owner()
     async def get_game_results(self, game_session_id: str) -> Dict[str, Any]:
         game_session_id = ensure_uuid(game_session_id)
+        room = self._get_room(game_session_id)
+        if room is not None:
+            return room.results()
         game_session = await self.game_session_repo.get_by_id(game_session_id)
         if not game_session: raise ValueError(f"Game {game_session_id} not found")
 
@@ -618,15 +1134,27 @@ class GameService:
             "completed_at": completion_time.isoformat() # Use ISO format
         }
 
+    @forwarded_to_room_owner(GameSession)
     async def cancel_game(self, game_session_id: str, host_user_id: str) -> GameSession:
         game_session_id = ensure_uuid(game_session_id); host_user_id = ensure_uuid(host_user_id)
         game_session = await self.game_session_repo.get_by_id(game_session_id)
         if not game_session: raise ValueError(f"Game {game_session_id} not found")
         if str(game_session.host_user_id) != str(host_user_id): raise ValueError("Only host can cancel") # Compare as strings
-        if game_session.status not in [GameStatus.PENDING, GameStatus.ACTIVE]: raise ValueError(f"Game cannot be cancelled (status: {game_session.status})")
+        room = self._get_room(game_session_id)
+        current_status = room.status if room is not None else game_session.status # The room is ahead of the DB
+        if current_status not in [GameStatus.PENDING, GameStatus.ACTIVE]: raise ValueError(f"Game cannot be cancelled (status: {current_status})")
+        if room is not None:
+            # Stop accepting answers and let queued writes land before the status change
+            room.cancel()
+            self._cancel_question_deadline(game_session_id)
+            await room.flush()
+            if self.answer_buffer is not None:
+                await self.answer_buffer.flush(game_session_id)
 
         updated_game = await self.game_session_repo.update_game_status(game_id=game_session_id, status=GameStatus.CANCELLED)
         if not updated_game: raise ValueError(f"Failed to cancel game {game_session_id}")
+        if room is not None:
+            self.game_rooms.retire(game_session_id)
 
         # --- Broadcast Cancel Event ---
         cancel_message = {"type": "game_cancelled", "payload": {"game_id": game_session_id}}
@@ -637,10 +1165,14 @@ class GameService:
         logger.info(f"Game {game_session_id} cancelled by host {host_user_id}")
         return updated_game
 
+    @forwarded_to_room_owner()
     async def handle_disconnect(self, game_id: str, user_id: str):
         """Handles logic when a user disconnects (called by WS endpoint)."""
         logger.info(f"Handling disconnect for user {user_id} in game {game_id}")
-        participant = await self.game_participant_repo.get_by_user_and_game(user_id, game_id)
+        room = self._get_room(game_id)
+        participant = room.get_participant_by_user(user_id) if room is not None else None
+        if participant is None:
+            participant = await self.game_participant_repo.get_by_user_and_game(user_id, game_id)
         if participant:
             # Fetch latest user info for the broadcast message
             display_name_for_broadcast = participant.display_name # Fallback
@@ -664,6 +1196,9 @@ class GameService:
             }
             await self.connection_manager.broadcast(message, game_id)
             logger.debug(f"Broadcasted participant_left for user {user_id} in game {game_id} with name '{display_name_for_broadcast}'")
+            # The players still connected may all have answered already
+            if room is not None and room.is_active and room.current_question is not None:
+                await self._close_early_if_all_answered(room, room.current_question)
         else:
             logger.warning(f"Participant record not found for disconnected user {user_id} in game {game_id}")
 
@@ -8,6 +8,7 @@ from ..models.incorrect_answers import IncorrectAnswers, IncorrectAnswersCreate,
 from ..repositories.question_repository import QuestionRepository
 from ..repositories.incorrect_answers_repository import IncorrectAnswersRepository
 from ..utils.question_generation.incorrect_answer_generator import IncorrectAnswerGenerator, IncorrectAnswerGenerationError # Import the custom error
+from ..utils.llm.llm_scheduler import LLMPriority
 from ..utils import ensure_uuid
 
 logger = logging.getLogger(__name__)
@@ -32,7 +33,8 @@ class IncorrectAnswerService:
         questions: List[Question], # Accepts List[Question]
         num_incorrect_answers: int = 3,
         batch_size: int = 5,
-        debug_mode: bool = False
+        debug_mode: bool = False,
+        priority: LLMPriority = LLMPriority.BULK
     ) -> Dict[str, List[str]]:
         """
         Generate incorrect answers for a list of questions and store them.
@@ -43,6 +45,7 @@ class IncorrectAnswerService:
             num_incorrect_answers: Number of incorrect answers per question
             batch_size: Size of question batches for processing
             debug_mode: Enable verbose debug logging
+            priority: Scheduler priority of the generation calls (INTERACTIVE when a user is waiting)
 
         Returns:
             Dictionary mapping successfully processed question IDs (as strings)
@@ -67,7 +70,8 @@ class IncorrectAnswerService:
                 num_incorrect_answers=num_incorrect_answers,
                 batch_size=batch_size,
                 max_retries=1, # Allow one retry
-                debug_mode=debug_mode
+                debug_mode=debug_mode,
+                priority=priority
             )
             # If no exception, generation was successful for all questions attempted in the final retry.
 
@@ -123,6 +127,10 @@ class IncorrectAnswerService:
 
         return stored_answers_map # Return map of successfully stored answers
 
+    async def store_incorrect_answer_set(self, question_id: str, incorrect_answers: List[str]) -> bool:
+        """Create or update the stored incorrect answers for one question."""
+        return await self._store_single_incorrect_answer_set(str(question_id), incorrect_answers)
+
     async def _store_single_incorrect_answer_set(self, question_id_str: str, incorrect_answers: List[str]) -> bool:
         """Helper coroutine to store answers for one question."""
         question_id_uuid = ensure_uuid(question_id_str) # Ensure UUID string format
@@ -165,25 +173,40 @@ class IncorrectAnswerService:
     ) -> Dict[str, List[str]]:
         """
         Generate incorrect answers for all questions currently in a pack.
+
+        The pack is streamed page by page, so only one page of questions is
+        held at a time however large the pack is.
         """
         pack_id_uuid = ensure_uuid(pack_id)
-        questions_in_pack = await self.question_repository.get_by_pack_id(pack_id_uuid)
+        result_map: Dict[str, List[str]] = {}
+        failed_ids: List[str] = []
+        question_count = 0
+
+        async for questions_page in self.question_repository.iter_pages_by_pack_id(pack_id_uuid):
+            question_count += len(questions_page)
+            logger.info(f"Generating incorrect answers for {len(questions_page)} questions in pack {pack_id} ({question_count} so far)")
+            # Failures on one page do not stop the rest; they are reported together at the end
+            try:
+                result_map.update(await self.generate_and_store_incorrect_answers(
+                    questions=questions_page,
+                    num_incorrect_answers=num_incorrect_answers,
+                    batch_size=batch_size,
+                    debug_mode=debug_mode,
+                    priority=LLMPriority.BULK
+                ))
+            except IncorrectAnswerGenerationError as e:
+                failed_ids.extend(e.failed_question_ids)
 
-        if not questions_in_pack:
+        if question_count == 0:
             logger.warning(f"No questions found in pack {pack_id} to generate incorrect answers for.")
             return {}
 
-        logger.info(f"Generating incorrect answers for {len(questions_in_pack)} questions in pack {pack_id}")
-
-        # Call the core method that handles generation and storage
-        # This will raise IncorrectAnswerGenerationError if generation fails for some questions
-        # The API layer will catch this and report the failure.
-        result_map = await self.generate_and_store_incorrect_answers(
-            questions=questions_in_pack,
-            num_incorrect_answers=num_incorrect_answers,
-            batch_size=batch_size,
-            debug_mode=debug_mode
-        )
+        # The API layer catches this and reports the failure.
+        if failed_ids:
+            raise IncorrectAnswerGenerationError(
+                f"Failed to generate or store incorrect answers for {len(failed_ids)} questions.",
+                failed_ids
+            )
         return result_map # Returns dict of successes if no exception was raised
 
 
@@ -196,4 +219,90 @@ class IncorrectAnswerService:
         """
         question_id_uuid = ensure_uuid(question_id)
         result = await self.incorrect_answers_repository.get_by_question_id(question_id_uuid)
-        return result.incorrect_answers if result else None
\ No newline at end of file
+        return result.incorrect_answers if result else None
+
+class IncorrectAnswerBatcher:
+    """
+    Collects questions as they are created and starts incorrect-answer
+    generation for each full batch in the background, so distractors for the
+    first questions are produced while later questions are still streaming.
+    """
+
+    def __init__(
+        self,
+        incorrect_answer_service: IncorrectAnswerService,
+        num_incorrect_answers: int = 3,
+        batch_size: int = 5,
+        debug_mode: bool = False
+    ):
+        self.incorrect_answer_service = incorrect_answer_service
+        self.num_incorrect_answers = num_incorrect_answers
+        self.batch_size = max(1, batch_size)
+        self.debug_mode = debug_mode
+        self._pending: List[Question] = []
+        self._tasks: List[asyncio.Task] = []
+
+    async def add(self, question: Question) -> None:
+        """Queue a newly created question; launches a batch once batch_size are waiting."""
+        self._pending.append(question)
+        if len(self._pending) >= self.batch_size:
+            self._launch()
+
+    def _launch(self) -> None:
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        self._tasks.append(asyncio.create_task(
+            self.incorrect_answer_service.generate_and_store_incorrect_answers(
+                questions=batch,
+                num_incorrect_answers=self.num_incorrect_answers,
+                batch_size=self.batch_size,
+                debug_mode=self.debug_mode,
+                priority=LLMPriority.BULK # Background work; the last partial batch is no more urgent than the rest
+            )
+        ))
+
+    async def finish(self) -> Dict[str, List[str]]:
+        """
+        Flush the remaining questions and wait for every batch.
+
+        Returns:
+            Dictionary mapping question IDs to their stored incorrect answers.
+
+        Raises:
+            IncorrectAnswerGenerationError: If any batch failed for some questions
+                                            (lists the failed IDs across all batches).
+        """
+        self._launch()
+        results = await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        stored_answers_map: Dict[str, List[str]] = {}
+        failed_ids: List[str] = []
+        unexpected_error: Optional[BaseException] = None
+        for result in results:
+            if isinstance(result, IncorrectAnswerGenerationError):
+                failed_ids.extend(result.failed_question_ids)
+            elif isinstance(result, BaseException):
+                logger.error(f"Unexpected error in incorrect answer batch: {result}", exc_info=result)
+                unexpected_error = unexpected_error or result
+            else:
+                stored_answers_map.update(result)
+
+        if failed_ids:
+            raise IncorrectAnswerGenerationError(
+                f"Failed to generate or store incorrect answers for {len(failed_ids)} questions.",
+                failed_ids
+            )
+        if unexpected_error:
+            raise unexpected_error
+        return stored_answers_map
+
+    async def cancel(self) -> None:
+        """Cancel batches still in flight and wait for them to stop. Safe to call after finish()."""
+        self._pending = []
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,308 @@
+# backend/src/services/pack_build_service.py
+"""
+Single-request pack build: questions -> incorrect answers -> storage.
+
+The stages are connected by bounded asyncio queues, so incorrect-answer
+generation starts as soon as a batch of questions exists, storage runs
+concurrently with generation, and a slow stage applies backpressure to the
+ones before it instead of buffering without limit.
+"""
+
+import time
+import asyncio
+import logging
+from typing import List, Dict, Any, Optional
+
+from ..models.question import Question
+from ..services.question_service import QuestionService
+from ..services.incorrect_answer_service import IncorrectAnswerService
+from ..utils.question_generation.incorrect_answer_generator import IncorrectAnswerGenerator, IncorrectAnswerGenerationError
+from ..utils.llm.llm_scheduler import LLMPriority
+from ..api.schemas.question import TopicQuestionConfig
+from ..utils import ensure_uuid
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of a queue's input
+_END = object()
+
+
+class StageStats:
+    """Throughput counters for one pipeline stage."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items_in = 0
+        self.items_out = 0
+        self.failures = 0
+        self.busy_seconds = 0.0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def start(self) -> None:
+        if self.started_at is None:
+            self.started_at = time.perf_counter()
+
+    def finish(self) -> None:
+        self.finished_at = time.perf_counter()
+
+    def as_dict(self) -> Dict[str, Any]:
+        elapsed = (self.finished_at or time.perf_counter()) - self.started_at if self.started_at else 0.0
+        return {
+            "items_in": self.items_in,
+            "items_out": self.items_out,
+            "failures": self.failures,
+            "elapsed_seconds": round(elapsed, 3),
+            "busy_seconds": round(self.busy_seconds, 3),
+            "items_per_second": round(self.items_out / elapsed, 2) if elapsed > 0 else 0.0,
+        }
+
+
+class PackBuildService:
+    """
+    Builds a pack's questions and incorrect answers in one overlapping pipeline.
+    """
+
+    def __init__(
+        self,
+        question_service: QuestionService,
+        incorrect_answer_service: IncorrectAnswerService,
+        incorrect_answer_generator: Optional[IncorrectAnswerGenerator] = None,
+        queue_size: int = 50,
+        answer_workers: int = 4,
+        storage_workers: int = 4,
+        batch_linger_seconds: float = 0.5
+    ):
+        """
+        Initialize the service.
+
+        Args:
+            question_service: Generates and stores questions.
+            incorrect_answer_service: Stores generated incorrect answers.
+            incorrect_answer_generator: Generator for incorrect answers. Defaults to the service's generator.
+            queue_size: Capacity of each inter-stage queue.
+            answer_workers: Concurrent incorrect-answer batches.
+            storage_workers: Concurrent incorrect-answer DB writers.
+            batch_linger_seconds: How long a partial batch waits for more questions before it is sent anyway.
+        """
+        self.question_service = question_service
+        self.incorrect_answer_service = incorrect_answer_service
+        self.incorrect_answer_generator = incorrect_answer_generator or incorrect_answer_service.incorrect_answer_generator
+        self.queue_size = queue_size
+        self.answer_workers = max(1, answer_workers)
+        self.storage_workers = max(1, storage_workers)
+        self.batch_linger_seconds = batch_linger_seconds
+
+    async def build_pack(
+        self,
+        pack_id: str,
+        pack_name: str,
+        topic_configs: List[TopicQuestionConfig],
+        regenerate_instructions: bool = False,
+        num_incorrect_answers: int = 3,
+        batch_size: int = 5,
+        max_retries: int = 1,
+        debug_mode: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Generate questions for every topic/difficulty and their incorrect answers.
+
+        Args:
+            pack_id: ID of the pack.
+            pack_name: Name of the pack.
+            topic_configs: Topics and per-difficulty counts to generate.
+            regenerate_instructions: Force regeneration of topic custom instructions.
+            num_incorrect_answers: Incorrect answers per question.
+            batch_size: Questions per incorrect-answer LLM call.
+            max_retries: Retries for questions whose incorrect answers failed to generate.
+            debug_mode: Enable verbose debug output.
+
+        Returns:
+            Summary with status, counts, failed topics/question IDs and per-stage stats.
+        """
+        pack_id_uuid = ensure_uuid(pack_id)
+        build_started = time.perf_counter()
+
+        question_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        batch_queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, self.queue_size // batch_size))
+        storage_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+
+        stats = {
+            "questions": StageStats("questions"),
+            "batching": StageStats("batching"),
+            "incorrect_answers": StageStats("incorrect_answers"),
+            "storage": StageStats("storage"),
+        }
+        failed_question_ids: List[str] = []
+        stored_question_ids: List[str] = []
+
+        # --- Stage 1: question generation (stored by QuestionService as they stream in) ---
+        async def on_question_created(question: Question) -> None:
+            stats["questions"].items_out += 1
+            await question_queue.put(question) # Blocks when downstream is saturated
+
+        async def produce_questions() -> Dict[str, Any]:
+            stage = stats["questions"]
+            stage.start()
+            stage.items_in = sum(dc.num_questions for tc in topic_configs for dc in tc.difficulty_configs) # Requested
+            try:
+                results = await self.question_service.batch_generate_and_store_questions(
+                    pack_id=pack_id_uuid,
+                    pack_name=pack_name,
+                    topic_configs=topic_configs,
+                    regenerate_instructions=regenerate_instructions,
+                    debug_mode=debug_mode,
+                    on_question_created=on_question_created
+                )
+            finally:
+                stage.finish()
+                stage.busy_seconds = stage.finished_at - stage.started_at
+            # Only signal the end on success; on failure the supervisor cancels every stage
+            await question_queue.put(_END)
+            return results
+
+        # --- Stage 2: group questions into incorrect-answer batches ---
+        async def batch_questions() -> None:
+            stage = stats["batching"]
+            stage.start()
+            pending: List[Question] = []
+            while True:
+                try:
+                    if pending:
+                        item = await asyncio.wait_for(question_queue.get(), timeout=self.batch_linger_seconds)
+                    else:
+                        item = await question_queue.get()
+                except asyncio.TimeoutError:
+                    item = None # Linger expired: flush the partial batch
+                if item is _END:
+                    break
+                if item is not None:
+                    stage.items_in += 1
+                    pending.append(item)
+                if pending and (item is None or len(pending) >= batch_size):
+                    await batch_queue.put(pending)
+                    stage.items_out += 1
+                    pending = []
+            if pending:
+                await batch_queue.put(pending)
+                stage.items_out += 1
+            stage.finish()
+            for _ in range(self.answer_workers):
+                await batch_queue.put(_END)
+
+        # --- Stage 3: incorrect-answer generation ---
+        async def generate_answers() -> None:
+            stage = stats["incorrect_answers"]
+            while True:
+                batch = await batch_queue.get()
+                if batch is _END:
+                    break
+                stage.start()
+                stage.items_in += len(batch)
+                started = time.perf_counter()
+                try:
+                    results = await self.incorrect_answer_generator.generate_incorrect_answers(
+                        questions=batch,
+                        num_incorrect_answers=num_incorrect_answers,
+                        batch_size=batch_size,
+                        max_retries=max_retries,
+                        debug_mode=debug_mode,
+                        priority=LLMPriority.BULK
+                    )
+                except IncorrectAnswerGenerationError as e:
+                    results = e.partial_results
+                    failed_question_ids.extend(e.failed_question_ids)
+                    stage.failures += len(e.failed_question_ids)
+                except Exception as e:
+                    logger.error(f"Incorrect answer batch failed during pack build for {pack_id_uuid}: {e}", exc_info=True)
+                    results = []
+                    failed_question_ids.extend(str(q.id) for q in batch)
+                    stage.failures += len(batch)
+                stage.busy_seconds += time.perf_counter() - started
+                for result in results:
+                    stage.items_out += 1
+                    await storage_queue.put(result)
+
+        # --- Stage 4: incorrect-answer storage ---
+        async def store_answers() -> None:
+            stage = stats["storage"]
+            while True:
+                item = await storage_queue.get()
+                if item is _END:
+                    break
+                question_id, answers = item
+                stage.start()
+                stage.items_in += 1
+                started = time.perf_counter()
+                try:
+                    stored = await self.incorrect_answer_service.store_incorrect_answer_set(question_id, answers)
+                except Exception as e:
+                    logger.error(f"Error storing incorrect answers for question {question_id}: {e}")
+                    stored = False
+                stage.busy_seconds += time.perf_counter() - started
+                if stored:
+                    stage.items_out += 1
+                    stored_question_ids.append(str(question_id))
+                else:
+                    stage.failures += 1
+                    failed_question_ids.append(str(question_id))
+
+        async def close_storage() -> None:
+            await asyncio.gather(*answer_tasks)
+            stats["incorrect_answers"].finish()
+            for _ in range(self.storage_workers):
+                await storage_queue.put(_END)
+            await asyncio.gather(*storage_tasks)
+            stats["storage"].finish()
+
+        producer_task = asyncio.create_task(produce_questions())
+        batcher_task = asyncio.create_task(batch_questions())
+        answer_tasks = [asyncio.create_task(generate_answers()) for _ in range(self.answer_workers)]
+        storage_tasks = [asyncio.create_task(store_answers()) for _ in range(self.storage_workers)]
+        closer_task = asyncio.create_task(close_storage())
+        all_tasks = [producer_task, batcher_task, *answer_tasks, *storage_tasks, closer_task]
+
+        # A failed stage would leave its neighbours blocked on a full or empty
+        # queue, so the first failure cancels every stage and is re-raised.
+        try:
+            done, _ = await asyncio.wait(all_tasks, return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                if not task.cancelled() and task.exception() is not None:
+                    raise task.exception()
+        finally:
+            for task in all_tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*all_tasks, return_exceptions=True)
+        question_results: Dict[str, Any] = producer_task.result()
+
+        total_generated = question_results.get("total_generated", 0)
+        failed_topics = list(question_results.get("failed_topics", []))
+        if failed_question_ids:
+            failed_ids_set = set(failed_question_ids)
+            failed_topics.extend(
+                q.pack_topics_item for q in question_results.get("generated_questions", [])
+                if str(q.id) in failed_ids_set and q.pack_topics_item
+            )
+
+        status = "completed"
+        if total_generated == 0:
+            status = "failed"
+        elif failed_topics or failed_question_ids:
+            status = "partial_failure"
+
+        elapsed = time.perf_counter() - build_started
+        stage_stats = {name: stage.as_dict() for name, stage in stats.items()}
+        logger.info(f"Pack build for {pack_id_uuid} finished in {elapsed:.2f}s. Status: {status}. Questions: {total_generated}. Incorrect answers stored: {len(stored_question_ids)}. Stages: {stage_stats}")
+
+        return {
+            "pack_id": pack_id_uuid,
+            "status": status,
+            "topics_processed": question_results.get("topics_processed", []),
+            "total_questions_generated": total_generated,
+            "total_incorrect_answers_stored": len(stored_question_ids),
+            "failed_topics": sorted(set(failed_topics)),
+            "failed_question_ids": sorted(set(failed_question_ids)),
+            "elapsed_seconds": round(elapsed, 3),
+            "stages": stage_stats,
+        }
@@ -1,10 +1,11 @@
 # backend/src/services/question_service.py
+import os
 import uuid
 import logging
 import json
 import traceback
 import asyncio
-from typing import List, Dict, Any, Optional, Union, Tuple
+from typing import List, Dict, Any, Optional, Union, Tuple, Callable, Awaitable
 
 # --- UPDATED IMPORTS ---
 from ..models.pack import Pack # Import Pack model
@@ -43,6 +44,9 @@ class QuestionService:
     Does NOT handle incorrect answer generation.
     """
 
+    # Streamed questions are bulk-inserted in groups of this size
+    STREAM_INSERT_BATCH_SIZE = 5
+
     # --- MODIFIED __init__ ---
     def __init__(
         self,
@@ -61,52 +65,85 @@ class QuestionService:
         self.seed_question_service = seed_question_service # <<< ADDED
         self.question_generator = question_generator or QuestionGenerator()
         self.debug_enabled = False
+        # Store each question as soon as its JSON object arrives in the LLM stream
+        self.stream_generation = os.getenv("QUESTION_STREAMING_ENABLED", "true").lower() in ("1", "true", "yes")
     # --- END MODIFIED __init__ ---
 
-    async def _create_question(self, question_data: Dict[str, Any]) -> Optional[Question]:
+    def _build_question_create(self, question_data: Dict[str, Any]) -> QuestionCreate:
         """
-        Helper method to create a single question in the database.
-        Validates data and uses the repository.
-        (Unchanged)
+        Validate raw question data and build the creation schema.
+        Raises ValueError/KeyError if the data cannot be stored.
         """
+        pack_id_uuid = ensure_uuid(question_data.get("pack_id"))
+        if not pack_id_uuid:
+            raise ValueError("Missing or invalid pack_id in question data")
+
+        difficulty_initial_val = question_data.get("difficulty_initial")
+        difficulty_current_val = question_data.get("difficulty_current")
+
         try:
-            if self.debug_enabled:
-                print("\n  === Creating Question (Internal) ===")
-                print(f"  Raw Data: {question_data}")
+            if isinstance(difficulty_initial_val, DifficultyLevel):
+                 difficulty_initial_enum = difficulty_initial_val
+            else:
+                 difficulty_initial_enum = DifficultyLevel(difficulty_initial_val.lower()) if difficulty_initial_val else None
 
-            pack_id_uuid = ensure_uuid(question_data.get("pack_id"))
-            if not pack_id_uuid:
-                 logger.error("Missing or invalid pack_id in question data")
-                 return None
+            if isinstance(difficulty_current_val, DifficultyLevel):
+                 difficulty_current_enum = difficulty_current_val
+            else:
+                 difficulty_current_enum = DifficultyLevel(difficulty_current_val.lower()) if difficulty_current_val else None
+
+        except (ValueError, AttributeError):
+            logger.warning(f"Invalid difficulty value found: initial='{difficulty_initial_val}', current='{difficulty_current_val}'. Defaulting to MIXED.")
+            difficulty_initial_enum = DifficultyLevel.MIXED
+            difficulty_current_enum = DifficultyLevel.MIXED
+
+        return QuestionCreate(
+            question=question_data["question"],
+            answer=question_data["answer"],
+            pack_id=pack_id_uuid,
+            pack_topics_item=question_data.get("pack_topics_item"),
+            difficulty_initial=difficulty_initial_enum,
+            difficulty_current=difficulty_current_enum or difficulty_initial_enum, # Default current to initial if current is None
+            correct_answer_rate=question_data.get("correct_answer_rate", 0.0)
+        )
 
-            difficulty_initial_val = question_data.get("difficulty_initial")
-            difficulty_current_val = question_data.get("difficulty_current")
+    async def _create_questions(self, question_data_list: List[Dict[str, Any]]) -> List[Question]:
+        """
+        Validate and store several questions with a single bulk insert.
+        Rows that fail validation or insertion are logged and skipped.
 
+        Returns:
+            The successfully created Question objects, in input order.
+        """
+        question_creates: List[QuestionCreate] = []
+        for question_data in question_data_list:
             try:
-                if isinstance(difficulty_initial_val, DifficultyLevel):
-                     difficulty_initial_enum = difficulty_initial_val
-                else:
-                     difficulty_initial_enum = DifficultyLevel(difficulty_initial_val.lower()) if difficulty_initial_val else None
+                question_creates.append(self._build_question_create(question_data))
+            except Exception as e:
+                logger.error(f"Skipping invalid question data {question_data}: {str(e)}")
 
-                if isinstance(difficulty_current_val, DifficultyLevel):
-                     difficulty_current_enum = difficulty_current_val
-                else:
-                     difficulty_current_enum = DifficultyLevel(difficulty_current_val.lower()) if difficulty_current_val else None
+        if not question_creates:
+            return []
 
-            except (ValueError, AttributeError):
-                logger.warning(f"Invalid difficulty value found: initial='{difficulty_initial_val}', current='{difficulty_current_val}'. Defaulting to MIXED.")
-                difficulty_initial_enum = DifficultyLevel.MIXED
-                difficulty_current_enum = DifficultyLevel.MIXED
+        created_questions, errors = await self.question_repository.create_many(objs_in=question_creates)
+        for error in errors:
+            logger.error(f"Failed to store question '{question_creates[error['index']].question[:60]}': {error['error']}")
 
-            question_create = QuestionCreate(
-                question=question_data["question"],
-                answer=question_data["answer"],
-                pack_id=pack_id_uuid,
-                pack_topics_item=question_data.get("pack_topics_item"),
-                difficulty_initial=difficulty_initial_enum,
-                difficulty_current=difficulty_current_enum or difficulty_initial_enum, # Default current to initial if current is None
-                correct_answer_rate=question_data.get("correct_answer_rate", 0.0)
-            )
+        if self.debug_enabled:
+            print(f"  Bulk insert stored {len(created_questions)}/{len(question_creates)} questions.")
+        return created_questions
+
+    async def _create_question(self, question_data: Dict[str, Any]) -> Optional[Question]:
+        """
+        Helper method to create a single question in the database.
+        Validates data and uses the repository.
+        """
+        try:
+            if self.debug_enabled:
+                print("\n  === Creating Question (Internal) ===")
+                print(f"  Raw Data: {question_data}")
+
+            question_create = self._build_question_create(question_data)
 
             if self.debug_enabled:
                 print(f"  Prepared Schema:")
@@ -133,12 +170,16 @@ class QuestionService:
         topic: str,
         difficulty_config: DifficultyConfig,
         custom_instruction_for_topic: Optional[str], # <<< ADDED Parameter
-        debug_mode: bool
+        debug_mode: bool,
+        on_question_created: Optional[Callable[[Question], Awaitable[None]]] = None
     ) -> List[Question]:
         """
         Internal helper to generate and store questions for ONE topic-difficulty pair.
         Uses provided custom instructions. Reads seeds/diffs from Pack object.
         Returns the list of successfully created Question objects.
+
+        When streaming is enabled each question is stored (and passed to
+        on_question_created) while the rest are still being generated.
         """
         pack_id_uuid = ensure_uuid(pack.id)
         target_difficulty = difficulty_config.difficulty
@@ -162,6 +203,19 @@ class QuestionService:
         # topic_record = await self.topic_repository.get_by_name_and_pack_id(topic, pack_id_uuid)
         # ...
 
+        if self.stream_generation:
+            return await self._stream_questions_for_topic_difficulty(
+                pack=pack,
+                topic=topic,
+                target_difficulty=target_difficulty,
+                num_questions=num_questions,
+                difficulty_descriptions=difficulty_descriptions,
+                topic_seeds=topic_seeds,
+                custom_instruction_for_topic=custom_instruction_for_topic,
+                debug_mode=debug_mode,
+                on_question_created=on_question_created
+            )
+
         try:
             # Call the QuestionGenerator, passing the provided instruction
             question_data_list: List[Dict] = await self.question_generator.generate_questions(
@@ -180,8 +234,7 @@ class QuestionService:
                 print(f"  LLM generated {len(question_data_list)} raw items for '{topic}' ({target_difficulty.value}).")
                 if question_data_list: print_json(question_data_list[0])
 
-            # Store the questions
-            created_questions: List[Question] = []
+            # Store the questions with one bulk insert
             for q_data in question_data_list:
                 if "pack_id" not in q_data: q_data["pack_id"] = pack_id_uuid
                 if "pack_topics_item" not in q_data: q_data["pack_topics_item"] = topic
@@ -189,9 +242,10 @@ class QuestionService:
                 q_data["difficulty_initial"] = target_difficulty
                 q_data["difficulty_current"] = target_difficulty
 
-                question_obj = await self._create_question(q_data)
-                if question_obj:
-                    created_questions.append(question_obj)
+            created_questions: List[Question] = await self._create_questions(question_data_list)
+            if on_question_created:
+                for question_obj in created_questions:
+                    await on_question_created(question_obj)
 
             if debug_mode:
                  print(f"  Successfully created {len(created_questions)} DB questions for '{topic}' ({target_difficulty.value}).")
@@ -206,6 +260,84 @@ class QuestionService:
             return []
     # --- END MODIFIED _generate_questions_for_topic_difficulty ---
 
+    async def _stream_questions_for_topic_difficulty(
+        self,
+        pack: Pack,
+        topic: str,
+        target_difficulty: DifficultyLevel,
+        num_questions: int,
+        difficulty_descriptions: Dict[str, Dict[str, str]],
+        topic_seeds: Dict[str, str],
+        custom_instruction_for_topic: Optional[str],
+        debug_mode: bool,
+        on_question_created: Optional[Callable[[Question], Awaitable[None]]] = None
+    ) -> List[Question]:
+        """
+        Streaming variant of _generate_questions_for_topic_difficulty.
+        Questions are bulk-inserted in groups of STREAM_INSERT_BATCH_SIZE while
+        the rest are still being generated (downstream incorrect-answer batches
+        use the same size, so grouping adds no latency there). A single writer
+        stores them; groups that arrive while an insert is in flight are
+        coalesced into the next insert.
+        """
+        pack_id_uuid = ensure_uuid(pack.id)
+        write_queue: asyncio.Queue = asyncio.Queue()
+        created_questions: List[Question] = []
+
+        async def writer() -> None:
+            finished = False
+            while not finished:
+                groups = [await write_queue.get()]
+                while not write_queue.empty():
+                    groups.append(write_queue.get_nowait())
+                if groups[-1] is None: # End of stream
+                    groups.pop()
+                    finished = True
+                batch = [q_data for group in groups for q_data in group]
+                if not batch:
+                    continue
+                try:
+                    stored = await self._create_questions(batch)
+                except Exception as e:
+                    logger.error(f"Error storing streamed questions for topic '{topic}': {str(e)}", exc_info=True)
+                    continue
+                created_questions.extend(stored)
+                if on_question_created:
+                    for question_obj in stored:
+                        await on_question_created(question_obj)
+
+        writer_task = asyncio.create_task(writer())
+        pending: List[Dict[str, Any]] = []
+        try:
+            async for q_data in self.question_generator.stream_questions(
+                pack_id=pack_id_uuid,
+                pack_name=pack.name,
+                pack_topic=topic,
+                difficulty=target_difficulty,
+                difficulty_descriptions=difficulty_descriptions,
+                seed_questions=topic_seeds,
+                num_questions=num_questions,
+                debug_mode=debug_mode,
+                custom_instructions=custom_instruction_for_topic
+            ):
+                q_data["difficulty_initial"] = target_difficulty
+                q_data["difficulty_current"] = target_difficulty
+                pending.append(q_data)
+                if len(pending) >= self.STREAM_INSERT_BATCH_SIZE:
+                    write_queue.put_nowait(pending)
+                    pending = []
+        except Exception as e:
+            logger.error(f"Error streaming questions for topic '{topic}', difficulty '{target_difficulty.value}': {str(e)}", exc_info=True)
+        finally:
+            if pending:
+                write_queue.put_nowait(pending)
+            write_queue.put_nowait(None)
+            await writer_task
+
+        if debug_mode:
+            print(f"  Streamed and created {len(created_questions)} DB questions for '{topic}' ({target_difficulty.value}).")
+        return created_questions
+
 
     async def generate_and_store_questions(
         self,
@@ -214,11 +346,13 @@ class QuestionService:
         pack_topic: str,
         difficulty: DifficultyLevel,
         num_questions: int = 5,
-        debug_mode: bool = False
+        debug_mode: bool = False,
+        on_question_created: Optional[Callable[[Question], Awaitable[None]]] = None
     ) -> List[Question]:
         """
         Generate questions for a SINGLE topic and SINGLE difficulty and store them.
         Fetches topic-specific instructions internally. Reads context from Pack object.
+        on_question_created, if given, is awaited for each question as soon as it is stored.
         """
         self.debug_enabled = debug_mode
         pack_id_uuid = ensure_uuid(pack_id)
@@ -255,7 +389,8 @@ class QuestionService:
             topic=pack_topic,
             difficulty_config=difficulty_config,
             custom_instruction_for_topic=instruction_for_topic, # <<< Pass fetched instruction
-            debug_mode=debug_mode
+            debug_mode=debug_mode,
+            on_question_created=on_question_created
         )
         return created_questions
 
@@ -266,13 +401,15 @@ class QuestionService:
         pack_name: str,
         topic_configs: List[TopicQuestionConfig],
         regenerate_instructions: bool = False, # <<< ADDED parameter
-        debug_mode: bool = False
+        debug_mode: bool = False,
+        on_question_created: Optional[Callable[[Question], Awaitable[None]]] = None
     ) -> Dict[str, Any]:
         """
         Generate questions concurrently for multiple topics AND multiple difficulties.
         Also concurrently generates missing topic-specific custom instructions if needed.
         Reads context (seeds, diff descriptions) from the Pack object.
         Returns a summary dictionary including the list of created Question objects.
+        on_question_created, if given, is awaited for each question as soon as it is stored.
         """
         self.debug_enabled = debug_mode
         pack_id_uuid = ensure_uuid(pack_id)
@@ -378,7 +515,8 @@ class QuestionService:
                         topic=topic,
                         difficulty_config=difficulty_config,
                         custom_instruction_for_topic=final_instruction_for_topic, # <<< PASS FINAL INSTRUCTION
-                        debug_mode=debug_mode
+                        debug_mode=debug_mode,
+                        on_question_created=on_question_created
                     ), name=f"GenerateQ_{topic}_{difficulty_config.difficulty.value}"
                 )
                 question_gen_tasks.append(task)
@@ -444,14 +582,17 @@ class QuestionService:
     async def get_questions_by_pack_id(self, pack_id: str) -> List[Question]:
         """Retrieve all questions for a specific pack."""
         pack_id_uuid = ensure_uuid(pack_id)
-        return await self.question_repository.get_by_pack_id(pack_id_uuid)
+        return [q async for q in self.question_repository.iter_by_pack_id(pack_id_uuid)]
 
     async def get_questions_by_topic(self, pack_id: str, topic: str) -> List[Question]:
         """Retrieve questions for a specific pack filtered by topic."""
         pack_id_uuid = ensure_uuid(pack_id)
-        all_questions = await self.question_repository.get_by_pack_id(pack_id_uuid)
         topic_lower = topic.lower()
-        return [q for q in all_questions if q.pack_topics_item and q.pack_topics_item.lower() == topic_lower]
+        # The topic filter runs in the database; the exact comparison guards against pattern characters in topic names
+        return [
+            q async for q in self.question_repository.iter_by_pack_id(pack_id_uuid, topic=topic)
+            if q.pack_topics_item and q.pack_topics_item.lower() == topic_lower
+        ]
 
     async def update_question_statistics(
         self,
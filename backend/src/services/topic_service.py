@@ -6,7 +6,7 @@ from typing import List, Optional
 from ..repositories.topic_repository import TopicRepository # Changed import
 from ..models.topic import TopicCreate # Import the create schema
 from ..utils.question_generation.pack_topic_creation import PackTopicCreation
-from ..utils.llm.llm_service import LLMService
+from ..utils.llm.llm_client_registry import get_llm_service
 from ..utils import ensure_uuid
 
 # Setup logger
@@ -26,7 +26,7 @@ class TopicService:
             topic_repository: Repository for topic operations.
         """
         self.topic_repository = topic_repository # Renamed attribute
-        llm_service = LLMService()
+        llm_service = get_llm_service() # Shared pooled client
         self.topic_creator = PackTopicCreation(llm_service=llm_service)
 
     async def store_pack_topics(self, pack_id: str, topics: List[str]) -> List[str]:
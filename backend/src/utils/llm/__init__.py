@@ -8,10 +8,28 @@ their outputs.
 """
 
 from .llm_service import LLMService
+from .llm_client_registry import (
+    LLMClientRegistry,
+    llm_client_registry,
+    get_llm_service
+)
+from .llm_scheduler import (
+    LLMScheduler,
+    LLMPriority,
+    get_llm_scheduler,
+    get_llm_scheduler_metrics
+)
+from .llm_response_cache import (
+    LLMResponseCache,
+    get_llm_response_cache,
+    get_llm_response_cache_metrics
+)
 from .llm_parsing_utils import (
     LLMParsingUtils,
+    IncrementalJsonArrayParser,
     extract_bullet_list,
     parse_json_from_llm,
+    parses_without_repair,
     format_as_bullet_list,
     extract_key_value_pairs,
     detect_and_parse_format
@@ -24,9 +42,21 @@ from .llm_json_repair import (
 
 __all__ = [
     "LLMService",
+    "LLMClientRegistry",
+    "llm_client_registry",
+    "get_llm_service",
+    "LLMScheduler",
+    "LLMPriority",
+    "get_llm_scheduler",
+    "get_llm_scheduler_metrics",
+    "LLMResponseCache",
+    "get_llm_response_cache",
+    "get_llm_response_cache_metrics",
     "LLMParsingUtils",
+    "IncrementalJsonArrayParser",
     "extract_bullet_list",
     "parse_json_from_llm",
+    "parses_without_repair",
     "format_as_bullet_list",
     "extract_key_value_pairs",
     "detect_and_parse_format",
@@ -0,0 +1,94 @@
+# backend/src/utils/llm/llm_client_registry.py
+"""
+Process-wide registry of LLM clients.
+
+Generators and services are constructed per request, so building an
+LLMService for each of them would re-read the environment and open a new
+HTTP client (and TLS session) on every call. The registry keeps exactly one
+LLMConfig/LLMService per provider/model pair, each backed by a keep-alive
+connection pool, and hands the same instance to every caller.
+"""
+
+import os
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+
+from ...config.config import LLMConfig, LLMPoolConfig
+from .llm_service import LLMService
+
+logger = logging.getLogger(__name__)
+
+
+class LLMClientRegistry:
+    """
+    Caches pooled LLM services keyed by (provider, model).
+    """
+
+    def __init__(self, pool_config: Optional[LLMPoolConfig] = None):
+        """
+        Initialize the registry.
+
+        Args:
+            pool_config: Connection pool settings applied to every provider client.
+                         If None, settings are read from the environment on first use.
+        """
+        self._pool_config = pool_config
+        self._services: Dict[Tuple[str, Optional[str]], LLMService] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def pool_config(self) -> LLMPoolConfig:
+        if self._pool_config is None:
+            self._pool_config = LLMPoolConfig()
+        return self._pool_config
+
+    def configure(self, pool_config: LLMPoolConfig) -> None:
+        """Replace the pool settings used for clients created from now on."""
+        self._pool_config = pool_config
+
+    def get_service(self, provider: Optional[str] = None, model: Optional[str] = None) -> LLMService:
+        """
+        Return the shared LLMService for a provider/model, creating it on first use.
+
+        Args:
+            provider: LLM provider name. Defaults to the LLM_PROVIDER environment variable.
+            model: Model name. Defaults to the provider's default model.
+
+        Returns:
+            The shared LLMService instance.
+        """
+        pool_config = self.pool_config # Loads .env before LLM_PROVIDER is read
+        key = ((provider or os.getenv("LLM_PROVIDER", "openai")).lower(), model)
+        service = self._services.get(key)
+        if service is not None:
+            return service
+
+        with self._lock:
+            service = self._services.get(key)
+            if service is None:
+                llm_config = LLMConfig(provider=key[0], model=model, pool_config=pool_config)
+                service = LLMService(llm_config)
+                self._services[key] = service
+                logger.info(f"Created pooled LLM client for provider '{key[0]}' (model: {service.model})")
+        return service
+
+    async def aclose(self) -> None:
+        """Close every pooled client. Called on application shutdown."""
+        with self._lock:
+            services = list(self._services.values())
+            self._services.clear()
+        for service in services:
+            try:
+                await service.llm_config.aclose()
+            except Exception as e:
+                logger.error(f"Error closing LLM client for provider '{service.provider}': {e}")
+
+
+# Shared registry used by default throughout the application
+llm_client_registry = LLMClientRegistry()
+
+
+def get_llm_service(provider: Optional[str] = None, model: Optional[str] = None) -> LLMService:
+    """Helper to fetch the shared LLMService from the process-wide registry."""
+    return llm_client_registry.get_service(provider, model)
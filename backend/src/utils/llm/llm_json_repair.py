@@ -12,6 +12,8 @@ import re
 from typing import Any, Dict, List, Optional, Union
 
 from .llm_service import LLMService
+from .llm_client_registry import get_llm_service
+from .llm_scheduler import LLMPriority
 from ..document_processing.processors import clean_text
 
 # Configure logger
@@ -31,9 +33,9 @@ class LLMJsonRepair:
         Initialize the JSON repair service.
         
         Args:
-            llm_service: Service for LLM interactions. If None, creates a new instance.
+            llm_service: Service for LLM interactions. If None, uses the shared pooled instance.
         """
-        self.llm_service = llm_service or LLMService()
+        self.llm_service = llm_service or get_llm_service()
     
     async def repair_json(self, malformed_json: str, json_type: str = "auto") -> str:
         """
@@ -55,10 +57,12 @@ class LLMJsonRepair:
         
         try:
             # Use LLM to generate a fixed version
-            raw_response = self.llm_service.generate_content(
+            raw_response = await self.llm_service.agenerate_content(
                 prompt=prompt,
                 temperature=0.2,  # Lower temperature for more deterministic output
-                max_tokens=3000   # Ensure enough tokens for the repaired JSON
+                max_tokens=3000,  # Ensure enough tokens for the repaired JSON
+                priority=LLMPriority.INTERACTIVE, # A caller is blocked on this repair
+                cache_if=self._extracts_valid_json
             )
             
             # Process and validate the response
@@ -192,10 +196,12 @@ Return ONLY the fixed JSON with no explanation or markdown. Return it exactly as
         
         try:
             # Use LLM to generate a fixed version with lower temperature for precision
-            raw_response = self.llm_service.generate_content(
+            raw_response = await self.llm_service.agenerate_content(
                 prompt=prompt,
                 temperature=0.1,
-                max_tokens=3000
+                max_tokens=3000,
+                priority=LLMPriority.INTERACTIVE,
+                cache_if=self._extracts_valid_json
             )
             
             return self._extract_json_from_response(raw_response)
@@ -205,6 +211,14 @@ Return ONLY the fixed JSON with no explanation or markdown. Return it exactly as
             # Return the input JSON if fallback fails
             return json_str
     
+    def _extracts_valid_json(self, response: str) -> bool:
+        """Whether a repair response yields valid JSON; only those are cached."""
+        try:
+            json.loads(self._extract_json_from_response(response))
+            return True
+        except json.JSONDecodeError:
+            return False
+
     def _extract_json_from_response(self, response: str) -> str:
         """
         Extract JSON from LLM response, handling potential markdown or explanation text.
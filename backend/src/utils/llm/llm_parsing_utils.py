@@ -576,16 +576,163 @@ class LLMParsingUtils:
             # Extract content
             content = text[start_pos:end_pos].strip()
             sections[header] = content
-        
+
         return sections
 
 
+class IncrementalJsonArrayParser:
+    """
+    Parses a top-level JSON array of objects as it streams in.
+
+    Text before the opening '[' (e.g. a ```json fence) is ignored. Each call to
+    feed() returns the objects whose closing brace arrived in that chunk.
+    Objects that fail to parse are counted in `errors` and skipped; the full
+    text is kept in `text` so callers can fall back to parse_json_from_llm.
+    """
+
+    def __init__(self):
+        self._parts: List[str] = []
+        self._started = False
+        self._finished = False
+        self._current: Optional[List[str]] = None
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self.items_emitted = 0
+        self.errors = 0
+
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
+
+    @property
+    def finished(self) -> bool:
+        """True once the closing ']' of the top-level array has been seen."""
+        return self._finished
+
+    def feed(self, chunk: str) -> List[Any]:
+        """
+        Consume the next chunk of streamed text.
+
+        Args:
+            chunk: Newly received text
+
+        Returns:
+            List of complete objects parsed from this chunk
+        """
+        self._parts.append(chunk)
+        completed: List[Any] = []
+        for char in chunk:
+            if self._finished:
+                break
+            if not self._started:
+                if char == '[':
+                    self._started = True
+                continue
+            if self._current is None:
+                # Between elements: only an object start or the array end matters
+                if char == '{':
+                    self._current = [char]
+                    self._depth = 1
+                elif char == ']':
+                    self._finished = True
+                continue
+
+            self._current.append(char)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in '{[':
+                self._depth += 1
+            elif char in '}]':
+                self._depth -= 1
+                if self._depth == 0:
+                    raw_object = "".join(self._current)
+                    self._current = None
+                    try:
+                        completed.append(json.loads(raw_object))
+                        self.items_emitted += 1
+                    except json.JSONDecodeError:
+                        try:
+                            # Most common streamed defect: a trailing comma before '}' or ']'
+                            completed.append(json.loads(re.sub(r',\s*([}\]])', r'\1', raw_object)))
+                            self.items_emitted += 1
+                        except json.JSONDecodeError:
+                            self.errors += 1
+                            logger.debug(f"Skipping unparseable streamed object: {raw_object[:100]}")
+        return completed
+
+
 # Helper functions for common parsing operations
 
 def extract_bullet_list(text: str) -> List[str]:
     """Helper function to extract bullet list from text."""
     return LLMParsingUtils.extract_bullet_list(text)
 
+def _parse_json_rule_based(text: str) -> Any:
+    """
+    Parse JSON from LLM output using only local, rule-based recovery.
+
+    Raises:
+        ValueError: If no rule-based approach yields valid JSON.
+    """
+    # Try direct JSON parsing first (fastest)
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+        
+    # Extract JSON from mixed content
+    cleaned_json = LLMParsingUtils.extract_json_from_response(text)
+    try:
+        return json.loads(cleaned_json)
+    except json.JSONDecodeError:
+        pass
+        
+    # Handle potentially truncated arrays
+    fixed_json = LLMParsingUtils.handle_truncated_json_array(cleaned_json)
+    try:
+        return json.loads(fixed_json)
+    except json.JSONDecodeError:
+        pass
+    
+    # Manual character-by-character cleanup
+    sanitized_json = LLMParsingUtils.sanitize_json(fixed_json)
+    try:
+        return json.loads(sanitized_json)
+    except json.JSONDecodeError:
+        # Try recovery approaches for arrays
+        if fixed_json.strip().startswith('['):
+            recovered_items = LLMParsingUtils.recover_items_from_truncated_array(fixed_json)
+            if recovered_items:
+                return recovered_items
+                
+            chunk_recovered_items = LLMParsingUtils.chunk_recover_json_array(fixed_json)
+            if chunk_recovered_items:
+                return chunk_recovered_items
+                
+        # If we reach here, all rule-based approaches failed
+        raise ValueError("Rule-based JSON parsing failed")
+
+def parses_without_repair(text: str) -> bool:
+    """
+    Whether LLM output parses as JSON without an LLM repair pass.
+
+    Used as the cache_if predicate for LLMService calls that expect JSON, so a
+    response that needed repair is not served again from the cache.
+    """
+    try:
+        _parse_json_rule_based(text)
+        return True
+    except Exception:
+        return False
+
 async def parse_json_from_llm(text: str, default_value: Any = None) -> Any:
     """
     Parse JSON from LLM output with automatic LLM-based repair if needed.
@@ -602,44 +749,7 @@ async def parse_json_from_llm(text: str, default_value: Any = None) -> Any:
     """
     # First try traditional rule-based parsing approaches
     try:
-        # Try direct JSON parsing first (fastest)
-        try:
-            return json.loads(text)
-        except json.JSONDecodeError:
-            pass
-            
-        # Extract JSON from mixed content
-        cleaned_json = LLMParsingUtils.extract_json_from_response(text)
-        try:
-            return json.loads(cleaned_json)
-        except json.JSONDecodeError:
-            pass
-            
-        # Handle potentially truncated arrays
-        fixed_json = LLMParsingUtils.handle_truncated_json_array(cleaned_json)
-        try:
-            return json.loads(fixed_json)
-        except json.JSONDecodeError:
-            pass
-        
-        # Manual character-by-character cleanup
-        sanitized_json = LLMParsingUtils.sanitize_json(fixed_json)
-        try:
-            return json.loads(sanitized_json)
-        except json.JSONDecodeError:
-            # Try recovery approaches for arrays
-            if fixed_json.strip().startswith('['):
-                recovered_items = LLMParsingUtils.recover_items_from_truncated_array(fixed_json)
-                if recovered_items:
-                    return recovered_items
-                    
-                chunk_recovered_items = LLMParsingUtils.chunk_recover_json_array(fixed_json)
-                if chunk_recovered_items:
-                    return chunk_recovered_items
-                    
-            # If we reach here, all rule-based approaches failed
-            raise ValueError("Rule-based JSON parsing failed")
-            
+        return _parse_json_rule_based(text)
     except Exception as e:
         logger.debug(f"Traditional JSON parsing failed: {str(e)}")
     
@@ -672,8 +782,10 @@ def detect_and_parse_format(text: str) -> Union[List, Dict, str]:
 
 __all__ = [
     "LLMParsingUtils",
+    "IncrementalJsonArrayParser",
     "extract_bullet_list",
     "parse_json_from_llm",
+    "parses_without_repair",
     "format_as_bullet_list",
     "extract_key_value_pairs",
     "detect_and_parse_format",
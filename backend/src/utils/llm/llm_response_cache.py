@@ -0,0 +1,308 @@
+# backend/src/utils/llm/llm_response_cache.py
+"""
+Content-addressed cache for LLM responses.
+
+Several callers send byte-identical prompts repeatedly: custom instructions
+for the same topic, difficulty descriptions for the same pack, and JSON
+repair of the same malformed output. Responses are keyed on a hash of
+provider, model, system prompt, prompt, temperature and max_tokens, and kept
+in two tiers:
+
+- an in-memory LRU with a TTL, shared by every LLMService in the process,
+- an optional SQLite file so entries survive restarts.
+
+The cache is off unless LLM_CACHE_ENABLED is set. Creative calls (question
+and incorrect-answer generation) opt out per call, and callers that expect
+JSON only store responses that parse without an LLM repair pass.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple, Any
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(
+    provider: str,
+    model: str,
+    system_prompt: str,
+    prompt: str,
+    temperature: float,
+    max_tokens: int
+) -> str:
+    """Stable SHA-256 key for a single LLM request."""
+    payload = json.dumps(
+        [provider, model, system_prompt, prompt, round(float(temperature), 4), int(max_tokens)],
+        ensure_ascii=False,
+        separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Two-tier (memory LRU + SQLite) cache of LLM responses with TTL expiry.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 7 * 24 * 3600,
+        max_memory_entries: int = 1000,
+        db_path: Optional[str] = None,
+        max_disk_entries: int = 50000
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl_seconds: Lifetime of an entry in both tiers.
+            max_memory_entries: Size of the in-memory LRU tier.
+            db_path: Path of the SQLite file for the disk tier. If None, only memory is used.
+            max_disk_entries: Upper bound on rows kept in the disk tier.
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_entries = max(1, max_memory_entries)
+        self.max_disk_entries = max(1, max_disk_entries)
+        self.db_path = db_path
+
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._memory_lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._disk_writes_since_prune = 0
+
+        self._counters: Dict[str, int] = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "memory_evictions": 0,
+            "bypassed": 0,
+        }
+
+        if db_path:
+            self._open_db(db_path)
+
+    # --- Disk tier ---
+
+    def _open_db(self, db_path: str) -> None:
+        try:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_responses ("
+                " key TEXT PRIMARY KEY,"
+                " response TEXT NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " last_used_at REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_llm_responses_last_used ON llm_responses (last_used_at)")
+            self._db.commit()
+            logger.info(f"LLM response cache disk tier at {db_path}")
+        except sqlite3.Error as e:
+            logger.error(f"Could not open LLM response cache at {db_path}, using memory only: {e}")
+            self._db = None
+
+    def _disk_get(self, key: str) -> Optional[str]:
+        if self._db is None:
+            return None
+        now = time.time()
+        with self._db_lock:
+            try:
+                row = self._db.execute(
+                    "SELECT response, expires_at FROM llm_responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                if row[1] <= now:
+                    self._db.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                    self._db.commit()
+                    return None
+                self._db.execute("UPDATE llm_responses SET last_used_at = ? WHERE key = ?", (now, key))
+                self._db.commit()
+                return row[0]
+            except sqlite3.Error as e:
+                logger.warning(f"LLM response cache read failed: {e}")
+                return None
+
+    def _disk_set(self, key: str, response: str, expires_at: float) -> None:
+        if self._db is None:
+            return
+        now = time.time()
+        with self._db_lock:
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO llm_responses (key, response, expires_at, last_used_at) VALUES (?, ?, ?, ?)",
+                    (key, response, expires_at, now)
+                )
+                self._disk_writes_since_prune += 1
+                if self._disk_writes_since_prune >= 100:
+                    self._disk_writes_since_prune = 0
+                    self._prune_disk(now)
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"LLM response cache write failed: {e}")
+
+    def _prune_disk(self, now: float) -> None:
+        """Drop expired rows and the least recently used rows beyond max_disk_entries."""
+        self._db.execute("DELETE FROM llm_responses WHERE expires_at <= ?", (now,))
+        self._db.execute(
+            "DELETE FROM llm_responses WHERE key IN ("
+            " SELECT key FROM llm_responses ORDER BY last_used_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_entries,)
+        )
+
+    # --- Memory tier ---
+
+    def _memory_get(self, key: str) -> Optional[str]:
+        with self._memory_lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            expires_at, response = entry
+            if expires_at <= time.time():
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            return response
+
+    def _memory_set(self, key: str, response: str, expires_at: float) -> None:
+        with self._memory_lock:
+            self._memory[key] = (expires_at, response)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+                self._counters["memory_evictions"] += 1
+
+    # --- Public API ---
+
+    def get(self, key: str) -> Optional[str]:
+        """Look up a response, promoting disk hits into memory."""
+        response = self._memory_get(key)
+        if response is not None:
+            self._counters["memory_hits"] += 1
+            return response
+        response = self._disk_get(key)
+        if response is not None:
+            self._counters["disk_hits"] += 1
+            self._memory_set(key, response, time.time() + self.ttl_seconds)
+            return response
+        self._counters["misses"] += 1
+        return None
+
+    def set(self, key: str, response: str) -> None:
+        """Store a response in both tiers. Empty responses are not cached."""
+        if not response:
+            return
+        expires_at = time.time() + self.ttl_seconds
+        self._memory_set(key, response, expires_at)
+        self._disk_set(key, response, expires_at)
+        self._counters["writes"] += 1
+
+    async def aget(self, key: str) -> Optional[str]:
+        """Async lookup; the disk tier is read off the event loop."""
+        response = self._memory_get(key)
+        if response is not None:
+            self._counters["memory_hits"] += 1
+            return response
+        if self._db is None:
+            self._counters["misses"] += 1
+            return None
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, response: str) -> None:
+        """Async store; the disk tier is written off the event loop."""
+        if self._db is None:
+            self.set(key, response)
+            return
+        await asyncio.to_thread(self.set, key, response)
+
+    def record_bypass(self) -> None:
+        """Count a call that opted out of caching."""
+        self._counters["bypassed"] += 1
+
+    def clear(self) -> None:
+        """Remove every entry from both tiers."""
+        with self._memory_lock:
+            self._memory.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM llm_responses")
+                self._db.commit()
+
+    def close(self) -> None:
+        if self._db is not None:
+            with self._db_lock:
+                self._db.close()
+                self._db = None
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Hit/miss counters and tier sizes."""
+        lookups = self._counters["memory_hits"] + self._counters["disk_hits"] + self._counters["misses"]
+        hits = self._counters["memory_hits"] + self._counters["disk_hits"]
+        return {
+            **self._counters,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "disk_enabled": self._db is not None,
+        }
+
+
+_response_cache: Optional[LLMResponseCache] = None
+_response_cache_initialized = False
+_response_cache_lock = threading.Lock()
+
+
+def get_llm_response_cache() -> Optional[LLMResponseCache]:
+    """
+    Return the process-wide response cache, creating it from the environment on
+    first use. Returns None unless LLM_CACHE_ENABLED is set.
+
+    Environment:
+        LLM_CACHE_ENABLED: "false" (default) or "true".
+        LLM_CACHE_TTL_SECONDS: Entry lifetime (default one week).
+        LLM_CACHE_MAX_ENTRIES: In-memory LRU size (default 1000).
+        LLM_CACHE_PATH: Absolute path of the SQLite file for the disk tier. Unset
+                        keeps the cache in memory only.
+        LLM_CACHE_MAX_DISK_ENTRIES: Row limit for the disk tier (default 50000).
+
+    Raises:
+        ValueError: If LLM_CACHE_PATH is set to a relative path.
+    """
+    global _response_cache, _response_cache_initialized
+    if _response_cache_initialized:
+        return _response_cache
+    with _response_cache_lock:
+        if not _response_cache_initialized:
+            if os.getenv("LLM_CACHE_ENABLED", "false").lower() in ("1", "true", "yes"):
+                db_path = os.getenv("LLM_CACHE_PATH") or None
+                if db_path is not None and not os.path.isabs(db_path):
+                    raise ValueError(
+                        f"LLM_CACHE_PATH must be an absolute path, got {db_path!r}"
+                    )
+                _response_cache = LLMResponseCache(
+                    ttl_seconds=float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600))),
+                    max_memory_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1000")),
+                    db_path=db_path,
+                    max_disk_entries=int(os.getenv("LLM_CACHE_MAX_DISK_ENTRIES", "50000"))
+                )
+            _response_cache_initialized = True
+    return _response_cache
+
+
+def get_llm_response_cache_metrics() -> Dict[str, Any]:
+    """Metrics for the shared cache, or a disabled marker."""
+    if _response_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **_response_cache.get_metrics()}
@@ -0,0 +1,249 @@
+# backend/src/utils/llm/llm_scheduler.py
+"""
+Per-provider admission control for LLM calls.
+
+Batch pack generation fans out one task per topic/difficulty and one per
+incorrect-answer batch, so without a cap a large pack can put dozens of
+requests in flight at once and trip provider rate limits. Each provider gets
+one LLMScheduler that combines:
+
+- a max-in-flight limit,
+- requests-per-minute and tokens-per-minute token buckets,
+- a priority queue, so interactive calls (JSON repair, single-question
+  incorrect answers) are admitted before bulk generation.
+"""
+
+import os
+import heapq
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Dict, List, Optional, Any
+
+logger = logging.getLogger(__name__)
+
+
+class LLMPriority(IntEnum):
+    """Admission priority for LLM calls (lower value is admitted first)."""
+    INTERACTIVE = 0
+    NORMAL = 1
+    BULK = 2
+
+
+def estimate_tokens(prompt: str, max_tokens: int) -> int:
+    """Rough token cost of a call: ~4 characters per prompt token plus the completion budget."""
+    return len(prompt) // 4 + max_tokens
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at a per-minute rate.
+    A rate of 0 disables the limit.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate_per_second > 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate_per_second)
+        self.updated_at = now
+
+    def clamp(self, amount: float) -> float:
+        """Requests larger than the bucket can never be satisfied; cap them at capacity."""
+        return min(amount, self.capacity) if self.enabled else amount
+
+    def seconds_until_available(self, amount: float) -> float:
+        if not self.enabled:
+            return 0.0
+        self._refill()
+        amount = self.clamp(amount)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate_per_second
+
+    def consume(self, amount: float) -> None:
+        if self.enabled:
+            self._refill()
+            self.tokens -= self.clamp(amount)
+
+
+class LLMScheduler:
+    """
+    Admission controller for a single LLM provider.
+
+    Usage:
+        async with scheduler.slot(LLMPriority.BULK, estimated_tokens):
+            await client.call(...)
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        max_in_flight: int = 8,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0
+    ):
+        self.provider = provider
+        self.max_in_flight = max(1, max_in_flight)
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+
+        self._waiters: List[list] = [] # Heap of [priority, seq, future, tokens, enqueued_at]
+        self._sequence = itertools.count()
+        self._in_flight = 0
+        self._wakeup_handle: Optional[asyncio.TimerHandle] = None
+
+        # Metrics
+        self._admitted = 0
+        self._admitted_by_priority: Dict[str, int] = {p.name: 0 for p in LLMPriority}
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._last_wait = 0.0
+
+    @asynccontextmanager
+    async def slot(self, priority: LLMPriority = LLMPriority.NORMAL, estimated_tokens: int = 0):
+        """Wait for admission, hold the slot for the duration of the block, then release it."""
+        await self.acquire(priority, estimated_tokens)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, priority: LLMPriority = LLMPriority.NORMAL, estimated_tokens: int = 0) -> None:
+        """Wait until this call is admitted."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        entry = [int(priority), next(self._sequence), future, estimated_tokens, time.monotonic()]
+        heapq.heappush(self._waiters, entry)
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Admitted just before cancellation: give the slot back
+                self.release()
+            else:
+                # Cancelled while queued: the entry is skipped lazily by _dispatch
+                self._dispatch()
+            raise
+
+    def release(self) -> None:
+        """Release a slot previously granted by acquire()."""
+        self._in_flight = max(0, self._in_flight - 1)
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Admit waiters in priority order while capacity and rate budget allow."""
+        while self._waiters:
+            priority, _, future, tokens, enqueued_at = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters) # Cancelled while waiting
+                continue
+            if self._in_flight >= self.max_in_flight:
+                return
+
+            delay = max(
+                self.request_bucket.seconds_until_available(1),
+                self.token_bucket.seconds_until_available(tokens)
+            )
+            if delay > 0:
+                self._schedule_wakeup(delay)
+                return
+
+            heapq.heappop(self._waiters)
+            self.request_bucket.consume(1)
+            self.token_bucket.consume(tokens)
+            self._in_flight += 1
+
+            waited = time.monotonic() - enqueued_at
+            self._admitted += 1
+            self._admitted_by_priority[LLMPriority(priority).name] += 1
+            self._total_wait += waited
+            self._last_wait = waited
+            self._max_wait = max(self._max_wait, waited)
+            if waited > 1.0:
+                logger.info(f"LLM call for provider '{self.provider}' admitted after waiting {waited:.2f}s (priority {LLMPriority(priority).name})")
+            future.set_result(None)
+
+    def _schedule_wakeup(self, delay: float) -> None:
+        if self._wakeup_handle is not None and not self._wakeup_handle.cancelled():
+            return
+        loop = asyncio.get_running_loop()
+
+        def _wake():
+            self._wakeup_handle = None
+            self._dispatch()
+
+        self._wakeup_handle = loop.call_later(delay, _wake)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Snapshot of queue depth, in-flight calls and admission wait times."""
+        queued_by_priority = {p.name: 0 for p in LLMPriority}
+        for priority, _, future, _, _ in self._waiters:
+            if not future.done():
+                queued_by_priority[LLMPriority(priority).name] += 1
+        oldest_wait = max(
+            (time.monotonic() - entry[4] for entry in self._waiters if not entry[2].done()),
+            default=0.0
+        )
+        return {
+            "provider": self.provider,
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self._in_flight,
+            "queue_depth": sum(queued_by_priority.values()),
+            "queue_depth_by_priority": queued_by_priority,
+            "oldest_queued_wait_seconds": round(oldest_wait, 3),
+            "admitted_total": self._admitted,
+            "admitted_by_priority": dict(self._admitted_by_priority),
+            "avg_wait_seconds": round(self._total_wait / self._admitted, 3) if self._admitted else 0.0,
+            "max_wait_seconds": round(self._max_wait, 3),
+            "last_wait_seconds": round(self._last_wait, 3),
+        }
+
+
+def _env_number(provider: str, name: str, default: str) -> float:
+    """Read LLM_<PROVIDER>_<NAME>, falling back to LLM_<NAME> and then the default."""
+    return float(os.getenv(f"LLM_{provider.upper()}_{name}", os.getenv(f"LLM_{name}", default)))
+
+
+_schedulers: Dict[str, LLMScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_llm_scheduler(provider: str) -> LLMScheduler:
+    """
+    Return the process-wide scheduler for a provider, creating it from the
+    environment on first use (LLM_MAX_IN_FLIGHT, LLM_REQUESTS_PER_MINUTE,
+    LLM_TOKENS_PER_MINUTE, each overridable per provider, e.g. LLM_OPENAI_MAX_IN_FLIGHT).
+    """
+    provider = provider.lower()
+    scheduler = _schedulers.get(provider)
+    if scheduler is None:
+        with _schedulers_lock:
+            scheduler = _schedulers.get(provider)
+            if scheduler is None:
+                scheduler = LLMScheduler(
+                    provider=provider,
+                    max_in_flight=int(_env_number(provider, "MAX_IN_FLIGHT", "8")),
+                    requests_per_minute=_env_number(provider, "REQUESTS_PER_MINUTE", "0"),
+                    tokens_per_minute=_env_number(provider, "TOKENS_PER_MINUTE", "0")
+                )
+                _schedulers[provider] = scheduler
+    return scheduler
+
+
+def get_llm_scheduler_metrics() -> Dict[str, Dict[str, Any]]:
+    """Metrics for every provider scheduler created so far."""
+    return {provider: scheduler.get_metrics() for provider, scheduler in _schedulers.items()}
@@ -1,7 +1,23 @@
 # backend/src/utils/llm/llm_service.py
-from typing import Optional, Dict, Any
+import os
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, AsyncIterator, Callable
 from ...config.config import LLMConfig
 from ..document_processing.processors import clean_text, normalize_text
+from .llm_scheduler import LLMScheduler, LLMPriority, get_llm_scheduler, estimate_tokens
+from .llm_response_cache import LLMResponseCache, get_llm_response_cache, make_cache_key
+from .replay_client import record_cassette
+
+SYSTEM_PROMPT = "You are a helpful assistant that creates high-quality trivia content."
+
+# Bounded pool used when a provider has no native async client, so blocking
+# SDK calls never run on the event loop thread.
+_sync_fallback_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("LLM_SYNC_FALLBACK_WORKERS", "8")),
+    thread_name_prefix="llm-sync"
+)
 
 class LLMService:
     """
@@ -9,20 +25,36 @@ class LLMService:
     Abstracts the details of different LLM providers.
     """
     
-    def __init__(self, llm_config: Optional[LLMConfig] = None):
+    def __init__(self, llm_config: Optional[LLMConfig] = None, scheduler: Optional[LLMScheduler] = None,
+                 cache: Optional[LLMResponseCache] = None):
         """
         Initialize the LLM service with configuration.
         
         Args:
             llm_config: Configuration for LLM providers. If None, uses default config.
+            scheduler: Admission scheduler for async calls. If None, uses the provider's shared scheduler.
+            cache: Response cache. If None, uses the shared cache (when LLM_CACHE_ENABLED).
         """
         self.llm_config = llm_config or LLMConfig()
         self.client = self.llm_config.get_client()
+        self.async_client = self.llm_config.get_async_client()
         self.model = self.llm_config.get_model()
         self.provider = self.llm_config.get_provider()
+        self.scheduler = scheduler or get_llm_scheduler(self.provider)
+        self.cache = cache or get_llm_response_cache()
+        # Record prompt/response pairs for the replay provider when set
+        self.record_cassette_dir = os.getenv("LLM_RECORD_CASSETTE_DIR") or None
+
+    def _cache_key(self, prompt: str, temperature: float, max_tokens: int) -> str:
+        return make_cache_key(self.provider, self.model, SYSTEM_PROMPT, prompt, temperature, max_tokens)
+
+    @staticmethod
+    def _should_cache(response: str, cache_if: Optional[Callable[[str], bool]]) -> bool:
+        return cache_if is None or cache_if(response)
     
     def generate_content(self, prompt: str, temperature: float = 0.7, max_tokens: int = 1000, 
-                         clean_prompt: bool = False) -> str:
+                         clean_prompt: bool = False, use_cache: bool = True,
+                         cache_if: Optional[Callable[[str], bool]] = None) -> str:
         """
         Generate content using the configured LLM provider.
         
@@ -31,6 +63,10 @@ class LLMService:
             temperature: Controls randomness (0-1), higher = more random
             max_tokens: Maximum number of tokens to generate
             clean_prompt: Whether to clean and normalize the prompt text
+            use_cache: Serve identical earlier requests from the response cache.
+                       Pass False for creative calls that should vary between runs.
+            cache_if: Store the response only when this returns True, e.g. only
+                      JSON that parses without an LLM repair pass.
             
         Returns:
             String containing the raw LLM response
@@ -38,23 +74,221 @@ class LLMService:
         # Clean prompt if requested - using utility from document_processing
         if clean_prompt:
             prompt = clean_text(prompt, remove_extra_whitespace=True)
-        
+
+        if self.cache is None:
+            return self._generate(prompt, temperature, max_tokens)
+        if not use_cache:
+            self.cache.record_bypass()
+            return self._generate(prompt, temperature, max_tokens)
+
+        key = self._cache_key(prompt, temperature, max_tokens)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        response = self._generate(prompt, temperature, max_tokens)
+        if self._should_cache(response, cache_if):
+            self.cache.set(key, response)
+        return response
+
+    def _generate(self, prompt: str, temperature: float, max_tokens: int) -> str:
+        """Dispatch a synchronous call to the provider's API."""
         # Call appropriate method based on provider
         if self.provider == "openai":
-            return self._generate_with_openai(prompt, temperature, max_tokens)
+            response = self._generate_with_openai(prompt, temperature, max_tokens)
         elif self.provider == "anthropic":
-            return self._generate_with_anthropic(prompt, temperature, max_tokens)
+            response = self._generate_with_anthropic(prompt, temperature, max_tokens)
         elif self.provider == "gemini":
-            return self._generate_with_gemini(prompt, temperature, max_tokens)
+            response = self._generate_with_gemini(prompt, temperature, max_tokens)
+        elif self.provider == "replay":
+            response = self.client.generate(prompt, temperature, max_tokens)
         else:
             raise ValueError(f"Unsupported LLM provider: {self.provider}")
+        self._maybe_record(prompt, response)
+        return response
+
+    def _maybe_record(self, prompt: str, response: str) -> None:
+        if self.record_cassette_dir and self.provider != "replay":
+            record_cassette(self.record_cassette_dir, prompt, response)
+
+    async def agenerate_content(self, prompt: str, temperature: float = 0.7, max_tokens: int = 1000,
+                                clean_prompt: bool = False,
+                                priority: LLMPriority = LLMPriority.NORMAL,
+                                use_cache: bool = True,
+                                cache_if: Optional[Callable[[str], bool]] = None) -> str:
+        """
+        Generate content without blocking the event loop.
+
+        Uses the provider's native async client when available and otherwise
+        runs the synchronous call on a bounded thread pool. Cache hits return
+        immediately; every other call is admitted through the provider
+        scheduler first.
+
+        Args:
+            prompt: The prompt to send to the LLM
+            temperature: Controls randomness (0-1), higher = more random
+            max_tokens: Maximum number of tokens to generate
+            clean_prompt: Whether to clean and normalize the prompt text
+            priority: Admission priority relative to other queued calls
+            use_cache: Serve identical earlier requests from the response cache.
+                       Pass False for creative calls that should vary between runs.
+            cache_if: Store the response only when this returns True, e.g. only
+                      JSON that parses without an LLM repair pass.
+
+        Returns:
+            String containing the raw LLM response
+        """
+        if clean_prompt:
+            prompt = clean_text(prompt, remove_extra_whitespace=True)
+
+        key = None
+        if self.cache is not None:
+            if use_cache:
+                key = self._cache_key(prompt, temperature, max_tokens)
+                cached = await self.cache.aget(key)
+                if cached is not None:
+                    return cached
+            else:
+                self.cache.record_bypass()
+
+        async with self.scheduler.slot(priority, estimate_tokens(prompt, max_tokens)):
+            response = await self._agenerate(prompt, temperature, max_tokens)
+
+        if key is not None and self._should_cache(response, cache_if):
+            await self.cache.aset(key, response)
+        return response
+
+    async def astream_content(self, prompt: str, temperature: float = 0.7, max_tokens: int = 1000,
+                              clean_prompt: bool = False,
+                              priority: LLMPriority = LLMPriority.NORMAL,
+                              use_cache: bool = True,
+                              cache_if: Optional[Callable[[str], bool]] = None) -> AsyncIterator[str]:
+        """
+        Stream generated text as the provider produces it.
+
+        The scheduler slot is held until the stream is exhausted or closed.
+        Cache hits and providers without a native async client yield the
+        whole response as a single chunk.
+
+        Args:
+            prompt: The prompt to send to the LLM
+            temperature: Controls randomness (0-1), higher = more random
+            max_tokens: Maximum number of tokens to generate
+            clean_prompt: Whether to clean and normalize the prompt text
+            priority: Admission priority relative to other queued calls
+            use_cache: Serve identical earlier requests from the response cache.
+            cache_if: Store the complete response only when this returns True.
+
+        Yields:
+            Text chunks in the order they were generated
+        """
+        if clean_prompt:
+            prompt = clean_text(prompt, remove_extra_whitespace=True)
+
+        key = None
+        if self.cache is not None:
+            if use_cache:
+                key = self._cache_key(prompt, temperature, max_tokens)
+                cached = await self.cache.aget(key)
+                if cached is not None:
+                    yield cached
+                    return
+            else:
+                self.cache.record_bypass()
+
+        parts = []
+        async with self.scheduler.slot(priority, estimate_tokens(prompt, max_tokens)):
+            async for chunk in self._astream(prompt, temperature, max_tokens):
+                if chunk:
+                    parts.append(chunk)
+                    yield chunk
+
+        response = "".join(parts)
+        self._maybe_record(prompt, response)
+        if key is not None and self._should_cache(response, cache_if):
+            await self.cache.aset(key, response)
+
+    async def _astream(self, prompt: str, temperature: float, max_tokens: int) -> AsyncIterator[str]:
+        """Dispatch an admitted streaming call to the provider's async API."""
+        if self.async_client is None:
+            loop = asyncio.get_running_loop()
+            yield await loop.run_in_executor(
+                _sync_fallback_executor,
+                functools.partial(self._generate, prompt, temperature, max_tokens)
+            )
+            return
+
+        if self.provider == "openai":
+            stream = await self.async_client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        elif self.provider == "anthropic":
+            async with self.async_client.messages.stream(
+                model=self.model,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                system=SYSTEM_PROMPT,
+                messages=[
+                    {"role": "user", "content": prompt}
+                ]
+            ) as stream:
+                async for text in stream.text_stream:
+                    yield text
+        elif self.provider == "gemini":
+            model = self.async_client.GenerativeModel(self.model)
+            response = await model.generate_content_async(
+                prompt,
+                generation_config={
+                    "temperature": temperature,
+                    "max_output_tokens": max_tokens
+                },
+                stream=True
+            )
+            async for chunk in response:
+                yield chunk.text
+        elif self.provider == "replay":
+            async for chunk in self.async_client.astream(prompt, temperature, max_tokens):
+                yield chunk
+        else:
+            raise ValueError(f"Unsupported LLM provider: {self.provider}")
+
+    async def _agenerate(self, prompt: str, temperature: float, max_tokens: int) -> str:
+        """Dispatch an admitted call to the provider's async API."""
+        if self.async_client is None:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                _sync_fallback_executor,
+                functools.partial(self._generate, prompt, temperature, max_tokens)
+            )
+
+        if self.provider == "openai":
+            response = await self._agenerate_with_openai(prompt, temperature, max_tokens)
+        elif self.provider == "anthropic":
+            response = await self._agenerate_with_anthropic(prompt, temperature, max_tokens)
+        elif self.provider == "gemini":
+            response = await self._agenerate_with_gemini(prompt, temperature, max_tokens)
+        elif self.provider == "replay":
+            response = await self.async_client.agenerate(prompt, temperature, max_tokens)
+        else:
+            raise ValueError(f"Unsupported LLM provider: {self.provider}")
+        self._maybe_record(prompt, response)
+        return response
     
     def _generate_with_openai(self, prompt: str, temperature: float, max_tokens: int) -> str:
         """Generate content using OpenAI API."""
         response = self.client.chat.completions.create(
             model=self.model,
             messages=[
-                {"role": "system", "content": "You are a helpful assistant that creates high-quality trivia content."},
+                {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": prompt}
             ],
             temperature=temperature,
@@ -68,7 +302,7 @@ class LLMService:
             model=self.model,
             max_tokens=max_tokens,
             temperature=temperature,
-            system="You are a helpful assistant that creates high-quality trivia content.",
+            system=SYSTEM_PROMPT,
             messages=[
                 {"role": "user", "content": prompt}
             ]
@@ -87,6 +321,44 @@ class LLMService:
             }
         )
         return response.text
+
+    async def _agenerate_with_openai(self, prompt: str, temperature: float, max_tokens: int) -> str:
+        """Generate content using the async OpenAI client."""
+        response = await self.async_client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+        return response.choices[0].message.content
+
+    async def _agenerate_with_anthropic(self, prompt: str, temperature: float, max_tokens: int) -> str:
+        """Generate content using the async Anthropic client."""
+        message = await self.async_client.messages.create(
+            model=self.model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            system=SYSTEM_PROMPT,
+            messages=[
+                {"role": "user", "content": prompt}
+            ]
+        )
+        return message.content[0].text
+
+    async def _agenerate_with_gemini(self, prompt: str, temperature: float, max_tokens: int) -> str:
+        """Generate content using Gemini's async model API."""
+        model = self.async_client.GenerativeModel(self.model)
+        response = await model.generate_content_async(
+            prompt,
+            generation_config={
+                "temperature": temperature,
+                "max_output_tokens": max_tokens
+            }
+        )
+        return response.text
     
     def process_llm_response(self, response: str, normalize: bool = True, 
                            remove_extra_whitespace: bool = True) -> str:
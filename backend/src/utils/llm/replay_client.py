@@ -0,0 +1,215 @@
+# backend/src/utils/llm/replay_client.py
+"""
+Offline LLM client for benchmarks and tests.
+
+Selected with LLM_PROVIDER=replay (or "fake"). No network access or API key
+is needed. A response is produced in one of two ways:
+
+1. A recorded response from the cassette directory, looked up by the SHA-256
+   of the prompt (<hash>.json with a "response" key). Cassettes are written
+   by any provider when LLM_RECORD_CASSETTE_DIR is set.
+2. Otherwise a well-formed response synthesized from the prompt's shape
+   (questions, incorrect answers, topics, difficulty descriptions, seed
+   extraction, JSON repair, custom instructions).
+
+Latency and failures can be injected to exercise retries and fan-out.
+
+Environment:
+    LLM_REPLAY_CASSETTE_DIR: Directory of recorded responses.
+    LLM_REPLAY_LATENCY_MS: Simulated latency per call (default 0).
+    LLM_REPLAY_JITTER_MS: Uniform random extra latency (default 0).
+    LLM_REPLAY_FAILURE_RATE: Probability (0-1) that a call raises (default 0).
+    LLM_REPLAY_SEED: Seed for jitter and failure injection.
+"""
+
+import os
+import re
+import json
+import time
+import random
+import asyncio
+import hashlib
+import logging
+from typing import Optional, List, Dict, Any, AsyncIterator
+
+logger = logging.getLogger(__name__)
+
+
+class ReplayInjectedError(Exception):
+    """Raised by the replay client when failure injection triggers."""
+    pass
+
+
+def prompt_hash(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+def record_cassette(cassette_dir: str, prompt: str, response: str) -> None:
+    """Save a prompt/response pair so the replay provider can serve it later."""
+    try:
+        os.makedirs(cassette_dir, exist_ok=True)
+        path = os.path.join(cassette_dir, f"{prompt_hash(prompt)}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"prompt": prompt, "response": response}, f, ensure_ascii=False, indent=2)
+    except OSError as e:
+        logger.warning(f"Could not record LLM cassette in {cassette_dir}: {e}")
+
+
+# Matches a JSON string body, including escaped quotes
+_JSON_STRING = r'"((?:[^"\\]|\\.)*)"'
+
+
+def _unescape(value: str) -> str:
+    try:
+        return json.loads(f'"{value}"')
+    except json.JSONDecodeError:
+        return value
+
+
+class ReplayLLMClient:
+    """
+    Deterministic stand-in for a provider SDK client.
+    """
+
+    def __init__(
+        self,
+        cassette_dir: Optional[str] = None,
+        latency_ms: float = 0,
+        jitter_ms: float = 0,
+        failure_rate: float = 0.0,
+        seed: Optional[int] = None
+    ):
+        self.cassette_dir = cassette_dir
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self.calls = 0
+        self.cassette_hits = 0
+        self.injected_failures = 0
+
+    @classmethod
+    def from_env(cls) -> "ReplayLLMClient":
+        seed = os.getenv("LLM_REPLAY_SEED")
+        return cls(
+            cassette_dir=os.getenv("LLM_REPLAY_CASSETTE_DIR") or None,
+            latency_ms=float(os.getenv("LLM_REPLAY_LATENCY_MS", "0")),
+            jitter_ms=float(os.getenv("LLM_REPLAY_JITTER_MS", "0")),
+            failure_rate=float(os.getenv("LLM_REPLAY_FAILURE_RATE", "0")),
+            seed=int(seed) if seed else None
+        )
+
+    # --- Call entry points ---
+
+    def generate(self, prompt: str, temperature: float = 0.7, max_tokens: int = 1000) -> str:
+        delay = self._before_call()
+        if delay:
+            time.sleep(delay)
+        return self._respond(prompt)
+
+    async def agenerate(self, prompt: str, temperature: float = 0.7, max_tokens: int = 1000) -> str:
+        delay = self._before_call()
+        if delay:
+            await asyncio.sleep(delay)
+        return self._respond(prompt)
+
+    async def astream(self, prompt: str, temperature: float = 0.7, max_tokens: int = 1000,
+                      chunk_chars: int = 40) -> AsyncIterator[str]:
+        """Yield the response in small chunks, spreading the simulated latency across them."""
+        delay = self._before_call()
+        response = self._respond(prompt)
+        chunks = [response[i:i + chunk_chars] for i in range(0, len(response), chunk_chars)] or [""]
+        per_chunk_delay = delay / len(chunks)
+        for chunk in chunks:
+            if per_chunk_delay:
+                await asyncio.sleep(per_chunk_delay)
+            yield chunk
+
+    def _before_call(self) -> float:
+        """Count the call, apply failure injection and return the simulated latency in seconds."""
+        self.calls += 1
+        if self.failure_rate > 0 and self._random.random() < self.failure_rate:
+            self.injected_failures += 1
+            raise ReplayInjectedError("Injected replay provider failure")
+        jitter = self._random.uniform(0, self.jitter_ms) if self.jitter_ms > 0 else 0
+        return (self.latency_ms + jitter) / 1000.0
+
+    def _respond(self, prompt: str) -> str:
+        recorded = self._load_cassette(prompt)
+        if recorded is not None:
+            self.cassette_hits += 1
+            return recorded
+        return self.synthesize(prompt)
+
+    def _load_cassette(self, prompt: str) -> Optional[str]:
+        if not self.cassette_dir:
+            return None
+        path = os.path.join(self.cassette_dir, f"{prompt_hash(prompt)}.json")
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)["response"]
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Unreadable LLM cassette {path}: {e}")
+            return None
+
+    # --- Synthesis ---
+
+    def synthesize(self, prompt: str) -> str:
+        """Build a well-formed response from the shape of the prompt."""
+        tag = prompt_hash(prompt)[:8]
+
+        match = re.search(r"Generate (\d+) plausible but incorrect answers", prompt)
+        if match:
+            return self._synthesize_incorrect_answers(prompt, int(match.group(1)))
+
+        match = re.search(r'Generate (\d+) trivia questions about "(.*?)"', prompt)
+        if match:
+            return self._synthesize_questions(int(match.group(1)), match.group(2), prompt, tag)
+
+        match = re.search(r"Generate (\d+) (?:new )?specific topics for a trivia pack named \"(.*?)\"", prompt)
+        if match:
+            count, pack_name = int(match.group(1)), match.group(2)
+            return json.dumps([f"{pack_name}: Replay topic {i + 1} ({tag})" for i in range(count)], indent=2)
+
+        if "difficulty level descriptions" in prompt:
+            return "\n".join(
+                f"{level}: Replay {level.lower()} questions ({tag})."
+                for level in ("Easy", "Medium", "Hard", "Expert", "Mixed")
+            )
+
+        if "Extract all question-answer pairs" in prompt:
+            return json.dumps({f"Replay extracted question {i + 1} ({tag})?": f"Answer {i + 1}" for i in range(3)}, indent=2)
+
+        match = re.search(r"```\n(.*?)\n```", prompt, re.DOTALL)
+        if match and "JSON" in prompt:
+            return match.group(1) # JSON repair: echo the embedded JSON
+
+        return f"Replay instructions ({tag}): keep questions concise, factual and specific to the topic."
+
+    def _synthesize_questions(self, count: int, topic: str, prompt: str, tag: str) -> str:
+        difficulty = re.search(r"TARGET difficulty level for these questions is: (\w+)", prompt)
+        difficulty_str = difficulty.group(1) if difficulty else "Medium"
+        return json.dumps([
+            {
+                "question": f"Replay {difficulty_str} question {i + 1} about {topic} ({tag})?",
+                "answer": f"Replay answer {i + 1} ({tag})"
+            }
+            for i in range(count)
+        ], indent=2)
+
+    def _synthesize_incorrect_answers(self, prompt: str, count: int) -> str:
+        pattern = re.compile(
+            r'"question_id":\s*' + _JSON_STRING + r',\s*"question":\s*' + _JSON_STRING
+            + r',\s*"correct_answer":\s*' + _JSON_STRING
+        )
+        items: List[Dict[str, Any]] = []
+        for question_id, question, answer in pattern.findall(prompt):
+            answer_text = _unescape(answer)
+            items.append({
+                "question_id": _unescape(question_id),
+                "question": _unescape(question),
+                "incorrect_answers": [f"Not {answer_text} #{i + 1}" for i in range(count)]
+            })
+        return json.dumps(items, indent=2)
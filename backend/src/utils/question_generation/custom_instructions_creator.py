@@ -9,6 +9,7 @@ from typing import Dict, List, Optional
 import logging
 # Assuming LLMService and clean_text are correctly imported
 from ..llm.llm_service import LLMService
+from ..llm.llm_client_registry import get_llm_service
 from ..document_processing.processors import clean_text
 
 # Configure logger
@@ -26,9 +27,9 @@ class CustomInstructionsCreator:
         Initialize with required services.
 
         Args:
-            llm_service: Service for LLM interactions. If None, creates a new instance.
+            llm_service: Service for LLM interactions. If None, uses the shared pooled instance.
         """
-        self.llm_service = llm_service or LLMService()
+        self.llm_service = llm_service or get_llm_service()
 
     async def generate_custom_instructions(self,
                                          pack_topic: str,
@@ -50,7 +51,7 @@ class CustomInstructionsCreator:
         try:
             # Generate instructions using LLM
             # No change needed here, just uses the generated prompt
-            raw_response = self.llm_service.generate_content(prompt)
+            raw_response = await self.llm_service.agenerate_content(prompt)
             processed_response = self.llm_service.process_llm_response(raw_response)
 
             # Log success
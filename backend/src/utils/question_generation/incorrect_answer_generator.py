@@ -6,6 +6,8 @@ import time
 import math # Import math for ceiling
 
 from ..llm.llm_service import LLMService
+from ..llm.llm_client_registry import get_llm_service
+from ..llm.llm_scheduler import LLMPriority
 from ..document_processing.processors import clean_text
 from ..llm.llm_parsing_utils import parse_json_from_llm
 from ...models.question import Question
@@ -15,9 +17,11 @@ logger = logging.getLogger(__name__)
 # --- Define Custom Exception ---
 class IncorrectAnswerGenerationError(Exception):
     """Custom exception for failures in generating incorrect answers."""
-    def __init__(self, message: str, failed_question_ids: List[str]):
+    def __init__(self, message: str, failed_question_ids: List[str],
+                 partial_results: Optional[List[Tuple[str, List[str]]]] = None):
         self.message = message
         self.failed_question_ids = failed_question_ids
+        self.partial_results = partial_results or [] # (question_id, answers) for questions that did succeed
         super().__init__(f"{message} Failed for question IDs: {', '.join(failed_question_ids)}")
 # --- End Custom Exception ---
 
@@ -46,7 +50,7 @@ class IncorrectAnswerGenerator:
     Raises an error if generation fails for any question after retries.
     """
     def __init__(self, llm_service: Optional[LLMService] = None):
-        self.llm_service = llm_service or LLMService()
+        self.llm_service = llm_service or get_llm_service()
         self.debug_enabled = False
 
     async def generate_incorrect_answers(
@@ -55,7 +59,8 @@ class IncorrectAnswerGenerator:
         num_incorrect_answers: int = 3,
         batch_size: int = 5,
         max_retries: int = 1, # If > 0, allows one retry attempt with smaller batches
-        debug_mode: bool = False
+        debug_mode: bool = False,
+        priority: LLMPriority = LLMPriority.BULK
     ) -> List[Tuple[str, List[str]]]:
         """
         Generate incorrect answers for a list of questions with retries.
@@ -66,6 +71,7 @@ class IncorrectAnswerGenerator:
             batch_size: Initial number of questions per LLM call.
             max_retries: If > 0, allows one retry attempt with a smaller batch size.
             debug_mode: Enable verbose debug output.
+            priority: Scheduler priority of the LLM calls (INTERACTIVE when a user is waiting on the result).
 
         Returns:
             List of tuples (question_id, incorrect_answers_list). Contains entries
@@ -96,7 +102,7 @@ class IncorrectAnswerGenerator:
             if self.debug_enabled:
                 print(f"  Creating task for Initial Batch {batch_idx+1}/{len(initial_batches)} ({len(batch)} questions)")
             task = asyncio.create_task(
-                self._process_batch(batch, num_incorrect_answers, batch_idx, len(initial_batches), is_retry=False)
+                self._process_batch(batch, num_incorrect_answers, batch_idx, len(initial_batches), is_retry=False, priority=priority)
             )
             tasks.append(task)
 
@@ -129,7 +135,7 @@ class IncorrectAnswerGenerator:
                 if self.debug_enabled:
                     print(f"  Creating task for Retry Batch {batch_idx+1}/{len(retry_batches)} ({len(batch)} questions)")
                 task = asyncio.create_task(
-                    self._process_batch(batch, num_incorrect_answers, batch_idx, len(retry_batches), is_retry=True)
+                    self._process_batch(batch, num_incorrect_answers, batch_idx, len(retry_batches), is_retry=True, priority=priority)
                 )
                 retry_tasks.append(task)
 
@@ -157,7 +163,7 @@ class IncorrectAnswerGenerator:
             error_msg = f"Failed to generate incorrect answers for {len(final_failed_ids)} questions after {max_retries+1} attempts."
             logger.error(error_msg + f" Failed IDs: {final_failed_ids}")
             # Raise the custom error instead of generating fallbacks
-            raise IncorrectAnswerGenerationError(error_msg, final_failed_ids)
+            raise IncorrectAnswerGenerationError(error_msg, final_failed_ids, partial_results=list(all_results_map.items()))
         else:
             # All questions succeeded, format the results
             final_results = [(q_id, all_results_map[q_id]) for q_id in original_question_map.keys() if q_id in all_results_map] # Maintain order if possible
@@ -187,7 +193,8 @@ class IncorrectAnswerGenerator:
         num_incorrect_answers: int,
         batch_idx: int,
         total_batches: int,
-        is_retry: bool = False
+        is_retry: bool = False,
+        priority: LLMPriority = LLMPriority.BULK
     ) -> List[Tuple[str, List[str]]]:
         """
         Process a single batch, returning results ONLY for successes in this call.
@@ -211,10 +218,12 @@ class IncorrectAnswerGenerator:
         prompt = self._build_incorrect_answers_prompt(question_data_for_prompt, num_incorrect_answers)
 
         try:
-            raw_response = self.llm_service.generate_content(
+            raw_response = await self.llm_service.agenerate_content(
                 prompt=prompt,
                 temperature=0.7, # Consider slightly higher temp for retries?
-                max_tokens=2000
+                max_tokens=2000,
+                priority=priority,
+                use_cache=False # Creative: retries should produce different distractors
             )
 
             if self.debug_enabled:
@@ -3,6 +3,7 @@ import re
 from typing import List, Dict, Optional, Any
 import logging # Added logging
 from ..llm.llm_service import LLMService
+from ..llm.llm_client_registry import get_llm_service
 from ..document_processing.processors import clean_text, normalize_text, split_into_chunks
 
 # Configure logger
@@ -19,9 +20,9 @@ class PackDifficultyCreation:
         Initialize with required services.
 
         Args:
-            llm_service: Service for LLM interactions. If None, creates a new instance.
+            llm_service: Service for LLM interactions. If None, uses the shared pooled instance.
         """
-        self.llm_service = llm_service or LLMService()
+        self.llm_service = llm_service or get_llm_service()
 
         # Default base descriptions for each difficulty level
         self.base_descriptions = {
@@ -52,7 +53,7 @@ class PackDifficultyCreation:
 
         try: # Added try/except for robustness
             # Generate descriptions using LLM
-            raw_response = self.llm_service.generate_content(prompt)
+            raw_response = await self.llm_service.agenerate_content(prompt)
             processed_response = self.llm_service.process_llm_response(raw_response)
 
             # Parse the response
@@ -2,6 +2,7 @@
 import logging
 from typing import List, Optional
 from ..llm.llm_service import LLMService
+from ..llm.llm_client_registry import get_llm_service
 from ..document_processing.processors import clean_text, normalize_text
 from ..llm.llm_parsing_utils import parse_json_from_llm
 
@@ -47,9 +48,9 @@ class PackTopicCreation:
         Initialize with required services.
 
         Args:
-            llm_service: Service for LLM interactions. If None, creates a new instance.
+            llm_service: Service for LLM interactions. If None, uses the shared pooled instance.
         """
-        self.llm_service = llm_service or LLMService()
+        self.llm_service = llm_service or get_llm_service()
 
     # --- UPDATED METHOD SIGNATURE ---
     async def create_pack_topics(self, pack_name: str,
@@ -84,7 +85,7 @@ class PackTopicCreation:
 
         try: # Added try/except
             # Generate topics using LLM
-            raw_response = self.llm_service.generate_content(prompt)
+            raw_response = await self.llm_service.agenerate_content(prompt, use_cache=False)
 
             # Parse the raw response directly into JSON
             default_topics = []
@@ -199,7 +200,7 @@ DO NOT include any additional text, explanations, or markdown - ONLY return the
 
         try: # Added try/except
             # Generate additional topics
-            raw_response = self.llm_service.generate_content(additional_prompt)
+            raw_response = await self.llm_service.agenerate_content(additional_prompt, use_cache=False)
 
             # Parse the raw response directly into JSON
             default_topics = []
@@ -4,14 +4,16 @@ Utility for generating trivia questions using LLM based on pack topics and diffi
 """
 
 import json
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Optional, Union, AsyncIterator
 import logging
 import traceback
 
 # --- UPDATED IMPORTS ---
 from ...models.question import DifficultyLevel, Question # Keep Question import for type hint if needed elsewhere, though not directly used here
 from ..llm.llm_service import LLMService
-from ..llm.llm_parsing_utils import parse_json_from_llm
+from ..llm.llm_client_registry import get_llm_service
+from ..llm.llm_scheduler import LLMPriority
+from ..llm.llm_parsing_utils import parse_json_from_llm, IncrementalJsonArrayParser
 from ..document_processing.processors import clean_text
 # --- END UPDATED IMPORTS ---
 
@@ -44,9 +46,9 @@ class QuestionGenerator:
         Initialize the question generator with services.
 
         Args:
-            llm_service: Service for LLM interactions. If None, creates a new instance.
+            llm_service: Service for LLM interactions. If None, uses the shared pooled instance.
         """
-        self.llm_service = llm_service or LLMService()
+        self.llm_service = llm_service or get_llm_service()
         self.debug_enabled = False
         self.last_raw_response = None
         self.last_processed_questions = None
@@ -108,10 +110,12 @@ class QuestionGenerator:
 
         try:
             # Generate questions using LLM
-            raw_response = self.llm_service.generate_content(
+            raw_response = await self.llm_service.agenerate_content(
                 prompt=prompt,
                 temperature=0.7,
-                max_tokens=2000
+                max_tokens=2000,
+                priority=LLMPriority.BULK,
+                use_cache=False # Creative: re-runs should produce new questions
             )
 
             self.last_raw_response = raw_response
@@ -151,6 +155,89 @@ class QuestionGenerator:
                 print("================================\n")
             return []
 
+    async def stream_questions(
+        self,
+        pack_id: str,
+        pack_name: str,
+        pack_topic: str,
+        difficulty: Union[str, DifficultyLevel],
+        difficulty_descriptions: Dict[str, Dict[str, str]],
+        seed_questions: Dict[str, str] = None,
+        custom_instructions: Optional[str] = None,
+        num_questions: int = 5,
+        debug_mode: bool = False
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Generate questions for a topic and difficulty, yielding each one as soon
+        as its JSON object is complete in the provider's token stream.
+
+        Takes the same arguments as generate_questions(). If the stream cannot
+        be parsed incrementally (e.g. malformed JSON), the full response goes
+        through parse_json_from_llm and any questions not already yielded are
+        emitted at the end.
+
+        Yields:
+            Question data dictionaries ready to be stored.
+        """
+        self.debug_enabled = debug_mode
+
+        if isinstance(difficulty, DifficultyLevel):
+            difficulty_str = difficulty.value.capitalize()
+        else:
+            difficulty_str = difficulty.capitalize()
+        target_difficulty = self._resolve_difficulty(difficulty_str)
+
+        prompt = self._build_question_generation_prompt(
+            pack_name=pack_name,
+            pack_topic=pack_topic,
+            difficulty=difficulty_str,
+            difficulty_descriptions=difficulty_descriptions,
+            seed_questions=seed_questions,
+            custom_instructions=custom_instructions,
+            num_questions=num_questions
+        )
+
+        parser = IncrementalJsonArrayParser()
+        emitted_texts = set()
+        emitted: List[Dict[str, Any]] = []
+        try:
+            async for chunk in self.llm_service.astream_content(
+                prompt=prompt,
+                temperature=0.7,
+                max_tokens=2000,
+                priority=LLMPriority.BULK,
+                use_cache=False # Creative: re-runs should produce new questions
+            ):
+                for item in parser.feed(chunk):
+                    question_dict = self._structure_question_item(item, pack_id, pack_topic, target_difficulty)
+                    if question_dict and question_dict["question"] not in emitted_texts:
+                        emitted_texts.add(question_dict["question"])
+                        emitted.append(question_dict)
+                        yield question_dict
+        except Exception as e:
+            logger.error(f"Error streaming questions for topic '{pack_topic}': {str(e)}")
+            if not parser.text:
+                return
+
+        self.last_raw_response = parser.text
+
+        if parser.errors or not parser.finished or not emitted:
+            # Fall back to the tolerant (and LLM-repairing) parser for anything the stream missed
+            if parser.text:
+                logger.info(f"Streamed parse for topic '{pack_topic}' incomplete ({parser.items_emitted} items, {parser.errors} errors); re-parsing full response")
+                for question_dict in await self._process_question_response(
+                    response=parser.text,
+                    pack_id=pack_id,
+                    pack_topic=pack_topic,
+                    difficulty_str=difficulty_str
+                ):
+                    if question_dict["question"] not in emitted_texts:
+                        emitted_texts.add(question_dict["question"])
+                        emitted.append(question_dict)
+                        yield question_dict
+
+        self.last_processed_questions = emitted
+
     def _format_all_difficulty_descriptions(
         self,
         difficulty_descriptions: Dict[str, Dict[str, str]]
@@ -246,11 +333,7 @@ class QuestionGenerator:
         difficulty_str: str
     ) -> List[Dict[str, Any]]:
         """Process the LLM response into structured question data."""
-        try:
-            target_difficulty = DifficultyLevel(difficulty_str.lower())
-        except ValueError:
-            logger.warning(f"Invalid target difficulty level '{difficulty_str}', defaulting to MEDIUM")
-            target_difficulty = DifficultyLevel.MEDIUM
+        target_difficulty = self._resolve_difficulty(difficulty_str)
 
         questions_data = await parse_json_from_llm(response, [])
 
@@ -263,28 +346,47 @@ class QuestionGenerator:
         structured_questions = []
         if isinstance(questions_data, list):
             for item in questions_data:
-                if isinstance(item, dict) and "question" in item and "answer" in item:
-                    question_text = clean_text(item["question"])
-                    answer_text = clean_text(item["answer"])
-                    if not question_text or not answer_text:
-                        logger.warning(f"Skipping question with empty content/answer: {item}")
-                        continue
-                    question_dict = {
-                        "question": question_text,
-                        "answer": answer_text,
-                        "pack_id": pack_id,
-                        "pack_topics_item": pack_topic,
-                        "difficulty_initial": target_difficulty,
-                        "difficulty_current": target_difficulty
-                    }
+                question_dict = self._structure_question_item(item, pack_id, pack_topic, target_difficulty)
+                if question_dict:
                     structured_questions.append(question_dict)
-                    if self.debug_enabled:
-                        print(f"Structured question: {json.dumps(question_dict, default=lambda x: x.value if isinstance(x, DifficultyLevel) else str(x))}")
-                else:
-                    logger.warning(f"Skipping invalid question format in LLM response: {item}")
         else:
             logger.error(f"Failed to parse questions response as a list: {type(questions_data)}")
             if self.debug_enabled:
                 print(f"Failed to parse questions response as a list. Type: {type(questions_data)}")
 
-        return structured_questions
\ No newline at end of file
+        return structured_questions
+
+    def _resolve_difficulty(self, difficulty_str: str) -> DifficultyLevel:
+        try:
+            return DifficultyLevel(difficulty_str.lower())
+        except ValueError:
+            logger.warning(f"Invalid target difficulty level '{difficulty_str}', defaulting to MEDIUM")
+            return DifficultyLevel.MEDIUM
+
+    def _structure_question_item(
+        self,
+        item: Any,
+        pack_id: str,
+        pack_topic: str,
+        target_difficulty: DifficultyLevel
+    ) -> Optional[Dict[str, Any]]:
+        """Validate and clean one parsed {question, answer} item. Returns None if unusable."""
+        if not (isinstance(item, dict) and "question" in item and "answer" in item):
+            logger.warning(f"Skipping invalid question format in LLM response: {item}")
+            return None
+        question_text = clean_text(item["question"])
+        answer_text = clean_text(item["answer"])
+        if not question_text or not answer_text:
+            logger.warning(f"Skipping question with empty content/answer: {item}")
+            return None
+        question_dict = {
+            "question": question_text,
+            "answer": answer_text,
+            "pack_id": pack_id,
+            "pack_topics_item": pack_topic,
+            "difficulty_initial": target_difficulty,
+            "difficulty_current": target_difficulty
+        }
+        if self.debug_enabled:
+            print(f"Structured question: {json.dumps(question_dict, default=lambda x: x.value if isinstance(x, DifficultyLevel) else str(x))}")
+        return question_dict
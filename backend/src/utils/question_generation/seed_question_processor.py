@@ -11,8 +11,9 @@ import re
 from typing import Dict, Optional
 import logging
 from ...utils.llm.llm_service import LLMService
+from ...utils.llm.llm_client_registry import get_llm_service
 from ...utils.document_processing.processors import clean_text
-from ...utils.llm.llm_parsing_utils import parse_json_from_llm
+from ...utils.llm.llm_parsing_utils import parse_json_from_llm, parses_without_repair
 
 # Configure logger
 logger = logging.getLogger(__name__)
@@ -28,9 +29,9 @@ class SeedQuestionProcessor:
         Initialize with LLM service.
         
         Args:
-            llm_service: Service for LLM interactions. If None, creates a new instance.
+            llm_service: Service for LLM interactions. If None, uses the shared pooled instance.
         """
-        self.llm_service = llm_service or LLMService()
+        self.llm_service = llm_service or get_llm_service()
     
     async def process_csv_content(self, csv_content: str, 
                                   question_column: str = "question", 
@@ -129,8 +130,11 @@ class SeedQuestionProcessor:
         # Create prompt for LLM
         prompt = self._build_extraction_prompt(cleaned_text)
         
-        # Generate JSON using LLM (CHANGED: removed await)
-        raw_response = self.llm_service.generate_content(prompt)
+        # Generate JSON using LLM
+        raw_response = await self.llm_service.agenerate_content(
+            prompt,
+            cache_if=lambda response: parses_without_repair(self.llm_service.process_llm_response(response))
+        )
         processed_response = self.llm_service.process_llm_response(raw_response)
         
         # Parse the JSON response
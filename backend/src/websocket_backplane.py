@@ -0,0 +1,572 @@
+# backend/src/websocket_backplane.py
+"""
+Pub/sub backplane for WebSocket broadcasts across workers.
+
+ConnectionManager publishes a broadcast on the backplane and every worker
+subscribed to the room, the publisher included, delivers it to its own
+connections. Workers only subscribe to the rooms they have connections in, so
+room traffic reaches just the processes that need it.
+
+With Redis, a room's broadcasts are numbered by Redis as they are published
+(one seq/epoch counter per room), and the number travels with the message.
+The room's event logs on every worker therefore agree on seq and epoch, and a
+client can resume from its last seq on whichever worker it reconnects to.
+
+Which users are connected to a room, on any worker, is kept in a shared
+presence set per room.
+
+A started game's state (its GameRoom, question deadlines and buffered answers)
+lives on one worker, the room's owner, recorded under a per-room owner key.
+Game commands that reach another worker are forwarded to the owner over the
+backplane (call) and run there, so only the owner ever changes the game.
+
+Backplanes:
+- InProcessBackplane (default): single process, nothing to publish.
+- RedisBackplane: Redis PUBLISH/SUBSCRIBE over a minimal RESP client, usable
+  with Redis or any server speaking the same protocol.
+
+Selected by WS_BACKPLANE_URL (unset = in-process, redis://[:password@]host:port).
+"""
+
+import os
+import uuid
+import json
+import asyncio
+import logging
+from urllib.parse import unquote, urlparse
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "trivia:room:"
+WORKER_CHANNEL_PREFIX = "trivia:worker:"
+OWNER_KEY_PREFIX = "trivia:room-owner:"
+PRESENCE_KEY_PREFIX = "trivia:presence:"
+ROOM_LOG_KEY_PREFIX = "trivia:room-log:"
+
+# Called with (game_id, message_type, message_json, exclude_user_id, seq, epoch) for broadcasts received
+# from the backplane; seq/epoch are the room's shared sequence (None if the backplane does not assign one)
+DeliverCallback = Callable[[str, Optional[str], str, Optional[str], Optional[int], Optional[str]], None]
+# Called with (method, params) for game commands forwarded by other workers; returns a JSON-serializable result
+CommandHandler = Callable[[str, Dict[str, Any]], Awaitable[Any]]
+
+
+class RemoteCommandError(Exception):
+    """A game command forwarded to another worker failed there or got no reply."""
+
+
+class Backplane:
+    """
+    Base backplane. Subclasses publish a worker's broadcasts to the other
+    workers and hand messages received for subscribed rooms to the deliver
+    callback set by ConnectionManager. A distributed backplane delivers a
+    worker's own broadcasts back to it too, with the room's shared seq/epoch.
+    """
+
+    distributed = False
+
+    def __init__(self):
+        self.worker_id = uuid.uuid4().hex
+        self._deliver: Optional[DeliverCallback] = None
+        self._command_handler: Optional[CommandHandler] = None
+
+    def set_handler(self, deliver: DeliverCallback) -> None:
+        self._deliver = deliver
+
+    def set_command_handler(self, handler: CommandHandler) -> None:
+        self._command_handler = handler
+
+    def publish(self, game_id: str, message_type: Optional[str], message_json: str, exclude_user_id: Optional[str] = None) -> None:
+        """Send a broadcast to the workers subscribed to its room. Never blocks."""
+
+    def subscribe(self, game_id: str) -> None:
+        """Start receiving broadcasts for a room (first local connection joined)."""
+
+    def unsubscribe(self, game_id: str) -> None:
+        """Stop receiving broadcasts for a room (last local connection left)."""
+
+    def add_presence(self, game_id: str, user_id: str) -> None:
+        """Record that a user is connected to a room on this worker."""
+
+    def remove_presence(self, game_id: str, user_id: str) -> None:
+        """Record that a user's connection to a room on this worker is gone."""
+
+    async def present_user_ids(self, game_id: str) -> Optional[Set[str]]:
+        """Users connected to a room on any worker, or None if this worker's connections are all there are."""
+        return None
+
+    async def claim_room(self, game_id: str) -> bool:
+        """Record this worker as the owner of a room's game state. False if another worker owns it."""
+        return True
+
+    def release_room(self, game_id: str) -> None:
+        """Give up ownership of a room (its game state has been dropped)."""
+
+    async def room_owner(self, game_id: str) -> Optional[str]:
+        """The worker owning a room's game state, if it is another worker."""
+        return None
+
+    async def call(self, worker_id: str, method: str, params: Dict[str, Any]) -> Any:
+        """
+        Run a game command on another worker and return its result.
+
+        Raises:
+            ValueError: The command was rejected there (as it would have been locally).
+            RemoteCommandError: The worker could not be reached or the command failed.
+        """
+        raise RemoteCommandError(f"Worker {worker_id} is not reachable from a single-process backplane")
+
+    async def aclose(self) -> None:
+        pass
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {"type": self.__class__.__name__}
+
+
+class InProcessBackplane(Backplane):
+    """Default for a single process: every connection is local, so nothing is published."""
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {"type": "in_process"}
+
+
+class RespError(Exception):
+    """Error reply from the pub/sub server."""
+
+
+async def read_resp(reader: asyncio.StreamReader) -> Any:
+    """Read one RESP2 value (simple string, error, integer, bulk string or array)."""
+    line = await reader.readuntil(b"\r\n")
+    kind, body = line[:1], line[1:-2]
+    if kind == b"+":
+        return body.decode("utf-8")
+    if kind == b"-":
+        raise RespError(body.decode("utf-8"))
+    if kind == b":":
+        return int(body)
+    if kind == b"$":
+        length = int(body)
+        if length < 0:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2]
+    if kind == b"*":
+        count = int(body)
+        if count < 0:
+            return None
+        return [await read_resp(reader) for _ in range(count)]
+    raise RespError(f"Unexpected RESP type byte {kind!r}")
+
+
+def encode_command(*parts: Any) -> bytes:
+    """Encode a command as a RESP array of bulk strings."""
+    out = [b"*%d\r\n" % len(parts)]
+    for part in parts:
+        data = part if isinstance(part, bytes) else str(part).encode("utf-8")
+        out.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(out)
+
+
+# Number a room broadcast and publish it with its seq/epoch, atomically, so channel order is seq order.
+# KEYS: room log hash, room channel. ARGV: envelope JSON, epoch to use for a new log, log TTL (ms).
+_PUBLISH_SEQUENCED_SCRIPT = """
+local seq = redis.call('HINCRBY', KEYS[1], 'seq', 1)
+redis.call('HSETNX', KEYS[1], 'epoch', ARGV[2])
+local epoch = redis.call('HGET', KEYS[1], 'epoch')
+redis.call('PEXPIRE', KEYS[1], ARGV[3])
+redis.call('PUBLISH', KEYS[2], '{"seq":' .. seq .. ',"epoch":"' .. epoch .. '",' .. string.sub(ARGV[1], 2))
+return seq
+"""
+
+# A room's seq/epoch counter is dropped after this long without broadcasts (a new one starts a new epoch)
+ROOM_LOG_TTL_SECONDS = 24 * 3600
+
+# Idle presence sets expire after this (each new connection extends it)
+PRESENCE_TTL_SECONDS = 6 * 3600
+
+# Renew the owner key only while this worker still holds it (or nobody does, after an expiry)
+_RENEW_OWNER_SCRIPT = """
+local owner = redis.call('GET', KEYS[1])
+if owner and owner ~= ARGV[1] then return 0 end
+redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+return 1
+"""
+
+# Delete the owner key only if this worker holds it
+_RELEASE_OWNER_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then return redis.call('DEL', KEYS[1]) end
+return 0
+"""
+
+
+class RedisBackplane(Backplane):
+    """
+    Backplane over Redis pub/sub (one channel per room, one per worker).
+
+    Uses two connections: a publisher that pipelines queued commands (sequenced
+    room publishes, worker messages, presence and owner-key commands) and a subscriber that tracks this worker's room
+    subscriptions and its own worker channel, on which forwarded game commands
+    and their replies arrive. Both reconnect with backoff; subscriptions are
+    restored after a reconnect. Publishes queue up (bounded by max_pending)
+    while the publisher is reconnecting; a batch in flight when the connection
+    drops is lost, and commands waiting on a reply in it fail.
+
+    Room owner keys expire after owner_ttl unless renewed, so the rooms of a
+    worker that died are released; its unflushed game state is lost with it.
+    Presence members are "user_id:worker_id"; a worker removes its own on
+    disconnect and on shutdown. Members left by a worker that died stay until
+    the room's presence key expires, which only delays early question closes
+    to the question deadline.
+    """
+
+    distributed = True
+
+    def __init__(
+        self,
+        url: str,
+        max_pending: int = 10000,
+        reconnect_delay: float = 0.5,
+        owner_ttl: Optional[float] = None,
+        call_timeout: Optional[float] = None
+    ):
+        super().__init__()
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.username = unquote(parsed.username) if parsed.username else None
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.max_pending = max_pending
+        self.reconnect_delay = reconnect_delay
+        self.owner_ttl = float(owner_ttl or os.getenv("WS_ROOM_OWNER_TTL", "30"))
+        self.call_timeout = float(call_timeout or os.getenv("WS_BACKPLANE_CALL_TIMEOUT", "10"))
+        self.worker_channel = WORKER_CHANNEL_PREFIX + self.worker_id
+
+        # (encoded command, future for its reply or None)
+        self._outbox: "asyncio.Queue[Tuple[bytes, Optional[asyncio.Future]]]" = asyncio.Queue()
+        self._channels: Set[str] = set()
+        self._owned_rooms: Set[str] = set()
+        self._local_presence: Set[Tuple[str, str]] = set() # (game_id, user_id) connected here, removed from the presence sets on close
+        self._calls: Dict[str, asyncio.Future] = {} # call ID -> reply, for calls this worker is waiting on
+        self._serving: Set[asyncio.Task] = set()
+        self._sub_writer: Optional[asyncio.StreamWriter] = None
+        self._tasks: List[asyncio.Task] = []
+        self._closed = False
+        self._counters: Dict[str, int] = {
+            "published": 0,
+            "publish_dropped": 0,
+            "received": 0,
+            "received_own": 0,
+            "calls_sent": 0,
+            "calls_served": 0,
+            "call_failures": 0,
+            "reconnects": 0,
+            "errors": 0,
+        }
+
+    # --- Public API ---
+
+    def publish(self, game_id: str, message_type: Optional[str], message_json: str, exclude_user_id: Optional[str] = None) -> None:
+        if self._closed:
+            return
+        self._ensure_started()
+        if self._outbox.qsize() >= self.max_pending:
+            self._counters["publish_dropped"] += 1
+            return
+        envelope = json.dumps(
+            {"origin": self.worker_id, "room": game_id, "type": message_type, "exclude": exclude_user_id, "message": message_json},
+            separators=(",", ":")
+        )
+        self._outbox.put_nowait((encode_command(
+            "EVAL", _PUBLISH_SEQUENCED_SCRIPT, 2, ROOM_LOG_KEY_PREFIX + game_id, CHANNEL_PREFIX + game_id,
+            envelope, uuid.uuid4().hex[:12], int(ROOM_LOG_TTL_SECONDS * 1000)
+        ), None))
+
+    def subscribe(self, game_id: str) -> None:
+        channel = CHANNEL_PREFIX + game_id
+        if channel in self._channels:
+            return
+        self._channels.add(channel)
+        self._ensure_started()
+        self._send_subscription("SUBSCRIBE", channel)
+
+    def unsubscribe(self, game_id: str) -> None:
+        channel = CHANNEL_PREFIX + game_id
+        if channel not in self._channels:
+            return
+        self._channels.discard(channel)
+        self._send_subscription("UNSUBSCRIBE", channel)
+
+    def add_presence(self, game_id: str, user_id: str) -> None:
+        if self._closed:
+            return
+        self._ensure_started()
+        key = PRESENCE_KEY_PREFIX + game_id
+        self._local_presence.add((game_id, user_id))
+        self._outbox.put_nowait((encode_command("SADD", key, f"{user_id}:{self.worker_id}"), None))
+        self._outbox.put_nowait((encode_command("PEXPIRE", key, int(PRESENCE_TTL_SECONDS * 1000)), None))
+
+    def remove_presence(self, game_id: str, user_id: str) -> None:
+        self._local_presence.discard((game_id, user_id))
+        if not self._closed:
+            self._outbox.put_nowait((encode_command("SREM", PRESENCE_KEY_PREFIX + game_id, f"{user_id}:{self.worker_id}"), None))
+
+    async def present_user_ids(self, game_id: str) -> Optional[Set[str]]:
+        members = await self._command("SMEMBERS", PRESENCE_KEY_PREFIX + game_id)
+        return {member.decode("utf-8").rpartition(":")[0] for member in members or ()}
+
+    async def claim_room(self, game_id: str) -> bool:
+        key = OWNER_KEY_PREFIX + game_id
+        claimed = await self._command("SET", key, self.worker_id, "NX", "PX", int(self.owner_ttl * 1000))
+        if claimed is None and await self._command("GET", key) != self.worker_id.encode("utf-8"):
+            return False
+        self._owned_rooms.add(game_id)
+        return True
+
+    def release_room(self, game_id: str) -> None:
+        if game_id not in self._owned_rooms:
+            return
+        self._owned_rooms.discard(game_id)
+        if not self._closed:
+            self._outbox.put_nowait((encode_command("EVAL", _RELEASE_OWNER_SCRIPT, 1, OWNER_KEY_PREFIX + game_id, self.worker_id), None))
+
+    async def room_owner(self, game_id: str) -> Optional[str]:
+        if game_id in self._owned_rooms:
+            return None
+        owner = await self._command("GET", OWNER_KEY_PREFIX + game_id)
+        if owner is None:
+            return None
+        owner = owner.decode("utf-8")
+        return None if owner == self.worker_id else owner
+
+    async def call(self, worker_id: str, method: str, params: Dict[str, Any]) -> Any:
+        call_id = uuid.uuid4().hex
+        reply = asyncio.get_running_loop().create_future()
+        self._calls[call_id] = reply
+        self._counters["calls_sent"] += 1
+        try:
+            request = json.dumps(
+                {"kind": "call", "origin": self.worker_id, "id": call_id, "method": method, "params": params},
+                separators=(",", ":"), default=str
+            )
+            receivers = await self._command("PUBLISH", WORKER_CHANNEL_PREFIX + worker_id, request)
+            if not receivers:
+                raise RemoteCommandError(f"Worker {worker_id} is not connected to the backplane")
+            return await asyncio.wait_for(reply, self.call_timeout)
+        except asyncio.TimeoutError:
+            self._counters["call_failures"] += 1
+            raise RemoteCommandError(f"No reply from worker {worker_id} to {method} within {self.call_timeout:.0f}s") from None
+        except RemoteCommandError:
+            self._counters["call_failures"] += 1
+            raise
+        finally:
+            self._calls.pop(call_id, None)
+
+    async def aclose(self) -> None:
+        if self._tasks and (self._owned_rooms or self._local_presence):
+            # Hand the rooms back so other workers stop forwarding to this one, and drop this worker's users from presence
+            cleanup = [
+                self._command("EVAL", _RELEASE_OWNER_SCRIPT, 1, OWNER_KEY_PREFIX + game_id, self.worker_id)
+                for game_id in self._owned_rooms
+            ] + [
+                self._command("SREM", PRESENCE_KEY_PREFIX + game_id, f"{user_id}:{self.worker_id}")
+                for game_id, user_id in self._local_presence
+            ]
+            await asyncio.gather(*cleanup, return_exceptions=True)
+        self._owned_rooms.clear()
+        self._local_presence.clear()
+        self._closed = True
+        for task in self._tasks + list(self._serving):
+            task.cancel()
+        await asyncio.gather(*self._tasks, *self._serving, return_exceptions=True)
+        self._tasks.clear()
+        for reply in self._calls.values():
+            if not reply.done():
+                reply.set_exception(RemoteCommandError("Backplane closed"))
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "type": "redis",
+            "endpoint": f"{self.host}:{self.port}",
+            "subscribed_rooms": len(self._channels),
+            "owned_rooms": len(self._owned_rooms),
+            "pending_publishes": self._outbox.qsize(),
+            "pending_calls": len(self._calls),
+            "subscriber_connected": self._sub_writer is not None,
+            **self._counters,
+        }
+
+    # --- Connections ---
+
+    def _ensure_started(self) -> None:
+        if not self._tasks and not self._closed:
+            self._tasks = [
+                asyncio.create_task(self._run_publisher()),
+                asyncio.create_task(self._run_subscriber()),
+                asyncio.create_task(self._run_owner_renewal()),
+            ]
+
+    async def _command(self, *parts: Any) -> Any:
+        """Send a command on the publisher connection and wait for its reply."""
+        if self._closed:
+            raise RemoteCommandError("Backplane closed")
+        self._ensure_started()
+        reply = asyncio.get_running_loop().create_future()
+        self._outbox.put_nowait((encode_command(*parts), reply))
+        try:
+            return await asyncio.wait_for(reply, self.call_timeout)
+        except asyncio.TimeoutError:
+            raise RemoteCommandError(f"No reply from {self.host}:{self.port} to {parts[0]}") from None
+
+    async def _open(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        if self.password:
+            # Redis 6 ACL users authenticate with AUTH <username> <password>
+            credentials = (self.username, self.password) if self.username else (self.password,)
+            writer.write(encode_command("AUTH", *credentials))
+            await writer.drain()
+            await read_resp(reader)
+        if self.db:
+            writer.write(encode_command("SELECT", self.db))
+            await writer.drain()
+            await read_resp(reader)
+        return reader, writer
+
+    def _send_subscription(self, command: str, channel: str) -> None:
+        # Replies arrive on the subscriber's read loop; while disconnected the
+        # channel set is replayed on reconnect instead
+        if self._sub_writer is not None:
+            self._sub_writer.write(encode_command(command, channel))
+
+    async def _run_publisher(self) -> None:
+        while not self._closed:
+            writer = None
+            batch: List[Tuple[bytes, Optional[asyncio.Future]]] = []
+            try:
+                reader, writer = await self._open()
+                while True:
+                    batch = [await self._outbox.get()]
+                    while not self._outbox.empty():
+                        batch.append(self._outbox.get_nowait())
+                    writer.write(b"".join(data for data, _ in batch))
+                    await writer.drain()
+                    for _, reply in batch:
+                        try:
+                            result: Any = await read_resp(reader)
+                        except RespError as e:
+                            result = e
+                        if reply is None:
+                            self._counters["published"] += 1
+                        elif not reply.done():
+                            if isinstance(result, RespError):
+                                reply.set_exception(result)
+                            else:
+                                reply.set_result(result)
+                    batch = []
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._counters["errors"] += 1
+                self._counters["reconnects"] += 1
+                logger.warning(f"Backplane publisher connection to {self.host}:{self.port} failed: {e}")
+                for _, reply in batch:
+                    if reply is not None and not reply.done():
+                        reply.set_exception(RemoteCommandError(f"Backplane connection lost: {e}"))
+                await asyncio.sleep(self.reconnect_delay)
+            finally:
+                if writer is not None:
+                    writer.close()
+
+    async def _run_subscriber(self) -> None:
+        while not self._closed:
+            writer = None
+            try:
+                reader, writer = await self._open()
+                writer.write(encode_command("SUBSCRIBE", self.worker_channel, *sorted(self._channels)))
+                self._sub_writer = writer
+                while True:
+                    reply = await read_resp(reader)
+                    if isinstance(reply, list) and len(reply) == 3 and reply[0] == b"message":
+                        self._on_message(reply[1], reply[2])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._counters["errors"] += 1
+                self._counters["reconnects"] += 1
+                logger.warning(f"Backplane subscriber connection to {self.host}:{self.port} failed: {e}")
+                await asyncio.sleep(self.reconnect_delay)
+            finally:
+                self._sub_writer = None
+                if writer is not None:
+                    writer.close()
+
+    async def _run_owner_renewal(self) -> None:
+        """Keep this worker's room owner keys from expiring while it holds the rooms."""
+        while not self._closed:
+            await asyncio.sleep(self.owner_ttl / 3)
+            ttl_ms = int(self.owner_ttl * 1000)
+            for game_id in list(self._owned_rooms):
+                self._outbox.put_nowait((encode_command("EVAL", _RENEW_OWNER_SCRIPT, 1, OWNER_KEY_PREFIX + game_id, self.worker_id, ttl_ms), None))
+
+    def _on_message(self, channel: bytes, data: bytes) -> None:
+        try:
+            envelope = json.loads(data)
+        except ValueError:
+            self._counters["errors"] += 1
+            return
+        if channel.decode("utf-8") == self.worker_channel:
+            self._on_worker_message(envelope)
+            return
+        self._counters["received_own" if envelope.get("origin") == self.worker_id else "received"] += 1
+        if self._deliver is not None:
+            self._deliver(
+                envelope["room"], envelope.get("type"), envelope["message"], envelope.get("exclude"),
+                envelope.get("seq"), envelope.get("epoch")
+            )
+
+    # --- Forwarded game commands ---
+
+    def _on_worker_message(self, envelope: Dict[str, Any]) -> None:
+        kind = envelope.get("kind")
+        if kind == "call":
+            task = asyncio.create_task(self._serve_call(envelope))
+            self._serving.add(task)
+            task.add_done_callback(self._serving.discard)
+        elif kind == "reply":
+            reply = self._calls.get(envelope.get("id"))
+            if reply is None or reply.done():
+                return # Caller timed out
+            if "error" not in envelope:
+                reply.set_result(envelope.get("result"))
+            elif envelope.get("rejected"):
+                reply.set_exception(ValueError(envelope["error"]))
+            else:
+                reply.set_exception(RemoteCommandError(envelope["error"]))
+
+    async def _serve_call(self, envelope: Dict[str, Any]) -> None:
+        response: Dict[str, Any] = {"kind": "reply", "id": envelope.get("id")}
+        method = envelope.get("method")
+        try:
+            if self._command_handler is None:
+                raise RemoteCommandError("No command handler on this worker")
+            response["result"] = await self._command_handler(method, envelope.get("params") or {})
+        except ValueError as e:
+            response.update(error=str(e), rejected=True)
+        except Exception as e:
+            logger.error(f"Forwarded game command {method} from worker {envelope.get('origin')} failed: {e}", exc_info=True)
+            response["error"] = f"Failed to process {method}"
+        self._counters["calls_served"] += 1
+        if not self._closed:
+            payload = json.dumps(response, separators=(",", ":"), default=str)
+            self._outbox.put_nowait((encode_command("PUBLISH", WORKER_CHANNEL_PREFIX + str(envelope.get("origin")), payload), None))
+
+
+def create_backplane(url: Optional[str] = None) -> Backplane:
+    """Backplane for WS_BACKPLANE_URL (in-process when unset)."""
+    url = url if url is not None else os.getenv("WS_BACKPLANE_URL", "")
+    if not url:
+        return InProcessBackplane()
+    scheme = urlparse(url).scheme
+    if scheme in ("redis", "resp", "tcp"):
+        return RedisBackplane(url)
+    raise ValueError(f"Unsupported WS_BACKPLANE_URL scheme: {scheme}")
@@ -0,0 +1,108 @@
+# backend/src/websocket_encoding.py
+"""
+Wire encodings for game WebSocket messages.
+
+Clients pick an encoding when they connect, either with a WebSocket
+subprotocol ("trivia.msgpack" / "trivia.json") or with ?encoding=msgpack.
+JSON text frames are the default and the fallback when MessagePack is not
+requested or the msgpack package is not installed. MessagePack is sent as
+binary frames.
+"""
+
+import json
+import logging
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+
+try:
+    import msgpack
+except ImportError: # Optional: without it every client gets JSON
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+JSON = "json"
+MSGPACK = "msgpack"
+
+# Subprotocol name -> encoding, in server preference order
+SUBPROTOCOLS: Dict[str, str] = {
+    "trivia.msgpack": MSGPACK,
+    "trivia.json": JSON,
+}
+
+Frame = Union[str, bytes]
+
+
+def available_encodings() -> Tuple[str, ...]:
+    return (MSGPACK, JSON) if msgpack is not None else (JSON,)
+
+
+def negotiate_encoding(offered_subprotocols: Iterable[str], requested: Optional[str] = None) -> Tuple[str, Optional[str]]:
+    """
+    Choose the encoding for a new connection.
+
+    Args:
+        offered_subprotocols: Subprotocols from the client's handshake.
+        requested: Encoding from the ?encoding= query parameter.
+
+    Returns:
+        Tuple of (encoding, subprotocol to accept, or None if the client offered none we support).
+    """
+    offered = set(offered_subprotocols or ())
+    supported = available_encodings()
+    for subprotocol, encoding in SUBPROTOCOLS.items():
+        if subprotocol in offered and encoding in supported:
+            return encoding, subprotocol
+    if requested and requested.lower() in supported:
+        return requested.lower(), None
+    if requested and requested.lower() != JSON:
+        logger.info(f"WebSocket encoding '{requested}' not available; falling back to JSON")
+    return JSON, None
+
+
+def encode(message: Dict[str, Any], encoding: str) -> Frame:
+    if encoding == MSGPACK:
+        return msgpack.packb(message, use_bin_type=True)
+    return json.dumps(message)
+
+
+def decode(frame: Frame) -> Dict[str, Any]:
+    """Decode a received frame: binary frames are MessagePack, text frames JSON."""
+    if isinstance(frame, (bytes, bytearray)):
+        if msgpack is None:
+            raise ValueError("Binary frames are not supported")
+        return msgpack.unpackb(frame, raw=False)
+    return json.loads(frame)
+
+
+class EncodedMessage:
+    """
+    One outgoing message, serialized at most once per encoding.
+
+    Built from the message's JSON text, plus the message dict (and fields
+    added to the JSON after serializing it) when the caller still has them,
+    which saves re-parsing the JSON for other encodings.
+    """
+
+    __slots__ = ("message_type", "_message", "_extra", "_frames")
+
+    def __init__(
+        self,
+        message_type: Optional[str],
+        message_json: str,
+        message: Optional[Dict[str, Any]] = None,
+        extra: Optional[Dict[str, Any]] = None
+    ):
+        self.message_type = message_type
+        self._message = message
+        self._extra = extra
+        self._frames: Dict[str, Frame] = {JSON: message_json}
+
+    def frame(self, encoding: str) -> Frame:
+        frame = self._frames.get(encoding)
+        if frame is None:
+            if self._message is None:
+                message = json.loads(self._frames[JSON])
+            else:
+                message = {**self._message, **self._extra} if self._extra else self._message
+            frame = self._frames[encoding] = encode(message, encoding)
+        return frame
@@ -0,0 +1,87 @@
+# backend/src/websocket_event_log.py
+"""
+Sequenced, bounded log of the broadcasts sent to a game room.
+
+Every room broadcast gets the next sequence number of its room log and is
+sent with "seq" and "epoch" fields. A client that reconnects with the last
+seq it saw (and the epoch it came from) is replayed only what it missed. If
+the events it needs are no longer buffered, or the log is a different one
+(a restart, or another worker with an in-process backplane), it gets a state
+snapshot instead.
+
+With a distributed backplane, broadcasts arrive already numbered with the
+room's shared seq/epoch; the log adopts them, so the room's logs on all
+workers agree and a client can resume on any of them.
+"""
+
+import time
+import uuid
+from collections import deque
+from typing import Deque, List, Optional, Tuple
+
+# Broadcasts kept per room for replay
+DEFAULT_EVENT_LOG_CAPACITY = 256
+
+
+def with_sequence(message_json: str, seq: int, epoch: str) -> str:
+    """Add seq/epoch fields to a serialized JSON object without re-serializing it."""
+    return f'{message_json[:-1]},"seq":{seq},"epoch":"{epoch}"}}' if message_json != "{}" else f'{{"seq":{seq},"epoch":"{epoch}"}}'
+
+
+class RoomEventLog:
+    """Ring buffer of one room's sequenced broadcasts."""
+
+    __slots__ = ("game_id", "epoch", "last_seq", "events", "last_activity")
+
+    def __init__(self, game_id: str, capacity: int = DEFAULT_EVENT_LOG_CAPACITY):
+        self.game_id = game_id
+        self.epoch = uuid.uuid4().hex[:12]
+        self.last_seq = 0
+        self.events: Deque[Tuple[int, Optional[str], str, Optional[str]]] = deque(maxlen=capacity) # (seq, message type, JSON with seq, excluded user)
+        self.last_activity = time.monotonic()
+
+    def append(
+        self,
+        message_type: Optional[str],
+        message_json: str,
+        exclude_user_id: Optional[str] = None,
+        seq: Optional[int] = None,
+        epoch: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Sequence a serialized broadcast. Returns it with its seq/epoch fields.
+
+        A broadcast numbered by the backplane passes its seq and epoch. Events
+        before a gap in that numbering (or from an earlier epoch) can no longer
+        be replayed, and a repeated seq is ignored (returns None).
+        """
+        if seq is None:
+            self.last_seq += 1
+        else:
+            if epoch != self.epoch:
+                self.epoch = epoch
+                self.events.clear()
+            elif seq <= self.last_seq:
+                return None
+            elif seq > self.last_seq + 1:
+                self.events.clear()
+            self.last_seq = seq
+        sequenced = with_sequence(message_json, self.last_seq, self.epoch)
+        self.events.append((self.last_seq, message_type, sequenced, exclude_user_id))
+        self.last_activity = time.monotonic()
+        return sequenced
+
+    def since(self, last_seq: int, epoch: Optional[str], user_id: Optional[str] = None) -> Optional[List[Tuple[Optional[str], str]]]:
+        """
+        (message type, JSON) of the events after last_seq that user_id received,
+        or None if they cannot be replayed from this log (different epoch,
+        evicted from the buffer, or a seq from the future).
+        """
+        if epoch != self.epoch or last_seq > self.last_seq:
+            return None
+        if last_seq == self.last_seq:
+            return []
+        oldest = self.events[0][0] if self.events else self.last_seq + 1
+        if last_seq + 1 < oldest:
+            return None
+        return [(message_type, text) for seq, message_type, text, excluded in self.events if seq > last_seq and (excluded is None or excluded != user_id)]
@@ -1,45 +1,214 @@
 # backend/src/websocket_manager.py
+import os
+import time
 import asyncio
 import json
 import logging
-from typing import Dict, List, Set, Optional
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
 from fastapi import WebSocket
 
+from .websocket_backplane import Backplane, InProcessBackplane
+from .websocket_event_log import RoomEventLog, DEFAULT_EVENT_LOG_CAPACITY
+from .websocket_encoding import JSON, EncodedMessage, Frame, encode
+
 logger = logging.getLogger(__name__)
 
+# What to do when a client's send queue is full
+SLOW_CONSUMER_POLICIES = ("drop", "coalesce", "disconnect")
+
+# Close code sent to clients evicted for falling behind (1013 = try again later)
+WS_CLOSE_SLOW_CONSUMER = 1013
+# Close code sent to a socket replaced by a newer one of the same user (normal closure: do not reconnect)
+WS_CLOSE_REPLACED = 1000
+
+
+class ClientConnection:
+    """
+    One client's WebSocket with its bounded outbound queue.
+
+    Messages are sent in order by a dedicated writer task, so a slow client
+    only ever delays its own messages.
+    """
+
+    __slots__ = (
+        "websocket", "game_id", "user_id", "encoding", "queue", "wakeup", "writer_task",
+        "sent", "bytes_sent", "dropped", "coalesced", "closed"
+    )
+
+    def __init__(self, websocket: WebSocket, game_id: str, user_id: str, encoding: str = JSON):
+        self.websocket = websocket
+        self.game_id = game_id
+        self.user_id = user_id
+        self.encoding = encoding
+        self.queue: Deque[Tuple[float, Optional[str], Frame]] = deque() # (enqueued_at, message type, text or binary frame)
+        self.wakeup = asyncio.Event()
+        self.writer_task: Optional[asyncio.Task] = None
+        self.sent = 0
+        self.bytes_sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.closed = False
+
+    def lag_ms(self, now: float) -> float:
+        """Age of the oldest queued message."""
+        return (now - self.queue[0][0]) * 1000 if self.queue else 0.0
+
+
 class ConnectionManager:
     """Manages active WebSocket connections for game rooms."""
 
-    def __init__(self):
-        # Structure: {game_id: {user_id: WebSocket}}
-        self.active_connections: Dict[str, Dict[str, WebSocket]] = {}
-        logger.info("ConnectionManager initialized.")
+    def __init__(
+        self,
+        max_queue_size: Optional[int] = None,
+        slow_consumer_policy: Optional[str] = None,
+        max_lag_ms: Optional[float] = None,
+        backplane: Optional[Backplane] = None,
+        event_log_capacity: Optional[int] = None,
+        event_log_retention_seconds: Optional[float] = None
+    ):
+        """
+        Initialize the manager.
+
+        Args:
+            max_queue_size: Messages buffered per connection (WS_SEND_QUEUE_SIZE, default 256).
+            slow_consumer_policy: Applied when a connection's queue is full
+                (WS_SLOW_CONSUMER_POLICY, default "disconnect"):
+                "disconnect" closes the connection, and the client reconnects
+                and resumes from its last seq (or gets a snapshot); "drop"
+                discards the oldest queued message and "coalesce" replaces the
+                oldest queued message of the same type (else drops the oldest).
+                The client is not told about messages lost to drop/coalesce,
+                so use them only when every message type is superseded by later ones.
+            max_lag_ms: Under the "disconnect" policy, a connection whose oldest
+                queued message is older than this is also closed (WS_MAX_LAG_MS, default 5000).
+            backplane: Carries broadcasts to connections held by other workers.
+                Defaults to InProcessBackplane (single process).
+            event_log_capacity: Broadcasts kept per room for reconnect replay (WS_EVENT_LOG_SIZE, default 256).
+            event_log_retention_seconds: How long a room's log (and its backplane
+                subscription) outlives its last local connection (WS_EVENT_LOG_RETENTION, default 600).
+        """
+        self.max_queue_size = max(1, int(max_queue_size or os.getenv("WS_SEND_QUEUE_SIZE", "256")))
+        self.slow_consumer_policy = (slow_consumer_policy or os.getenv("WS_SLOW_CONSUMER_POLICY", "disconnect")).lower()
+        if self.slow_consumer_policy not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(f"Invalid slow consumer policy: {self.slow_consumer_policy}")
+        self.max_lag_ms = float(max_lag_ms or os.getenv("WS_MAX_LAG_MS", "5000"))
 
-    async def connect(self, websocket: WebSocket, game_id: str, user_id: str):
-        """Accepts and stores a new WebSocket connection."""
-        await websocket.accept()
+        # Structure: {game_id: {user_id: ClientConnection}}
+        self.active_connections: Dict[str, Dict[str, ClientConnection]] = {}
+        self.backplane = backplane or InProcessBackplane()
+        self.backplane.set_handler(self._deliver_broadcast)
+        self.event_log_capacity = max(1, int(event_log_capacity or os.getenv("WS_EVENT_LOG_SIZE", str(DEFAULT_EVENT_LOG_CAPACITY))))
+        self.event_log_retention_seconds = float(event_log_retention_seconds or os.getenv("WS_EVENT_LOG_RETENTION", "600"))
+        # {game_id: RoomEventLog}; kept past a room's last disconnect so a whole room can reconnect and resume
+        self.event_logs: Dict[str, RoomEventLog] = {}
+        self.replayed = 0
+        self.snapshots_required = 0
+        self._closing: Set[asyncio.Task] = set()
+        self.evicted = 0
+        self.send_failures = 0
+        logger.info(
+            f"ConnectionManager initialized (queue size {self.max_queue_size}, "
+            f"slow consumer policy '{self.slow_consumer_policy}', max lag {self.max_lag_ms:.0f}ms)."
+        )
+
+    async def connect(
+        self,
+        websocket: WebSocket,
+        game_id: str,
+        user_id: str,
+        last_seq: Optional[int] = None,
+        epoch: Optional[str] = None,
+        encoding: str = JSON,
+        subprotocol: Optional[str] = None
+    ) -> bool:
+        """
+        Accepts and stores a new WebSocket connection.
+
+        A reconnecting client passes the seq and epoch of the last broadcast it
+        received; the broadcasts it missed are queued for it ahead of new ones.
+        Messages to the connection are sent in its negotiated encoding
+        (see websocket_encoding.negotiate_encoding); subprotocol is echoed in the handshake.
+
+        Returns:
+            False if the client is resuming but its missed broadcasts are no
+            longer available (it needs a state snapshot), otherwise True.
+        """
+        await websocket.accept(subprotocol=subprotocol)
+        self._prune_event_logs()
+        if game_id not in self.event_logs:
+            self.event_logs[game_id] = RoomEventLog(game_id, self.event_log_capacity)
+            self.backplane.subscribe(game_id) # Receive this room's broadcasts from other workers
         if game_id not in self.active_connections:
             self.active_connections[game_id] = {}
-        self.active_connections[game_id][user_id] = websocket
+        previous = self.active_connections[game_id].get(user_id)
+        if previous is not None:
+            # Same user reconnected; the new socket takes over delivery and the old one is closed
+            self._stop_writer(previous)
+            self._close_later(previous.websocket, WS_CLOSE_REPLACED)
+        connection = ClientConnection(websocket, game_id, user_id, encoding)
+        connection.writer_task = asyncio.create_task(self._run_writer(connection))
+        self.active_connections[game_id][user_id] = connection
+        self.backplane.add_presence(game_id, user_id)
         logger.info(f"WebSocket connected: User {user_id} in Game {game_id}. Total in game: {len(self.active_connections[game_id])}")
-        # Optionally send a welcome message or current state upon connection
-        # await self.send_personal_message({"type": "status", "message": "Connected"}, websocket)
+        if last_seq is None:
+            return True
+        return self.replay_missed(game_id, user_id, last_seq, epoch) is not None
+
+    def replay_missed(
+        self,
+        game_id: str,
+        user_id: str,
+        last_seq: int,
+        epoch: Optional[str],
+        websocket: Optional[WebSocket] = None
+    ) -> Optional[int]:
+        """
+        Queue the room broadcasts a user missed after last_seq for their connection
+        (only if it is still websocket, when given).
+
+        Returns:
+            Number of broadcasts replayed, or None if they are not available
+            (the caller should send a state snapshot instead).
+        """
+        connection = self._connection(game_id, user_id, websocket)
+        log = self.event_logs.get(game_id)
+        missed = log.since(last_seq, epoch, user_id) if log is not None else None
+        if missed is None:
+            self.snapshots_required += 1
+            logger.info(f"User {user_id} in game {game_id} cannot resume from seq {last_seq} (epoch {epoch}); snapshot needed")
+            return None
+        if connection is not None:
+            for message_type, text in missed:
+                self._enqueue(connection, message_type, EncodedMessage(message_type, text).frame(connection.encoding))
+        self.replayed += len(missed)
+        logger.info(f"Replayed {len(missed)} missed broadcasts to user {user_id} in game {game_id} from seq {last_seq}")
+        return len(missed)
+
+    def room_position(self, game_id: str) -> Dict[str, Any]:
+        """seq/epoch of the latest broadcast in a room, sent with state snapshots."""
+        log = self.event_logs.get(game_id)
+        return {"seq": log.last_seq, "epoch": log.epoch} if log is not None else {"seq": 0, "epoch": None}
 
-    def disconnect(self, websocket: WebSocket, game_id: str, user_id: str):
-        """Removes a WebSocket connection."""
+    def disconnect(self, websocket: WebSocket, game_id: str, user_id: str) -> bool:
+        """
+        Removes a WebSocket connection.
+
+        Returns:
+            False if the user is still connected through a newer socket
+            (websocket was replaced), otherwise True.
+        """
         if game_id in self.active_connections:
             if user_id in self.active_connections[game_id]:
                 # Ensure the websocket object matches before deleting, though user_id should be unique per game
-                if self.active_connections[game_id][user_id] == websocket:
-                    del self.active_connections[game_id][user_id]
+                if self.active_connections[game_id][user_id].websocket == websocket:
+                    self._remove(self.active_connections[game_id][user_id])
                     logger.info(f"WebSocket disconnected: User {user_id} from Game {game_id}.")
-                    if not self.active_connections[game_id]:
-                        del self.active_connections[game_id]
-                        logger.info(f"Game room {game_id} empty, removed.")
             else:
-                 logger.warning(f"User {user_id} not found in game {game_id} during disconnect.")
+                 logger.debug(f"User {user_id} not found in game {game_id} during disconnect (already evicted or replaced).")
         else:
-             logger.warning(f"Game room {game_id} not found during disconnect for user {user_id}.")
+             logger.debug(f"Game room {game_id} not found during disconnect for user {user_id}.")
+        return not self.is_user_connected(game_id, user_id)
 
     # --- ADDED METHOD ---
     def is_user_connected(self, game_id: str, user_id: str) -> bool:
@@ -49,6 +218,10 @@ class ConnectionManager:
         return is_connected
     # --- END ADDED METHOD ---
 
+    def is_current(self, websocket: WebSocket, game_id: str, user_id: str) -> bool:
+        """Whether websocket is still the user's connection (not replaced or evicted)."""
+        return self._connection(game_id, user_id, websocket) is not None
+
     async def send_personal_message(self, message: dict, websocket: WebSocket):
         """Sends a JSON message to a specific WebSocket client."""
         try:
@@ -57,54 +230,237 @@ class ConnectionManager:
             # Log error, connection might be closed unexpectedly
             logger.error(f"Failed to send personal message: {e}", exc_info=False) # Avoid full tb for send errors usually
 
+    def send_to_user(self, message: dict, game_id: str, user_id: str, websocket: Optional[WebSocket] = None) -> bool:
+        """
+        Queues a message for one user's connection on this worker, in order
+        with the broadcasts queued for it. With websocket, only if that is still
+        the user's connection (replies to a command go to the socket that sent it).
+        Returns False if the user (or websocket) is not connected here.
+        """
+        connection = self._connection(game_id, user_id, websocket)
+        if connection is None:
+            return False
+        self._enqueue(connection, message.get("type"), encode(message, connection.encoding))
+        return True
+
     async def broadcast(self, message: dict, game_id: str):
-        """Broadcasts a JSON message to all clients in a specific game room."""
-        if game_id in self.active_connections:
-            connections = list(self.active_connections[game_id].values()) # Create list to avoid issues if dict changes during iteration
-            message_json = json.dumps(message) # Serialize once
-            logger.debug(f"Broadcasting to {len(connections)} clients in game {game_id}: {message_json}")
-
-            # Use asyncio.gather for concurrent sending
-            results = await asyncio.gather(
-                *[conn.send_text(message_json) for conn in connections],
-                return_exceptions=True
-            )
-
-            # Log any exceptions that occurred during sending
-            for i, result in enumerate(results):
-                if isinstance(result, Exception):
-                     # Find the user_id associated with the failed connection if possible
-                     failed_user_id = "unknown"
-                     for uid, ws in self.active_connections.get(game_id, {}).items():
-                         if ws == connections[i]:
-                             failed_user_id = uid
-                             break
-                     logger.error(f"Failed to broadcast to user {failed_user_id} in game {game_id}: {result}", exc_info=False)
-                     # Consider removing the problematic connection here if appropriate
-                     # self.disconnect(connections[i], game_id, failed_user_id)
+        """
+        Queues a JSON message for all clients in a specific game room, on this
+        worker and (through the backplane) on every other worker.
+
+        With a distributed backplane, local clients get it when it comes back
+        from the backplane, numbered in the room's shared sequence.
+        Returns without waiting for delivery; each connection's writer task sends it.
+        """
+        message_json = json.dumps(message) # Serialize once
+        message_type = message.get("type")
+        self.backplane.publish(game_id, message_type, message_json)
+        if self.backplane.distributed:
+            return
+        if game_id in self.event_logs:
+            logger.debug(f"Broadcasting to {len(self.active_connections.get(game_id, {}))} local clients in game {game_id}: {message_json}")
+            self._deliver_broadcast(game_id, message_type, message_json, message=message)
         else:
             logger.warning(f"Attempted to broadcast to non-existent game room: {game_id}")
 
     async def broadcast_to_others(self, message: dict, game_id: str, sender_user_id: str):
-        """Broadcasts a JSON message to all clients in a room EXCEPT the sender."""
-        if game_id in self.active_connections:
-            message_json = json.dumps(message)
-            tasks = []
-            count = 0
-            for user_id, websocket in self.active_connections[game_id].items():
-                if user_id != sender_user_id:
-                    tasks.append(websocket.send_text(message_json))
-                    count += 1
-
-            logger.debug(f"Broadcasting to {count} others in game {game_id} (excluding {sender_user_id}): {message_json}")
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-
-            # Log any exceptions
-            # (Error logging similar to broadcast can be added here if needed)
-
+        """Queues a JSON message for all clients in a room EXCEPT the sender."""
+        message_json = json.dumps(message)
+        message_type = message.get("type")
+        self.backplane.publish(game_id, message_type, message_json, sender_user_id)
+        if self.backplane.distributed:
+            return
+        if game_id in self.event_logs:
+            logger.debug(f"Broadcasting to local others in game {game_id} (excluding {sender_user_id}): {message_json}")
+            self._deliver_broadcast(game_id, message_type, message_json, sender_user_id, message=message)
 
     def get_connected_user_ids(self, game_id: str) -> List[str]:
          """Returns a list of user IDs currently connected in a game room."""
          if game_id in self.active_connections:
              return list(self.active_connections[game_id].keys())
-         return []
\ No newline at end of file
+         return []
+
+    async def connected_user_ids(self, game_id: str) -> List[str]:
+        """User IDs connected to a game room on any worker (the room's presence set on the backplane)."""
+        local_user_ids = self.get_connected_user_ids(game_id)
+        present = await self.backplane.present_user_ids(game_id)
+        if present is None:
+            return local_user_ids
+        return list(present.union(local_user_ids))
+
+    # --- Outbound queues ---
+
+    def _connection(self, game_id: str, user_id: str, websocket: Optional[WebSocket] = None) -> Optional[ClientConnection]:
+        connection = self.active_connections.get(game_id, {}).get(user_id)
+        if connection is None or (websocket is not None and connection.websocket is not websocket):
+            return None
+        return connection
+
+    def _deliver_broadcast(
+        self,
+        game_id: str,
+        message_type: Optional[str],
+        message_json: str,
+        exclude_user_id: Optional[str] = None,
+        seq: Optional[int] = None,
+        epoch: Optional[str] = None,
+        message: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        Sequence a serialized room broadcast and queue it for this worker's
+        connections in the room, encoding it once per encoding in use.
+        seq/epoch are the room's shared sequence for broadcasts from a distributed backplane.
+        """
+        log = self.event_logs.get(game_id)
+        if log is None:
+            return # Not serving this room (late message from the backplane)
+        sequenced = log.append(message_type, message_json, exclude_user_id, seq, epoch)
+        if sequenced is None:
+            return # Repeated delivery
+        encoded = EncodedMessage(message_type, sequenced, message, {"seq": log.last_seq, "epoch": log.epoch})
+        # Create list to avoid issues if dict changes during iteration
+        for user_id, connection in list(self.active_connections.get(game_id, {}).items()):
+            if user_id != exclude_user_id:
+                self._enqueue(connection, message_type, encoded.frame(connection.encoding))
+
+    def _enqueue(self, connection: ClientConnection, message_type: Optional[str], frame: Frame) -> None:
+        if connection.closed:
+            return
+        now = time.monotonic()
+        if self.slow_consumer_policy == "disconnect":
+            if len(connection.queue) >= self.max_queue_size or connection.lag_ms(now) > self.max_lag_ms:
+                self._evict(connection, f"{len(connection.queue)} queued, {connection.lag_ms(now):.0f}ms behind")
+                return
+        elif len(connection.queue) >= self.max_queue_size:
+            if self.slow_consumer_policy == "coalesce" and self._coalesce(connection, message_type):
+                connection.coalesced += 1
+            else:
+                connection.queue.popleft()
+                connection.dropped += 1
+        connection.queue.append((now, message_type, frame))
+        connection.wakeup.set()
+
+    @staticmethod
+    def _coalesce(connection: ClientConnection, message_type: Optional[str]) -> bool:
+        """Drop the oldest queued message of message_type (superseded by the new one)."""
+        if message_type is None:
+            return False
+        for i, (_, queued_type, _) in enumerate(connection.queue):
+            if queued_type == message_type:
+                del connection.queue[i]
+                return True
+        return False
+
+    async def _run_writer(self, connection: ClientConnection) -> None:
+        while not connection.closed:
+            if not connection.queue:
+                connection.wakeup.clear()
+                await connection.wakeup.wait()
+                continue
+            _, _, frame = connection.queue.popleft()
+            try:
+                if isinstance(frame, bytes):
+                    await connection.websocket.send_bytes(frame)
+                else:
+                    await connection.websocket.send_text(frame)
+                connection.sent += 1
+                connection.bytes_sent += len(frame)
+            except Exception as e:
+                self.send_failures += 1
+                logger.error(f"Failed to send to user {connection.user_id} in game {connection.game_id}: {e}", exc_info=False)
+                self._evict(connection, "send failed")
+                return
+
+    def _evict(self, connection: ClientConnection, reason: str) -> None:
+        """Drop a connection that failed or fell too far behind and close its socket."""
+        if connection.closed:
+            return
+        self.evicted += 1
+        logger.warning(f"Evicting WebSocket of user {connection.user_id} in game {connection.game_id}: {reason}")
+        self._remove(connection)
+        self._close_later(connection.websocket, WS_CLOSE_SLOW_CONSUMER)
+
+    def _close_later(self, websocket: WebSocket, code: int) -> None:
+        task = asyncio.create_task(self._close_socket(websocket, code))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    @staticmethod
+    async def _close_socket(websocket: WebSocket, code: int) -> None:
+        try:
+            await websocket.close(code=code)
+        except Exception:
+            pass # Already closed
+
+    def _remove(self, connection: ClientConnection) -> None:
+        room = self.active_connections.get(connection.game_id)
+        if room is not None and room.get(connection.user_id) is connection:
+            del room[connection.user_id]
+            self.backplane.remove_presence(connection.game_id, connection.user_id)
+            if not room:
+                del self.active_connections[connection.game_id]
+                logger.info(f"Game room {connection.game_id} empty, removed.")
+                if connection.game_id in self.event_logs:
+                    self.event_logs[connection.game_id].last_activity = time.monotonic()
+        self._stop_writer(connection)
+
+    def _prune_event_logs(self) -> None:
+        """Drop the logs (and backplane subscriptions) of rooms without connections past the retention period."""
+        cutoff = time.monotonic() - self.event_log_retention_seconds
+        for game_id, log in list(self.event_logs.items()):
+            if game_id not in self.active_connections and log.last_activity < cutoff:
+                del self.event_logs[game_id]
+                self.backplane.unsubscribe(game_id)
+
+    @staticmethod
+    def _stop_writer(connection: ClientConnection) -> None:
+        connection.closed = True
+        connection.queue.clear()
+        if connection.writer_task is not None and connection.writer_task is not asyncio.current_task():
+            connection.writer_task.cancel()
+
+    async def aclose(self) -> None:
+        """Stop all writer tasks. Called on application shutdown."""
+        connections = [c for room in self.active_connections.values() for c in room.values()]
+        for connection in connections:
+            self._stop_writer(connection)
+        self.active_connections.clear()
+        tasks = [c.writer_task for c in connections if c.writer_task is not None] + list(self._closing)
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        await self.backplane.aclose()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Connection counts and outbound queue depths, per room and in total."""
+        self._prune_event_logs()
+        now = time.monotonic()
+        rooms: Dict[str, Dict[str, Any]] = {}
+        for game_id, connections in self.active_connections.items():
+            queue_lengths = [len(c.queue) for c in connections.values()]
+            rooms[game_id] = {
+                "connections": len(connections),
+                "queued": sum(queue_lengths),
+                "max_queue": max(queue_lengths, default=0),
+                "max_lag_ms": round(max((c.lag_ms(now) for c in connections.values()), default=0.0), 1),
+                "dropped": sum(c.dropped for c in connections.values()),
+                "coalesced": sum(c.coalesced for c in connections.values()),
+                "bytes_sent": sum(c.bytes_sent for c in connections.values()),
+                "last_seq": self.event_logs[game_id].last_seq if game_id in self.event_logs else 0,
+            }
+        encodings: Dict[str, int] = {}
+        for connections in self.active_connections.values():
+            for c in connections.values():
+                encodings[c.encoding] = encodings.get(c.encoding, 0) + 1
+        return {
+            "connections": sum(room["connections"] for room in rooms.values()),
+            "encodings": encodings,
+            "queued": sum(room["queued"] for room in rooms.values()),
+            "evicted": self.evicted,
+            "send_failures": self.send_failures,
+            "slow_consumer_policy": self.slow_consumer_policy,
+            "event_logs": len(self.event_logs),
+            "replayed": self.replayed,
+            "snapshots_required": self.snapshots_required,
+            "backplane": self.backplane.get_metrics(),
+            "rooms": rooms,
+        }
@@ -0,0 +1,112 @@
+# bench_generation_offline.py
+#!/usr/bin/env python
+# Offline benchmark of the question + incorrect-answer pipeline using the replay LLM provider.
+# No API keys or database needed.
+# Example: python3 tests/bench_generation_offline.py --topics 10 -n 20 --latency-ms 800 --jitter-ms 400
+# Example (failure injection): python3 tests/bench_generation_offline.py --topics 5 -n 10 --failure-rate 0.1
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+# Add the project root (backend/) to the Python path
+script_path = Path(__file__).resolve()
+project_root = script_path.parent.parent
+sys.path.insert(0, str(project_root))
+
+# ANSI color codes
+class Colors:
+    HEADER = '\033[95m'
+    CYAN = '\033[96m'
+    GREEN = '\033[92m'
+    WARNING = '\033[93m'
+    FAIL = '\033[91m'
+    ENDC = '\033[0m'
+
+def print_step(message: str):
+    print(f"\n{Colors.HEADER}--- {message} ---{Colors.ENDC}")
+
+def configure_environment(args: argparse.Namespace):
+    """Point the LLM layer at the replay provider before any src imports."""
+    os.environ["LLM_PROVIDER"] = "replay"
+    os.environ["LLM_CACHE_ENABLED"] = "false" # Measure the pipeline, not the cache
+    os.environ["LLM_REPLAY_LATENCY_MS"] = str(args.latency_ms)
+    os.environ["LLM_REPLAY_JITTER_MS"] = str(args.jitter_ms)
+    os.environ["LLM_REPLAY_FAILURE_RATE"] = str(args.failure_rate)
+    os.environ["LLM_REPLAY_SEED"] = str(args.seed)
+    if args.cassette_dir:
+        os.environ["LLM_REPLAY_CASSETTE_DIR"] = args.cassette_dir
+    if args.max_in_flight:
+        os.environ["LLM_REPLAY_MAX_IN_FLIGHT"] = str(args.max_in_flight)
+
+async def run_benchmark(args: argparse.Namespace):
+    from src.models.question import Question, DifficultyLevel
+    from src.utils.llm.llm_client_registry import get_llm_service
+    from src.utils.llm.llm_scheduler import get_llm_scheduler_metrics
+    from src.utils.question_generation.question_generator import QuestionGenerator
+    from src.utils.question_generation.incorrect_answer_generator import (
+        IncorrectAnswerGenerator, IncorrectAnswerGenerationError
+    )
+
+    llm_service = get_llm_service()
+    question_generator = QuestionGenerator(llm_service=llm_service)
+    incorrect_answer_generator = IncorrectAnswerGenerator(llm_service=llm_service)
+    difficulty_descriptions = {"Medium": {"base": "Moderately challenging questions.", "custom": ""}}
+    topics = [f"Benchmark Topic {i + 1}" for i in range(args.topics)]
+
+    print_step(f"Generating {args.num_questions} questions for each of {len(topics)} topics")
+    start = time.perf_counter()
+    results = await asyncio.gather(*[
+        question_generator.generate_questions(
+            pack_id="bench-pack",
+            pack_name="Offline Benchmark",
+            pack_topic=topic,
+            difficulty=DifficultyLevel.MEDIUM,
+            difficulty_descriptions=difficulty_descriptions,
+            num_questions=args.num_questions
+        )
+        for topic in topics
+    ])
+    question_seconds = time.perf_counter() - start
+    questions: List[Question] = [Question(**data) for batch in results for data in batch]
+    print(f"Generated {len(questions)} questions in {question_seconds:.2f}s")
+
+    print_step(f"Generating incorrect answers (batch size {args.batch_size})")
+    start = time.perf_counter()
+    failed = 0
+    try:
+        answers = await incorrect_answer_generator.generate_incorrect_answers(
+            questions, batch_size=args.batch_size
+        )
+    except IncorrectAnswerGenerationError as e:
+        answers = []
+        failed = len(e.failed_question_ids)
+    answer_seconds = time.perf_counter() - start
+    color = Colors.GREEN if not failed else Colors.WARNING
+    print(f"{color}Incorrect answers for {len(answers)} questions ({failed} failed) in {answer_seconds:.2f}s{Colors.ENDC}")
+
+    client = llm_service.client
+    print_step("Summary")
+    print(f"LLM calls: {client.calls} (cassette hits: {client.cassette_hits}, injected failures: {client.injected_failures})")
+    print(f"Total wall time: {question_seconds + answer_seconds:.2f}s")
+    print(f"Scheduler: {get_llm_scheduler_metrics()}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline generation pipeline benchmark (replay LLM provider)")
+    parser.add_argument("--topics", type=int, default=5, help="Number of topics to generate concurrently")
+    parser.add_argument("--num-questions", "-n", type=int, default=10, help="Questions per topic")
+    parser.add_argument("--batch-size", type=int, default=5, help="Incorrect-answer batch size")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Simulated LLM latency per call")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Random extra latency per call")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Probability that an LLM call fails")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for jitter and failure injection")
+    parser.add_argument("--max-in-flight", type=int, help="Override the scheduler concurrency limit")
+    parser.add_argument("--cassette-dir", help="Serve recorded responses from this directory")
+    args = parser.parse_args()
+
+    configure_environment(args)
+    asyncio.run(run_benchmark(args))
@@ -0,0 +1,151 @@
+# backend/tests/fake_postgrest.py
+"""
+In-memory PostgREST server for repository tests.
+
+Repositories are given a real postgrest AsyncPostgrestClient whose HTTP
+transport is answered here, so the query builders, headers and error
+parsing are the library's own. Supports the subset the repositories use:
+select with eq/gt/in/ilike filters, order, limit and offset; insert, update
+and delete with return=representation; and RPC calls to Python functions.
+"""
+
+import json
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Set
+from urllib.parse import parse_qsl
+
+import httpx
+from postgrest import AsyncPostgrestClient
+
+# (method, table or "rpc/<function>", JSON body) -> error dict to return instead, or None
+ErrorHook = Callable[[str, str, Any], Optional[Dict[str, Any]]]
+
+
+class DatabaseError(Exception):
+    """Raised by a fake database function; returned to the client as a PostgREST error."""
+
+    def __init__(self, code: str, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class FakePostgrest:
+    def __init__(self):
+        self.tables: Dict[str, List[Dict[str, Any]]] = {}
+        self.columns: Dict[str, Set[str]] = {} # table -> allowed columns, when restricted
+        self.functions: Dict[str, Callable[[Dict[str, Any]], Any]] = {}
+        self.error_hooks: List[ErrorHook] = []
+        self.requests: List[httpx.Request] = []
+        self.reorder_inserted: Optional[Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]]] = None
+
+    def client(self) -> AsyncPostgrestClient:
+        http_client = httpx.AsyncClient(base_url="http://postgrest.test", transport=httpx.MockTransport(self._handle))
+        return AsyncPostgrestClient("http://postgrest.test", http_client=http_client)
+
+    def rows(self, table: str) -> List[Dict[str, Any]]:
+        return self.tables.setdefault(table, [])
+
+    def requests_to(self, method: str, target: str) -> List[httpx.Request]:
+        return [r for r in self.requests if r.method == method and r.url.path.lstrip("/") == target]
+
+    # --- Request handling ---
+
+    def _handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        target = request.url.path.lstrip("/")
+        body = json.loads(request.content) if request.content else None
+        for hook in self.error_hooks:
+            error = hook(request.method, target, body)
+            if error is not None:
+                return httpx.Response(400, json={"code": None, "message": None, "details": None, "hint": None, **error})
+        if target.startswith("rpc/"):
+            return self._call(target[4:], body or {})
+        params = parse_qsl(request.url.query.decode("utf-8"))
+        rows = self.rows(target)
+        if request.method == "GET":
+            return httpx.Response(200, json=self._select(rows, params))
+        if request.method == "POST":
+            return self._insert(target, rows, body if isinstance(body, list) else [body])
+        matched = [row for row in rows if self._matches(row, params)]
+        if request.method == "PATCH":
+            for row in matched:
+                row.update(body)
+            return httpx.Response(200, json=matched)
+        if request.method == "DELETE":
+            self.tables[target] = [row for row in rows if row not in matched]
+            return httpx.Response(200, json=matched)
+        return httpx.Response(405, json={"message": f"Unsupported method {request.method}"})
+
+    def _call(self, function: str, params: Dict[str, Any]) -> httpx.Response:
+        if function not in self.functions:
+            return httpx.Response(404, json={
+                "code": "PGRST202", "message": f"Could not find the function public.{function} in the schema cache",
+                "details": None, "hint": None,
+            })
+        try:
+            return httpx.Response(200, json=self.functions[function](params))
+        except DatabaseError as e:
+            return httpx.Response(400, json={"code": e.code, "message": e.message, "details": None, "hint": None})
+
+    def _insert(self, table: str, rows: List[Dict[str, Any]], new_rows: List[Dict[str, Any]]) -> httpx.Response:
+        allowed = self.columns.get(table)
+        if allowed is not None:
+            for row in new_rows:
+                unknown = sorted(set(row) - allowed)
+                if unknown:
+                    return httpx.Response(400, json={
+                        "code": "PGRST204", "details": None, "hint": None,
+                        "message": f"Could not find the '{unknown[0]}' column of '{table}' in the schema cache",
+                    })
+        inserted = [{"id": str(uuid.uuid4()), **row} for row in new_rows] # Column default for id
+        rows.extend(inserted)
+        return httpx.Response(201, json=self.reorder_inserted(inserted) if self.reorder_inserted else inserted)
+
+    def _select(self, rows: List[Dict[str, Any]], params) -> List[Dict[str, Any]]:
+        options = {key: value for key, value in params if key in ("select", "order", "limit", "offset")}
+        result = [row for row in rows if self._matches(row, params)]
+        if "order" in options:
+            column, _, direction = options["order"].partition(".")
+            result.sort(key=lambda row: str(row.get(column)), reverse=direction == "desc")
+        offset = int(options.get("offset", 0))
+        limit = int(options["limit"]) if "limit" in options else None
+        result = result[offset:None if limit is None else offset + limit]
+        if options.get("select", "*") != "*":
+            columns = options["select"].split(",")
+            result = [{column: row.get(column) for column in columns} for row in result]
+        return result
+
+    @staticmethod
+    def _matches(row: Dict[str, Any], params) -> bool:
+        for column, condition in params:
+            if column in ("select", "order", "limit", "offset", "columns"):
+                continue
+            operator, _, value = condition.partition(".")
+            actual = None if row.get(column) is None else str(row.get(column))
+            if operator == "eq" and actual != value:
+                return False
+            if operator == "gt" and (actual is None or actual <= value):
+                return False
+            if operator == "in" and actual not in value.strip("()").split(","):
+                return False
+            if operator == "ilike" and (actual is None or actual.lower() != value.replace("\\", "").lower()):
+                return False
+        return True
+
+
+def install_record_game_answer(server: FakePostgrest) -> None:
+    """Python model of backend/sql/record_game_answer.sql over the fake tables."""
+    def record_game_answer(params):
+        participant = next((p for p in server.rows("game_participants") if p["id"] == params["p_participant_id"]), None)
+        if participant is None:
+            raise DatabaseError("P0002", f"Participant {params['p_participant_id']} not found")
+        question = next((q for q in server.rows("game_questions") if q["id"] == params["p_game_question_id"]), None)
+        key = params["p_participant_id"]
+        if question is None or question.get("end_time") or key in question["participant_answers"]:
+            return [{"recorded": False, "total_score": None}]
+        question["participant_answers"][key] = params["p_answer"]
+        question["participant_scores"][key] = params["p_score"]
+        participant["score"] += params["p_score"]
+        return [{"recorded": True, "total_score": participant["score"]}]
+    server.functions["record_game_answer"] = record_game_answer
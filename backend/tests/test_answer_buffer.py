@@ -0,0 +1,133 @@
+# backend/tests/test_answer_buffer.py
+"""Tests for the write-behind answer buffer: batching, retries and shutdown."""
+
+import asyncio
+
+from src.game.answer_buffer import AnswerBuffer, BufferedAnswer
+
+
+def _answer(game_id: str = "game-1", participant_id: str = "p1", answer: str = "a") -> BufferedAnswer:
+    return BufferedAnswer(game_id, "gq-1", "q-1", participant_id, "user-1", answer, 100, True)
+
+
+class FlakyHandler:
+    """Records written batches, failing the first `failures` calls."""
+
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.batches = []
+
+    async def __call__(self, batch):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("database unavailable")
+        self.batches.append([answer.answer for answer in batch])
+
+
+def test_background_flush_writes_one_batch():
+    async def main():
+        handler = FlakyHandler()
+        buffer = AnswerBuffer(handler, flush_interval=0.02)
+        for name in "abc":
+            buffer.add(_answer(answer=name))
+        assert buffer.pending == 3
+        await asyncio.sleep(0.08)
+        assert handler.batches == [["a", "b", "c"]]
+        assert buffer.pending == 0
+        await buffer.aclose()
+        assert buffer.get_metrics()["persisted"] == 3
+    asyncio.run(main())
+
+
+def test_full_buffer_flushes_early():
+    async def main():
+        handler = FlakyHandler()
+        buffer = AnswerBuffer(handler, flush_interval=10, max_batch=2)
+        buffer.add(_answer(answer="a"))
+        buffer.add(_answer(answer="b"))
+        await asyncio.sleep(0.02)
+        assert handler.batches == [["a", "b"]]
+        await buffer.aclose()
+    asyncio.run(main())
+
+
+def test_flush_of_one_game_leaves_the_others_buffered():
+    async def main():
+        handler = FlakyHandler()
+        buffer = AnswerBuffer(handler, flush_interval=10)
+        buffer.add(_answer("game-1", answer="a"))
+        buffer.add(_answer("game-2", answer="b"))
+        await buffer.flush("game-1")
+        assert handler.batches == [["a"]]
+        assert buffer.pending == 1
+        await buffer.aclose()
+        assert handler.batches == [["a"], ["b"]]
+    asyncio.run(main())
+
+
+def test_failed_batch_is_retried_ahead_of_newer_answers():
+    async def main():
+        handler = FlakyHandler(failures=1)
+        buffer = AnswerBuffer(handler, flush_interval=10)
+        buffer.add(_answer(answer="first"))
+        await buffer.flush()
+        assert handler.batches == [] and buffer.pending == 1
+        buffer.add(_answer(answer="second"))
+        await buffer.flush()
+        assert handler.batches == [["first", "second"]]
+        metrics = buffer.get_metrics()
+        assert (metrics["batch_failures"], metrics["persisted"], metrics["dropped"]) == (1, 2, 0)
+        await buffer.aclose()
+    asyncio.run(main())
+
+
+def test_answers_are_dropped_after_max_attempts():
+    async def main():
+        handler = FlakyHandler(failures=3)
+        buffer = AnswerBuffer(handler, flush_interval=10, max_attempts=2)
+        buffer.add(_answer())
+        await buffer.flush()
+        await buffer.flush()
+        assert buffer.pending == 0
+        assert buffer.get_metrics()["dropped"] == 1
+        await buffer.flush()
+        assert handler.batches == []
+        await buffer.aclose()
+    asyncio.run(main())
+
+
+def test_aclose_retries_until_everything_is_written():
+    async def main():
+        handler = FlakyHandler(failures=2)
+        buffer = AnswerBuffer(handler, flush_interval=0.01)
+        buffer._ensure_running = lambda: None # Leave flushing to aclose
+        buffer.add(_answer(answer="a"))
+        buffer.add(_answer("game-2", answer="b"))
+        await buffer.aclose()
+        assert handler.batches == [["a", "b"]]
+        assert buffer.pending == 0
+    asyncio.run(main())
+
+
+def test_answers_added_after_close_are_written_immediately():
+    async def main():
+        handler = FlakyHandler()
+        buffer = AnswerBuffer(handler, flush_interval=10)
+        await buffer.aclose()
+        buffer.add(_answer(answer="late"))
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert handler.batches == [["late"]]
+    asyncio.run(main())
+
+
+def test_closing_without_a_handler_drops_buffered_answers():
+    async def main():
+        buffer = AnswerBuffer(flush_interval=10)
+        buffer.add(_answer())
+        await buffer.flush()
+        assert buffer.pending == 1 # Kept until a handler is set
+        await buffer.aclose()
+        assert buffer.pending == 0
+        assert buffer.get_metrics()["dropped"] == 1
+    asyncio.run(main())
@@ -315,10 +315,10 @@ def submit_answer(game_id: str, participant_id: str, question_index: int, answer
         except json.JSONDecodeError: print(f"Raw error response: {response.text}")
         return None
 
-def next_question(game_id: str, host_id: str) -> Optional[Dict[str, Any]]:
-    """Move to the next question or end the game."""
+def next_question(game_id: str, host_id: str, question_index: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """Move to the next question or end the game (question_index: the question being closed)."""
     print(f"{Colors.HEADER}Moving to next question (Host action)...{Colors.ENDC}")
-    response = requests.post(f"{BASE_URL}/games/{game_id}/next?user_id={host_id}")
+    response = requests.post(f"{BASE_URL}/games/{game_id}/next?user_id={host_id}", json={"question_index": question_index})
 
     if response.status_code == 200:
         result = response.json()
@@ -453,7 +453,7 @@ def simulate_game_flow(
 
         print("\nHost advancing to next question...")
         time.sleep(1)
-        next_result = next_question(game_id, host_id)
+        next_result = next_question(game_id, host_id, question_index)
         if not next_result: print(f"{Colors.FAIL}Failed to move to next question. Exiting simulation.{Colors.ENDC}"); return
         if next_result.get("game_complete", False): game_ended = True; print(f"{Colors.GREEN}Game ending signal received.{Colors.ENDC}")
         else:
@@ -0,0 +1,283 @@
+# backend/tests/test_game_room.py
+"""Tests for GameRoom state transitions, its write-behind queue and GameRoomRegistry."""
+
+import asyncio
+import uuid
+from typing import List
+
+import pytest
+
+from src.api.schemas.game import GamePlayQuestionResponse
+from src.game.game_room import GameRoom, GameRoomRegistry, RoomQuestion
+from src.game.option_order import answer_id
+from src.game.play_snapshot import PlaySnapshot
+from src.models.game_participant import GameParticipant
+from src.models.game_session import GameSession, GameStatus
+
+CORRECT_OPTION = 2
+
+
+def _room(question_count: int = 2, player_count: int = 2) -> GameRoom:
+    session = GameSession(
+        code="ABC123", host_user_id=str(uuid.uuid4()), pack_id=str(uuid.uuid4()),
+        status=GameStatus.ACTIVE, question_count=question_count
+    )
+    participants = [
+        GameParticipant(game_session_id=session.id, user_id=str(uuid.uuid4()), display_name=f"Player {i}", is_host=i == 0)
+        for i in range(player_count)
+    ]
+    play_questions = []
+    room_questions = []
+    for i in range(question_count):
+        question_id = str(uuid.uuid4())
+        play_questions.append(GamePlayQuestionResponse(
+            index=i, question_id=question_id, question_text=f"Question {i}?",
+            options=["A", "B", "C", "D"], correct_answer_id=answer_id(question_id, CORRECT_OPTION), time_limit=0
+        ))
+    snapshot = PlaySnapshot(session.id, play_questions)
+    for play in play_questions:
+        room_questions.append(RoomQuestion(
+            game_question_id=str(uuid.uuid4()), question_id=play.question_id, index=play.index,
+            question_text=play.question_text, correct_answer="C", correct_option_index=CORRECT_OPTION,
+            play=snapshot.get(play.index), pack_ordinal=play.index
+        ))
+    return GameRoom(session=session, participants=participants, questions=room_questions, snapshot=snapshot)
+
+
+def _player_ids(room: GameRoom) -> List[str]:
+    return list(room.participants)
+
+
+def _answer(room: GameRoom, index: int, option: int) -> str:
+    return answer_id(room.questions[index].question_id, option)
+
+
+# --- Answers ---
+
+def test_record_answer_scores_and_totals():
+    room = _room()
+    first, second = _player_ids(room)
+    question, is_correct, score, total = room.record_answer(first, 0, _answer(room, 0, CORRECT_OPTION))
+    assert (question.index, is_correct, score, total) == (0, True, 1, 1)
+    _, is_correct, score, total = room.record_answer(second, 0, _answer(room, 0, 0))
+    assert (is_correct, score, total) == (False, 0, 0)
+    assert room.questions[0].scores == {first: 1, second: 0}
+    assert room.participants[first].score == 1
+
+
+@pytest.mark.parametrize("case, message", [
+    ("inactive", "Game not active"),
+    ("unknown participant", "Participant not found"),
+    ("bad index", "not found for this game"),
+    ("ended", "has already ended"),
+    ("duplicate", "already submitted"),
+])
+def test_record_answer_rejects_invalid_answers(case, message):
+    room = _room()
+    participant_id = _player_ids(room)[0]
+    index = 0
+    if case == "inactive":
+        room.cancel()
+    elif case == "unknown participant":
+        participant_id = str(uuid.uuid4())
+    elif case == "bad index":
+        index = 5
+    elif case == "ended":
+        room.end_current_question()
+    elif case == "duplicate":
+        room.record_answer(participant_id, 0, _answer(room, 0, 1))
+    with pytest.raises(ValueError, match=message):
+        room.record_answer(participant_id, index, _answer(room, 0, CORRECT_OPTION))
+
+
+def test_all_connected_answered_ignores_absent_players_and_needs_someone_connected():
+    room = _room()
+    first, second = _player_ids(room)
+    question = room.questions[0]
+    room.record_answer(first, 0, _answer(room, 0, 1))
+    first_user = room.participants[first].user_id
+    second_user = room.participants[second].user_id
+    assert room.all_connected_answered(question, [first_user, "spectator"])
+    assert not room.all_connected_answered(question, [first_user, second_user])
+    assert not room.all_connected_answered(question, [])
+
+
+# --- Ending and advancing ---
+
+def test_end_current_question_closes_it_once():
+    room = _room()
+    ended = room.end_current_question()
+    assert ended is room.questions[0] and ended.end_time is not None
+    assert room.end_current_question() is None
+
+
+def test_advance_starts_the_next_question_and_completes_after_the_last():
+    room = _room(question_count=2)
+    room.end_current_question()
+    started = room.advance()
+    assert started is room.questions[1] and started.start_time is not None
+    assert room.current_index == 1 and room.is_active
+    room.end_current_question()
+    assert room.advance() is None
+    assert room.status == GameStatus.COMPLETED
+    assert room.current_index == 1 # Stays on the last question
+
+
+def test_results_rank_participants_by_score():
+    room = _room(question_count=1)
+    first, second = _player_ids(room)
+    room.record_answer(second, 0, _answer(room, 0, CORRECT_OPTION))
+    room.record_answer(first, 0, _answer(room, 0, 0))
+    room.end_current_question()
+    room.advance()
+    results = room.results()
+    assert [p["id"] for p in results["participants"]] == [second, first]
+    assert results["status"] == "completed"
+    assert results["questions"][0]["correct_count"] == 1
+
+
+# --- Write-behind queue ---
+
+def test_writes_are_applied_in_queued_order():
+    async def main():
+        room = _room()
+        applied = []
+
+        async def write(n, delay):
+            await asyncio.sleep(delay)
+            applied.append(n)
+
+        for n, delay in enumerate([0.02, 0, 0.01, 0]):
+            room.persist(f"write {n}", lambda n=n, delay=delay: write(n, delay))
+        pending = room.pending_writes
+        await room.flush()
+        await room.close()
+        return applied, pending, room
+
+    applied, pending, room = asyncio.run(main())
+    assert applied == [0, 1, 2, 3]
+    assert pending >= 3 # Queued without waiting for the database
+    assert room.writes_completed == 4 and room.pending_writes == 0
+
+
+def test_failed_write_is_counted_and_later_writes_still_run():
+    async def main():
+        room = _room()
+        applied = []
+
+        async def fail():
+            raise RuntimeError("database unavailable")
+
+        async def succeed():
+            applied.append("after")
+
+        room.persist("failing write", fail)
+        room.persist("next write", succeed)
+        await room.close()
+        return room, applied
+
+    room, applied = asyncio.run(main())
+    assert applied == ["after"]
+    assert (room.writes_failed, room.writes_completed) == (1, 1)
+
+
+def test_close_flushes_and_stops_the_writer_and_persist_restarts_it():
+    async def main():
+        room = _room()
+        applied = []
+
+        async def write(n):
+            await asyncio.sleep(0)
+            applied.append(n)
+
+        room.persist("first", lambda: write(1))
+        await room.close()
+        stopped = room._writer_task is None
+        room.persist("after close", lambda: write(2))
+        await room.close()
+        return applied, stopped
+
+    applied, stopped = asyncio.run(main())
+    assert applied == [1, 2]
+    assert stopped
+
+
+def test_flush_without_writes_returns_immediately():
+    async def main():
+        room = _room()
+        await asyncio.wait_for(room.flush(), timeout=1)
+        await room.close()
+
+    asyncio.run(main())
+
+
+# --- Registry ---
+
+def test_retire_flushes_and_removes_the_room():
+    async def main():
+        registry = GameRoomRegistry(retention_seconds=0)
+        removed = []
+        registry.on_removed = removed.append
+        room = registry.add(_room())
+        written = []
+
+        async def write():
+            await asyncio.sleep(0.01)
+            written.append(True)
+
+        room.persist("last write", write)
+        registry.retire(room.game_id)
+        registry.retire(room.game_id) # Already retiring: no second task
+        retiring = len(registry._retirements)
+        await asyncio.sleep(0.05)
+        return registry, room, removed, written, retiring
+
+    registry, room, removed, written, retiring = asyncio.run(main())
+    assert retiring == 1
+    assert written == [True]
+    assert registry.get(room.game_id) is None and len(registry) == 0
+    assert removed == [room.game_id]
+    assert registry._retirements == {}
+
+
+def test_retire_keeps_the_room_for_the_retention_period():
+    async def main():
+        registry = GameRoomRegistry(retention_seconds=60)
+        room = registry.add(_room())
+        registry.retire(room.game_id)
+        await asyncio.sleep(0)
+        kept = registry.get(room.game_id) is room
+        await registry.aclose() # Shutdown cancels the wait and flushes the room
+        return registry, kept
+
+    registry, kept = asyncio.run(main())
+    assert kept
+    assert len(registry) == 0
+
+
+def test_remove_does_not_drop_a_room_that_replaced_it_while_flushing():
+    async def main():
+        registry = GameRoomRegistry()
+        removed = []
+        registry.on_removed = removed.append
+        old = registry.add(_room())
+        replacement = _room()
+        replacement.game_id = old.game_id
+
+        async def slow_write():
+            await asyncio.sleep(0.01)
+            registry.add(replacement) # The game is restarted while the old room flushes
+
+        old.persist("slow write", slow_write)
+        await registry.remove(old.game_id)
+        return registry, old, replacement, removed
+
+    registry, old, replacement, removed = asyncio.run(main())
+    assert registry.get(old.game_id) is replacement
+    assert removed == []
+
+
+def test_remove_of_an_unknown_room_is_a_no_op():
+    registry = GameRoomRegistry()
+    asyncio.run(registry.remove(str(uuid.uuid4())))
+    assert len(registry) == 0
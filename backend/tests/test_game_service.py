@@ -0,0 +1,358 @@
+# backend/tests/test_game_service.py
+"""
+Tests for GameService play from in-memory rooms, with its repositories
+writing to an in-memory PostgREST server and broadcasts going through a real
+ConnectionManager.
+"""
+
+import asyncio
+import json
+import uuid
+from typing import Any, Dict, List
+
+import pytest
+
+from fake_postgrest import FakePostgrest, install_record_game_answer
+from src.api.websocket_commands import GameSocketCommands
+from src.game.game_room import GameRoom, GameRoomRegistry
+from src.game.option_order import answer_id
+from src.game.timer_wheel import TimerWheel
+from src.models.game_participant import GameParticipant
+from src.models.game_question import GameQuestion
+from src.models.game_session import GameSession, GameStatus
+from src.models.question import Question
+from src.repositories.game_participant_repository import GameParticipantRepository
+from src.repositories.game_question_repository import GameQuestionRepository
+from src.repositories.game_session_repository import GameSessionRepository
+from src.repositories.incorrect_answers_repository import IncorrectAnswersRepository
+from src.repositories.question_repository import QuestionRepository
+from src.repositories.user_pack_history_repository import UserPackHistoryRepository
+from src.repositories.user_question_history_repository import UserQuestionHistoryRepository
+from src.repositories.user_repository import UserRepository
+from src.services.game_service import GameService
+from src.websocket_manager import ConnectionManager
+
+PACK_ID = "6f1c5b7e-2a51-4c0e-9d1a-3b8f0f6c2a10"
+HOST_USER_ID = "0b6d3c1e-8f4a-4e2b-9c7d-5a1f2e3d4c5b"
+
+
+class RecordingConnectionManager(ConnectionManager):
+    """Keeps every room broadcast for assertions."""
+
+    def __init__(self):
+        super().__init__()
+        self.broadcasts: List[Dict[str, Any]] = []
+
+    async def broadcast(self, message: dict, game_id: str):
+        self.broadcasts.append(message)
+        await super().broadcast(message, game_id)
+
+    def types(self) -> List[str]:
+        return [message["type"] for message in self.broadcasts]
+
+
+class FakeWebSocket:
+    async def accept(self, subprotocol=None) -> None:
+        pass
+
+    async def send_text(self, text: str) -> None:
+        pass
+
+    async def close(self, code: int = 1000) -> None:
+        pass
+
+
+@pytest.fixture
+def server():
+    server = FakePostgrest()
+    install_record_game_answer(server)
+    server.functions["mark_questions_seen"] = lambda params: None
+    return server
+
+
+def _service(server: FakePostgrest, game_rooms=None, question_timers=None) -> GameService:
+    client = server.client()
+    return GameService(
+        game_session_repository=GameSessionRepository(client),
+        game_participant_repository=GameParticipantRepository(client),
+        game_question_repository=GameQuestionRepository(client),
+        question_repository=QuestionRepository(client),
+        incorrect_answers_repository=IncorrectAnswersRepository(client),
+        user_repository=UserRepository(client),
+        user_question_history_repository=UserQuestionHistoryRepository(client),
+        user_pack_history_repository=UserPackHistoryRepository(client),
+        connection_manager=RecordingConnectionManager(),
+        game_room_registry=game_rooms if game_rooms is not None else GameRoomRegistry(),
+        question_timers=question_timers
+    )
+
+
+def _start_room(service: GameService, question_count: int = 3, player_count: int = 1, server: FakePostgrest = None) -> GameRoom:
+    """
+    Start a game's room the way start_game does, from models instead of a pack.
+    With server, the game's rows are stored there for the room's writes to update.
+    """
+    session = GameSession(
+        code="ABC123", host_user_id=HOST_USER_ID, pack_id=PACK_ID, status=GameStatus.ACTIVE,
+        question_count=question_count, current_question_index=0
+    )
+    participants = [GameParticipant(game_session_id=session.id, user_id=HOST_USER_ID, display_name="Host", is_host=True)]
+    participants += [
+        GameParticipant(game_session_id=session.id, user_id=str(uuid.uuid4()), display_name=f"Player {i}")
+        for i in range(player_count - 1)
+    ]
+    questions = [Question(question=f"Question {i}?", answer=f"Right {i}", pack_id=PACK_ID, pack_ordinal=i) for i in range(question_count)]
+    game_questions = [
+        GameQuestion(game_session_id=session.id, question_id=q.id, question_index=i) for i, q in enumerate(questions)
+    ]
+    incorrect_options = {q.id: [f"Wrong {i}a", f"Wrong {i}b", f"Wrong {i}c"] for i, q in enumerate(questions)}
+    if server is not None:
+        server.rows("game_sessions").append(session.model_dump(mode="json"))
+        server.rows("game_participants").extend(p.model_dump(mode="json") for p in participants)
+        server.rows("game_questions").extend(
+            {**gq.model_dump(mode="json"), "participant_answers": {}, "participant_scores": {}} for gq in game_questions
+        )
+    return service._create_game_room(session, participants, questions, game_questions, incorrect_options)
+
+
+def _correct_answer(room: GameRoom, index: int) -> str:
+    return room.questions[index].correct_answer_id
+
+
+def _wrong_answer(room: GameRoom, index: int) -> str:
+    question = room.questions[index]
+    return answer_id(question.question_id, (question.correct_option_index + 1) % 4)
+
+
+def _run(service: GameService, coroutine):
+    """Run a service call, then wait for the rooms' queued writes and stop their tasks."""
+    async def main():
+        try:
+            return await coroutine
+        finally:
+            await service.game_rooms.aclose()
+            await service.connection_manager.aclose()
+    return asyncio.run(main())
+
+
+# --- The host's "next" names the question it closes ---
+
+def test_host_next_closes_the_named_question(server):
+    service = _service(server)
+
+    async def main():
+        room = _start_room(service)
+        result = await service.end_current_question(room.game_id, HOST_USER_ID, expected_index=0)
+        return room, result
+
+    room, result = _run(service, main())
+    assert room.current_index == 1
+    assert result["next_question"]["index"] == 1
+    assert service.connection_manager.types() == ["question_results", "next_question"]
+
+
+def test_stale_host_next_leaves_the_next_question_open(server):
+    service = _service(server)
+
+    async def main():
+        room = _start_room(service)
+        # The question deadline (or the all-answered close) got to question 0 first
+        await service.handle_question_deadline(room.game_id, 0)
+        result = await service.end_current_question(room.game_id, HOST_USER_ID, expected_index=0)
+        return room, result
+
+    room, result = _run(service, main())
+    assert room.current_index == 1
+    assert room.current_question.end_time is None
+    assert result == {"game_complete": False, "next_question": room.current_question.play.payload}
+    assert service.connection_manager.types() == ["question_results", "next_question"]
+
+
+def test_host_next_racing_the_deadline_advances_once(server):
+    service = _service(server)
+
+    async def main():
+        room = _start_room(service)
+        await asyncio.gather(
+            service.handle_question_deadline(room.game_id, 0, reason="all_answered"),
+            service.end_current_question(room.game_id, HOST_USER_ID, expected_index=0)
+        )
+        return room
+
+    room = _run(service, main())
+    assert room.current_index == 1
+    assert service.connection_manager.types().count("next_question") == 1
+
+
+def test_host_next_without_an_index_closes_the_current_question(server):
+    service = _service(server)
+
+    async def main():
+        room = _start_room(service, question_count=2)
+        await service.end_current_question(room.game_id, HOST_USER_ID)
+        result = await service.end_current_question(room.game_id, HOST_USER_ID)
+        return room, result
+
+    room, result = _run(service, main())
+    assert result == {"game_complete": True}
+    assert room.status == GameStatus.COMPLETED
+
+
+def test_stale_host_next_after_the_last_question_reports_completion(server):
+    service = _service(server)
+
+    async def main():
+        room = _start_room(service, question_count=1)
+        await service.handle_question_deadline(room.game_id, 0)
+        return await service.end_current_question(room.game_id, HOST_USER_ID, expected_index=0)
+
+    assert _run(service, main()) == {"game_complete": True}
+    assert service.connection_manager.types().count("game_over") == 1
+
+
+def test_next_question_command_passes_the_question_index(server):
+    service = _service(server)
+
+    async def main():
+        room = _start_room(service)
+        await service.handle_question_deadline(room.game_id, 0)
+        commands = GameSocketCommands(service, room.game_id, HOST_USER_ID)
+        ack = await commands.handle(json.dumps({"type": "next_question", "id": "n1", "payload": {"question_index": 0}}))
+        return room, ack
+
+    room, ack = _run(service, main())
+    assert ack["ok"] and ack["id"] == "n1"
+    assert room.current_index == 1
+
+
+def test_stale_host_next_without_a_room_changes_nothing(server):
+    service = _service(server)
+    service.game_rooms = None # Played from the database
+    game_id = str(uuid.uuid4())
+    server.rows("game_sessions").append({
+        "id": game_id, "code": "ABC123", "host_user_id": HOST_USER_ID, "pack_id": PACK_ID,
+        "status": GameStatus.COMPLETED.value, "question_count": 1, "current_question_index": 0,
+    })
+
+    result = asyncio.run(service.end_current_question(game_id, HOST_USER_ID, expected_index=0))
+    assert result == {"game_complete": True}
+    assert [r.method for r in server.requests] == ["GET"]
+
+
+# --- Play from the room, persisted behind it ---
+
+def test_answers_are_scored_in_memory_and_written_behind(server):
+    service = _service(server)
+
+    async def main():
+        room = _start_room(service, player_count=2, server=server)
+        host_id, player_id = list(room.participants)
+        right = await service.submit_answer(room.game_id, host_id, 0, _correct_answer(room, 0))
+        wrong = await service.submit_answer(room.game_id, player_id, 0, _wrong_answer(room, 0))
+        with pytest.raises(ValueError, match="already submitted"):
+            await service.submit_answer(room.game_id, host_id, 0, _correct_answer(room, 0))
+        await room.flush()
+        return room, right, wrong
+
+    room, right, wrong = _run(service, main())
+    assert (right["is_correct"], right["score"], right["total_score"]) == (True, 1, 1)
+    assert right["correct_answer"] == "Right 0"
+    assert (wrong["is_correct"], wrong["total_score"]) == (False, 0)
+    stored = server.rows("game_questions")[0]
+    assert stored["participant_scores"] == {p: s for p, s in room.questions[0].scores.items()}
+    assert {p["id"]: p["score"] for p in server.rows("game_participants")} == {p.id: p.score for p in room.participants.values()}
+
+
+def test_closing_a_question_persists_its_end_history_and_the_advance(server):
+    service = _service(server)
+
+    async def main():
+        room = _start_room(service, player_count=2, server=server)
+        host_id = next(iter(room.participants))
+        await service.submit_answer(room.game_id, host_id, 0, _correct_answer(room, 0))
+        await service.end_current_question(room.game_id, HOST_USER_ID, expected_index=0)
+        await room.flush()
+        return room
+
+    room = _run(service, main())
+    first, second = server.rows("game_questions")[:2]
+    assert first["end_time"] is not None and second["start_time"] is not None
+    assert server.rows("game_sessions")[0]["current_question_index"] == 1
+    history = [(row["user_id"], row["question_id"], row["correct"]) for row in server.rows("user_question_history")]
+    assert history == [(HOST_USER_ID, room.questions[0].question_id, True)]
+    seen_calls = [json.loads(r.content) for r in server.requests_to("POST", "rpc/mark_questions_seen")]
+    assert [(call["p_user_ids"], call["p_ordinals"]) for call in seen_calls] == [([HOST_USER_ID], [0])]
+    results = service.connection_manager.broadcasts[0]
+    assert (results["type"], results["payload"]["reason"]) == ("question_results", "host")
+    assert results["payload"]["scores"] == {next(iter(room.participants)): 1}
+
+
+def test_last_question_completes_the_game_and_retires_the_room(server):
+    service = _service(server, game_rooms=GameRoomRegistry(retention_seconds=0))
+
+    async def main():
+        room = _start_room(service, question_count=1, server=server)
+        result = await service.end_current_question(room.game_id, HOST_USER_ID, expected_index=0)
+        await asyncio.sleep(0.05) # Retirement flushes the room's writes, then drops it
+        return room, result
+
+    room, result = _run(service, main())
+    assert result == {"game_complete": True}
+    assert room.status == GameStatus.COMPLETED
+    assert service.game_rooms.get(room.game_id) is None
+    assert server.rows("game_sessions")[0]["status"] == "completed"
+    game_over = service.connection_manager.broadcasts[-1]
+    assert game_over["type"] == "game_over" and game_over["payload"]["status"] == "completed"
+
+
+def test_stale_deadline_does_not_close_the_next_question(server):
+    service = _service(server)
+
+    async def main():
+        room = _start_room(service)
+        await service.end_current_question(room.game_id, HOST_USER_ID, expected_index=0)
+        await service.handle_question_deadline(room.game_id, 0) # Question 0's timer firing late
+        return room
+
+    room = _run(service, main())
+    assert room.current_index == 1 and room.current_question.end_time is None
+
+
+def test_answers_after_close_are_rejected(server):
+    service = _service(server)
+
+    async def main():
+        room = _start_room(service, server=server)
+        host_id = next(iter(room.participants))
+        await service.end_current_question(room.game_id, HOST_USER_ID, expected_index=0)
+        with pytest.raises(ValueError, match="has already ended"):
+            await service.submit_answer(room.game_id, host_id, 0, _correct_answer(room, 0))
+        return room
+
+    room = _run(service, main())
+    assert room.questions[0].answers == {}
+
+
+def test_question_closes_early_once_every_connected_player_answered(server):
+    timers = TimerWheel(tick_seconds=0.01)
+    service = _service(server, question_timers=timers)
+    timers.handler = service.handle_question_deadline
+
+    async def main():
+        room = _start_room(service, player_count=3, server=server)
+        host_id, player_id, absent_id = list(room.participants)
+        for participant_id in (host_id, player_id):
+            await service.connection_manager.connect(FakeWebSocket(), room.game_id, room.participants[participant_id].user_id)
+        await service.submit_answer(room.game_id, host_id, 0, _correct_answer(room, 0))
+        await asyncio.sleep(0.05)
+        still_open = room.current_index == 0
+        await service.submit_answer(room.game_id, player_id, 0, _wrong_answer(room, 0))
+        await asyncio.sleep(0.05)
+        await timers.aclose()
+        return room, still_open
+
+    room, still_open = _run(service, main())
+    assert still_open
+    assert room.current_index == 1
+    results = service.connection_manager.broadcasts[0]
+    assert results["payload"]["reason"] == "all_answered"
@@ -0,0 +1,62 @@
+# backend/tests/test_incremental_json_parser.py
+"""Tests for IncrementalJsonArrayParser, which yields objects from a streamed JSON array."""
+
+import json
+
+from src.utils.llm.llm_parsing_utils import IncrementalJsonArrayParser
+
+
+QUESTIONS = [
+    {"question": "Capital of France?", "answer": "Paris"},
+    {"question": "Tricky \"quotes\" and {braces} [brackets]?", "answer": "a\\b}"},
+    {"question": "Nested?", "answer": "yes", "tags": [{"k": [1, 2]}, {}]},
+]
+
+
+def _feed_in_chunks(text: str, size: int):
+    parser = IncrementalJsonArrayParser()
+    emitted = []
+    for i in range(0, len(text), size):
+        emitted.append(parser.feed(text[i:i + size]))
+    return parser, emitted
+
+
+def test_objects_are_emitted_as_soon_as_they_close():
+    text = "```json\n" + json.dumps(QUESTIONS, indent=2) + "\n```"
+    for size in (1, 3, 7, 64, len(text)):
+        parser, emitted = _feed_in_chunks(text, size)
+        assert [item for chunk in emitted for item in chunk] == QUESTIONS
+        assert parser.finished and parser.items_emitted == 3 and parser.errors == 0
+        assert parser.text == text
+
+
+def test_first_object_is_available_before_the_array_ends():
+    parser = IncrementalJsonArrayParser()
+    assert parser.feed('[{"answer": "Paris"}, {"answer": "Ber') == [{"answer": "Paris"}]
+    assert not parser.finished
+    assert parser.feed('lin"}]') == [{"answer": "Berlin"}]
+    assert parser.finished
+
+
+def test_text_before_the_array_and_after_it_is_ignored():
+    parser = IncrementalJsonArrayParser()
+    assert parser.feed('Sure! {"not": "in array"} [{"a": 1}] trailing {"b": 2}') == [{"a": 1}]
+    assert parser.feed('[{"c": 3}]') == []
+
+
+def test_trailing_commas_are_repaired():
+    parser = IncrementalJsonArrayParser()
+    assert parser.feed('[{"a": [1, 2,], "b": 1,},]') == [{"a": [1, 2], "b": 1}]
+    assert parser.errors == 0
+
+
+def test_unparseable_objects_are_counted_and_skipped():
+    parser = IncrementalJsonArrayParser()
+    assert parser.feed('[{"a": 1}, {bad json}, {"c": 3}]') == [{"a": 1}, {"c": 3}]
+    assert (parser.items_emitted, parser.errors) == (2, 1)
+
+
+def test_truncated_stream_keeps_completed_objects():
+    parser, emitted = _feed_in_chunks('[{"a": 1}, {"b": "cut off', 4)
+    assert [item for chunk in emitted for item in chunk] == [{"a": 1}]
+    assert not parser.finished
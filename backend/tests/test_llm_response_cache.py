@@ -0,0 +1,136 @@
+# backend/tests/test_llm_response_cache.py
+"""Tests for the two-tier LLM response cache and its environment configuration."""
+
+import asyncio
+
+import pytest
+
+from src.utils.llm import llm_response_cache
+from src.utils.llm.llm_response_cache import LLMResponseCache, make_cache_key, get_llm_response_cache
+from src.utils.llm.llm_parsing_utils import parses_without_repair
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(llm_response_cache.time, "time", fake)
+    return fake
+
+
+@pytest.fixture
+def fresh_shared_cache(monkeypatch):
+    monkeypatch.setattr(llm_response_cache, "_response_cache", None)
+    monkeypatch.setattr(llm_response_cache, "_response_cache_initialized", False)
+    for name in ("LLM_CACHE_ENABLED", "LLM_CACHE_PATH"):
+        monkeypatch.delenv(name, raising=False)
+
+
+def test_cache_key_covers_every_request_field():
+    base = ("openai", "gpt", "system", "prompt", 0.7, 100)
+    key = make_cache_key(*base)
+    assert key == make_cache_key(*base)
+    for i, changed in enumerate(("gemini", "other", "sys", "prompt!", 0.8, 101)):
+        assert make_cache_key(*base[:i], changed, *base[i + 1:]) != key
+
+
+def test_memory_tier_is_lru_bounded():
+    cache = LLMResponseCache(max_memory_entries=2)
+    cache.set("a", "A")
+    cache.set("b", "B")
+    assert cache.get("a") == "A" # a is now most recently used
+    cache.set("c", "C")
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == ("A", "C")
+    assert cache.get_metrics()["memory_evictions"] == 1
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = LLMResponseCache(ttl_seconds=60)
+    cache.set("k", "v")
+    clock.now += 59
+    assert cache.get("k") == "v"
+    clock.now += 2
+    assert cache.get("k") is None
+
+
+def test_empty_responses_are_not_cached():
+    cache = LLMResponseCache()
+    cache.set("k", "")
+    assert cache.get("k") is None
+    assert cache.get_metrics()["writes"] == 0
+
+
+def test_disk_tier_survives_a_new_instance(tmp_path):
+    path = str(tmp_path / "cache" / "llm.sqlite")
+    first = LLMResponseCache(db_path=path)
+    first.set("k", "persisted")
+    first.close()
+
+    second = LLMResponseCache(db_path=path)
+    assert second.get("k") == "persisted"
+    assert second.get("k") == "persisted" # Promoted to memory
+    metrics = second.get_metrics()
+    assert (metrics["disk_hits"], metrics["memory_hits"], metrics["disk_enabled"]) == (1, 1, True)
+    second.close()
+
+
+def test_async_api_matches_sync_api(tmp_path):
+    async def main():
+        cache = LLMResponseCache(db_path=str(tmp_path / "llm.sqlite"))
+        assert await cache.aget("k") is None
+        await cache.aset("k", "v")
+        assert await cache.aget("k") == "v"
+        cache.close()
+    asyncio.run(main())
+
+
+def test_metrics_report_hit_rate():
+    cache = LLMResponseCache()
+    cache.set("k", "v")
+    cache.get("k")
+    cache.get("missing")
+    cache.record_bypass()
+    metrics = cache.get_metrics()
+    assert metrics["hit_rate"] == 0.5
+    assert metrics["bypassed"] == 1
+
+
+def test_shared_cache_is_off_by_default(fresh_shared_cache):
+    assert get_llm_response_cache() is None
+    assert llm_response_cache.get_llm_response_cache_metrics() == {"enabled": False}
+
+
+def test_shared_cache_uses_memory_only_without_a_path(fresh_shared_cache, monkeypatch):
+    monkeypatch.setenv("LLM_CACHE_ENABLED", "true")
+    cache = get_llm_response_cache()
+    assert cache is not None and cache.db_path is None
+    assert get_llm_response_cache() is cache
+
+
+def test_shared_cache_rejects_a_relative_path(fresh_shared_cache, monkeypatch):
+    monkeypatch.setenv("LLM_CACHE_ENABLED", "true")
+    monkeypatch.setenv("LLM_CACHE_PATH", "data/llm.sqlite")
+    with pytest.raises(ValueError, match="absolute"):
+        get_llm_response_cache()
+
+
+def test_shared_cache_opens_an_absolute_path(fresh_shared_cache, monkeypatch, tmp_path):
+    monkeypatch.setenv("LLM_CACHE_ENABLED", "true")
+    monkeypatch.setenv("LLM_CACHE_PATH", str(tmp_path / "llm.sqlite"))
+    cache = get_llm_response_cache()
+    assert cache.get_metrics()["disk_enabled"] is True
+    cache.close()
+
+
+def test_only_output_that_parses_without_repair_is_cacheable():
+    assert parses_without_repair('{"a": 1}')
+    assert parses_without_repair('Here you go:\n```json\n[{"a": 1}]\n```')
+    assert not parses_without_repair("no json here at all")
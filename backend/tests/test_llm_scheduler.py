@@ -0,0 +1,142 @@
+# backend/tests/test_llm_scheduler.py
+"""Tests for per-provider LLM admission control (token buckets, priorities, in-flight cap)."""
+
+import asyncio
+import time
+
+import pytest
+
+from src.utils.llm import llm_scheduler
+from src.utils.llm.llm_scheduler import LLMPriority, LLMScheduler, TokenBucket, estimate_tokens, get_llm_scheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(llm_scheduler.time, "monotonic", fake)
+    return fake
+
+
+# --- TokenBucket ---
+
+def test_bucket_starts_full_and_refills_at_its_rate(clock):
+    bucket = TokenBucket(rate_per_minute=60) # 1 token per second
+    assert bucket.seconds_until_available(60) == 0.0
+    bucket.consume(60)
+    assert bucket.seconds_until_available(1) == pytest.approx(1.0)
+    clock.now += 0.5
+    assert bucket.seconds_until_available(1) == pytest.approx(0.5)
+    clock.now += 100
+    bucket.consume(0)
+    assert bucket.tokens == pytest.approx(60) # Never refills past capacity
+
+
+def test_bucket_caps_requests_larger_than_capacity(clock):
+    bucket = TokenBucket(rate_per_minute=60, capacity=10)
+    assert bucket.clamp(500) == 10
+    assert bucket.seconds_until_available(500) == 0.0
+    bucket.consume(500)
+    assert bucket.tokens == pytest.approx(0)
+    assert bucket.seconds_until_available(500) == pytest.approx(10.0)
+
+
+def test_zero_rate_disables_the_bucket(clock):
+    bucket = TokenBucket(rate_per_minute=0)
+    assert not bucket.enabled
+    bucket.consume(10 ** 6)
+    assert bucket.seconds_until_available(10 ** 6) == 0.0
+
+
+def test_estimate_tokens_counts_prompt_and_completion():
+    assert estimate_tokens("x" * 400, 50) == 150
+
+
+# --- LLMScheduler ---
+
+def test_in_flight_limit_and_priority_order():
+    async def main():
+        scheduler = LLMScheduler("test", max_in_flight=1)
+        order = []
+
+        async def call(name, priority):
+            async with scheduler.slot(priority):
+                order.append(name)
+                await asyncio.sleep(0)
+
+        await scheduler.acquire()
+        tasks = [
+            asyncio.create_task(call("bulk", LLMPriority.BULK)),
+            asyncio.create_task(call("normal", LLMPriority.NORMAL)),
+            asyncio.create_task(call("interactive", LLMPriority.INTERACTIVE)),
+        ]
+        await asyncio.sleep(0.01)
+        assert order == [] # All queued behind the held slot
+        assert scheduler.get_metrics()["queue_depth"] == 3
+        scheduler.release()
+        await asyncio.gather(*tasks)
+        assert order == ["interactive", "normal", "bulk"]
+        metrics = scheduler.get_metrics()
+        assert metrics["in_flight"] == 0 and metrics["admitted_total"] == 4
+        assert metrics["admitted_by_priority"] == {"INTERACTIVE": 1, "NORMAL": 2, "BULK": 1}
+    asyncio.run(main())
+
+
+def test_cancelled_waiter_does_not_hold_a_slot():
+    async def main():
+        scheduler = LLMScheduler("test", max_in_flight=1)
+        await scheduler.acquire()
+        waiter = asyncio.create_task(scheduler.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        scheduler.release()
+        await asyncio.wait_for(scheduler.acquire(), 1) # Admitted straight away
+        assert scheduler.get_metrics()["in_flight"] == 1
+        assert scheduler.get_metrics()["queue_depth"] == 0
+    asyncio.run(main())
+
+
+def test_rate_limit_delays_admission():
+    async def main():
+        scheduler = LLMScheduler("test", max_in_flight=10)
+        scheduler.request_bucket = TokenBucket(rate_per_minute=600, capacity=1) # One request per 0.1s
+        started = time.monotonic()
+        for _ in range(3):
+            async with scheduler.slot():
+                pass
+        return time.monotonic() - started
+    assert asyncio.run(main()) >= 0.18
+
+
+def test_token_budget_delays_large_calls():
+    async def main():
+        scheduler = LLMScheduler("test", max_in_flight=10, tokens_per_minute=6000) # 100 tokens per second
+        await scheduler.acquire(estimated_tokens=6000)
+        second = asyncio.create_task(scheduler.acquire(estimated_tokens=10))
+        await asyncio.sleep(0.01)
+        assert not second.done()
+        await asyncio.wait_for(second, 1)
+        assert scheduler.get_metrics()["in_flight"] == 2
+    asyncio.run(main())
+
+
+def test_schedulers_are_shared_per_provider_and_configured_from_env(monkeypatch):
+    monkeypatch.setattr(llm_scheduler, "_schedulers", {})
+    monkeypatch.setenv("LLM_MAX_IN_FLIGHT", "4")
+    monkeypatch.setenv("LLM_OPENAI_MAX_IN_FLIGHT", "2")
+    monkeypatch.setenv("LLM_OPENAI_REQUESTS_PER_MINUTE", "120")
+    openai = get_llm_scheduler("OpenAI")
+    assert get_llm_scheduler("openai") is openai
+    assert openai.max_in_flight == 2
+    assert openai.request_bucket.rate_per_second == pytest.approx(2.0)
+    assert get_llm_scheduler("gemini").max_in_flight == 4
+    assert set(llm_scheduler.get_llm_scheduler_metrics()) == {"openai", "gemini"}
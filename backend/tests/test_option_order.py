@@ -0,0 +1,39 @@
+# backend/tests/test_option_order.py
+"""Tests for deterministic option order and answer ID parsing."""
+
+from src.game.option_order import option_order, arrange_options, answer_id, parse_answer_index
+
+
+def test_order_is_a_stable_permutation_per_game_and_question():
+    order = option_order("game-1", "question-1", 4)
+    assert sorted(order) == [0, 1, 2, 3]
+    assert option_order("game-1", "question-1", 4) == order
+    orders = {tuple(option_order(f"game-{i}", "question-1", 4)) for i in range(50)}
+    assert len(orders) > 1 # Varies between games
+
+
+def test_arrange_options_reports_where_the_correct_answer_landed():
+    for i in range(20):
+        options, correct_index = arrange_options(f"game-{i}", "q", "Paris", ["Lyon", "Nice", "Lille"])
+        assert sorted(options) == ["Lille", "Lyon", "Nice", "Paris"]
+        assert options[correct_index] == "Paris"
+        assert (options, correct_index) == arrange_options(f"game-{i}", "q", "Paris", ["Lyon", "Nice", "Lille"])
+
+
+def test_arrange_options_without_incorrect_answers():
+    assert arrange_options("g", "q", "Only", []) == (["Only"], 0)
+
+
+def test_answer_id_round_trips():
+    assert answer_id("q-123", 2) == "q-123-2"
+    assert parse_answer_index(answer_id("q-123", 2), "q-123") == 2
+    assert parse_answer_index(answer_id("q-123", 10), "q-123") == 10
+
+
+def test_parse_answer_index_rejects_other_answers():
+    assert parse_answer_index("other-2", "q-123") is None # Another question's answer
+    assert parse_answer_index("q-123-", "q-123") is None
+    assert parse_answer_index("q-123--1", "q-123") is None
+    assert parse_answer_index("q-123-1a", "q-123") is None
+    assert parse_answer_index("q-123-²", "q-123") is None # Unicode digit, not a number
+    assert parse_answer_index("Paris", "q-123") is None # Answer text instead of an ID
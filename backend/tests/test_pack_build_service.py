@@ -0,0 +1,146 @@
+# backend/tests/test_pack_build_service.py
+"""
+Tests for the pipelined pack build, run end to end on the offline replay LLM
+provider and an in-memory PostgREST server.
+"""
+
+import asyncio
+import uuid
+
+import pytest
+
+from fake_postgrest import FakePostgrest
+from src.api.schemas.question import DifficultyConfig, TopicQuestionConfig
+from src.config.config import LLMConfig
+from src.models.question import DifficultyLevel
+from src.repositories.incorrect_answers_repository import IncorrectAnswersRepository
+from src.repositories.pack_repository import PackRepository
+from src.repositories.question_repository import QuestionRepository
+from src.repositories.topic_repository import TopicRepository
+from src.services.incorrect_answer_service import IncorrectAnswerService
+from src.services.pack_build_service import PackBuildService
+from src.services.question_service import QuestionService
+from src.services.seed_question_service import SeedQuestionService
+from src.utils.llm.llm_scheduler import LLMScheduler
+from src.utils.llm.llm_service import LLMService
+from src.utils.llm.replay_client import ReplayInjectedError, ReplayLLMClient
+from src.utils.question_generation.incorrect_answer_generator import IncorrectAnswerGenerator
+from src.utils.question_generation.question_generator import QuestionGenerator
+
+PACK_ID = str(uuid.uuid4())
+
+
+class FlakyReplayClient(ReplayLLMClient):
+    """Replay client whose first few incorrect-answer calls fail."""
+
+    def __init__(self, failing_answer_calls: int = 0, **options):
+        super().__init__(**options)
+        self.failing_answer_calls = failing_answer_calls
+        self.answer_calls = 0
+
+    async def agenerate(self, prompt, temperature=0.7, max_tokens=1000):
+        if "plausible but incorrect answers" in prompt:
+            self.answer_calls += 1
+            if self.answer_calls <= self.failing_answer_calls:
+                raise ReplayInjectedError("Injected incorrect-answer failure")
+        return await super().agenerate(prompt, temperature, max_tokens)
+
+
+def _build_service(server, client: ReplayLLMClient, **options) -> PackBuildService:
+    llm_service = LLMService(LLMConfig(provider="replay"), scheduler=LLMScheduler("replay-test", max_in_flight=16))
+    llm_service.client = llm_service.async_client = client
+    db = server.client()
+    pack_repository, topic_repository = PackRepository(db), TopicRepository(db)
+    question_service = QuestionService(
+        QuestionRepository(db), topic_repository, pack_repository,
+        SeedQuestionService(pack_repository, topic_repository),
+        question_generator=QuestionGenerator(llm_service=llm_service)
+    )
+    incorrect_answer_service = IncorrectAnswerService(
+        QuestionRepository(db), IncorrectAnswersRepository(db),
+        IncorrectAnswerGenerator(llm_service=llm_service)
+    )
+    return PackBuildService(question_service, incorrect_answer_service, **options)
+
+
+@pytest.fixture(autouse=True)
+def replay_provider(monkeypatch):
+    # Services that build their own LLM clients get the replay provider too
+    monkeypatch.setenv("LLM_PROVIDER", "replay")
+    monkeypatch.setenv("LLM_CACHE_ENABLED", "false")
+
+
+@pytest.fixture
+def server():
+    server = FakePostgrest()
+    server.rows("packs").append({"id": PACK_ID, "name": "Replay Pack", "price": 0, "creator_type": "system"})
+    return server
+
+
+def _topics(*names: str, count: int = 5):
+    return [
+        TopicQuestionConfig(topic=name, custom_instructions="Keep it short.",
+                            difficulty_configs=[DifficultyConfig(difficulty=DifficultyLevel.MEDIUM, num_questions=count)])
+        for name in names
+    ]
+
+
+def _build(service: PackBuildService, topics, **options):
+    return asyncio.run(asyncio.wait_for(service.build_pack(PACK_ID, "Replay Pack", topics, **options), timeout=10))
+
+
+def test_pipeline_stores_questions_and_incorrect_answers(server):
+    service = _build_service(server, FlakyReplayClient(latency_ms=5), batch_linger_seconds=0.05)
+    result = _build(service, _topics("History", "Science"), num_incorrect_answers=3)
+
+    assert result["status"] == "completed"
+    assert result["total_questions_generated"] == 10
+    assert result["total_incorrect_answers_stored"] == 10
+    assert result["failed_question_ids"] == [] and result["failed_topics"] == []
+    stored = server.rows("incorrect_answers")
+    assert {row["question_id"] for row in stored} == {row["id"] for row in server.rows("questions")}
+    assert all(len(row["incorrect_answers"]) == 3 for row in stored)
+    assert result["stages"]["storage"]["items_out"] == 10
+
+
+def test_failed_answer_batches_are_retried(server):
+    client = FlakyReplayClient(failing_answer_calls=1)
+    result = _build(_build_service(server, client, answer_workers=1), _topics("History"), batch_size=5, max_retries=1)
+
+    assert result["status"] == "completed"
+    assert result["total_incorrect_answers_stored"] == 5
+    assert client.answer_calls == 1 + 2 # The failed batch of 5 is retried in batches of 3 and 2
+
+
+def test_answer_failures_without_retries_are_reported(server):
+    client = FlakyReplayClient(failing_answer_calls=1)
+    result = _build(_build_service(server, client, answer_workers=1), _topics("History"), batch_size=5, max_retries=0)
+
+    assert result["status"] == "partial_failure"
+    assert len(result["failed_question_ids"]) == 5
+    assert result["failed_topics"] == ["History"]
+    assert result["stages"]["incorrect_answers"]["failures"] == 5
+    assert server.rows("incorrect_answers") == []
+
+
+def test_a_failing_stage_cancels_the_others(server):
+    service = _build_service(server, FlakyReplayClient(latency_ms=20), queue_size=1, answer_workers=1, storage_workers=1)
+    generate = service.question_service.batch_generate_and_store_questions
+
+    async def generate_then_fail(**kwargs):
+        await generate(**kwargs) # Questions are already flowing through the later stages
+        raise RuntimeError("question store lost")
+    service.question_service.batch_generate_and_store_questions = generate_then_fail
+
+    async def main():
+        with pytest.raises(RuntimeError, match="question store lost"):
+            await asyncio.wait_for(service.build_pack(PACK_ID, "Replay Pack", _topics("History", count=10), batch_size=2), timeout=10)
+        leftover = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        assert leftover == []
+    asyncio.run(main())
+
+
+def test_a_missing_pack_fails_the_build_without_hanging(server):
+    server.error_hooks.append(lambda method, target, body: {"code": "08006", "message": "connection failure"} if target == "packs" else None)
+    with pytest.raises(Exception, match="connection failure"):
+        _build(_build_service(server, FlakyReplayClient()), _topics("History"))
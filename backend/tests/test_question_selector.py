@@ -0,0 +1,86 @@
+# backend/tests/test_question_selector.py
+"""Tests for vectorized question selection (unseen first, topic balance, difficulty curve)."""
+
+from collections import Counter
+
+import numpy as np
+
+from src.game.question_selector import PackQuestionArrays, select_pack_questions, select_questions
+from src.models.question import DifficultyLevel, Question
+
+
+def _arrays(topics, difficulty=None, rate=None) -> PackQuestionArrays:
+    size = len(topics)
+    return PackQuestionArrays(
+        [f"q{i}" for i in range(size)],
+        np.array(topics, dtype=np.int32),
+        np.array(difficulty if difficulty is not None else [1.0] * size, dtype=np.float32),
+        np.array(rate if rate is not None else [0.0] * size, dtype=np.float32),
+    )
+
+
+def _rng(seed: int = 7) -> np.random.Generator:
+    return np.random.default_rng(seed)
+
+
+def test_returns_distinct_indexes_capped_at_pack_size():
+    arrays = _arrays([0, 1, 2, 0, 1])
+    none_seen = np.zeros(5, dtype=bool)
+    chosen = select_questions(arrays, none_seen, 3, _rng())
+    assert len(chosen) == 3 and len(set(chosen.tolist())) == 3
+    assert sorted(select_questions(arrays, none_seen, 50, _rng()).tolist()) == [0, 1, 2, 3, 4]
+    assert len(select_questions(arrays, none_seen, 0, _rng())) == 0
+    assert len(select_questions(_arrays([]), np.zeros(0, dtype=bool), 5, _rng())) == 0
+
+
+def test_unseen_questions_come_first():
+    arrays = _arrays([0] * 10)
+    seen = np.array([True] * 7 + [False] * 3)
+    for seed in range(20):
+        assert sorted(select_questions(arrays, seen, 3, _rng(seed)).tolist()) == [7, 8, 9]
+        assert {7, 8, 9} <= set(select_questions(arrays, seen, 5, _rng(seed)).tolist())
+
+
+def test_topics_are_taken_round_robin():
+    topics = [0] * 20 + [1] * 2 + [2] * 2
+    arrays = _arrays(topics)
+    for seed in range(20):
+        chosen = select_questions(arrays, np.zeros(len(topics), dtype=bool), 6, _rng(seed))
+        assert Counter(topics[i] for i in chosen) == {0: 2, 1: 2, 2: 2}
+        # Once the small topics run out the large one fills the rest
+        chosen = select_questions(arrays, np.zeros(len(topics), dtype=bool), 10, _rng(seed))
+        assert Counter(topics[i] for i in chosen) == {0: 6, 1: 2, 2: 2}
+
+
+def test_play_order_follows_the_difficulty_curve():
+    difficulty = [3.0, 0.0, 2.0, 1.0, 1.5, 0.0]
+    arrays = _arrays([0, 1, 2, 0, 1, 2], difficulty)
+    chosen = select_questions(arrays, np.zeros(6, dtype=bool), 6, _rng())
+    assert [difficulty[i] for i in chosen] == sorted(difficulty)
+
+
+def test_easier_questions_by_correct_rate_within_a_difficulty():
+    arrays = _arrays([0, 0, 0], rate=[0.2, 0.0, 0.9])
+    # Higher correct-answer rate first; an unknown rate counts as 0.5
+    assert select_questions(arrays, np.zeros(3, dtype=bool), 3, _rng()).tolist() == [2, 1, 0]
+
+
+def test_same_seed_gives_the_same_selection():
+    arrays = _arrays([i % 4 for i in range(40)], [float(i % 3) for i in range(40)])
+    seen = np.array([i % 5 == 0 for i in range(40)])
+    first = select_questions(arrays, seen, 10, _rng(3))
+    assert select_questions(arrays, seen, 10, _rng(3)).tolist() == first.tolist()
+
+
+def test_select_pack_questions_from_models():
+    questions = [
+        Question(id="hard", question="?", answer="!", pack_id="p", pack_topics_item="history", difficulty_initial=DifficultyLevel.HARD),
+        Question(id="easy", question="?", answer="!", pack_id="p", pack_topics_item="science", difficulty_initial=DifficultyLevel.EASY),
+        Question(id="seen", question="?", answer="!", pack_id="p", pack_topics_item="history", difficulty_initial=DifficultyLevel.EASY),
+        Question(id="unrated", question="?", answer="!", pack_id="p"),
+    ]
+    arrays = PackQuestionArrays.from_questions(questions)
+    assert arrays.difficulty.tolist() == [2.0, 0.0, 0.0, 1.5]
+    assert arrays.topic[0] == arrays.topic[2] != arrays.topic[1]
+    chosen = select_pack_questions(questions, {"seen"}, 3, _rng())
+    assert [q.id for q in chosen] == ["easy", "unrated", "hard"]
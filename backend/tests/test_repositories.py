@@ -0,0 +1,229 @@
+# backend/tests/test_repositories.py
+"""Tests for repository reads and writes against an in-memory PostgREST server."""
+
+import asyncio
+import uuid
+
+import pytest
+
+from fake_postgrest import FakePostgrest, install_record_game_answer
+from src.models.game_question import GameQuestionCreate
+from src.models.question import DifficultyLevel, QuestionCreate, QuestionUpdate
+from src.repositories.game_question_repository import GameQuestionRepository
+from src.repositories.question_repository import QuestionRepository
+
+PACK_ID = "6f1c5b7e-2a51-4c0e-9d1a-3b8f0f6c2a10"
+
+
+@pytest.fixture
+def server():
+    return FakePostgrest()
+
+
+@pytest.fixture
+def question_repo(server):
+    return QuestionRepository(server.client())
+
+
+def _question(text: str) -> QuestionCreate:
+    return QuestionCreate(question=text, answer=f"{text} answer", pack_id=PACK_ID)
+
+
+def _add_questions(server, count: int, pack_id: str = PACK_ID):
+    ids = sorted(str(uuid.uuid4()) for _ in range(count))
+    server.rows("questions").extend({"id": qid, "question": f"Q{i}", "answer": "A", "pack_id": pack_id} for i, qid in enumerate(ids))
+    return ids
+
+
+# --- Written rows are returned without a refetch ---
+
+def test_create_returns_the_inserted_row(server, question_repo):
+    created = asyncio.run(question_repo.create(obj_in=_question("Capital?")))
+    assert created.id == server.rows("questions")[0]["id"] # The id assigned by the database
+    assert [r.method for r in server.requests] == ["POST"]
+
+
+def test_update_returns_the_written_row_without_a_read(server, question_repo):
+    qid = _add_questions(server, 1)[0]
+    updated = asyncio.run(question_repo.update(id=qid, obj_in=QuestionUpdate(difficulty_current=DifficultyLevel.HARD)))
+    assert updated.difficulty_current == DifficultyLevel.HARD
+    assert [r.method for r in server.requests] == ["PATCH"]
+    assert server.rows("questions")[0]["difficulty_current"] == "hard"
+
+
+def test_update_with_refetch_reads_the_row_back(server, question_repo):
+    qid = _add_questions(server, 1)[0]
+    asyncio.run(question_repo.update(id=qid, obj_in=QuestionUpdate(answer="B"), refetch=True))
+    assert [r.method for r in server.requests] == ["PATCH", "GET"]
+
+
+def test_update_and_delete_of_a_missing_row_return_none(server, question_repo):
+    missing = str(uuid.uuid4())
+    assert asyncio.run(question_repo.update(id=missing, obj_in=QuestionUpdate(answer="B"))) is None
+    assert asyncio.run(question_repo.delete(id=missing)) is None
+
+
+def test_delete_returns_the_removed_row(server, question_repo):
+    ids = _add_questions(server, 2)
+    deleted = asyncio.run(question_repo.delete(id=ids[0]))
+    assert deleted.id == ids[0]
+    assert [row["id"] for row in server.rows("questions")] == [ids[1]]
+    assert [r.method for r in server.requests] == ["DELETE"]
+
+
+def test_update_statistics_writes_one_request(server, question_repo):
+    qid = _add_questions(server, 1)[0]
+    updated = asyncio.run(question_repo.update_statistics(qid, 0.25, DifficultyLevel.EXPERT))
+    assert (updated.correct_answer_rate, updated.difficulty_current) == (0.25, DifficultyLevel.EXPERT)
+    assert len(server.requests) == 1
+
+
+# --- create_many ---
+
+def test_create_many_matches_returned_rows_by_id(server, question_repo):
+    server.reorder_inserted = lambda rows: list(reversed(rows))
+    created, errors = asyncio.run(question_repo.create_many(objs_in=[_question(f"Q{i}") for i in range(5)], chunk_size=2))
+    assert errors == []
+    assert [q.question for q in created] == ["Q0", "Q1", "Q2", "Q3", "Q4"]
+    assert len(server.requests_to("POST", "questions")) == 3
+    assert {q.id for q in created} == {row["id"] for row in server.rows("questions")}
+
+
+def test_create_many_isolates_rows_rejected_for_their_data(server, question_repo):
+    def reject_bad_rows(method, table, body):
+        rows = body if isinstance(body, list) else [body]
+        if method == "POST" and any(row["question"].startswith("bad") for row in rows):
+            return {"code": "23505", "message": "duplicate key value violates unique constraint"}
+    server.error_hooks.append(reject_bad_rows)
+
+    objs_in = [_question("Q0"), _question("bad1"), _question("Q2"), _question("bad3")]
+    created, errors = asyncio.run(question_repo.create_many(objs_in=objs_in))
+    assert [q.question for q in created] == ["Q0", "Q2"]
+    assert [error["index"] for error in errors] == [1, 3]
+    assert "duplicate key" in errors[0]["error"]
+    assert len(server.requests_to("POST", "questions")) == 1 + len(objs_in) # Bulk attempt, then row by row
+
+
+def test_create_many_raises_errors_that_are_not_about_the_data(server, question_repo):
+    server.error_hooks.append(lambda method, table, body: {"code": "42501", "message": "permission denied"})
+    with pytest.raises(Exception, match="permission denied"):
+        asyncio.run(question_repo.create_many(objs_in=[_question("Q0"), _question("Q1")]))
+    assert len(server.requests_to("POST", "questions")) == 1
+
+
+def test_create_many_reports_rows_missing_from_the_response(server, question_repo):
+    server.reorder_inserted = lambda rows: rows[:1]
+    created, errors = asyncio.run(question_repo.create_many(objs_in=[_question("Q0"), _question("Q1")]))
+    assert [q.question for q in created] == ["Q0"]
+    assert errors == [{"index": 1, "error": "No row returned from insert"}]
+
+
+# --- Keyset paging ---
+
+def _pages(question_repo, page_size: int, **options):
+    async def main():
+        return [page async for page in question_repo.iter_pages_by_pack_id(PACK_ID, page_size=page_size, **options)]
+    return asyncio.run(main())
+
+
+@pytest.mark.parametrize("count, page_size, requests", [(5, 2, 3), (4, 2, 3), (0, 2, 1), (3, 10, 1)])
+def test_keyset_paging_stops_on_a_short_page(server, question_repo, count, page_size, requests):
+    ids = _add_questions(server, count)
+    _add_questions(server, 3, pack_id=str(uuid.uuid4())) # Another pack
+    pages = _pages(question_repo, page_size)
+    assert [q.id for page in pages for q in page] == ids
+    assert all(len(page) <= page_size for page in pages)
+    assert len(server.requests_to("GET", "questions")) == requests
+
+
+def test_keyset_paging_continues_after_the_last_id(server, question_repo):
+    ids = _add_questions(server, 3)
+    _pages(question_repo, 2)
+    first, second = server.requests_to("GET", "questions")
+    assert "gt." not in str(first.url)
+    assert f"id=gt.{ids[1]}" in str(second.url)
+
+
+def test_paging_filters_by_topic(server, question_repo):
+    ids = _add_questions(server, 3)
+    server.rows("questions")[1]["pack_topics_item"] = "History"
+    pages = _pages(question_repo, 2, topic="history")
+    assert [q.id for page in pages for q in page] == [ids[1]]
+
+
+def test_get_by_pack_id_without_a_limit_streams_the_whole_pack(server, question_repo):
+    ids = _add_questions(server, 5)
+    assert [q.id for q in asyncio.run(question_repo.get_by_pack_id(PACK_ID))] == ids
+    assert "id=gt." not in str(server.requests[0].url) and "limit=500" in str(server.requests[0].url)
+
+
+# --- GameQuestionRepository ---
+
+@pytest.fixture
+def game_question_repo(server, monkeypatch):
+    monkeypatch.setattr(GameQuestionRepository, "_correct_option_column_available", True)
+    return GameQuestionRepository(server.client())
+
+
+def _game_question(index: int = 0) -> GameQuestionCreate:
+    return GameQuestionCreate(game_session_id="game-1", question_id=f"q{index}", question_index=index, correct_option_index=2)
+
+
+def test_game_question_keeps_the_correct_option_index(server, game_question_repo):
+    created = asyncio.run(game_question_repo.create(obj_in=_game_question()))
+    assert created.correct_option_index == 2
+    assert server.rows("game_questions")[0]["correct_option_index"] == 2
+
+
+@pytest.mark.parametrize("error", [
+    {"code": "PGRST204", "message": "Could not find the 'correct_option_index' column of 'game_questions' in the schema cache"},
+    {"code": "42703", "message": 'column "correct_option_index" of relation "game_questions" does not exist'},
+])
+def test_game_questions_are_stored_without_a_missing_correct_option_column(server, game_question_repo, error):
+    server.error_hooks.append(
+        lambda method, table, body: error if method == "POST" and "correct_option_index" in (body or {}) else None
+    )
+
+    async def main():
+        return [await game_question_repo.create(obj_in=_game_question(i)) for i in range(3)]
+    created = asyncio.run(main())
+
+    assert [q.question_index for q in created] == [0, 1, 2]
+    assert all(q.correct_option_index is None for q in created)
+    # Only the first insert is retried; later ones leave the column out straight away
+    assert len(server.requests_to("POST", "game_questions")) == 4
+    assert not GameQuestionRepository._correct_option_column_available
+
+
+def test_other_insert_errors_are_raised(server, game_question_repo):
+    server.error_hooks.append(lambda method, table, body: {"code": "23503", "message": "violates foreign key constraint"})
+    with pytest.raises(Exception, match="foreign key"):
+        asyncio.run(game_question_repo.create(obj_in=_game_question()))
+    assert GameQuestionRepository._correct_option_column_available
+
+
+def test_record_answer_reports_recorded_and_duplicate_answers(server, game_question_repo):
+    install_record_game_answer(server)
+    question_id, participant_id = str(uuid.uuid4()), str(uuid.uuid4())
+    server.rows("game_questions").append({"id": question_id, "participant_answers": {}, "participant_scores": {}})
+    server.rows("game_participants").append({"id": participant_id, "score": 2})
+
+    first = asyncio.run(game_question_repo.record_answer(question_id, participant_id, "option_1", 1))
+    again = asyncio.run(game_question_repo.record_answer(question_id, participant_id, "option_2", 1))
+    assert first == {"recorded": True, "total_score": 3}
+    assert again == {"recorded": False, "total_score": None}
+    assert server.rows("game_questions")[0]["participant_answers"] == {participant_id: "option_1"}
+
+
+def test_record_answer_for_a_missing_participant_raises_and_writes_nothing(server, game_question_repo):
+    install_record_game_answer(server)
+    question_id = str(uuid.uuid4())
+    server.rows("game_questions").append({"id": question_id, "participant_answers": {}, "participant_scores": {}})
+    with pytest.raises(ValueError, match="not found"):
+        asyncio.run(game_question_repo.record_answer(question_id, str(uuid.uuid4()), "option_1", 1))
+    assert server.rows("game_questions")[0]["participant_answers"] == {}
+
+
+def test_record_answer_requires_the_database_function(server, game_question_repo):
+    with pytest.raises(RuntimeError, match="record_game_answer.sql"):
+        asyncio.run(game_question_repo.record_answer(str(uuid.uuid4()), str(uuid.uuid4()), "option_1", 1))
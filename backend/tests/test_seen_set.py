@@ -0,0 +1,60 @@
+# backend/tests/test_seen_set.py
+"""Tests that seen-question bitmaps use the same layout as the SQL seen_bitmap_set function."""
+
+import base64
+
+import pytest
+
+from src.game.seen_set import bitmap_from_ordinals, decode_bitmap, encode_bitmap, is_set
+
+
+def _sql_seen_bitmap_set(encoded: str, ordinals) -> str:
+    """Python model of seen_bitmap_set() in backend/sql/user_pack_seen_questions.sql."""
+    bits = bytearray(base64.b64decode(encoded)) if encoded else bytearray()
+    valid = [o for o in ordinals if o >= 0]
+    if not valid:
+        return encoded
+    bits.extend(b"\x00" * max(0, max(valid) // 8 + 1 - len(bits)))
+    for ordinal in valid:
+        # Postgres set_bit(bytea, n, 1): byte n / 8, bit n % 8 counted from the least significant bit
+        bits[ordinal // 8] |= 1 << (ordinal % 8)
+    return base64.b64encode(bytes(bits)).decode("ascii")
+
+
+def test_layout_matches_postgres_set_bit():
+    # Postgres docs: set_bit('\x1234567890'::bytea, 30, 0) = '\x1234563890'
+    before = decode_bitmap(base64.b64encode(bytes.fromhex("1234567890")).decode())
+    assert is_set(before, 30)
+    after = before & ~(1 << 30)
+    assert base64.b64decode(encode_bitmap(after)) == bytes.fromhex("1234563890")
+
+
+@pytest.mark.parametrize("ordinals", [[0], [7], [8], [0, 9, 17], [1, 63, 64, 1000], list(range(0, 200, 3))])
+def test_encoding_matches_the_sql_function(ordinals):
+    encoded = _sql_seen_bitmap_set("", ordinals)
+    assert encode_bitmap(bitmap_from_ordinals(ordinals)) == encoded
+    bitmap = decode_bitmap(encoded)
+    assert [n for n in range(1100) if is_set(bitmap, n)] == sorted(set(ordinals))
+
+
+def test_sql_updates_decode_to_the_union():
+    encoded = _sql_seen_bitmap_set("", [3, 40])
+    encoded = _sql_seen_bitmap_set(encoded, [5])
+    assert decode_bitmap(encoded) == bitmap_from_ordinals([3, 5, 40])
+
+
+def test_trailing_zero_bytes_do_not_change_the_bitmap():
+    padded = base64.b64encode(b"\x05\x00\x00").decode()
+    assert decode_bitmap(padded) == 0b101
+    assert encode_bitmap(decode_bitmap(padded)) == base64.b64encode(b"\x05").decode()
+
+
+def test_empty_and_negative_inputs():
+    assert decode_bitmap(None) == decode_bitmap("") == 0
+    assert encode_bitmap(0) == ""
+    assert bitmap_from_ordinals([None, -1]) == 0
+
+
+def test_malformed_bitmap_is_rejected():
+    with pytest.raises(ValueError, match="Malformed"):
+        decode_bitmap("not base64!")
@@ -0,0 +1,107 @@
+# backend/tests/test_timer_wheel.py
+"""Tests for the hashed timer wheel that drives question deadlines."""
+
+import asyncio
+
+from src.game.timer_wheel import TimerWheel
+
+
+def _run(scenario, **options):
+    async def main():
+        fired = []
+
+        async def handler(*args):
+            fired.append((asyncio.get_running_loop().time(), args))
+
+        wheel = TimerWheel(handler, **options)
+        try:
+            await scenario(wheel, fired)
+        finally:
+            await wheel.aclose()
+    asyncio.run(main())
+
+
+def test_timer_fires_once_after_its_delay():
+    async def scenario(wheel, fired):
+        scheduled_at = asyncio.get_running_loop().time()
+        wheel.schedule("room-1", 0.05, "room-1", 3)
+        assert len(wheel) == 1
+        await asyncio.sleep(0.15)
+        assert [args for _, args in fired] == [("room-1", 3)]
+        assert fired[0][0] - scheduled_at >= 0.05
+        assert len(wheel) == 0
+        assert wheel.get_metrics()["fired"] == 1
+    _run(scenario, tick_seconds=0.01)
+
+
+def test_rescheduling_a_key_replaces_its_timer():
+    async def scenario(wheel, fired):
+        wheel.schedule("room-1", 0.03, "first")
+        wheel.schedule("room-1", 0.06, "second")
+        wheel.schedule("room-2", 0.03, "other room")
+        await asyncio.sleep(0.15)
+        assert sorted(args for _, args in fired) == [("other room",), ("second",)]
+    _run(scenario, tick_seconds=0.01)
+
+
+def test_cancelled_timer_does_not_fire():
+    async def scenario(wheel, fired):
+        wheel.schedule("room-1", 0.03, "x")
+        assert wheel.deadline_of("room-1") is not None
+        assert wheel.cancel("room-1") is True
+        assert wheel.cancel("room-1") is False
+        assert wheel.deadline_of("room-1") is None
+        await asyncio.sleep(0.08)
+        assert fired == []
+        assert wheel.get_metrics()["cancelled"] == 1
+    _run(scenario, tick_seconds=0.01)
+
+
+def test_timers_beyond_one_revolution_wait_extra_rounds():
+    async def scenario(wheel, fired):
+        scheduled_at = asyncio.get_running_loop().time()
+        wheel.schedule("far", 0.1, "far") # 10 ticks on a 4-slot wheel
+        wheel.schedule("near", 0.02, "near")
+        await asyncio.sleep(0.06)
+        assert [args for _, args in fired] == [("near",)]
+        await asyncio.sleep(0.1)
+        assert [args for _, args in fired] == [("near",), ("far",)]
+        assert fired[1][0] - scheduled_at >= 0.1
+    _run(scenario, tick_seconds=0.01, wheel_size=4)
+
+
+def test_zero_delay_fires_on_the_next_tick():
+    async def scenario(wheel, fired):
+        wheel.schedule("room-1", 0, "now")
+        await asyncio.sleep(0.05)
+        assert [args for _, args in fired] == [("now",)]
+    _run(scenario, tick_seconds=0.01)
+
+
+def test_handler_errors_do_not_stop_the_wheel():
+    async def main():
+        calls = []
+
+        async def handler(name):
+            calls.append(name)
+            if name == "bad":
+                raise RuntimeError("boom")
+
+        wheel = TimerWheel(handler, tick_seconds=0.01)
+        wheel.schedule("a", 0.01, "bad")
+        wheel.schedule("b", 0.04, "good")
+        await asyncio.sleep(0.1)
+        await wheel.aclose()
+        assert calls == ["bad", "good"]
+        assert wheel.get_metrics()["handler_errors"] == 1
+    asyncio.run(main())
+
+
+def test_aclose_drops_pending_timers_and_ignores_new_ones():
+    async def scenario(wheel, fired):
+        wheel.schedule("room-1", 0.05, "x")
+        await wheel.aclose()
+        wheel.schedule("room-2", 0, "y")
+        await asyncio.sleep(0.08)
+        assert fired == [] and len(wheel) == 0
+    _run(scenario, tick_seconds=0.01)
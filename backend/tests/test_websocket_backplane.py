@@ -0,0 +1,321 @@
+# backend/tests/test_websocket_backplane.py
+"""
+Tests for the RESP client and the Redis backplane, run against a minimal
+in-process server speaking the subset of the Redis protocol the backplane uses.
+"""
+
+import asyncio
+from typing import Any, Dict, List, Set
+
+import pytest
+
+from src.websocket_backplane import (
+    RedisBackplane, RespError, RemoteCommandError, encode_command, read_resp,
+    _RENEW_OWNER_SCRIPT, _RELEASE_OWNER_SCRIPT, _PUBLISH_SEQUENCED_SCRIPT,
+)
+
+
+def _read_replies(data: bytes, count: int = 1) -> List[Any]:
+    async def main():
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        return [await read_resp(reader) for _ in range(count)]
+    return asyncio.run(main())
+
+
+def _bulk(value: Any) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    data = value if isinstance(value, bytes) else str(value).encode("utf-8")
+    return b"$%d\r\n%s\r\n" % (len(data), data)
+
+
+class FakeRedis:
+    """PUBLISH/SUBSCRIBE, SET NX, GET, set commands and the backplane's owner-key scripts."""
+
+    def __init__(self):
+        self.data: Dict[bytes, bytes] = {}
+        self.sets: Dict[bytes, Set[bytes]] = {}
+        self.hashes: Dict[bytes, Dict[bytes, bytes]] = {}
+        self.auth: List[List[bytes]] = []
+        self.subscribers: Dict[bytes, Set[asyncio.StreamWriter]] = {}
+        self.server = None
+
+    async def start(self) -> str:
+        self.server = await asyncio.start_server(self._serve, "127.0.0.1", 0)
+        return f"redis://127.0.0.1:{self.server.sockets[0].getsockname()[1]}"
+
+    async def stop(self) -> None:
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                command = await read_resp(reader)
+                writer.write(self._run(command, writer))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            for writers in self.subscribers.values():
+                writers.discard(writer)
+            writer.close()
+
+    def _run(self, command: List[bytes], writer: asyncio.StreamWriter) -> bytes:
+        name, args = command[0].upper(), command[1:]
+        if name == b"AUTH":
+            self.auth.append(args)
+            return b"+OK\r\n"
+        if name == b"SELECT":
+            return b"+OK\r\n"
+        if name == b"SUBSCRIBE":
+            out = b""
+            for channel in args:
+                self.subscribers.setdefault(channel, set()).add(writer)
+                out += b"*3\r\n" + _bulk(b"subscribe") + _bulk(channel) + b":1\r\n"
+            return out
+        if name == b"UNSUBSCRIBE":
+            out = b""
+            for channel in args:
+                self.subscribers.get(channel, set()).discard(writer)
+                out += b"*3\r\n" + _bulk(b"unsubscribe") + _bulk(channel) + b":0\r\n"
+            return out
+        if name == b"PUBLISH":
+            return b":%d\r\n" % self._publish(args[0], args[1])
+        if name == b"SET":
+            if b"NX" in args[2:] and args[0] in self.data:
+                return b"$-1\r\n"
+            self.data[args[0]] = args[1]
+            return b"+OK\r\n"
+        if name == b"GET":
+            return _bulk(self.data.get(args[0]))
+        if name == b"SADD":
+            self.sets.setdefault(args[0], set()).update(args[1:])
+            return b":1\r\n"
+        if name == b"SREM":
+            self.sets.get(args[0], set()).difference_update(args[1:])
+            return b":1\r\n"
+        if name == b"SMEMBERS":
+            members = sorted(self.sets.get(args[0], ()))
+            return b"*%d\r\n" % len(members) + b"".join(_bulk(member) for member in members)
+        if name == b"PEXPIRE":
+            return b":1\r\n"
+        if name == b"EVAL":
+            script, key_count = args[0].decode("utf-8"), int(args[1])
+            keys, argv = args[2:2 + key_count], args[2 + key_count:]
+            if script == _PUBLISH_SEQUENCED_SCRIPT:
+                log = self.hashes.setdefault(keys[0], {})
+                log[b"seq"] = b"%d" % (int(log.get(b"seq", 0)) + 1)
+                log.setdefault(b"epoch", argv[1])
+                self._publish(keys[1], b'{"seq":%s,"epoch":"%s",%s' % (log[b"seq"], log[b"epoch"], argv[0][1:]))
+                return b":" + log[b"seq"] + b"\r\n"
+            key, worker_id = keys[0], argv[0]
+            owner = self.data.get(key)
+            if script == _RELEASE_OWNER_SCRIPT:
+                if owner != worker_id:
+                    return b":0\r\n"
+                del self.data[key]
+                return b":1\r\n"
+            if script == _RENEW_OWNER_SCRIPT:
+                if owner is not None and owner != worker_id:
+                    return b":0\r\n"
+                self.data[key] = worker_id
+                return b":1\r\n"
+        return b"-ERR unknown command\r\n"
+
+    def _publish(self, channel: bytes, message: bytes) -> int:
+        receivers = list(self.subscribers.get(channel, ()))
+        for subscriber in receivers:
+            subscriber.write(b"*3\r\n" + _bulk(b"message") + _bulk(channel) + _bulk(message))
+        return len(receivers)
+
+
+async def _wait_for(condition, timeout: float = 2.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("condition not met in time")
+        await asyncio.sleep(0.01)
+
+
+def _run_with_backplanes(scenario, count: int = 2, **options) -> None:
+    async def main():
+        server = FakeRedis()
+        url = await server.start()
+        backplanes = [RedisBackplane(url, reconnect_delay=0.05, **options) for _ in range(count)]
+        try:
+            for backplane in backplanes:
+                backplane._ensure_started()
+            await _wait_for(lambda: all(b._sub_writer is not None for b in backplanes))
+            await scenario(server, *backplanes)
+        finally:
+            for backplane in backplanes:
+                await backplane.aclose()
+            await server.stop()
+    asyncio.run(main())
+
+
+# --- RESP encoding ---
+
+def test_encode_command_writes_bulk_string_array():
+    assert encode_command("SET", "k", 12) == b"*3\r\n$3\r\nSET\r\n$1\r\nk\r\n$2\r\n12\r\n"
+    assert encode_command("PUBLISH", "c", "hé") == b"*3\r\n$7\r\nPUBLISH\r\n$1\r\nc\r\n$3\r\nh\xc3\xa9\r\n"
+
+
+def test_read_resp_decodes_each_reply_type():
+    replies = _read_replies(b"+OK\r\n:42\r\n$5\r\nhe\r\nl\r\n$-1\r\n*2\r\n$1\r\na\r\n:1\r\n*-1\r\n", 6)
+    assert replies == ["OK", 42, b"he\r\nl", None, [b"a", 1], None]
+
+
+def test_read_resp_raises_error_replies():
+    with pytest.raises(RespError, match="WRONGTYPE"):
+        _read_replies(b"-WRONGTYPE bad\r\n")
+    with pytest.raises(RespError):
+        _read_replies(b"?what\r\n")
+
+
+def test_encoded_command_reads_back():
+    assert _read_replies(encode_command("GET", "key")) == [[b"GET", b"key"]]
+
+
+def test_url_credentials_are_sent_with_auth():
+    async def main():
+        server = FakeRedis()
+        url = await server.start()
+        port = url.rsplit(":", 1)[1]
+        for credentials in ("app:s%40cret@", ":legacy@"):
+            backplane = RedisBackplane(f"redis://{credentials}127.0.0.1:{port}")
+            _, writer = await backplane._open()
+            writer.close()
+        await server.stop()
+        return server.auth
+    assert asyncio.run(main()) == [[b"app", b"s@cret"], [b"legacy"]]
+
+
+# --- Broadcasts ---
+
+def test_broadcasts_reach_every_subscribed_worker_with_the_rooms_shared_sequence():
+    async def scenario(server, a, b):
+        received = {"a": [], "b": []}
+        a.set_handler(lambda *args: received["a"].append(args))
+        b.set_handler(lambda *args: received["b"].append(args))
+        a.subscribe("game-1")
+        b.subscribe("game-1")
+        await _wait_for(lambda: len(server.subscribers.get(b"trivia:room:game-1", ())) == 2)
+        a.publish("game-1", "next_question", '{"type":"next_question"}', "user-1")
+        await _wait_for(lambda: received["a"] and received["b"])
+        b.publish("game-1", "question_results", '{"type":"question_results"}')
+        await _wait_for(lambda: len(received["a"]) == 2 and len(received["b"]) == 2)
+
+        # The publisher gets its own broadcast back, and both workers see the same seq/epoch
+        assert received["a"] == received["b"]
+        (room, message_type, message_json, exclude, seq, epoch), second = received["a"]
+        assert (room, message_type, message_json, exclude, seq) == ("game-1", "next_question", '{"type":"next_question"}', "user-1", 1)
+        assert second[4:] == (2, epoch)
+        assert a.get_metrics()["received_own"] == 1 and a.get_metrics()["received"] == 1
+    _run_with_backplanes(scenario)
+
+
+# --- Presence ---
+
+def test_presence_is_shared_across_workers():
+    async def scenario(server, a, b):
+        a.add_presence("game-1", "user-1")
+        b.add_presence("game-1", "user-2")
+        b.add_presence("game-1", "user-1") # Same user with a second socket on another worker
+        await _wait_for(lambda: len(server.sets.get(b"trivia:presence:game-1", ())) == 3)
+        assert await a.present_user_ids("game-1") == {"user-1", "user-2"}
+        a.remove_presence("game-1", "user-1")
+        await _wait_for(lambda: len(server.sets[b"trivia:presence:game-1"]) == 2)
+        assert await b.present_user_ids("game-1") == {"user-1", "user-2"}
+        b.remove_presence("game-1", "user-1")
+        assert await b.present_user_ids("game-1") == {"user-2"}
+        assert await a.present_user_ids("game-1") == {"user-2"}
+        assert await a.present_user_ids("game-2") == set()
+    _run_with_backplanes(scenario)
+
+
+def test_aclose_removes_the_workers_presence():
+    async def scenario(server, a, b):
+        a.add_presence("game-1", "user-1")
+        b.add_presence("game-1", "user-2")
+        await _wait_for(lambda: len(server.sets.get(b"trivia:presence:game-1", ())) == 2)
+        await a.aclose()
+        assert await b.present_user_ids("game-1") == {"user-2"}
+    _run_with_backplanes(scenario)
+
+
+# --- Room ownership and forwarded commands ---
+
+def test_room_has_a_single_owner_until_released():
+    async def scenario(server, a, b):
+        assert await a.claim_room("game-1") is True
+        assert await a.claim_room("game-1") is True # Idempotent for the owner
+        assert await b.claim_room("game-1") is False
+        assert await b.room_owner("game-1") == a.worker_id
+        assert await a.room_owner("game-1") is None
+        a.release_room("game-1")
+        await _wait_for(lambda: b"trivia:room-owner:game-1" not in server.data)
+        assert await b.room_owner("game-1") is None
+        assert await b.claim_room("game-1") is True
+    _run_with_backplanes(scenario)
+
+
+def test_release_does_not_drop_another_workers_claim():
+    async def scenario(server, a, b):
+        assert await b.claim_room("game-1")
+        a._owned_rooms.add("game-1") # Stale local belief (e.g. key expired and was re-claimed)
+        a.release_room("game-1")
+        assert await a.room_owner("game-1") == b.worker_id
+        assert server.data[b"trivia:room-owner:game-1"] == b.worker_id.encode()
+    _run_with_backplanes(scenario)
+
+
+def test_call_runs_the_command_on_the_owner():
+    async def scenario(server, owner, other):
+        calls = []
+
+        async def handler(method, params):
+            calls.append((method, params))
+            if method == "submit_answer":
+                return {"success": True, "score": 1}
+            raise ValueError("Only host can end question/advance game")
+        owner.set_command_handler(handler)
+
+        result = await other.call(owner.worker_id, "submit_answer", {"game_session_id": "g", "question_index": 0})
+        assert result == {"success": True, "score": 1}
+        assert calls == [("submit_answer", {"game_session_id": "g", "question_index": 0})]
+        with pytest.raises(ValueError, match="Only host"):
+            await other.call(owner.worker_id, "end_current_question", {"game_session_id": "g"})
+        assert owner.get_metrics()["calls_served"] == 2
+    _run_with_backplanes(scenario)
+
+
+def test_call_failures_surface_as_remote_command_errors():
+    async def scenario(server, owner, other):
+        async def handler(method, params):
+            if method == "slow":
+                await asyncio.sleep(5)
+            raise KeyError("boom")
+        owner.set_command_handler(handler)
+
+        with pytest.raises(RemoteCommandError, match="Failed to process broken"):
+            await other.call(owner.worker_id, "broken", {})
+        with pytest.raises(RemoteCommandError, match="not connected"):
+            await other.call("no-such-worker", "get_game_state", {})
+        with pytest.raises(RemoteCommandError, match="No reply"):
+            await other.call(owner.worker_id, "slow", {})
+        assert other.get_metrics()["call_failures"] == 3
+        assert other.get_metrics()["pending_calls"] == 0
+    _run_with_backplanes(scenario, call_timeout=0.2)
+
+
+def test_aclose_releases_owned_rooms():
+    async def scenario(server, a, b):
+        assert await a.claim_room("game-1")
+        await a.aclose()
+        assert b"trivia:room-owner:game-1" not in server.data
+        assert await b.room_owner("game-1") is None
+    _run_with_backplanes(scenario)
@@ -0,0 +1,72 @@
+# backend/tests/test_websocket_encoding.py
+"""Tests for WebSocket encoding negotiation and per-encoding message frames."""
+
+import json
+
+import pytest
+
+from src import websocket_encoding
+from src.websocket_encoding import JSON, MSGPACK, EncodedMessage, decode, encode, negotiate_encoding
+
+
+@pytest.fixture
+def without_msgpack(monkeypatch):
+    monkeypatch.setattr(websocket_encoding, "msgpack", None)
+
+
+@pytest.fixture
+def msgpack():
+    return pytest.importorskip("msgpack")
+
+
+def test_json_is_the_default(without_msgpack):
+    assert negotiate_encoding([]) == (JSON, None)
+    assert negotiate_encoding(None) == (JSON, None)
+    assert negotiate_encoding(["trivia.json"]) == (JSON, "trivia.json")
+
+
+def test_msgpack_falls_back_to_json_when_unavailable(without_msgpack):
+    assert negotiate_encoding(["trivia.msgpack"]) == (JSON, None)
+    assert negotiate_encoding(["trivia.msgpack", "trivia.json"]) == (JSON, "trivia.json")
+    assert negotiate_encoding([], requested="msgpack") == (JSON, None)
+    with pytest.raises(ValueError):
+        decode(b"\x80")
+
+
+def test_unknown_requests_fall_back_to_json():
+    assert negotiate_encoding(["chat"], requested="xml") == (JSON, None)
+    assert negotiate_encoding([], requested="JSON") == (JSON, None)
+
+
+def test_text_frames_are_json():
+    message = {"type": "answer_result", "correct": True}
+    assert encode(message, JSON) == json.dumps(message)
+    assert decode(json.dumps(message)) == message
+
+
+def test_encoded_message_reuses_the_json_text():
+    text = '{"type":"tick","seq":1}'
+    encoded = EncodedMessage("tick", text)
+    assert encoded.message_type == "tick"
+    assert encoded.frame(JSON) is text
+
+
+def test_msgpack_is_preferred_when_offered(msgpack):
+    assert negotiate_encoding(["trivia.json", "trivia.msgpack"]) == (MSGPACK, "trivia.msgpack")
+    assert negotiate_encoding([], requested="MsgPack") == (MSGPACK, None)
+
+
+def test_msgpack_frames_round_trip(msgpack):
+    message = {"type": "question", "options": ["a", "b"], "time_limit": 20}
+    frame = encode(message, MSGPACK)
+    assert isinstance(frame, bytes)
+    assert decode(frame) == message
+
+
+def test_encoded_message_serializes_each_encoding_once(msgpack):
+    encoded = EncodedMessage("tick", '{"type":"tick"}', {"type": "tick"}, {"seq": 4, "epoch": "e"})
+    frame = encoded.frame(MSGPACK)
+    assert encoded.frame(MSGPACK) is frame
+    assert decode(frame) == {"type": "tick", "seq": 4, "epoch": "e"}
+    # Without the dict the JSON text is parsed instead
+    assert decode(EncodedMessage("tick", '{"type":"tick","seq":4}').frame(MSGPACK)) == {"type": "tick", "seq": 4}
@@ -0,0 +1,80 @@
+# backend/tests/test_websocket_event_log.py
+"""Tests for the per-room broadcast log used to replay missed events on reconnect."""
+
+import json
+
+from src.websocket_event_log import RoomEventLog, with_sequence
+
+
+def _log_with(count: int, capacity: int = 256) -> RoomEventLog:
+    log = RoomEventLog("game-1", capacity)
+    for i in range(count):
+        log.append("tick", json.dumps({"type": "tick", "i": i}))
+    return log
+
+
+def test_with_sequence_appends_fields_to_the_json_object():
+    assert json.loads(with_sequence('{"type":"x"}', 3, "e1")) == {"type": "x", "seq": 3, "epoch": "e1"}
+    assert json.loads(with_sequence("{}", 1, "e1")) == {"seq": 1, "epoch": "e1"}
+
+
+def test_append_numbers_broadcasts_in_order():
+    log = _log_with(3)
+    assert log.last_seq == 3
+    assert [json.loads(text)["seq"] for _, _, text, _ in log.events] == [1, 2, 3]
+    assert all(json.loads(text)["epoch"] == log.epoch for _, _, text, _ in log.events)
+
+
+def test_since_replays_only_missed_events():
+    log = _log_with(5)
+    missed = log.since(2, log.epoch)
+    assert [json.loads(text)["i"] for _, text in missed] == [2, 3, 4]
+    assert all(message_type == "tick" for message_type, _ in missed)
+    assert log.since(5, log.epoch) == []
+
+
+def test_since_skips_events_excluded_for_the_user():
+    log = RoomEventLog("game-1")
+    log.append("a", '{"n":1}')
+    log.append("b", '{"n":2}', exclude_user_id="user-1")
+    log.append("c", '{"n":3}')
+    assert [t for t, _ in log.since(0, log.epoch, "user-1")] == ["a", "c"]
+    assert [t for t, _ in log.since(0, log.epoch, "user-2")] == ["a", "b", "c"]
+
+
+def test_since_requires_a_snapshot_when_replay_is_impossible():
+    log = _log_with(10, capacity=4)
+    assert log.since(3, "other-epoch") is None # Different log
+    assert log.since(11, log.epoch) is None # Seq from the future
+    assert log.since(5, log.epoch) is None # Events 6 and 7 were evicted
+    assert [json.loads(text)["seq"] for _, text in log.since(6, log.epoch)] == [7, 8, 9, 10]
+
+
+def test_shared_sequence_is_adopted_from_the_backplane():
+    log = RoomEventLog("game-1")
+    text = log.append("tick", '{"type":"tick"}', seq=41, epoch="shared")
+    assert json.loads(text) == {"type": "tick", "seq": 41, "epoch": "shared"}
+    assert (log.last_seq, log.epoch) == (41, "shared")
+    log.append("tick", '{"type":"tick"}', seq=42, epoch="shared")
+    # A client that saw seq 40 on another worker resumes here; earlier ones need a snapshot
+    assert len(log.since(40, "shared")) == 2
+    assert log.since(39, "shared") is None
+
+
+def test_shared_sequence_ignores_repeats_and_drops_events_before_a_gap():
+    log = RoomEventLog("game-1")
+    log.append("a", "{}", seq=1, epoch="shared")
+    log.append("b", "{}", seq=2, epoch="shared")
+    assert log.append("b", "{}", seq=2, epoch="shared") is None
+    log.append("c", "{}", seq=5, epoch="shared") # 3 and 4 never arrived here
+    assert log.since(1, "shared") is None
+    assert [t for t, _ in log.since(4, "shared")] == ["c"]
+
+
+def test_new_shared_epoch_resets_the_log():
+    log = RoomEventLog("game-1")
+    log.append("a", "{}", seq=7, epoch="old")
+    log.append("b", "{}", seq=1, epoch="new")
+    assert (log.last_seq, log.epoch) == (1, "new")
+    assert log.since(7, "old") is None
+    assert [t for t, _ in log.since(0, "new")] == ["b"]
@@ -0,0 +1,247 @@
+# backend/tests/test_websocket_manager.py
+"""
+Tests for ConnectionManager's outbound queues: slow consumer policies, lag
+eviction, per-connection writer ordering and per-room metrics, using fake
+websockets whose sends can be held back.
+"""
+
+import asyncio
+import json
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from src.websocket_manager import ConnectionManager, WS_CLOSE_SLOW_CONSUMER
+
+
+class FakeWebSocket:
+    """Records sent frames; sends wait while the socket is held (a slow client)."""
+
+    def __init__(self, held: bool = False):
+        self.sent: List[Dict[str, Any]] = []
+        self.close_code: Optional[int] = None
+        self.released = asyncio.Event()
+        if not held:
+            self.released.set()
+
+    async def accept(self, subprotocol: Optional[str] = None) -> None:
+        pass
+
+    async def send_text(self, text: str) -> None:
+        await self.released.wait()
+        self.sent.append(json.loads(text))
+
+    async def send_bytes(self, data: bytes) -> None:
+        raise AssertionError("JSON connections are sent text frames")
+
+    async def close(self, code: int = 1000) -> None:
+        self.close_code = code
+
+    def release(self) -> None:
+        self.released.set()
+
+
+async def _settle() -> None:
+    """Let writer and close tasks run."""
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+async def _broadcast_numbers(manager: ConnectionManager, game_id: str, numbers, message_type: str = "tick") -> None:
+    for n in numbers:
+        await manager.broadcast({"type": message_type, "n": n}, game_id)
+        await _settle() # Writers of clients keeping up send each one
+
+
+def test_default_policy_is_disconnect(monkeypatch):
+    monkeypatch.delenv("WS_SLOW_CONSUMER_POLICY", raising=False)
+
+    async def main():
+        return ConnectionManager().slow_consumer_policy
+
+    assert asyncio.run(main()) == "disconnect"
+
+
+def test_invalid_policy_is_rejected():
+    with pytest.raises(ValueError):
+        ConnectionManager(slow_consumer_policy="ignore")
+
+
+def test_drop_policy_discards_oldest_queued_message():
+    async def main():
+        manager = ConnectionManager(max_queue_size=2, slow_consumer_policy="drop")
+        ws = FakeWebSocket(held=True)
+        await manager.connect(ws, "g1", "u1")
+        await _broadcast_numbers(manager, "g1", [1, 2, 3, 4]) # 1 is being sent; 2 and 3 fill the queue, 4 pushes out 2
+        metrics = manager.get_metrics()["rooms"]["g1"]
+        ws.release()
+        await _settle()
+        connected = manager.is_user_connected("g1", "u1")
+        await manager.aclose()
+        return ws, metrics, connected
+
+    ws, metrics, connected = asyncio.run(main())
+    assert [m["n"] for m in ws.sent] == [1, 3, 4]
+    assert [m["seq"] for m in ws.sent] == [1, 3, 4]
+    assert metrics["dropped"] == 1
+    assert metrics["queued"] == 2
+    assert connected and ws.close_code is None
+
+
+def test_coalesce_policy_replaces_queued_message_of_same_type():
+    async def main():
+        manager = ConnectionManager(max_queue_size=2, slow_consumer_policy="coalesce")
+        ws = FakeWebSocket(held=True)
+        await manager.connect(ws, "g1", "u1")
+        await _broadcast_numbers(manager, "g1", [1], "timer") # Being sent
+        await _broadcast_numbers(manager, "g1", [2], "timer")
+        await _broadcast_numbers(manager, "g1", [3], "question")
+        await _broadcast_numbers(manager, "g1", [4], "timer") # Supersedes timer 2
+        await _broadcast_numbers(manager, "g1", [5], "answer") # No queued answer: drops the oldest (question 3)
+        metrics = manager.get_metrics()["rooms"]["g1"]
+        ws.release()
+        await _settle()
+        await manager.aclose()
+        return ws, metrics
+
+    ws, metrics = asyncio.run(main())
+    assert [(m["type"], m["n"]) for m in ws.sent] == [("timer", 1), ("timer", 4), ("answer", 5)]
+    assert metrics["coalesced"] == 1
+    assert metrics["dropped"] == 1
+
+
+def test_disconnect_policy_evicts_full_queue():
+    async def main():
+        manager = ConnectionManager(max_queue_size=2, slow_consumer_policy="disconnect")
+        slow, fast = FakeWebSocket(held=True), FakeWebSocket()
+        await manager.connect(slow, "g1", "slow")
+        await manager.connect(fast, "g1", "fast")
+        await _broadcast_numbers(manager, "g1", [1, 2, 3, 4])
+        result = (manager.get_connected_user_ids("g1"), manager.evicted)
+        await manager.aclose()
+        return slow, fast, result
+
+    slow, fast, (connected, evicted) = asyncio.run(main())
+    assert slow.close_code == WS_CLOSE_SLOW_CONSUMER
+    assert connected == ["fast"]
+    assert evicted == 1
+    assert [m["n"] for m in fast.sent] == [1, 2, 3, 4] # The slow client never held up the others
+
+
+def test_disconnect_policy_evicts_lagging_connection():
+    async def main():
+        manager = ConnectionManager(max_queue_size=100, slow_consumer_policy="disconnect", max_lag_ms=20)
+        ws = FakeWebSocket(held=True)
+        await manager.connect(ws, "g1", "u1")
+        await _broadcast_numbers(manager, "g1", [1, 2])
+        await asyncio.sleep(0.05) # 2 has been queued longer than max_lag_ms
+        await _broadcast_numbers(manager, "g1", [3])
+        await _settle()
+        connected = manager.is_user_connected("g1", "u1")
+        await manager.aclose()
+        return ws, connected
+
+    ws, connected = asyncio.run(main())
+    assert not connected
+    assert ws.close_code == WS_CLOSE_SLOW_CONSUMER
+
+
+def test_evicted_client_resumes_from_last_seq():
+    async def main():
+        manager = ConnectionManager(max_queue_size=100, slow_consumer_policy="disconnect", max_lag_ms=20)
+        slow = FakeWebSocket(held=True)
+        await manager.connect(slow, "g1", "u1")
+        await _broadcast_numbers(manager, "g1", [1, 2])
+        await asyncio.sleep(0.05)
+        await _broadcast_numbers(manager, "g1", [3])
+        assert not manager.is_user_connected("g1", "u1")
+        resumed = FakeWebSocket()
+        position = manager.room_position("g1")
+        # The client reconnects after 1, the message it was being sent when evicted
+        assert await manager.connect(resumed, "g1", "u1", last_seq=1, epoch=position["epoch"])
+        await _settle()
+        await manager.aclose()
+        return resumed
+
+    resumed = asyncio.run(main())
+    assert [m["n"] for m in resumed.sent] == [2, 3]
+
+
+def test_writer_keeps_personal_messages_in_order_with_broadcasts():
+    async def main():
+        manager = ConnectionManager()
+        ws = FakeWebSocket(held=True)
+        await manager.connect(ws, "g1", "u1")
+        await manager.broadcast({"type": "question", "n": 1}, "g1")
+        assert manager.send_to_user({"type": "ack", "n": 2}, "g1", "u1")
+        await manager.broadcast({"type": "question", "n": 3}, "g1")
+        assert manager.send_to_user({"type": "ack", "n": 4}, "g1", "u1")
+        assert not manager.send_to_user({"type": "ack"}, "g1", "absent")
+        ws.release()
+        await _settle()
+        await manager.aclose()
+        return ws
+
+    ws = asyncio.run(main())
+    assert [m["n"] for m in ws.sent] == [1, 2, 3, 4]
+
+
+def test_metrics_are_reported_per_room():
+    async def main():
+        manager = ConnectionManager(max_queue_size=1, slow_consumer_policy="drop")
+        held = FakeWebSocket(held=True)
+        await manager.connect(held, "g1", "a")
+        await manager.connect(FakeWebSocket(), "g1", "b")
+        await manager.connect(FakeWebSocket(), "g2", "c")
+        await _broadcast_numbers(manager, "g1", [1, 2, 3]) # a is sent 1; 3 pushes 2 out of its queue
+        await _broadcast_numbers(manager, "g2", [1])
+        metrics = manager.get_metrics()
+        await manager.aclose()
+        return metrics
+
+    metrics = asyncio.run(main())
+    g1, g2 = metrics["rooms"]["g1"], metrics["rooms"]["g2"]
+    assert (g1["connections"], g1["queued"], g1["max_queue"], g1["dropped"], g1["last_seq"]) == (2, 1, 1, 1, 3)
+    assert (g2["connections"], g2["queued"], g2["dropped"], g2["last_seq"]) == (1, 0, 0, 1)
+    assert g2["bytes_sent"] > 0
+    assert metrics["connections"] == 3
+    assert metrics["slow_consumer_policy"] == "drop"
+
+
+def test_reconnect_closes_replaced_socket():
+    async def main():
+        manager = ConnectionManager()
+        old, new = FakeWebSocket(), FakeWebSocket()
+        await manager.connect(old, "g1", "u1")
+        await manager.connect(new, "g1", "u1")
+        await _settle()
+        state = (manager.is_current(old, "g1", "u1"), manager.is_current(new, "g1", "u1"))
+        # Replies to commands from the old socket are not redirected to the new one
+        replied_old = manager.send_to_user({"type": "ack", "n": 1}, "g1", "u1", websocket=old)
+        replied_new = manager.send_to_user({"type": "ack", "n": 2}, "g1", "u1", websocket=new)
+        await _broadcast_numbers(manager, "g1", [3])
+        left_on_old_close = manager.disconnect(old, "g1", "u1")
+        connected = manager.is_user_connected("g1", "u1")
+        left_on_new_close = manager.disconnect(new, "g1", "u1")
+        await manager.aclose()
+        return old, new, state, (replied_old, replied_new), (left_on_old_close, connected, left_on_new_close)
+
+    old, new, state, replies, departures = asyncio.run(main())
+    assert old.close_code == 1000 and new.close_code is None
+    assert state == (False, True)
+    assert replies == (False, True)
+    assert [m["n"] for m in new.sent] == [2, 3] and old.sent == []
+    assert departures == (False, True, True)
+
+
+def test_disconnect_of_evicted_socket_reports_departure():
+    async def main():
+        manager = ConnectionManager(max_queue_size=1, slow_consumer_policy="disconnect")
+        ws = FakeWebSocket(held=True)
+        await manager.connect(ws, "g1", "u1")
+        await _broadcast_numbers(manager, "g1", [1, 2, 3])
+        left = manager.disconnect(ws, "g1", "u1")
+        await manager.aclose()
+        return left
+
+    assert asyncio.run(main())
@@ -7,6 +7,7 @@ interface UseQuestionManagerReturn {
   currentQuestionIndex: number;
   isLastQuestion: boolean;
   nextQuestion: () => void; // Advances to the next question
+  goToQuestion: (index: number) => void; // Jumps to a question (e.g. after a resync snapshot)
   totalQuestionsToPlay: number;
 }
 
@@ -14,13 +15,15 @@ interface UseQuestionManagerReturn {
  * Custom hook to manage the flow of questions in the game.
  * @param allQuestions Array of all available questions.
  * @param totalQuestions Desired number of questions for this game session.
+ * @param initialIndex Question to start from (a game joined in progress).
  * @returns An object containing the current question, index, navigation function, etc.
  */
 export const useQuestionManager = (
   allQuestions: Question[],
-  totalQuestions: number
+  totalQuestions: number,
+  initialIndex: number = 0
 ): UseQuestionManagerReturn => {
-  const [currentQuestionIndex, setCurrentQuestionIndex] = useState<number>(0);
+  const [currentQuestionIndex, setCurrentQuestionIndex] = useState<number>(initialIndex);
 
   // Determine the actual number of questions to play (don't exceed available)
   const totalQuestionsToPlay = useMemo(() =>
@@ -49,11 +52,19 @@ export const useQuestionManager = (
     // The calling component should handle game end logic based on `isLastQuestion`.
   }, [isLastQuestion]); // Dependency: only needs to know if it *can* advance
 
+  // Function to jump to a question, e.g. the server's current one after a reconnect
+  const goToQuestion = useCallback((index: number) => {
+    if (index >= 0) {
+      setCurrentQuestionIndex(index);
+    }
+  }, []);
+
   return {
     currentQuestion,
     currentQuestionIndex,
     isLastQuestion,
     nextQuestion,
+    goToQuestion,
     totalQuestionsToPlay // Expose the calculated number of questions
   };
 };
\ No newline at end of file
@@ -22,6 +22,18 @@ const WS_BASE_URL = import.meta.env.VITE_WS_BASE_URL || API_BASE_URL.replace(/^h
 console.log("WebSocket Base URL:", WS_BASE_URL);
 
 
+/** seq/epoch carried by a room broadcast or resync snapshot, if any */
+const sequencePosition = (message: IncomingWsMessage): { seq: number; epoch: string } | null => {
+  const sequenced = message as { seq?: number; epoch?: string | null; type: string; payload?: any };
+  if (sequenced.type === 'resync' && typeof sequenced.payload?.seq === 'number' && sequenced.payload.epoch) {
+    return { seq: sequenced.payload.seq, epoch: sequenced.payload.epoch };
+  }
+  if (typeof sequenced.seq === 'number' && sequenced.epoch) {
+    return { seq: sequenced.seq, epoch: sequenced.epoch };
+  }
+  return null;
+};
+
 /**
  * Custom hook to manage a WebSocket connection for the game.
  * Handles connection, disconnection, message sending/receiving, and basic reconnection.
@@ -43,6 +55,8 @@ export const useWebSocket = ({
   const connectTimeoutRef = useRef<NodeJS.Timeout | null>(null);
   const attemptingConnectionRef = useRef<boolean>(false);
   const manualDisconnectRef = useRef<boolean>(false);
+  // Position of the last room broadcast received, sent on reconnect so the server replays only missed events
+  const lastSeqRef = useRef<{ seq: number; epoch: string } | null>(null);
 
   // Stable callback refs
   const onMessageRef = useRef(onMessage);
@@ -62,7 +76,9 @@ export const useWebSocket = ({
     if (wsRef.current && (wsRef.current.readyState === WebSocket.OPEN || wsRef.current.readyState === WebSocket.CONNECTING)) { console.log(`[WS Connect Skipped - ${gameId}/${userId}] WebSocket already OPEN or CONNECTING (readyState: ${wsRef.current.readyState})`); return; }
     if (attemptingConnectionRef.current) { console.log(`[WS Connect Skipped - ${gameId}/${userId}] Already attempting connection.`); return; }
 
-    const wsUrl = `${WS_BASE_URL}/ws/${gameId}/${userId}`;
+    const resumeFrom = lastSeqRef.current;
+    const resumeQuery = resumeFrom ? `?last_seq=${resumeFrom.seq}&epoch=${encodeURIComponent(resumeFrom.epoch)}` : '';
+    const wsUrl = `${WS_BASE_URL}/ws/${gameId}/${userId}${resumeQuery}`;
     console.log(`[WS Attempting Connect - ${gameId}/${userId}] URL: ${wsUrl}`);
     manualDisconnectRef.current = false;
     attemptingConnectionRef.current = true;
@@ -88,7 +104,12 @@ export const useWebSocket = ({
 
         newWs.onmessage = (event) => {
             if (wsRef.current === newWs) {
-                try { const message: IncomingWsMessage = JSON.parse(event.data); if (onMessageRef.current) onMessageRef.current(message); }
+                try {
+                    const message: IncomingWsMessage = JSON.parse(event.data);
+                    const position = sequencePosition(message);
+                    if (position) lastSeqRef.current = position;
+                    if (onMessageRef.current) onMessageRef.current(message);
+                }
                 catch (error) { console.error(`[WS Message Error - ${gameId}/${userId}] Failed to parse:`, error, 'Data:', event.data); }
             }
         };
@@ -9,7 +9,7 @@ const CountdownScreen: React.FC = () => {
   const [count, setCount] = useState(3);
   const navigate = useNavigate();
   const location = useLocation(); // Get location object
-  const gameData = location.state as { gameId?: string, packName?: string, totalQuestions?: number } | undefined; // <-- Add packName to type
+  const gameData = location.state as { gameId?: string, packName?: string, totalQuestions?: number, currentQuestionIndex?: number } | undefined; // <-- Add packName to type
 
   // Add a check in case state is missing (e.g., direct navigation)
   useEffect(() => {
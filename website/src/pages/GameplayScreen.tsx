@@ -31,6 +31,7 @@ const GameplayScreen: React.FC = () => {
   const packId = location.state?.packId as string | undefined;
   const packName = location.state?.packName as string | undefined;
   const totalQuestionsSetting = location.state?.totalQuestions as number | undefined;
+  const startQuestionIndex = (location.state?.currentQuestionIndex as number | undefined) ?? 0; // Set when joining a game in progress
   const gameCode = searchParams.get('gameCode');
   const isSoloMode = !gameCode; // Determine mode based on gameCode presence
 
@@ -79,8 +80,9 @@ const GameplayScreen: React.FC = () => {
     currentQuestionIndex,
     isLastQuestion,
     nextQuestion,
+    goToQuestion,
     totalQuestionsToPlay
-  } = useQuestionManager(gameQuestions, totalQuestionsSetting ?? gameQuestions.length);
+  } = useQuestionManager(gameQuestions, totalQuestionsSetting ?? gameQuestions.length, startQuestionIndex);
 
   // --- Local State ---
   const [selectedAnswer, setSelectedAnswer] = useState<string | null>(null);
@@ -168,6 +170,28 @@ const GameplayScreen: React.FC = () => {
          navigate('/');
          break;
        }
+       case 'resync': {
+         // Snapshot sent after a reconnect when the missed broadcasts could not be replayed
+         const { state } = message.payload;
+         console.log(`WS: Resync to ${state.status} game at index ${state.current_question_index}. Current index: ${currentQuestionIndexRef.current}`);
+         const me = state.participants.find((p: ApiParticipant) => p.user_id === currentUserIdRef.current);
+         if (me) setScore(me.score);
+         if (state.status === 'completed') {
+             const formattedResults: PlayerResult[] = state.participants.map((p: ApiParticipant) => ({
+                  id: p.user_id, name: p.display_name, score: p.score,
+                  avatar: getEmojiForPlayerId(p.user_id)
+             }));
+             const resultsPath = gameCode ? `/results?gameCode=${gameCode}` : '/results';
+             toast.info("Game Over!", { description: "Heading to the results..." });
+             navigate(resultsPath, { state: { results: formattedResults } });
+         } else if (state.status === 'cancelled') {
+             toast.error("Game Cancelled", { description: "The Captain has cancelled the game." });
+             navigate('/');
+         } else if (state.status === 'active' && state.current_question_index !== currentQuestionIndexRef.current) {
+             goToQuestionRef.current(state.current_question_index);
+         }
+         break;
+       }
        case 'error': {
          toast.error("Server Error", { description: message.payload.message });
          break;
@@ -179,9 +203,13 @@ const GameplayScreen: React.FC = () => {
 
   // --- Refs for Stable Callbacks ---
   const nextQuestionRef = useRef(nextQuestion);
+  const goToQuestionRef = useRef(goToQuestion);
   const currentQuestionIndexRef = useRef(currentQuestionIndex);
+  const currentUserIdRef = useRef(currentUserId);
   useEffect(() => { nextQuestionRef.current = nextQuestion; }, [nextQuestion]);
+  useEffect(() => { goToQuestionRef.current = goToQuestion; }, [goToQuestion]);
   useEffect(() => { currentQuestionIndexRef.current = currentQuestionIndex; }, [currentQuestionIndex]);
+  useEffect(() => { currentUserIdRef.current = currentUserId; }, [currentUserId]);
 
   // --- Initialize WebSocket Connection (Conditional) ---
   const { status: wsStatus } = useWebSocket({
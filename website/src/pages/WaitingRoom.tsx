@@ -171,6 +171,34 @@ const WaitingRoom: React.FC = () => {
         navigate(getBackLink()); // Define getBackLink or replace with static path
         break;
       }
+      case 'resync': {
+        // Snapshot sent after a reconnect when the missed broadcasts could not be replayed
+        const { state } = message.payload;
+        console.log(`[WS] Resync: game ${state.game_id} is ${state.status} with ${state.participants.length} participants`);
+        setCrewMembers(state.participants.map(p => ({
+          ...p,
+          is_host: p.is_host || p.user_id === gameSessionRef.current?.host_user_id
+        })));
+        if (state.status === 'active') {
+          // The game started while we were disconnected; join it at its current question
+          toast.success("Game Started!", { description: "Joining the voyage in progress..." });
+          navigate(`/countdown`, {
+            state: {
+              gameId: state.game_id,
+              packName: packName,
+              totalQuestions: state.total_questions,
+              currentQuestionIndex: state.current_question_index,
+            }
+          });
+        } else if (state.status === 'cancelled') {
+          toast.error("Game Cancelled", { description: "The Captain has cancelled the game." });
+          navigate(getBackLink());
+        } else if (state.status === 'completed') {
+          toast.info("Game Over!", { description: "This voyage has already ended." });
+          navigate(getBackLink());
+        }
+        break;
+      }
       case 'error': {
         toast.error("Server Error", { description: message.payload.message });
         break;
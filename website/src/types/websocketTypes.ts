@@ -53,6 +53,23 @@ export interface WsNextQuestionMessage {
     payload: WsNextQuestionPayload;
 }
 
+/** Message with the results of a question that has just closed (sent before next_question/game_over) */
+export interface WsQuestionResultsPayload {
+    index: number;
+    question_text: string;
+    correct_answer: string;
+    correct_answer_id: string;
+    correct_count: number;
+    total_answered: number;
+    correct_percentage: number;
+    scores: Record<string, number>; // participant_id -> score for this question
+    reason: 'host' | 'timeout' | 'all_answered';
+}
+export interface WsQuestionResultsMessage {
+    type: 'question_results';
+    payload: WsQuestionResultsPayload;
+}
+
 /** Message indicating the game is over and includes final results */
 export interface WsGameOverPayload {
     // Structure should match the response from GET /games/{game_id}/results
@@ -78,6 +95,25 @@ export interface WsGameCancelledMessage {
     payload: WsGameCancelledPayload;
 }
 
+/** Game state snapshot, sent on reconnect when missed broadcasts can no longer be replayed */
+export interface WsResyncPayload {
+    seq: number; // seq/epoch of the latest room broadcast; resume from here
+    epoch: string | null;
+    state: {
+        game_id: string;
+        status: string;
+        current_question_index: number;
+        total_questions: number;
+        time_limit: number;
+        current_question: ApiGamePlayQuestion | null;
+        participants: ApiParticipant[];
+    };
+}
+export interface WsResyncMessage {
+    type: 'resync';
+    payload: WsResyncPayload;
+}
+
 /** Generic error message from the backend via WebSocket */
 export interface WsErrorPayload {
     message: string;
@@ -88,6 +124,8 @@ export interface WsErrorMessage {
     payload: WsErrorPayload;
 }
 
+// Room broadcasts also carry `seq` and `epoch` (position in the room's event log)
+
 // --------- Union Type for ALL Incoming Messages ---------
 export type IncomingWsMessage =
     | WsParticipantUpdateMessage
@@ -95,22 +133,57 @@ export type IncomingWsMessage =
     | WsUserNameUpdatedMessage
     | WsGameStartedMessage
     | WsNextQuestionMessage
+    | WsQuestionResultsMessage
     | WsGameOverMessage
     | WsGameCancelledMessage
+    | WsResyncMessage
+    | WsAckMessage
     | WsErrorMessage;
 
 
 // --------- Message Types Sent FROM Frontend TO Backend ---------
-// (Currently, we are not planning to send messages from client to server,
-// but you could define them here if needed, e.g., for submitting answers via WS)
-
-// Example:
-// export interface WsSubmitAnswerPayload {
-//     question_index: number;
-//     answer_id: string;
-// }
-// export interface WsSubmitAnswerMessage {
-//     type: 'submit_answer';
-//     payload: WsSubmitAnswerPayload;
-// }
-// export type OutgoingWsMessage = WsSubmitAnswerMessage;
\ No newline at end of file
+// Commands are answered with a WsAckMessage carrying the same `id`.
+
+export interface WsSubmitAnswerPayload {
+    question_index: number;
+    answer: string; // Answer ID like "qID-optionIndex"
+}
+export interface WsSubmitAnswerCommand {
+    type: 'submit_answer';
+    id?: string;
+    payload: WsSubmitAnswerPayload;
+}
+
+/** Host only: end the current question and advance */
+export interface WsNextQuestionCommand {
+    type: 'next_question';
+    id?: string;
+    /** question_index: the question being closed; ignored if the game already moved past it */
+    payload?: { question_index?: number };
+}
+export interface WsPingCommand {
+    type: 'ping';
+    id?: string;
+    payload?: Record<string, never>;
+}
+/** Catch up: replays broadcasts after last_seq, or returns a snapshot ({seq, epoch, state}) */
+export interface WsResyncCommand {
+    type: 'resync';
+    id?: string;
+    payload?: { last_seq?: number; epoch?: string };
+}
+export type OutgoingWsMessage =
+    | WsSubmitAnswerCommand
+    | WsNextQuestionCommand
+    | WsPingCommand
+    | WsResyncCommand;
+
+/** Reply to a command, sent only to the client that issued it */
+export interface WsAckMessage {
+    type: 'ack';
+    id?: string;
+    command?: OutgoingWsMessage['type'];
+    ok: boolean;
+    payload?: Record<string, any>;
+    error?: string;
+}